@@ -0,0 +1,12 @@
+"""In-process caches for pg-mcp."""
+
+from pg_mcp.cache.lru import CacheStats, LRUCache
+from pg_mcp.cache.query_cache import CachedResult, QueryCache, normalize_question
+
+__all__ = [
+    "CachedResult",
+    "CacheStats",
+    "LRUCache",
+    "QueryCache",
+    "normalize_question",
+]
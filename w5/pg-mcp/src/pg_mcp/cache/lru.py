@@ -0,0 +1,128 @@
+"""Bounded LRU cache with optional expiry."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time cache counters.
+
+    Attributes:
+        hits: Lookups that found a live entry.
+        misses: Lookups that found nothing or an expired entry.
+        evictions: Entries dropped to stay within ``maxsize``.
+        size: Current number of entries.
+        maxsize: Maximum number of entries.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits (0 when there were none)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """Least-recently-used cache with a size bound and optional TTL.
+
+    Not thread-safe; intended for use from a single event loop.
+
+    Args:
+        maxsize: Maximum number of entries (0 disables caching).
+        ttl: Seconds an entry stays valid, or None to never expire.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Look up an entry and mark it as recently used.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The cached value, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Insert or replace an entry, evicting the least recently used ones.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        """Remove an entry.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The removed value, or None if it was not cached.
+        """
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Get the current cache counters.
+
+        Returns:
+            Snapshot of hits, misses, evictions and size.
+        """
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._entries),
+            maxsize=self.maxsize,
+        )
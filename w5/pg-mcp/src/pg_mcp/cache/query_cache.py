@@ -0,0 +1,158 @@
+"""Two-level cache for natural language queries."""
+
+import logging
+import re
+import unicodedata
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from pg_mcp.cache.lru import CacheStats, LRUCache
+from pg_mcp.config import CacheSettings
+from pg_mcp.models import QueryResultData, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+# Trailing punctuation that does not change the meaning of a question
+_TRAILING_PUNCTUATION = "?？!！.。;；"
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different phrasings share a cache entry.
+
+    Applies NFKC normalization (full-width to half-width), collapses
+    whitespace and strips trailing punctuation. Case is kept: questions may
+    quote case-sensitive literals such as ``status 'Shipped'``.
+
+    Args:
+        question: Natural language question.
+
+    Returns:
+        The normalized question.
+    """
+    text = unicodedata.normalize("NFKC", question)
+    text = _WHITESPACE_PATTERN.sub(" ", text).strip()
+    return text.rstrip(_TRAILING_PUNCTUATION).rstrip()
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """A query result stored in the result cache.
+
+    Attributes:
+        result: The query result data.
+        validation: The LLM validation of the result, if it was run.
+    """
+
+    result: QueryResultData
+    validation: ValidationResult | None
+
+
+class QueryCache:
+    """Caches generated SQL and query results across requests.
+
+    The first level maps (database, schema version, normalized question) to
+    the generated SQL, so a schema change invalidates it automatically. The
+    second level maps (database, schema version, SQL) to the result and
+    expires after ``result_ttl`` seconds; results larger than
+    ``result_max_rows`` are not cached.
+
+    Args:
+        settings: Cache configuration settings.
+    """
+
+    def __init__(self, settings: CacheSettings) -> None:
+        self.settings = settings
+        self._sql: LRUCache[Hashable, str] = LRUCache(settings.sql_cache_size)
+        self._results: LRUCache[Hashable, CachedResult] = LRUCache(
+            settings.result_cache_size if settings.result_ttl > 0 else 0,
+            ttl=settings.result_ttl,
+        )
+
+    def get_sql(self, database: str, schema_version: int, question: str) -> str | None:
+        """Look up the SQL previously generated for a question.
+
+        Args:
+            database: Database alias.
+            schema_version: Current schema version of the database.
+            question: Natural language question.
+
+        Returns:
+            The cached SQL, or None on a miss.
+        """
+        return self._sql.get((database, schema_version, normalize_question(question)))
+
+    def set_sql(self, database: str, schema_version: int, question: str, sql: str) -> None:
+        """Store the SQL generated for a question.
+
+        Args:
+            database: Database alias.
+            schema_version: Schema version the SQL was generated against.
+            question: Natural language question.
+            sql: Generated and validated SQL.
+        """
+        self._sql.set((database, schema_version, normalize_question(question)), sql)
+
+    def get_result(self, database: str, schema_version: int, sql: str) -> CachedResult | None:
+        """Look up a cached result for a SQL statement.
+
+        Args:
+            database: Database alias.
+            schema_version: Current schema version of the database.
+            sql: SQL statement.
+
+        Returns:
+            The cached result, or None on a miss or after expiry.
+        """
+        return self._results.get((database, schema_version, sql))
+
+    def set_result(
+        self,
+        database: str,
+        schema_version: int,
+        sql: str,
+        result: QueryResultData,
+        validation: ValidationResult | None,
+    ) -> bool:
+        """Store a query result if it fits the row budget.
+
+        Args:
+            database: Database alias.
+            schema_version: Schema version the query ran against.
+            sql: SQL statement.
+            result: Query result data.
+            validation: LLM validation of the result, if any.
+
+        Returns:
+            True if the result was cached.
+        """
+        if result.row_count > self.settings.result_max_rows:
+            logger.debug(f"Not caching result with {result.row_count} rows")
+            return False
+        self._results.set((database, schema_version, sql), CachedResult(result, validation))
+        return True
+
+    def discard(self, database: str, schema_version: int, question: str, sql: str) -> None:
+        """Drop the cached SQL of a question and the cached result of its SQL.
+
+        Args:
+            database: Database alias.
+            schema_version: Schema version the entries were stored for.
+            question: Natural language question.
+            sql: SQL statement generated for the question.
+        """
+        self._sql.pop((database, schema_version, normalize_question(question)))
+        self._results.pop((database, schema_version, sql))
+
+    def clear(self) -> None:
+        """Drop all cached SQL and results."""
+        self._sql.clear()
+        self._results.clear()
+
+    def stats(self) -> dict[str, CacheStats]:
+        """Get hit/miss counters of both cache levels.
+
+        Returns:
+            Counters keyed by "sql" and "result".
+        """
+        return {"sql": self._sql.stats(), "result": self._results.stats()}
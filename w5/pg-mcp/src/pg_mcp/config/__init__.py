@@ -1,17 +1,27 @@
 """Configuration management for pg-mcp."""
 
 from pg_mcp.config.settings import (
+    AdmissionSettings,
+    CacheSettings,
     ConfigLoader,
     DatabaseConfig,
     LLMSettings,
     QuerySettings,
+    ReplicaConfig,
+    SchemaSettings,
     Settings,
+    ValidatorSettings,
 )
 
 __all__ = [
     "Settings",
     "LLMSettings",
     "QuerySettings",
+    "SchemaSettings",
+    "CacheSettings",
+    "ValidatorSettings",
+    "AdmissionSettings",
     "DatabaseConfig",
+    "ReplicaConfig",
     "ConfigLoader",
 ]
@@ -4,6 +4,7 @@ import logging
 import os
 import re
 from pathlib import Path
+from typing import Literal
 
 import yaml
 from pydantic import BaseModel, Field, SecretStr, computed_field
@@ -26,6 +27,48 @@ class LLMSettings(BaseSettings):
     temperature: float = Field(default=0.1, ge=0, le=2, description="Generation temperature")
     timeout: float = Field(default=30.0, gt=0, description="API request timeout in seconds")
     max_tokens: int = Field(default=2048, gt=0, description="Maximum tokens to generate")
+    batch_max_tokens: int = Field(
+        default=8192,
+        gt=0,
+        description="Maximum tokens to generate for a combined batch request, which "
+        "otherwise gets max_tokens per question; keep within the model's output limit",
+    )
+    stream_sql: bool = Field(
+        default=False,
+        description="Stream SQL generation responses and stop reading once the statement "
+        "is complete",
+    )
+    max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum number of LLM API requests in flight",
+    )
+    rate_limit: float = Field(
+        default=0,
+        ge=0,
+        description="Maximum LLM API requests per second (0 disables rate limiting)",
+    )
+    rate_burst: int = Field(
+        default=5,
+        ge=1,
+        description="Requests that may be sent at once before rate limiting applies",
+    )
+    max_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Retries of LLM API requests that failed with a rate limit, timeout, "
+        "connection or server error",
+    )
+    retry_base_delay: float = Field(
+        default=0.5,
+        gt=0,
+        description="Backoff before the first retry in seconds, doubled per retry and jittered",
+    )
+    retry_max_delay: float = Field(
+        default=8.0,
+        gt=0,
+        description="Upper bound of the retry backoff in seconds",
+    )
 
 
 class QuerySettings(BaseSettings):
@@ -48,6 +91,254 @@ class QuerySettings(BaseSettings):
         default=True,
         description="Whether to enable LLM result validation",
     )
+    validation_mode: Literal["sync", "async"] = Field(
+        default="sync",
+        description="Run LLM result validation before responding (sync) or in the "
+        "background, retrievable by validation ID (async)",
+    )
+    validation_workers: int = Field(
+        default=2,
+        ge=1,
+        description="Background validations run at once; keep below LLM_MAX_CONCURRENCY "
+        "so that SQL generation always has API capacity left",
+    )
+    validation_queue_size: int = Field(
+        default=100,
+        ge=1,
+        description="Background validations waiting to run; further queries skip validation",
+    )
+    validation_result_ttl: float = Field(
+        default=600.0,
+        gt=0,
+        description="Seconds background validation results stay retrievable",
+    )
+    batch_max_queries: int = Field(
+        default=20,
+        ge=1,
+        le=100,
+        description="Maximum number of questions in one batch query",
+    )
+    batch_sql_mode: Literal["concurrent", "combined"] = Field(
+        default="concurrent",
+        description="Generate the SQL of a batch with one LLM request per question "
+        "(concurrent) or with a single multi-question request (combined)",
+    )
+    stream_results: bool = Field(
+        default=False,
+        description="Fetch results in batches through a server-side cursor instead of "
+        "loading them all at once",
+    )
+    stream_batch_size: int = Field(
+        default=500,
+        ge=1,
+        description="Rows fetched per batch when streaming results",
+    )
+    max_result_bytes: int = Field(
+        default=0,
+        ge=0,
+        description="Byte budget for the JSON-encoded result rows (columns in the columnar "
+        "format); rows beyond it are dropped and the result is marked truncated "
+        "(0 disables the budget)",
+    )
+    result_format: Literal["rows", "columnar"] = Field(
+        default="rows",
+        description="Return result values as rows, or as typed column arrays with "
+        "dictionary-encoded strings and compact numbers (columnar)",
+    )
+    max_estimated_cost: float = Field(
+        default=0,
+        ge=0,
+        description="Reject queries whose EXPLAIN total cost is above this, in planner "
+        "cost units (0 disables the check)",
+    )
+    max_estimated_rows: int = Field(
+        default=0,
+        ge=0,
+        description="Reject queries where any plan node outside the input of a Limit, or a "
+        "cross join of tables by their estimated row counts, is estimated to produce more rows "
+        "than this (0 disables the check)",
+    )
+    explain_cache_size: int = Field(
+        default=1024,
+        ge=0,
+        description="Number of EXPLAIN estimates cached by SQL hash until the next schema "
+        "refresh (0 disables caching)",
+    )
+    repair_attempts: int = Field(
+        default=0,
+        ge=0,
+        le=5,
+        description="Times SQL that fails validation or execution is sent back to the LLM "
+        "with its error for correction (0 disables repair)",
+    )
+    repair_timeout: float = Field(
+        default=15.0,
+        gt=0,
+        description="Seconds from the start of SQL generation after which no further "
+        "repair is attempted",
+    )
+    schema_token_budget: int = Field(
+        default=6000,
+        ge=0,
+        description="Estimated token budget for the schema sent to the LLM (0 disables pruning)",
+    )
+    schema_pruning_min_tables: int = Field(
+        default=30,
+        ge=1,
+        description="Only prune the schema context when it has at least this many tables and views",
+    )
+
+
+class SchemaSettings(BaseSettings):
+    """Schema cache configuration settings."""
+
+    model_config = SettingsConfigDict(env_prefix="SCHEMA_")
+
+    refresh_concurrency: int = Field(
+        default=1,
+        ge=1,
+        le=7,
+        description="Number of pooled connections used to run catalog queries in parallel "
+        "during a schema refresh (1 runs them sequentially on a single connection)",
+    )
+    introspection: Literal["information_schema", "pg_catalog"] = Field(
+        default="information_schema",
+        description="Catalog backend used for schema introspection",
+    )
+    watch_interval: float = Field(
+        default=0,
+        ge=0,
+        description="Seconds between DDL change checks that incrementally refresh "
+        "the schema cache (0 disables the watcher)",
+    )
+    ddl_log_table: str | None = Field(
+        default=None,
+        pattern=r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$",
+        description="Optional table filled by a DDL event trigger; when set, the watcher "
+        "only checks catalog signatures after new rows appear in it",
+    )
+    snapshot_dir: str | None = Field(
+        default=None,
+        description="Directory for on-disk schema snapshots; when set, startup loads the "
+        "snapshot immediately and revalidates it against the catalog in the background",
+    )
+    context_cache_size: int = Field(
+        default=256,
+        ge=0,
+        description="Maximum number of rendered LLM contexts of pruned schema subsets "
+        "kept per database (0 disables subset caching)",
+    )
+    profile_interval: float = Field(
+        default=0,
+        ge=0,
+        description="Seconds between refreshes of the common values of low-cardinality text "
+        "columns from pg_stats, shown in the LLM context (0 disables profiling)",
+    )
+    profile_max_distinct: int = Field(
+        default=50,
+        ge=1,
+        description="Only profile text columns with at most this many distinct values",
+    )
+    profile_max_values: int = Field(
+        default=10,
+        ge=1,
+        description="Most common values kept per profiled column",
+    )
+
+
+class ValidatorSettings(BaseSettings):
+    """SQL safety validation configuration settings."""
+
+    model_config = SettingsConfigDict(env_prefix="VALIDATOR_")
+
+    executor: Literal["inline", "thread", "process"] = Field(
+        default="thread",
+        description="Where SQL is parsed and checked: on the event loop (inline), or in a "
+        "thread or process pool",
+    )
+    workers: int = Field(
+        default=2,
+        ge=1,
+        description="Number of validation worker threads or processes",
+    )
+    parse_timeout: float = Field(
+        default=5.0,
+        gt=0,
+        description="Seconds allowed for parsing and checking one statement; slower "
+        "statements are rejected",
+    )
+    cache_size: int = Field(
+        default=1024,
+        ge=0,
+        description="Maximum number of validation verdicts cached by SQL hash (0 disables)",
+    )
+
+
+class CacheSettings(BaseSettings):
+    """Query cache configuration settings."""
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_")
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to cache generated SQL and query results",
+    )
+    sql_cache_size: int = Field(
+        default=1024,
+        ge=0,
+        description="Maximum number of question to SQL entries",
+    )
+    result_cache_size: int = Field(
+        default=256,
+        ge=0,
+        description="Maximum number of SQL to result entries",
+    )
+    result_ttl: float = Field(
+        default=60.0,
+        ge=0,
+        description="Seconds a cached query result stays valid (0 disables result caching)",
+    )
+    result_max_rows: int = Field(
+        default=1000,
+        ge=0,
+        description="Results with more rows than this are not cached",
+    )
+
+
+class AdmissionSettings(BaseSettings):
+    """Admission control configuration settings."""
+
+    model_config = SettingsConfigDict(env_prefix="ADMISSION_")
+
+    max_concurrency: int = Field(
+        default=0,
+        ge=0,
+        description="Queries processed at once across all databases; further queries wait "
+        "in a weighted fair queue (0 disables admission control)",
+    )
+    database_max_concurrency: int = Field(
+        default=0,
+        ge=0,
+        description="Queries processed at once per database (0 for no quota beyond "
+        "max_concurrency)",
+    )
+    client_max_concurrency: int = Field(
+        default=8,
+        ge=0,
+        description="Queries processed at once per client, keyed on the server-assigned "
+        "session (0 for no quota beyond max_concurrency)",
+    )
+    max_queue_size: int = Field(
+        default=256,
+        ge=0,
+        description="Queries waiting for admission; further queries are rejected with a "
+        "retry delay",
+    )
+    queue_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds a query may wait for admission before it is rejected",
+    )
 
 
 class Settings(BaseSettings):
@@ -63,8 +354,24 @@ class Settings(BaseSettings):
         default="INFO",
         description="Logging level",
     )
+    init_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds allowed for each database to initialize at startup or on retry",
+    )
     llm: LLMSettings = Field(default_factory=LLMSettings)
     query: QuerySettings = Field(default_factory=QuerySettings)
+    schema_cache: SchemaSettings = Field(default_factory=SchemaSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    validator: ValidatorSettings = Field(default_factory=ValidatorSettings)
+    admission: AdmissionSettings = Field(default_factory=AdmissionSettings)
+
+
+class ReplicaConfig(BaseModel):
+    """Read replica endpoint; credentials and database name are those of the primary."""
+
+    host: str = Field(description="Replica host")
+    port: int = Field(default=5432, ge=1, le=65535, description="Replica port")
 
 
 class DatabaseConfig(BaseModel):
@@ -79,6 +386,39 @@ class DatabaseConfig(BaseModel):
     min_pool_size: int = Field(default=2, ge=1, description="Minimum connection pool size")
     max_pool_size: int = Field(default=10, ge=1, description="Maximum connection pool size")
     ssl: bool = Field(default=False, description="Whether to use SSL connection")
+    statement_cache_size: int = Field(
+        default=256,
+        ge=0,
+        description="Prepared statements cached per connection (0 disables, e.g. behind "
+        "PgBouncer in transaction pooling mode)",
+    )
+    command_timeout: float | None = Field(
+        default=60.0,
+        gt=0,
+        description="Client-side timeout in seconds for each command (None disables)",
+    )
+    max_inactive_connection_lifetime: float = Field(
+        default=300.0,
+        ge=0,
+        description="Seconds an idle pooled connection is kept before it is closed (0 keeps "
+        "it forever)",
+    )
+    replicas: list[ReplicaConfig] = Field(
+        default_factory=list,
+        description="Read replicas that queries are routed to; the primary serves queries "
+        "only when no replica is healthy",
+    )
+    replica_check_interval: float = Field(
+        default=10.0,
+        gt=0,
+        description="Seconds between replica health checks",
+    )
+    weight: float = Field(
+        default=1.0,
+        gt=0,
+        description="Share of the server's query capacity this database gets when queries "
+        "queue for admission, relative to the other databases",
+    )
 
     @computed_field
     @property
@@ -151,7 +491,12 @@ class ConfigLoader:
                 result[key] = cls._expand_env_vars(value)
             elif isinstance(value, list):
                 result[key] = [
-                    cls._expand_string(v) if isinstance(v, str) else v for v in value
+                    cls._expand_string(v)
+                    if isinstance(v, str)
+                    else cls._expand_env_vars(v)
+                    if isinstance(v, dict)
+                    else v
+                    for v in value
                 ]
             else:
                 result[key] = value
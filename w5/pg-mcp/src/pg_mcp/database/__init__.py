@@ -1,11 +1,23 @@
 """Database components for pg-mcp."""
 
-from pg_mcp.database.connection import ConnectionPool
+from pg_mcp.database.column_profiler import ColumnProfiler
+from pg_mcp.database.connection import ConnectionPool, PoolStats
+from pg_mcp.database.cost_guard import CostGuard, PlanEstimate
+from pg_mcp.database.replicas import ReplicaRouter
 from pg_mcp.database.schema_cache import SchemaCache
+from pg_mcp.database.schema_snapshot import SchemaSnapshotStore
+from pg_mcp.database.schema_watcher import SchemaWatcher
 from pg_mcp.database.service import DatabaseService
 
 __all__ = [
+    "ColumnProfiler",
     "ConnectionPool",
+    "PoolStats",
+    "CostGuard",
+    "PlanEstimate",
+    "ReplicaRouter",
     "SchemaCache",
+    "SchemaSnapshotStore",
+    "SchemaWatcher",
     "DatabaseService",
 ]
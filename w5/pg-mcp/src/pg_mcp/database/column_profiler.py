@@ -0,0 +1,161 @@
+"""Background profiling of low-cardinality text columns from pg_stats."""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+
+from asyncpg import Record
+
+from pg_mcp.database.connection import ConnectionPool
+from pg_mcp.database.schema_cache import ColumnStatsMap, SchemaCache
+from pg_mcp.models import ColumnStats
+
+logger = logging.getLogger(__name__)
+
+# Longer common values are cut to this many characters
+MAX_VALUE_LENGTH = 60
+
+# Planner statistics of text columns with few distinct values. A negative
+# n_distinct is a fraction of the row count; statistics covering inheritance
+# children are preferred so that partitioned tables are profiled too.
+COLUMN_STATS_QUERY = """
+SELECT * FROM (
+    SELECT DISTINCT ON (s.schemaname, s.tablename, s.attname)
+        s.schemaname AS table_schema,
+        s.tablename AS table_name,
+        s.attname AS column_name,
+        s.null_frac,
+        round(CASE
+            WHEN s.n_distinct < 0 THEN -s.n_distinct * greatest(c.reltuples, 0)
+            ELSE s.n_distinct
+        END)::bigint AS distinct_count,
+        s.most_common_vals::text::text[] AS most_common_values,
+        s.most_common_freqs::float8[] AS most_common_frequencies
+    FROM pg_catalog.pg_stats s
+    JOIN pg_catalog.pg_namespace n ON n.nspname = s.schemaname
+    JOIN pg_catalog.pg_class c ON c.relnamespace = n.oid AND c.relname = s.tablename
+    JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attname = s.attname
+    JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+    WHERE s.schemaname NOT IN ('pg_catalog', 'information_schema')
+        AND s.schemaname !~ '^pg_(toast|temp_)'
+        AND t.typcategory = 'S'
+    ORDER BY s.schemaname, s.tablename, s.attname, s.inherited DESC
+) stats
+WHERE distinct_count BETWEEN 1 AND $1;
+"""
+
+
+def build_column_stats(rows: Iterable[Record], max_values: int) -> ColumnStatsMap:
+    """Turn pg_stats rows into column statistics.
+
+    Args:
+        rows: Rows of :data:`COLUMN_STATS_QUERY`.
+        max_values: Most common values kept per column.
+
+    Returns:
+        Column statistics keyed by table full name, then column name.
+    """
+    stats: ColumnStatsMap = {}
+    for row in rows:
+        values = (row["most_common_values"] or [])[:max_values]
+        frequencies = (row["most_common_frequencies"] or [])[:max_values]
+        table = f"{row['table_schema']}.{row['table_name']}"
+        stats.setdefault(table, {})[row["column_name"]] = ColumnStats(
+            null_fraction=row["null_frac"],
+            distinct_count=row["distinct_count"],
+            most_common_values=[
+                value if len(value) <= MAX_VALUE_LENGTH else value[:MAX_VALUE_LENGTH] + "…"
+                for value in values
+            ],
+            most_common_frequencies=[round(f, 4) for f in frequencies],
+        )
+    return stats
+
+
+class ColumnProfiler:
+    """Periodically attaches common values of text columns to the schema cache.
+
+    Reads only the statistics ANALYZE (or autovacuum) already sampled in
+    ``pg_stats``, so a profile costs a single catalog query and never scans
+    a table; tables that were never analyzed have no statistics and are
+    skipped. The first profile is taken as soon as the profiler starts.
+
+    Args:
+        pool: Connection pool used for the catalog query.
+        schema_cache: Schema cache to attach the statistics to.
+        interval: Seconds between profiles.
+        max_distinct: Only columns with at most this many distinct values
+            are profiled.
+        max_values: Most common values kept per column.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        schema_cache: SchemaCache,
+        interval: float,
+        max_distinct: int = 50,
+        max_values: int = 10,
+    ) -> None:
+        self._pool = pool
+        self._schema_cache = schema_cache
+        self.interval = interval
+        self.max_distinct = max_distinct
+        self.max_values = max_values
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the background profiling task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def profile(self) -> ColumnStatsMap:
+        """Read the column statistics once and attach them to the schema cache.
+
+        Returns:
+            The column statistics that were read.
+        """
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(COLUMN_STATS_QUERY, self.max_distinct)
+        stats = build_column_stats(rows, self.max_values)
+        updated = await self._schema_cache.update_column_stats(stats)
+        logger.info(
+            f"Profiled {sum(len(columns) for columns in stats.values())} column(s) of "
+            f"{self._schema_cache.database_name}"
+            + ("" if updated else " (unchanged)")
+        )
+        return stats
+
+    def start(self) -> None:
+        """Start the background profiling task (no-op if already running)."""
+        if self.is_running:
+            return
+        logger.info(
+            f"Starting column profiler for {self._schema_cache.database_name} "
+            f"(every {self.interval}s)"
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background profiling task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Profile now and then every interval until cancelled."""
+        while True:
+            try:
+                await self.profile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Column profiling failed for {self._schema_cache.database_name}: {e}"
+                )
+            await asyncio.sleep(self.interval)
@@ -3,25 +3,52 @@
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
 import asyncpg
 from asyncpg import Connection, Pool
 
-from pg_mcp.config import DatabaseConfig
+from pg_mcp.config import DatabaseConfig, ReplicaConfig
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time connection pool counters.
+
+    Attributes:
+        size: Open connections.
+        idle: Open connections not in use.
+        max_size: Maximum number of connections.
+        waiters: Callers waiting for a connection.
+    """
+
+    size: int
+    idle: int
+    max_size: int
+    waiters: int
+
+
 class ConnectionPool:
     """Manages asyncpg connection pool for PostgreSQL.
 
     Args:
         config: Database connection configuration.
+        replica: Read replica to connect to instead of the primary; the
+            credentials and pool options of ``config`` still apply.
     """
 
-    def __init__(self, config: DatabaseConfig) -> None:
+    def __init__(
+        self,
+        config: DatabaseConfig,
+        replica: ReplicaConfig | None = None,
+    ) -> None:
         self.config = config
+        self.host = replica.host if replica else config.host
+        self.port = replica.port if replica else config.port
         self._pool: Pool | None = None
+        self._waiters = 0
 
     @property
     def is_initialized(self) -> bool:
@@ -32,6 +59,8 @@ class ConnectionPool:
         """Initialize the connection pool.
 
         Creates an asyncpg connection pool with the configured settings.
+        Each connection keeps an LRU cache of prepared statements (keyed by
+        query text), so repeated queries skip the parse and plan round trip.
         This method is idempotent - calling it multiple times has no effect.
         """
         if self._pool is not None:
@@ -40,21 +69,23 @@ class ConnectionPool:
 
         logger.info(
             f"Initializing connection pool for {self.config.name} "
-            f"({self.config.host}:{self.config.port}/{self.config.database})"
+            f"({self.host}:{self.port}/{self.config.database})"
         )
 
         ssl_context = "require" if self.config.ssl else False
 
         self._pool = await asyncpg.create_pool(
-            host=self.config.host,
-            port=self.config.port,
+            host=self.host,
+            port=self.port,
             database=self.config.database,
             user=self.config.user,
             password=self.config.password.get_secret_value(),
             min_size=self.config.min_pool_size,
             max_size=self.config.max_pool_size,
             ssl=ssl_context,
-            command_timeout=60,  # Default command timeout
+            command_timeout=self.config.command_timeout,
+            statement_cache_size=self.config.statement_cache_size,
+            max_inactive_connection_lifetime=self.config.max_inactive_connection_lifetime,
         )
 
         logger.info(f"Connection pool initialized successfully for {self.config.name}")
@@ -85,5 +116,28 @@ class ConnectionPool:
         if self._pool is None:
             raise RuntimeError("Connection pool not initialized. Call initialize() first.")
 
-        async with self._pool.acquire() as conn:
-            yield conn
+        self._waiters += 1
+        waiting = True
+        try:
+            async with self._pool.acquire() as conn:
+                self._waiters -= 1
+                waiting = False
+                yield conn
+        finally:
+            if waiting:
+                self._waiters -= 1
+
+    def stats(self) -> PoolStats:
+        """Get the current pool counters (all zero before initialization).
+
+        Returns:
+            Pool size, idle connections and waiting callers.
+        """
+        if self._pool is None:
+            return PoolStats(size=0, idle=0, max_size=self.config.max_pool_size, waiters=0)
+        return PoolStats(
+            size=self._pool.get_size(),
+            idle=self._pool.get_idle_size(),
+            max_size=self._pool.get_max_size(),
+            waiters=self._waiters,
+        )
@@ -0,0 +1,198 @@
+"""Rejection of queries the planner estimates to be too expensive."""
+
+import hashlib
+import json
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from asyncpg import Connection
+from sqlglot import exp
+
+from pg_mcp.cache import LRUCache
+from pg_mcp.models import DatabaseSchema, QueryTooExpensiveError
+
+
+@dataclass(frozen=True)
+class PlanEstimate:
+    """Planner estimates of a query.
+
+    Attributes:
+        cost: Total cost of the plan, in planner cost units.
+        rows: Largest number of rows any plan node is estimated to produce,
+            not counting the nodes below a Limit.
+    """
+
+    cost: float
+    rows: int
+
+
+def _plan_nodes(node: Mapping[str, Any]) -> Iterator[Mapping[str, Any]]:
+    """Walk a plan node and the nodes below it, stopping at Limit nodes.
+
+    The nodes below a Limit still report the estimate for running to
+    completion, although execution stops once the limit is reached.
+    """
+    yield node
+    if node.get("Node Type") == "Limit":
+        return
+    for child in node.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def parse_plan(explain: Any) -> PlanEstimate:
+    """Extract the estimates from the output of ``EXPLAIN (FORMAT JSON)``.
+
+    Args:
+        explain: The EXPLAIN output, as JSON text or already decoded.
+
+    Returns:
+        The estimates of the plan.
+    """
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    plan = explain[0]["Plan"]
+    return PlanEstimate(
+        cost=float(plan["Total Cost"]),
+        rows=max(int(node["Plan Rows"]) for node in _plan_nodes(plan)),
+    )
+
+
+def _is_cross_join(join: exp.Join, select: exp.Select) -> bool:
+    """Check whether a join has no condition relating it to the other sources.
+
+    Comma and CROSS joins count only when the query has no WHERE clause,
+    since the condition usually lives there.
+    """
+    if join.args.get("on") or join.args.get("using") or join.method == "NATURAL":
+        return False
+    return select.args.get("where") is None
+
+
+def estimate_cross_join_rows(
+    statement: exp.Expression, row_counts: Mapping[str, int]
+) -> int | None:
+    """Estimate the rows of the largest cross join in a statement.
+
+    For each SELECT, multiplies the estimated row counts of the tables it
+    joins without a join condition. Joins involving anything other than a
+    table with a known row count (subqueries, CTEs, views) are skipped.
+
+    Args:
+        statement: Parsed statement.
+        row_counts: Estimated row counts keyed by table name, both with and
+            without the schema prefix.
+
+    Returns:
+        The largest product, or None if the statement has no cross join of
+        tables with known row counts.
+    """
+    largest: int | None = None
+    for select in statement.find_all(exp.Select):
+        joins = [j for j in select.args.get("joins") or () if _is_cross_join(j, select)]
+        # The FROM clause is stored as "from_" since sqlglot 26
+        source = select.args.get("from_") or select.args.get("from")
+        if not joins or source is None:
+            continue
+
+        product = 1
+        for table in (source.this, *(j.this for j in joins)):
+            if not isinstance(table, exp.Table):
+                break
+            name = f"{table.db}.{table.name}" if table.db else table.name
+            count = row_counts.get(name)
+            if count is None:
+                break
+            # A never-analyzed table still holds at least a row as far as we know
+            product *= max(count, 1)
+        else:
+            largest = product if largest is None else max(largest, product)
+    return largest
+
+
+class CostGuard:
+    """Checks queries against cost and row limits before they run.
+
+    A cross join of tables whose estimated row counts from the schema cache
+    multiply past the row limit is rejected without asking the server.
+    Otherwise the query is planned with ``EXPLAIN (FORMAT JSON)`` and its
+    estimates are checked; estimates are cached by SQL hash until the
+    schema is refreshed, since refreshes also bring new table statistics.
+
+    Args:
+        max_cost: Largest allowed total plan cost (0 disables the check).
+        max_rows: Largest allowed row estimate of any plan node outside
+            the input of a Limit (0 disables the check).
+        cache_size: Number of plan estimates to cache.
+    """
+
+    def __init__(self, max_cost: float, max_rows: int, cache_size: int = 1024) -> None:
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self._estimates: LRUCache[bytes, PlanEstimate] = LRUCache(cache_size)
+        self._row_counts: dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set."""
+        return self.max_cost > 0 or self.max_rows > 0
+
+    def update_schema(self, schema: DatabaseSchema) -> None:
+        """Take the table row estimates of a new schema and drop cached plans.
+
+        Args:
+            schema: The refreshed schema.
+        """
+        row_counts: dict[str, int] = {}
+        for table in schema.tables:
+            if table.estimated_row_count is None or table.estimated_row_count < 0:
+                continue
+            row_counts[table.full_name] = table.estimated_row_count
+            row_counts.setdefault(table.name, table.estimated_row_count)
+        self._row_counts = row_counts
+        self._estimates.clear()
+
+    async def check(
+        self,
+        conn: Connection,
+        sql: str,
+        statement: exp.Expression | None = None,
+    ) -> PlanEstimate | None:
+        """Check a query against the limits.
+
+        Args:
+            conn: Connection the query will run on.
+            sql: SQL text that will be executed.
+            statement: Parsed form of the query, for the cross join check.
+
+        Returns:
+            The plan estimate, or None if no limit is set.
+
+        Raises:
+            QueryTooExpensiveError: If an estimate exceeds its limit.
+        """
+        if not self.enabled:
+            return None
+
+        if self.max_rows > 0 and statement is not None and self._row_counts:
+            cross_rows = estimate_cross_join_rows(statement, self._row_counts)
+            if cross_rows is not None and cross_rows > self.max_rows:
+                raise QueryTooExpensiveError(
+                    f"笛卡尔积预计 {cross_rows:,} 行，上限 {self.max_rows:,} 行", sql
+                )
+
+        key = hashlib.sha256(sql.encode("utf-8")).digest()
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            estimate = parse_plan(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}"))
+            self._estimates.set(key, estimate)
+
+        if self.max_cost > 0 and estimate.cost > self.max_cost:
+            raise QueryTooExpensiveError(
+                f"预计代价 {estimate.cost:,.0f}，上限 {self.max_cost:,.0f}", sql
+            )
+        if self.max_rows > 0 and estimate.rows > self.max_rows:
+            raise QueryTooExpensiveError(
+                f"预计 {estimate.rows:,} 行，上限 {self.max_rows:,} 行", sql
+            )
+        return estimate
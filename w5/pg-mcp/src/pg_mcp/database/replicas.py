@@ -0,0 +1,232 @@
+"""Routing of read-only queries across read replicas."""
+
+import asyncio
+import logging
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import asyncpg
+from asyncpg import Connection
+
+from pg_mcp.database.connection import ConnectionPool, PoolStats
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning a connection to the server could not be made
+CONNECT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.InterfaceError,
+)
+
+# Errors meaning an established connection was lost. Timeouts are left out:
+# asyncpg also raises them when command_timeout expires on a slow query, and
+# TimeoutError is an OSError, hence ConnectionError rather than OSError.
+CONNECTION_ERRORS = (
+    ConnectionError,
+    asyncpg.PostgresConnectionError,
+)
+
+# Seconds a single replica health check may take
+HEALTH_CHECK_TIMEOUT = 5.0
+
+
+@dataclass
+class _Replica:
+    """Routing state of one replica."""
+
+    pool: ConnectionPool
+    healthy: bool = False
+    # Queries waiting for or holding a connection of this replica
+    outstanding: int = 0
+
+    @property
+    def address(self) -> str:
+        """Host and port of the replica, for logging."""
+        return f"{self.pool.host}:{self.pool.port}"
+
+
+class ReplicaRouter:
+    """Routes read-only queries to the least busy healthy replica.
+
+    Each query goes to the healthy replica with the fewest outstanding
+    requests, ties taking turns. A replica that cannot be reached is taken
+    out of rotation and the connection is taken from the next replica,
+    falling back to the primary when none is left. A replica whose
+    connection is lost during a query is also taken out of rotation, but
+    the error reaches the caller, which may retry the query on another
+    :meth:`acquire`. A background task checks every replica each
+    ``check_interval`` seconds, connecting replicas that were down, and puts
+    recovered replicas back into rotation.
+
+    Args:
+        primary: Pool of the primary, used when no replica is available.
+        replicas: Pools of the read replicas.
+        check_interval: Seconds between health checks.
+    """
+
+    def __init__(
+        self,
+        primary: ConnectionPool,
+        replicas: list[ConnectionPool],
+        check_interval: float,
+    ) -> None:
+        self._primary = primary
+        self._replicas = [_Replica(pool) for pool in replicas]
+        self.check_interval = check_interval
+        self._task: asyncio.Task[None] | None = None
+        self._turn = 0
+
+    @property
+    def healthy_count(self) -> int:
+        """Number of replicas currently in rotation."""
+        return sum(replica.healthy for replica in self._replicas)
+
+    def health(self) -> dict[str, bool]:
+        """Get whether each replica is in rotation.
+
+        Returns:
+            Health keyed by replica ``host:port``.
+        """
+        return {replica.address: replica.healthy for replica in self._replicas}
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        """Get the pool counters of the replicas.
+
+        Returns:
+            Pool counters keyed by replica ``host:port``.
+        """
+        return {replica.address: replica.pool.stats() for replica in self._replicas}
+
+    async def initialize(self) -> None:
+        """Connect to the replicas and start the background health checks.
+
+        Unreachable replicas do not fail startup; they join the rotation once
+        a health check reaches them.
+        """
+        await self.check()
+        logger.info(
+            f"{self.healthy_count}/{len(self._replicas)} replicas of "
+            f"{self._primary.config.name} are healthy"
+        )
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the health checks and close the replica pools."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*(replica.pool.close() for replica in self._replicas))
+        for replica in self._replicas:
+            replica.healthy = False
+
+    async def check(self) -> None:
+        """Check the health of every replica once."""
+        await asyncio.gather(*(self._check(replica) for replica in self._replicas))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Connection]:
+        """Acquire a connection for a read-only query.
+
+        Yields:
+            A connection to a replica, or to the primary if no replica is
+            available.
+        """
+        for replica in self._candidates():
+            replica.outstanding += 1
+            try:
+                try:
+                    acquisition = replica.pool.acquire()
+                    conn = await acquisition.__aenter__()
+                except CONNECT_ERRORS as e:
+                    self._mark_unhealthy(replica, e)
+                    continue
+
+                exc_info: tuple = (None, None, None)
+                try:
+                    yield conn
+                except BaseException:
+                    exc_info = sys.exc_info()
+                    raise
+                finally:
+                    lost = conn.is_closed() or isinstance(exc_info[1], CONNECTION_ERRORS)
+                    # Pass the error on so the pool can reset or discard the connection
+                    await acquisition.__aexit__(*exc_info)
+                    if lost:
+                        self._mark_unhealthy(replica, exc_info[1] or "connection lost")
+                return
+            finally:
+                replica.outstanding -= 1
+
+        async with self._primary.acquire() as conn:
+            yield conn
+
+    def _candidates(self) -> list[_Replica]:
+        """Order the healthy replicas by outstanding requests.
+
+        Returns:
+            Healthy replicas, least busy first; equally busy replicas are
+            rotated between calls.
+        """
+        healthy = [replica for replica in self._replicas if replica.healthy]
+        if not healthy:
+            return []
+        self._turn = (self._turn + 1) % len(healthy)
+        rotated = healthy[self._turn :] + healthy[: self._turn]
+        return sorted(rotated, key=lambda replica: replica.outstanding)
+
+    def _mark_unhealthy(self, replica: _Replica, reason: object) -> None:
+        """Take a replica out of rotation until a health check succeeds.
+
+        Args:
+            replica: The failed replica.
+            reason: Error or description of the failure, for logging.
+        """
+        if replica.healthy:
+            logger.warning(
+                f"Replica {replica.address} of {self._primary.config.name} "
+                f"is unavailable: {reason}"
+            )
+        replica.healthy = False
+
+    async def _check(self, replica: _Replica) -> None:
+        """Probe one replica, connecting its pool first if needed.
+
+        Args:
+            replica: The replica to check.
+        """
+        try:
+            await asyncio.wait_for(self._probe(replica.pool), HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            self._mark_unhealthy(replica, e)
+            return
+
+        if not replica.healthy:
+            logger.info(f"Replica {replica.address} of {self._primary.config.name} is healthy")
+        replica.healthy = True
+
+    @staticmethod
+    async def _probe(pool: ConnectionPool) -> None:
+        """Run a trivial query on a replica pool.
+
+        Args:
+            pool: The replica pool.
+        """
+        await pool.initialize()
+        async with pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+
+    async def _run(self) -> None:
+        """Check the replicas until cancelled."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
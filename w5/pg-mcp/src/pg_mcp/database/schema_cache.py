@@ -1,11 +1,19 @@
 """Database schema caching for pg-mcp."""
 
+import asyncio
+import hashlib
 import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
 
-from asyncpg import Connection
+from asyncpg import Connection, Record
 
+from pg_mcp.cache import LRUCache
+from pg_mcp.database.connection import ConnectionPool
 from pg_mcp.models import (
     ColumnInfo,
+    ColumnStats,
     DatabaseSchema,
     EnumTypeInfo,
     ForeignKeyRelation,
@@ -40,6 +48,7 @@ SELECT
     c.table_schema,
     c.table_name,
     c.column_name,
+    c.ordinal_position,
     c.data_type,
     c.is_nullable = 'YES' as is_nullable,
     c.column_default,
@@ -123,16 +132,292 @@ ORDER BY n.nspname, t.typname;
 """
 
 
+def _visible_relation(namespace: str = "n", relation: str = "c") -> str:
+    """Build the visibility condition for the given pg_namespace/pg_class aliases."""
+    return f"""
+    {namespace}.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND {namespace}.nspname !~ '^pg_(toast|temp_)'
+    AND (
+        pg_has_role({relation}.relowner, 'USAGE')
+        OR has_table_privilege({relation}.oid, 'SELECT, INSERT, UPDATE, DELETE, TRUNCATE, REFERENCES, TRIGGER')
+        OR has_any_column_privilege({relation}.oid, 'SELECT, INSERT, UPDATE, REFERENCES')
+    )
+"""
+
+
+# pg_catalog-native variants of the information_schema queries above.
+# They return the same column names, so the schema is built by the same code,
+# but join pg_class/pg_attribute/pg_constraint directly and read comments from
+# pg_description instead of calling obj_description()/col_description() with a
+# per-row regclass cast. Visibility mirrors information_schema: a relation is
+# listed when the current user owns it or holds any privilege on it, and keys
+# are only listed when every relation they involve is visible.
+PG_CATALOG_VISIBLE_RELATION = _visible_relation()
+
+PG_CATALOG_TABLES_QUERY = f"""
+SELECT
+    n.nspname as table_schema,
+    c.relname as table_name,
+    d.description as table_comment,
+    c.reltuples::bigint as estimated_row_count
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_description d
+    ON d.objoid = c.oid
+    AND d.classoid = 'pg_catalog.pg_class'::regclass
+    AND d.objsubid = 0
+WHERE c.relkind IN ('r', 'p')
+    AND {PG_CATALOG_VISIBLE_RELATION}
+ORDER BY n.nspname, c.relname;
+"""
+
+PG_CATALOG_COLUMNS_QUERY = f"""
+SELECT
+    n.nspname as table_schema,
+    c.relname as table_name,
+    a.attname as column_name,
+    a.attnum as ordinal_position,
+    pg_catalog.format_type(a.atttypid, NULL) as data_type,
+    NOT a.attnotnull as is_nullable,
+    pg_catalog.pg_get_expr(ad.adbin, ad.adrelid) as column_default,
+    d.description as column_comment
+FROM pg_catalog.pg_attribute a
+JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_attrdef ad
+    ON ad.adrelid = a.attrelid
+    AND ad.adnum = a.attnum
+LEFT JOIN pg_catalog.pg_description d
+    ON d.objoid = a.attrelid
+    AND d.classoid = 'pg_catalog.pg_class'::regclass
+    AND d.objsubid = a.attnum
+WHERE a.attnum > 0
+    AND NOT a.attisdropped
+    AND c.relkind IN ('r', 'p', 'v', 'f')
+    AND {PG_CATALOG_VISIBLE_RELATION}
+ORDER BY n.nspname, c.relname, a.attnum;
+"""
+
+PG_CATALOG_PRIMARY_KEYS_QUERY = f"""
+SELECT
+    n.nspname as table_schema,
+    c.relname as table_name,
+    a.attname as column_name
+FROM pg_catalog.pg_constraint con
+JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_catalog.pg_attribute a
+    ON a.attrelid = con.conrelid
+    AND a.attnum = ANY (con.conkey)
+WHERE con.contype = 'p'
+    AND {PG_CATALOG_VISIBLE_RELATION};
+"""
+
+PG_CATALOG_FOREIGN_KEYS_QUERY = f"""
+SELECT
+    fn.nspname as from_schema,
+    fc.relname as from_table,
+    fa.attname as from_column,
+    tn.nspname as to_schema,
+    tc.relname as to_table,
+    ta.attname as to_column,
+    con.conname as constraint_name
+FROM pg_catalog.pg_constraint con
+CROSS JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(from_attnum, to_attnum, position)
+JOIN pg_catalog.pg_class fc ON fc.oid = con.conrelid
+JOIN pg_catalog.pg_namespace fn ON fn.oid = fc.relnamespace
+JOIN pg_catalog.pg_attribute fa
+    ON fa.attrelid = con.conrelid
+    AND fa.attnum = k.from_attnum
+JOIN pg_catalog.pg_class tc ON tc.oid = con.confrelid
+JOIN pg_catalog.pg_namespace tn ON tn.oid = tc.relnamespace
+JOIN pg_catalog.pg_attribute ta
+    ON ta.attrelid = con.confrelid
+    AND ta.attnum = k.to_attnum
+WHERE con.contype = 'f'
+    AND {_visible_relation("fn", "fc")}
+    AND {_visible_relation("tn", "tc")}
+ORDER BY fn.nspname, fc.relname, con.conname, k.position;
+"""
+
+PG_CATALOG_VIEWS_QUERY = f"""
+SELECT
+    n.nspname as table_schema,
+    c.relname as table_name,
+    pg_catalog.pg_get_viewdef(c.oid) as view_definition,
+    d.description as view_comment
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_description d
+    ON d.objoid = c.oid
+    AND d.classoid = 'pg_catalog.pg_class'::regclass
+    AND d.objsubid = 0
+WHERE c.relkind = 'v'
+    AND {PG_CATALOG_VISIBLE_RELATION}
+ORDER BY n.nspname, c.relname;
+"""
+
+# Catalog queries run by a schema refresh, keyed by the name used in timing logs
+INFORMATION_SCHEMA_QUERIES: dict[str, str] = {
+    "tables": TABLES_QUERY,
+    "columns": COLUMNS_QUERY,
+    "primary_keys": PRIMARY_KEYS_QUERY,
+    "foreign_keys": FOREIGN_KEYS_QUERY,
+    "indexes": INDEXES_QUERY,
+    "views": VIEWS_QUERY,
+    "enum_types": ENUM_TYPES_QUERY,
+}
+
+PG_CATALOG_QUERIES: dict[str, str] = {
+    "tables": PG_CATALOG_TABLES_QUERY,
+    "columns": PG_CATALOG_COLUMNS_QUERY,
+    "primary_keys": PG_CATALOG_PRIMARY_KEYS_QUERY,
+    "foreign_keys": PG_CATALOG_FOREIGN_KEYS_QUERY,
+    "indexes": INDEXES_QUERY,
+    "views": PG_CATALOG_VIEWS_QUERY,
+    "enum_types": ENUM_TYPES_QUERY,
+}
+
+# Columns identifying the owning table of each catalog query's rows, plus the
+# ordering to restore when the query is scoped to a subset of tables.
+# Enum types are not table-scoped and are always fetched in full.
+CATALOG_QUERY_SCOPES: dict[str, tuple[str, str, str | None]] = {
+    "tables": ("table_schema", "table_name", None),
+    "columns": ("table_schema", "table_name", "table_schema, table_name, ordinal_position"),
+    "primary_keys": ("table_schema", "table_name", None),
+    "foreign_keys": ("from_schema", "from_table", None),
+    "indexes": ("schemaname", "tablename", "schemaname, tablename, indexname"),
+    "views": ("table_schema", "table_name", None),
+}
+
+# Cheap per-relation change signatures. Every DDL statement writes new catalog
+# rows (new xmin) for the relation, its columns, defaults, constraints,
+# indexes, rewrite rules or comments, while VACUUM/ANALYZE statistics updates
+# are done in place and leave xmin untouched.
+TABLE_SIGNATURES_QUERY = """
+SELECT
+    n.nspname as table_schema,
+    c.relname as table_name,
+    md5(concat_ws('|',
+        c.xmin::text,
+        (SELECT string_agg(a.xmin::text, ',' ORDER BY a.attnum)
+            FROM pg_catalog.pg_attribute a WHERE a.attrelid = c.oid AND a.attnum > 0),
+        (SELECT string_agg(ad.xmin::text, ',' ORDER BY ad.adnum)
+            FROM pg_catalog.pg_attrdef ad WHERE ad.adrelid = c.oid),
+        (SELECT string_agg(con.xmin::text, ',' ORDER BY con.oid)
+            FROM pg_catalog.pg_constraint con WHERE con.conrelid = c.oid),
+        (SELECT string_agg(ic.xmin::text, ',' ORDER BY ic.oid)
+            FROM pg_catalog.pg_index i
+            JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+            WHERE i.indrelid = c.oid),
+        (SELECT string_agg(r.xmin::text, ',' ORDER BY r.oid)
+            FROM pg_catalog.pg_rewrite r WHERE r.ev_class = c.oid),
+        (SELECT string_agg(d.xmin::text, ',' ORDER BY d.objsubid)
+            FROM pg_catalog.pg_description d
+            WHERE d.objoid = c.oid AND d.classoid = 'pg_catalog.pg_class'::regclass)
+    )) as signature
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relkind IN ('r', 'p', 'v', 'f')
+    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND n.nspname !~ '^pg_(toast|temp_)';
+"""
+
+ENUM_SIGNATURE_QUERY = """
+SELECT
+    md5(coalesce(string_agg(
+        t.xmin::text || ':' || e.xmin::text,
+        ',' ORDER BY e.enumtypid, e.enumsortorder
+    ), '')) as signature
+FROM pg_catalog.pg_enum e
+JOIN pg_catalog.pg_type t ON t.oid = e.enumtypid;
+"""
+
+# Introspection backends selectable via SchemaSettings.introspection
+INTROSPECTION_QUERIES: dict[str, dict[str, str]] = {
+    "information_schema": INFORMATION_SCHEMA_QUERIES,
+    "pg_catalog": PG_CATALOG_QUERIES,
+}
+
+
+@dataclass(frozen=True)
+class CatalogSignatures:
+    """Change signatures of the catalog objects the schema cache tracks.
+
+    Attributes:
+        tables: Signature per relation, keyed by schema-qualified name.
+        enums: Single signature covering all enum types and labels.
+    """
+
+    tables: dict[str, str] = field(default_factory=dict)
+    enums: str = ""
+
+    @property
+    def fingerprint(self) -> str:
+        """Get a single hash identifying the whole catalog state."""
+        digest = hashlib.sha256(self.enums.encode())
+        for name in sorted(self.tables):
+            digest.update(f"\n{name}={self.tables[name]}".encode())
+        return digest.hexdigest()
+
+    def changed_tables(self, other: "CatalogSignatures") -> set[str]:
+        """Get relations that were added, dropped or altered relative to another state.
+
+        Args:
+            other: Earlier catalog signatures to compare against.
+
+        Returns:
+            Set of schema-qualified relation names.
+        """
+        names = self.tables.keys() | other.tables.keys()
+        return {name for name in names if self.tables.get(name) != other.tables.get(name)}
+
+
+# Column value statistics keyed by table full name, then column name
+ColumnStatsMap = dict[str, dict[str, ColumnStats]]
+
+SchemaListener = Callable[[DatabaseSchema], None]
+
+
 class SchemaCache:
     """Caches database schema information.
 
+    The rendered LLM context of the full schema is memoized per schema
+    version, and contexts of pruned subsets are kept in a bounded LRU.
+
     Args:
         database_name: Name of the database for this cache.
+        introspection: Catalog query backend, "information_schema" or "pg_catalog".
+        context_cache_size: Maximum number of rendered subset contexts to keep.
+
+    Raises:
+        ValueError: If the introspection backend is unknown.
     """
 
-    def __init__(self, database_name: str) -> None:
+    def __init__(
+        self,
+        database_name: str,
+        introspection: str = "information_schema",
+        context_cache_size: int = 256,
+    ) -> None:
+        if introspection not in INTROSPECTION_QUERIES:
+            raise ValueError(f"Unknown schema introspection backend: {introspection}")
+
         self.database_name = database_name
+        self.introspection = introspection
+        self.queries = INTROSPECTION_QUERIES[introspection]
         self._schema: DatabaseSchema | None = None
+        # Bumped on every schema swap; keys all derived caches
+        self.version = 0
+        self._full_context: str | None = None
+        self._subset_contexts: LRUCache[tuple[int, frozenset[str]], str] = LRUCache(
+            context_cache_size
+        )
+        self._listeners: list[SchemaListener] = []
+        # Latest column profile, applied to every schema swapped in (None until profiled)
+        self._column_stats: ColumnStatsMap | None = None
+        # Serializes cache updates; readers never wait on it
+        self._update_lock = asyncio.Lock()
 
     @property
     def schema(self) -> DatabaseSchema | None:
@@ -171,6 +456,252 @@ class SchemaCache:
 
         return set()
 
+    def get_llm_context(self, names: frozenset[str] | None = None) -> str:
+        """Get the rendered LLM context of the schema or a subset of it.
+
+        Args:
+            names: Schema-qualified names of the tables and views to include,
+                or None for the full schema.
+
+        Returns:
+            The schema context string.
+
+        Raises:
+            RuntimeError: If schema has not been loaded yet.
+        """
+        schema = self._schema
+        if schema is None:
+            raise RuntimeError("Schema not loaded. Call refresh() first.")
+
+        if names is None:
+            if self._full_context is None:
+                self._full_context = schema.to_llm_context()
+            return self._full_context
+
+        key = (self.version, names)
+        context = self._subset_contexts.get(key)
+        if context is None:
+            context = schema.subset(set(names)).to_llm_context()
+            self._subset_contexts.set(key, context)
+        return context
+
+    def add_listener(self, listener: SchemaListener) -> None:
+        """Register a callback invoked with the new schema after every update.
+
+        Args:
+            listener: Callable receiving the updated DatabaseSchema.
+        """
+        self._listeners.append(listener)
+
+    def restore(self, schema: DatabaseSchema) -> DatabaseSchema:
+        """Populate the cache with a previously saved schema.
+
+        Args:
+            schema: Schema loaded from a snapshot.
+
+        Returns:
+            The restored schema.
+        """
+        return self._set_schema(schema)
+
+    async def update_column_stats(self, stats: ColumnStatsMap) -> bool:
+        """Attach a new column profile to the cached schema.
+
+        The profile is kept and also applied to schemas loaded by later
+        refreshes. The schema is only swapped (bumping the version) when
+        the statistics shown to the LLM actually changed.
+
+        Args:
+            stats: Column statistics keyed by table full name, then column name.
+
+        Returns:
+            True if the cached schema was updated.
+        """
+        async with self._update_lock:
+            self._column_stats = stats
+            current = self._schema
+            if current is None:
+                return False
+            updated = self._apply_column_stats(current)
+            if updated is current:
+                return False
+            self._set_schema(updated)
+            return True
+
+    def _apply_column_stats(self, schema: DatabaseSchema) -> DatabaseSchema:
+        """Copy a schema with the current column profile attached.
+
+        Returns:
+            The schema itself if no column statistics change.
+        """
+        profile = self._column_stats
+        if profile is None:
+            return schema
+
+        tables: list[TableInfo] = []
+        changed = False
+        for table in schema.tables:
+            table_stats = profile.get(table.full_name, {})
+            columns = [
+                col
+                if col.stats == table_stats.get(col.name)
+                else col.model_copy(update={"stats": table_stats.get(col.name)})
+                for col in table.columns
+            ]
+            if any(new is not old for new, old in zip(columns, table.columns)):
+                table = table.model_copy(update={"columns": columns})
+                changed = True
+            tables.append(table)
+        return schema.model_copy(update={"tables": tables}) if changed else schema
+
+    def _set_schema(self, schema: DatabaseSchema) -> DatabaseSchema:
+        """Swap in a new schema and notify listeners.
+
+        The cached schema is replaced rather than mutated, so callers holding
+        the previous DatabaseSchema keep a consistent view. The latest column
+        profile, if any, is attached to it.
+
+        Args:
+            schema: The new schema.
+
+        Returns:
+            The new schema.
+        """
+        schema = self._apply_column_stats(schema)
+        self._schema = schema
+        self.version += 1
+        self._full_context = None
+        self._subset_contexts.clear()
+        logger.info(
+            f"Schema cache updated for {self.database_name}: {len(schema.tables)} tables, "
+            f"{len(schema.views)} views, {len(schema.enum_types)} enum types, "
+            f"{len(schema.foreign_key_relations)} foreign keys"
+        )
+        for listener in self._listeners:
+            try:
+                listener(schema)
+            except Exception:
+                logger.exception(f"Schema listener failed for {self.database_name}")
+        return schema
+
+    async def fetch_signatures(self, conn: Connection) -> CatalogSignatures:
+        """Fetch change signatures for all tracked relations and enum types.
+
+        Args:
+            conn: Active database connection.
+
+        Returns:
+            The current catalog signatures.
+        """
+        rows = await conn.fetch(TABLE_SIGNATURES_QUERY)
+        enums = await conn.fetchval(ENUM_SIGNATURE_QUERY)
+        return CatalogSignatures(
+            tables={f"{row['table_schema']}.{row['table_name']}": row["signature"] for row in rows},
+            enums=enums or "",
+        )
+
+    async def refresh_tables(
+        self,
+        conn: Connection,
+        table_names: set[str],
+        refresh_enums: bool = False,
+    ) -> DatabaseSchema:
+        """Re-introspect a subset of relations and patch them into the cache.
+
+        Tables and views in ``table_names`` are replaced by their current
+        definition, or removed if they no longer exist. Everything else is
+        carried over from the cached schema. Falls back to a full refresh
+        when nothing is cached yet.
+
+        Args:
+            conn: Active database connection.
+            table_names: Schema-qualified names of the relations to re-introspect.
+            refresh_enums: Whether to re-fetch enum types as well.
+
+        Returns:
+            The updated DatabaseSchema.
+        """
+        async with self._update_lock:
+            current = self._schema
+            if current is None:
+                return await self._refresh(conn)
+            return await self._refresh_tables(conn, current, table_names, refresh_enums)
+
+    async def _refresh_tables(
+        self,
+        conn: Connection,
+        current: DatabaseSchema,
+        table_names: set[str],
+        refresh_enums: bool,
+    ) -> DatabaseSchema:
+        """Re-introspect a subset of relations (caller holds the update lock)."""
+
+        # A renamed or dropped table also invalidates the foreign key columns
+        # of tables referencing it
+        changed = set(table_names)
+        changed.update(
+            fk.from_table for fk in current.foreign_key_relations if fk.to_table in table_names
+        )
+
+        logger.info(
+            f"Refreshing {len(changed)} changed relation(s) in schema cache for {self.database_name}"
+        )
+
+        names = sorted(changed)
+        results: dict[str, list[Record]] = {}
+        timings: dict[str, float] = {}
+        for name, query in self.queries.items():
+            if name in CATALOG_QUERY_SCOPES:
+                results[name], timings[name] = await self._fetch_catalog(
+                    conn, name, self._scoped_query(name, query), names
+                )
+            elif refresh_enums:
+                results[name], timings[name] = await self._fetch_catalog(conn, name, query)
+            else:
+                results[name] = []
+
+        self._log_timings(timings)
+        partial = self._build_schema(results)
+
+        def sort_key(item: TableInfo | ViewInfo) -> tuple[str, str]:
+            return (item.schema_name, item.name)
+
+        tables = [t for t in current.tables if t.full_name not in changed] + partial.tables
+        views = [v for v in current.views if v.full_name not in changed] + partial.views
+        fk_relations = [
+            fk for fk in current.foreign_key_relations if fk.from_table not in changed
+        ] + partial.foreign_key_relations
+
+        return self._set_schema(
+            DatabaseSchema(
+                database_name=self.database_name,
+                tables=sorted(tables, key=sort_key),
+                views=sorted(views, key=sort_key),
+                enum_types=partial.enum_types if refresh_enums else current.enum_types,
+                foreign_key_relations=fk_relations,
+            )
+        )
+
+    @staticmethod
+    def _scoped_query(name: str, query: str) -> str:
+        """Restrict a catalog query to the relations passed as ``$1``.
+
+        Args:
+            name: Catalog query name (a key of CATALOG_QUERY_SCOPES).
+            query: SQL text of the catalog query.
+
+        Returns:
+            SQL text taking a text[] of schema-qualified names as ``$1``.
+        """
+        schema_column, table_column, order_by = CATALOG_QUERY_SCOPES[name]
+        scoped = (
+            f"SELECT * FROM ({query.strip().rstrip(';')}) AS q "
+            f"WHERE q.{schema_column} || '.' || q.{table_column} = ANY($1::text[])"
+        )
+        if order_by:
+            scoped += " ORDER BY " + ", ".join(f"q.{col.strip()}" for col in order_by.split(","))
+        return scoped
+
     async def refresh(self, conn: Connection) -> DatabaseSchema:
         """Refresh the schema cache from the database.
 
@@ -180,19 +711,109 @@ class SchemaCache:
         Returns:
             The updated DatabaseSchema.
         """
-        logger.info(f"Refreshing schema cache for {self.database_name}")
-
-        # Fetch all schema information in parallel
-        tables_data, columns_data, pk_data, fk_data, indexes_data, views_data, enum_data = (
-            await conn.fetch(TABLES_QUERY),
-            await conn.fetch(COLUMNS_QUERY),
-            await conn.fetch(PRIMARY_KEYS_QUERY),
-            await conn.fetch(FOREIGN_KEYS_QUERY),
-            await conn.fetch(INDEXES_QUERY),
-            await conn.fetch(VIEWS_QUERY),
-            await conn.fetch(ENUM_TYPES_QUERY),
+        async with self._update_lock:
+            return await self._refresh(conn)
+
+    async def _refresh(self, conn: Connection) -> DatabaseSchema:
+        """Run a full sequential refresh (caller holds the update lock)."""
+        logger.info(f"Refreshing schema cache for {self.database_name} ({self.introspection})")
+
+        results: dict[str, list[Record]] = {}
+        timings: dict[str, float] = {}
+        for name, query in self.queries.items():
+            results[name], timings[name] = await self._fetch_catalog(conn, name, query)
+
+        self._log_timings(timings)
+        return self._set_schema(self._build_schema(results))
+
+    async def refresh_parallel(self, pool: ConnectionPool, concurrency: int) -> DatabaseSchema:
+        """Refresh the schema cache using several pooled connections.
+
+        Each catalog query runs on its own connection borrowed from the pool,
+        with at most ``concurrency`` queries in flight at once. The queries do
+        not share a snapshot, so DDL committed mid-refresh may be seen by some
+        of them and not others; the next refresh picks it up.
+
+        Args:
+            pool: Initialized connection pool to borrow connections from.
+            concurrency: Maximum number of catalog queries run at the same time.
+
+        Returns:
+            The updated DatabaseSchema.
+        """
+        logger.info(
+            f"Refreshing schema cache for {self.database_name} "
+            f"({self.introspection}, {concurrency} parallel connections)"
         )
 
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(name: str, query: str) -> tuple[list[Record], float]:
+            async with semaphore:
+                async with pool.acquire() as conn:
+                    return await self._fetch_catalog(conn, name, query)
+
+        async with self._update_lock:
+            fetched = await asyncio.gather(
+                *(fetch(name, query) for name, query in self.queries.items())
+            )
+
+            results: dict[str, list[Record]] = {}
+            timings: dict[str, float] = {}
+            for name, (rows, elapsed_ms) in zip(self.queries, fetched):
+                results[name] = rows
+                timings[name] = elapsed_ms
+
+            self._log_timings(timings)
+            return self._set_schema(self._build_schema(results))
+
+    async def _fetch_catalog(
+        self, conn: Connection, name: str, query: str, *args: object
+    ) -> tuple[list[Record], float]:
+        """Run a single catalog query and measure how long it took.
+
+        Args:
+            conn: Active database connection.
+            name: Catalog query name used in log messages.
+            query: SQL text of the catalog query.
+            *args: Query parameters.
+
+        Returns:
+            Tuple of the fetched rows and the elapsed time in milliseconds.
+        """
+        start_time = time.perf_counter()
+        rows = await conn.fetch(query, *args)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.debug(f"Catalog query {name} returned {len(rows)} rows in {elapsed_ms:.2f}ms")
+        return rows, elapsed_ms
+
+    def _log_timings(self, timings: dict[str, float]) -> None:
+        """Log catalog query timings, slowest first.
+
+        Args:
+            timings: Elapsed milliseconds keyed by catalog query name.
+        """
+        ordered = sorted(timings.items(), key=lambda item: item[1], reverse=True)
+        summary = ", ".join(f"{name}={elapsed:.2f}ms" for name, elapsed in ordered)
+        logger.info(f"Catalog query timings for {self.database_name}: {summary}")
+
+    def _build_schema(self, results: dict[str, list[Record]]) -> DatabaseSchema:
+        """Build the DatabaseSchema model from catalog query results.
+
+        Args:
+            results: Fetched rows keyed by catalog query name.
+
+        Returns:
+            A new DatabaseSchema (the cache itself is not updated).
+        """
+        tables_data = results["tables"]
+        columns_data = results["columns"]
+        pk_data = results["primary_keys"]
+        fk_data = results["foreign_keys"]
+        indexes_data = results["indexes"]
+        views_data = results["views"]
+        enum_data = results["enum_types"]
+
         # Build primary key lookup
         pk_lookup: dict[tuple[str, str], set[str]] = {}
         for row in pk_data:
@@ -321,18 +942,10 @@ class SchemaCache:
         for fk in fk_grouped.values():
             fk_relations.append(ForeignKeyRelation(**fk))
 
-        # Create schema
-        self._schema = DatabaseSchema(
+        return DatabaseSchema(
             database_name=self.database_name,
             tables=tables,
             views=views,
             enum_types=enum_types,
             foreign_key_relations=fk_relations,
         )
-
-        logger.info(
-            f"Schema cache refreshed: {len(tables)} tables, {len(views)} views, "
-            f"{len(enum_types)} enum types, {len(fk_relations)} foreign keys"
-        )
-
-        return self._schema
@@ -0,0 +1,132 @@
+"""On-disk schema snapshots for fast server startup."""
+
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from pg_mcp.models import DatabaseSchema
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout or the DatabaseSchema model changes incompatibly
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    """A schema loaded from disk together with the catalog state it reflects.
+
+    Attributes:
+        schema: The cached database schema.
+        fingerprint: Catalog fingerprint taken right before the schema was introspected.
+        saved_at: When the snapshot was written.
+    """
+
+    schema: DatabaseSchema
+    fingerprint: str
+    saved_at: datetime
+
+
+class SchemaSnapshotStore:
+    """Stores one gzip-compressed JSON schema snapshot per configured database.
+
+    Snapshots are keyed by the database alias and record the connection
+    target and catalog fingerprint, so a snapshot is only used for the same
+    database and can be revalidated cheaply against the live catalog.
+
+    Args:
+        directory: Directory holding the snapshot files (created on first save).
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def path_for(self, name: str) -> Path:
+        """Get the snapshot file path for a database alias.
+
+        Args:
+            name: Database alias.
+
+        Returns:
+            Path of the snapshot file.
+        """
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        return self.directory / f"{safe_name}.schema.json.gz"
+
+    def load(self, name: str, target: str) -> SchemaSnapshot | None:
+        """Load the snapshot for a database.
+
+        Args:
+            name: Database alias.
+            target: Connection target (host:port/database) the snapshot must match.
+
+        Returns:
+            The snapshot, or None if it is missing, stale in format, for a
+            different target, or unreadable.
+        """
+        path = self.path_for(name)
+        if not path.exists():
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+
+            if payload.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                logger.info(f"Ignoring schema snapshot {path}: unsupported format version")
+                return None
+            if payload.get("target") != target:
+                logger.info(f"Ignoring schema snapshot {path}: taken from a different database")
+                return None
+
+            return SchemaSnapshot(
+                schema=DatabaseSchema.model_validate(payload["schema"]),
+                fingerprint=payload["fingerprint"],
+                saved_at=datetime.fromisoformat(payload["saved_at"]),
+            )
+        except (OSError, EOFError, ValueError, KeyError, ValidationError) as e:
+            logger.warning(f"Failed to read schema snapshot {path}: {e}")
+            return None
+
+    def save(self, name: str, target: str, schema: DatabaseSchema, fingerprint: str) -> Path:
+        """Write the snapshot for a database atomically.
+
+        Args:
+            name: Database alias.
+            target: Connection target (host:port/database).
+            schema: Schema to store.
+            fingerprint: Catalog fingerprint the schema corresponds to.
+
+        Returns:
+            Path of the written snapshot file.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(name)
+        payload = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "database": name,
+            "target": target,
+            "fingerprint": fingerprint,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "schema": schema.model_dump(mode="json"),
+        }
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        logger.debug(f"Saved schema snapshot for {name} to {path}")
+        return path
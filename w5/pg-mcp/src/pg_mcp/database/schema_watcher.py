@@ -0,0 +1,150 @@
+"""Background DDL change detection for the schema cache."""
+
+import asyncio
+import logging
+
+import asyncpg
+from asyncpg import Connection
+
+from pg_mcp.database.connection import ConnectionPool
+from pg_mcp.database.schema_cache import CatalogSignatures, SchemaCache
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaWatcher:
+    """Polls the catalog for DDL changes and patches the schema cache.
+
+    Each poll compares per-relation catalog signatures against the previous
+    poll and re-introspects only the relations that changed. When a DDL log
+    table (filled by an event trigger) is configured, the watcher first checks
+    whether it received new rows and skips the signature query otherwise.
+
+    Args:
+        pool: Connection pool used for polling.
+        schema_cache: Schema cache to patch.
+        interval: Seconds between polls.
+        ddl_log_table: Optional table with a monotonically increasing ``id``
+            column appended to by a DDL event trigger.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        schema_cache: SchemaCache,
+        interval: float,
+        ddl_log_table: str | None = None,
+    ) -> None:
+        self._pool = pool
+        self._schema_cache = schema_cache
+        self.interval = interval
+        self.ddl_log_table = ddl_log_table
+        self._signatures: CatalogSignatures | None = None
+        self._ddl_log_position: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the background polling task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def capture_baseline(self, conn: Connection) -> CatalogSignatures:
+        """Record the current catalog state as the comparison baseline.
+
+        Call this right before a full schema refresh so that DDL committed
+        while the refresh runs is detected by the next poll.
+
+        Args:
+            conn: Active database connection.
+
+        Returns:
+            The captured catalog signatures.
+        """
+        if self.ddl_log_table:
+            self._ddl_log_position = await self._read_ddl_log_position(conn)
+        self._signatures = await self._schema_cache.fetch_signatures(conn)
+        return self._signatures
+
+    def start(self) -> None:
+        """Start the background polling task (no-op if already running)."""
+        if self.is_running:
+            return
+        logger.info(
+            f"Starting schema watcher for {self._schema_cache.database_name} "
+            f"(every {self.interval}s)"
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background polling task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> set[str]:
+        """Poll once and patch the schema cache with any changed relations.
+
+        Returns:
+            Schema-qualified names of the relations that were re-introspected.
+        """
+        async with self._lock:
+            async with self._pool.acquire() as conn:
+                if self.ddl_log_table:
+                    position = await self._read_ddl_log_position(conn)
+                    if position is not None and position == self._ddl_log_position:
+                        return set()
+                    self._ddl_log_position = position
+
+                signatures = await self._schema_cache.fetch_signatures(conn)
+                previous = self._signatures
+                if previous is None:
+                    self._signatures = signatures
+                    return set()
+
+                changed = signatures.changed_tables(previous)
+                enums_changed = signatures.enums != previous.enums
+                if changed or enums_changed:
+                    logger.info(
+                        f"Detected DDL changes in {self._schema_cache.database_name}: "
+                        f"{sorted(changed)}{' (enum types)' if enums_changed else ''}"
+                    )
+                    await self._schema_cache.refresh_tables(conn, changed, enums_changed)
+
+                self._signatures = signatures
+                return changed
+
+    async def _run(self) -> None:
+        """Poll for changes until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Schema change check failed for {self._schema_cache.database_name}: {e}"
+                )
+
+    async def _read_ddl_log_position(self, conn: Connection) -> int | None:
+        """Read the latest id from the DDL log table.
+
+        Returns:
+            The highest log id, or None if the table is unavailable (in which
+            case the watcher falls back to signature polling alone).
+        """
+        try:
+            return await conn.fetchval(f"SELECT coalesce(max(id), 0) FROM {self.ddl_log_table}")
+        except asyncpg.PostgresError as e:
+            logger.warning(
+                f"DDL log table {self.ddl_log_table} unavailable, "
+                f"falling back to catalog signature polling: {e}"
+            )
+            self.ddl_log_table = None
+            return None
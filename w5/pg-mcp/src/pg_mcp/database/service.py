@@ -1,22 +1,319 @@
 """Database service for pg-mcp."""
 
+import asyncio
+import json
 import logging
+import re
 import time
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
 
 import asyncpg
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
 
-from pg_mcp.config import DatabaseConfig, QuerySettings
-from pg_mcp.database.connection import ConnectionPool
-from pg_mcp.database.schema_cache import SchemaCache
+from pg_mcp.config import DatabaseConfig, QuerySettings, SchemaSettings
+from pg_mcp.database.column_profiler import ColumnProfiler
+from pg_mcp.database.connection import ConnectionPool, PoolStats
+from pg_mcp.database.cost_guard import CostGuard
+from pg_mcp.database.replicas import CONNECTION_ERRORS, ReplicaRouter
+from pg_mcp.database.schema_cache import CatalogSignatures, SchemaCache, SchemaListener
+from pg_mcp.database.schema_snapshot import SchemaSnapshotStore
+from pg_mcp.database.schema_watcher import SchemaWatcher
 from pg_mcp.models import (
     DatabaseSchema,
     QueryResultData,
+    QueryTooExpensiveError,
     SQLExecutionError,
     SQLTimeoutError,
+    encode_columns,
 )
 
 logger = logging.getLogger(__name__)
 
+# Errors about the state of the connection or server rather than the statement
+_SERVER_STATE_ERRORS = (
+    asyncpg.PostgresConnectionError,
+    asyncpg.InsufficientResourcesError,
+    asyncpg.OperatorInterventionError,
+    asyncpg.PostgresSystemError,
+    asyncpg.InternalServerError,
+)
+
+# Matches the compact encoding used for tool responses
+_ROW_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+_SQL_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<literal>
+        (?<![\w$])[Ee]'(?:[^'\\]|''|\\.)*'      # escape string literal
+      | '(?:[^']|'')*'                          # string literal
+      | "(?:[^"]|"")*"                          # quoted identifier
+      | (?P<tag>\$[A-Za-z_]?[A-Za-z0-9_]*\$).*?(?P=tag)  # dollar-quoted string
+      | --[^\n]*\n?                             # line comment (keeps its newline)
+      | /\*.*?\*/                               # block comment
+    )
+    | (?P<space>\s+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """Normalize SQL text so repeated queries share a cached prepared statement.
+
+    Collapses whitespace outside literals and comments and strips trailing
+    semicolons; the statement itself is not changed.
+
+    Args:
+        sql: SQL statement.
+
+    Returns:
+        The normalized SQL text.
+    """
+
+    def replace(match: re.Match) -> str:
+        return match.group("literal") if match.group("literal") is not None else " "
+
+    return _SQL_TOKEN_PATTERN.sub(replace, sql).strip().rstrip("; \t\r\n")
+
+
+# Alias of the derived table used when a LIMIT cannot be capped in place
+_LIMIT_WRAPPER_ALIAS = "_pg_mcp_limited"
+
+
+def _literal_row_count(node: exp.Expression) -> int | None:
+    """Get the row count of a LIMIT or FETCH clause if it is an integer literal."""
+    if isinstance(node, exp.Fetch):
+        options = node.args.get("limit_options")
+        if options is not None and options.args.get("percent"):
+            return None
+        count = node.args.get("count")
+        # FETCH FIRST ROW ONLY returns a single row
+        if count is None:
+            return 1
+    else:
+        count = node.expression
+    if isinstance(count, exp.Literal) and count.is_int:
+        return int(count.to_py())
+    return None
+
+
+def apply_row_limit(
+    sql: str,
+    limit: int,
+    statement: exp.Expression | None = None,
+) -> str:
+    """Bound the number of rows a query can return.
+
+    Only the outermost LIMIT (or FETCH FIRST) counts: it is added when
+    missing and lowered to ``limit`` when larger, while limits inside
+    subqueries and CTEs are left alone. A limit that is not an integer
+    literal, such as ``LIMIT ALL``, is kept and the query is wrapped in a
+    derived table instead.
+
+    Args:
+        sql: SQL query.
+        limit: Maximum number of rows.
+        statement: Parsed form of ``sql`` (e.g. from the validator); the SQL
+            is parsed here if it is not given.
+
+    Returns:
+        The SQL text to execute.
+    """
+    if statement is None:
+        try:
+            statement = sqlglot.parse_one(sql, dialect="postgres")
+        except ParseError:
+            statement = None
+
+    if not isinstance(statement, exp.Query):
+        # Let the server parse it; the newline ends a trailing line comment
+        return f"SELECT * FROM ({normalize_sql(sql)}\n) AS {_LIMIT_WRAPPER_ALIAS} LIMIT {limit}"
+
+    # A literal node keeps the sqlglot builders from parsing the value
+    row_limit = exp.Literal.number(limit)
+    existing = statement.args.get("limit")
+    if existing is None:
+        limited = statement.limit(row_limit)
+    else:
+        current = _literal_row_count(existing)
+        if current is not None and current <= limit:
+            return normalize_sql(sql)
+        if current is not None:
+            limited = statement.limit(row_limit)
+        else:
+            wrapped = statement.subquery(_LIMIT_WRAPPER_ALIAS)
+            limited = exp.select(exp.Star()).from_(wrapped).limit(row_limit)
+
+    return limited.sql(dialect="postgres")
+
+
+class ResultBuffer:
+    """Collects result rows as lists, up to a budget of JSON-encoded bytes.
+
+    Args:
+        max_bytes: Budget for the encoded rows (0 for no budget).
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.rows: list[list[Any]] = []
+        # Encoded size of the rows array, including brackets and separators
+        self.size = 2
+        self.truncated = False
+
+    def extend(self, records: Iterable[Mapping[str, Any]]) -> bool:
+        """Append records until the budget is exhausted.
+
+        Args:
+            records: Result records (asyncpg Records or mappings).
+
+        Returns:
+            False once a record did not fit and the result is truncated.
+        """
+        for record in records:
+            row = list(record.values())
+            if self.max_bytes:
+                row_size = len(_ROW_ENCODER.encode(row).encode("utf-8")) + 1
+                if self.size + row_size > self.max_bytes:
+                    self.truncated = True
+                    return False
+                self.size += row_size
+            self.rows.append(row)
+        return True
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows kept."""
+        return len(self.rows)
+
+    def to_result(
+        self, columns: list[str], execution_time_ms: float
+    ) -> QueryResultData:
+        """Build the query result from the collected rows.
+
+        Args:
+            columns: Column names.
+            execution_time_ms: Query execution time in milliseconds.
+
+        Returns:
+            The query result in the row format.
+        """
+        return QueryResultData(
+            columns=columns,
+            rows=self.rows,
+            row_count=len(self.rows),
+            execution_time_ms=execution_time_ms,
+            truncated=self.truncated,
+        )
+
+
+class ColumnarBuffer:
+    """Collects result records for the columnar format, up to a byte budget.
+
+    With a budget, every batch of records is encoded column by column as it
+    arrives and counts with the size of its compact JSON encoding; when a
+    batch does not fit, the largest prefix that does is kept. A result that
+    arrives in a single batch (the non-streaming case) is encoded only once.
+
+    Args:
+        max_bytes: Budget for the encoded columns (0 for no budget).
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self._rows: list[tuple[Any, ...]] = []
+        self._names: list[str] = []
+        # Encoding of the kept rows while they came in a single batch
+        self._encoded: list[dict[str, Any]] | None = None
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows kept."""
+        return len(self._rows)
+
+    def extend(self, records: Sequence[Mapping[str, Any]]) -> bool:
+        """Append records until the budget is exhausted.
+
+        Args:
+            records: Result records (asyncpg Records or mappings).
+
+        Returns:
+            False once a record did not fit and the result is truncated.
+        """
+        if not records:
+            return True
+        if not self._names:
+            self._names = list(records[0].keys())
+        rows = [tuple(record.values()) for record in records]
+        first_batch = not self._rows
+
+        if self.max_bytes:
+            encoded, size = self._encode(rows)
+            if self.size + size > self.max_bytes:
+                rows, encoded, size = self._fit(rows, self.max_bytes - self.size)
+                self.truncated = True
+            self.size += size
+            self._encoded = encoded if first_batch and rows else None
+
+        self._rows.extend(rows)
+        return not self.truncated
+
+    def to_result(
+        self, columns: list[str], execution_time_ms: float
+    ) -> QueryResultData:
+        """Build the query result from the collected records.
+
+        Args:
+            columns: Column names.
+            execution_time_ms: Query execution time in milliseconds.
+
+        Returns:
+            The query result in the columnar format.
+        """
+        column_data = self._encoded
+        if column_data is None:
+            column_data = encode_columns(columns, self._rows)
+        return QueryResultData(
+            columns=columns,
+            rows=[],
+            row_count=len(self._rows),
+            execution_time_ms=execution_time_ms,
+            truncated=self.truncated,
+            format="columnar",
+            column_data=column_data,
+        )
+
+    def _encode(self, rows: list[tuple[Any, ...]]) -> tuple[list[dict[str, Any]], int]:
+        """Encode rows and measure the encoded size in bytes."""
+        encoded = encode_columns(self._names, rows)
+        return encoded, len(_ROW_ENCODER.encode(encoded).encode("utf-8"))
+
+    def _fit(
+        self, rows: list[tuple[Any, ...]], budget: int
+    ) -> tuple[list[tuple[Any, ...]], list[dict[str, Any]], int]:
+        """Find the longest prefix of a batch that fits the remaining budget.
+
+        Starts from the share of the batch the budget covers and shrinks the
+        prefix until it fits, usually within a few encodings.
+
+        Returns:
+            The kept rows, their encoding and its size.
+        """
+        count = len(rows)
+        encoded, size = [], 0
+        while count > 0:
+            encoded, size = self._encode(rows[:count])
+            if size <= budget:
+                return rows[:count], encoded, size
+            count = min(count - 1, count * budget // size)
+        return [], [], 0
+
 
 class DatabaseService:
     """Unified database service for schema caching and query execution.
@@ -24,17 +321,66 @@ class DatabaseService:
     Args:
         config: Database connection configuration.
         query_settings: Query execution settings.
+        schema_settings: Schema cache settings (optional).
     """
 
     def __init__(
         self,
         config: DatabaseConfig,
         query_settings: QuerySettings,
+        schema_settings: SchemaSettings | None = None,
     ) -> None:
         self.config = config
         self.query_settings = query_settings
+        self.schema_settings = schema_settings or SchemaSettings()
         self._pool = ConnectionPool(config)
-        self._schema_cache = SchemaCache(config.database)
+        # Queries go to the replicas when there are any; schema work stays on the primary
+        self._replicas: ReplicaRouter | None = None
+        if config.replicas:
+            self._replicas = ReplicaRouter(
+                self._pool,
+                [
+                    ConnectionPool(config, replica=replica)
+                    for replica in config.replicas
+                ],
+                check_interval=config.replica_check_interval,
+            )
+        self._schema_cache = SchemaCache(
+            config.database,
+            introspection=self.schema_settings.introspection,
+            context_cache_size=self.schema_settings.context_cache_size,
+        )
+        self._cost_guard = CostGuard(
+            query_settings.max_estimated_cost,
+            query_settings.max_estimated_rows,
+            cache_size=query_settings.explain_cache_size,
+        )
+        self._schema_cache.add_listener(self._cost_guard.update_schema)
+        self._schema_watcher: SchemaWatcher | None = None
+        if self.schema_settings.watch_interval > 0:
+            self._schema_watcher = SchemaWatcher(
+                self._pool,
+                self._schema_cache,
+                interval=self.schema_settings.watch_interval,
+                ddl_log_table=self.schema_settings.ddl_log_table,
+            )
+        self._column_profiler: ColumnProfiler | None = None
+        if self.schema_settings.profile_interval > 0:
+            self._column_profiler = ColumnProfiler(
+                self._pool,
+                self._schema_cache,
+                interval=self.schema_settings.profile_interval,
+                max_distinct=self.schema_settings.profile_max_distinct,
+                max_values=self.schema_settings.profile_max_values,
+            )
+        self._snapshot_store: SchemaSnapshotStore | None = None
+        if self.schema_settings.snapshot_dir:
+            self._snapshot_store = SchemaSnapshotStore(self.schema_settings.snapshot_dir)
+        self._revalidate_task: asyncio.Task[None] | None = None
+        self._init_lock = asyncio.Lock()
+        self._initialized = False
+        self.init_error: Exception | None = None
+        self.init_timings: dict[str, float] = {}
 
     @property
     def schema(self) -> DatabaseSchema:
@@ -51,93 +397,307 @@ class DatabaseService:
         """Get all table names from the cached schema."""
         return self._schema_cache.get_table_names()
 
+    @property
+    def schema_version(self) -> int:
+        """Version of the cached schema, bumped on every schema update."""
+        return self._schema_cache.version
+
+    def get_llm_context(self, names: frozenset[str] | None = None) -> str:
+        """Get the memoized LLM context of the schema or a subset of it.
+
+        Args:
+            names: Schema-qualified names of the tables and views to include,
+                or None for the full schema.
+
+        Returns:
+            The schema context string.
+        """
+        return self._schema_cache.get_llm_context(names)
+
+    def add_schema_listener(self, listener: SchemaListener) -> None:
+        """Register a callback invoked with the new schema after every refresh.
+
+        Args:
+            listener: Callable receiving the updated DatabaseSchema.
+        """
+        self._schema_cache.add_listener(listener)
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        """Get the counters of the primary and replica connection pools.
+
+        Returns:
+            Pool counters keyed by "primary" and by replica ``host:port``.
+        """
+        stats = {"primary": self._pool.stats()}
+        if self._replicas is not None:
+            stats.update(self._replicas.pool_stats())
+        return stats
+
+    def replica_health(self) -> dict[str, bool]:
+        """Get whether each read replica is in rotation.
+
+        Returns:
+            Health keyed by replica ``host:port`` (empty without replicas).
+        """
+        return self._replicas.health() if self._replicas is not None else {}
+
+    @property
+    def snapshot_target(self) -> str:
+        """Connection target recorded in schema snapshots."""
+        return f"{self.config.host}:{self.config.port}/{self.config.database}"
+
+    @property
+    def is_ready(self) -> bool:
+        """Check if every initialization step has completed."""
+        return (
+            self._initialized
+            and self._pool.is_initialized
+            and self._schema_cache.schema is not None
+        )
+
     async def initialize(self) -> None:
         """Initialize the database service.
 
-        Creates the connection pool and loads the schema cache.
+        Creates the connection pool, loads the schema cache, connects to the
+        read replicas and, if enabled, starts the background schema watcher
+        and column profiler. When a schema snapshot is
+        available it is loaded instead of introspecting the database, and
+        revalidated against the live catalog in the background.
+
+        Pool creation and schema load times are recorded in ``init_timings``
+        (``pool_ms`` and ``schema_ms``). Every step is idempotent: steps that
+        already completed in an earlier, failed or timed-out attempt are
+        skipped, and the service only becomes ready once all of them have
+        completed.
         """
+        start = time.perf_counter()
         await self._pool.initialize()
-        await self.refresh_schema()
+        pool_done = time.perf_counter()
+        self.init_timings["pool_ms"] = (pool_done - start) * 1000
+
+        if self._schema_cache.schema is None and not await self._load_snapshot():
+            await self.refresh_schema()
+        self.init_timings["schema_ms"] = (time.perf_counter() - pool_done) * 1000
+
+        if self._replicas is not None:
+            await self._replicas.initialize()
+
+        if self._schema_watcher is not None:
+            self._schema_watcher.start()
+        if self._column_profiler is not None:
+            self._column_profiler.start()
+        self._initialized = True
+
+    async def ensure_initialized(self, timeout: float | None = None) -> None:
+        """Initialize the service unless it is already ready.
+
+        Concurrent callers share a single attempt: a caller that waited for
+        another caller's failed attempt gets that failure instead of
+        immediately retrying.
+
+        Args:
+            timeout: Maximum seconds to spend on this attempt (None for no limit).
+
+        Raises:
+            asyncio.TimeoutError: If initialization does not finish in time.
+            Exception: Whatever the failed initialization raised.
+        """
+        if self.is_ready:
+            return
+
+        # An attempt already in flight decides the outcome for everyone waiting on it
+        joined_attempt = self._init_lock.locked()
+        async with self._init_lock:
+            if self.is_ready:
+                return
+            if joined_attempt and self.init_error is not None:
+                raise self.init_error
+
+            try:
+                await asyncio.wait_for(self.initialize(), timeout)
+            except Exception as e:
+                self.init_error = e
+                raise
+            self.init_error = None
 
     async def close(self) -> None:
         """Close the database service and release resources."""
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+            try:
+                await self._revalidate_task
+            except asyncio.CancelledError:
+                pass
+            self._revalidate_task = None
+        if self._schema_watcher is not None:
+            await self._schema_watcher.stop()
+        if self._column_profiler is not None:
+            await self._column_profiler.stop()
+        if self._replicas is not None:
+            await self._replicas.close()
         await self._pool.close()
+        self._initialized = False
+
+    async def _load_snapshot(self) -> bool:
+        """Load the schema cache from the on-disk snapshot, if enabled.
+
+        Returns:
+            True if a snapshot was loaded and background revalidation started.
+        """
+        if self._snapshot_store is None:
+            return False
+
+        snapshot = await asyncio.to_thread(
+            self._snapshot_store.load, self.config.name, self.snapshot_target
+        )
+        if snapshot is None:
+            return False
+
+        logger.info(
+            f"Loaded schema snapshot for {self.config.name} "
+            f"(saved {snapshot.saved_at.isoformat()}), revalidating in background"
+        )
+        self._schema_cache.restore(snapshot.schema)
+        self._revalidate_task = asyncio.create_task(
+            self._revalidate_snapshot(snapshot.fingerprint)
+        )
+        return True
+
+    async def _revalidate_snapshot(self, fingerprint: str) -> None:
+        """Refresh the schema if the catalog changed since the snapshot was taken.
+
+        Args:
+            fingerprint: Catalog fingerprint stored in the snapshot.
+        """
+        try:
+            async with self._pool.acquire() as conn:
+                signatures = await self._capture_signatures(conn)
+            if signatures.fingerprint == fingerprint:
+                logger.info(f"Schema snapshot for {self.config.name} is up to date")
+                return
+
+            logger.info(f"Schema snapshot for {self.config.name} is stale, refreshing")
+            await self.refresh_schema()
+        except Exception as e:
+            logger.warning(f"Schema snapshot revalidation failed for {self.config.name}: {e}")
+
+    async def _capture_signatures(self, conn: asyncpg.Connection) -> CatalogSignatures:
+        """Fetch catalog signatures, updating the watcher baseline if there is one."""
+        if self._schema_watcher is not None:
+            return await self._schema_watcher.capture_baseline(conn)
+        return await self._schema_cache.fetch_signatures(conn)
+
+    async def _save_snapshot(self, schema: DatabaseSchema, signatures: CatalogSignatures) -> None:
+        """Write the schema snapshot without failing the refresh on I/O errors."""
+        if self._snapshot_store is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self._snapshot_store.save,
+                self.config.name,
+                self.snapshot_target,
+                schema,
+                signatures.fingerprint,
+            )
+        except OSError as e:
+            logger.warning(f"Failed to save schema snapshot for {self.config.name}: {e}")
 
     async def refresh_schema(self) -> DatabaseSchema:
         """Refresh the schema cache from the database.
 
+        When ``refresh_concurrency`` is greater than one, the catalog queries
+        are spread across that many pooled connections (never more than the
+        pool can hold).
+
+        Catalog signatures are captured first whenever the schema watcher or
+        snapshots are enabled, so changes made during the refresh are not lost.
+
         Returns:
             The updated DatabaseSchema.
         """
-        async with self._pool.acquire() as conn:
-            return await self._schema_cache.refresh(conn)
+        track_signatures = self._schema_watcher is not None or self._snapshot_store is not None
+        signatures: CatalogSignatures | None = None
+
+        concurrency = min(self.schema_settings.refresh_concurrency, self.config.max_pool_size)
+        if concurrency > 1:
+            if track_signatures:
+                async with self._pool.acquire() as conn:
+                    signatures = await self._capture_signatures(conn)
+            schema = await self._schema_cache.refresh_parallel(self._pool, concurrency)
+        else:
+            async with self._pool.acquire() as conn:
+                if track_signatures:
+                    signatures = await self._capture_signatures(conn)
+                schema = await self._schema_cache.refresh(conn)
+
+        if signatures is not None:
+            await self._save_snapshot(schema, signatures)
+        return schema
 
     async def execute_query(
         self,
         sql: str,
         limit: int | None = None,
+        statement: exp.Expression | None = None,
     ) -> QueryResultData:
         """Execute a read-only SQL query.
 
+        The outermost LIMIT is added or capped on the parsed statement (see
+        :func:`apply_row_limit`).
+        Result rows are capped at ``max_result_bytes`` of compact JSON; when
+        ``stream_results`` is enabled they are fetched in batches through a
+        server-side cursor so that at most one batch of records is held
+        alongside the converted rows. With read replicas configured, the
+        query runs on the least busy healthy replica; if the connection is
+        lost during the query, it is retried once on the next healthy
+        replica, or on the primary when none is left. In the columnar
+        ``result_format`` the records are encoded column by column straight
+        away and the budget applies to the encoded columns.
+
+        With ``max_estimated_cost`` or ``max_estimated_rows`` set, the query
+        is first checked against the planner estimates (see
+        :class:`~pg_mcp.database.cost_guard.CostGuard`) and rejected rather
+        than run when it is over a limit.
+
         Args:
             sql: The SQL SELECT statement to execute.
             limit: Maximum number of rows to return. If not specified,
                    uses the default_limit from query settings.
+            statement: Parsed form of ``sql`` from the validator, so the
+                   statement is not parsed again.
 
         Returns:
-            Query result containing columns, rows, and metadata.
+            Query result containing columns, rows, and metadata
+            (``truncated`` is set when the byte budget cut the result short).
 
         Raises:
+            QueryTooExpensiveError: If the planner estimates are over a limit.
             SQLExecutionError: If the query fails.
             SQLTimeoutError: If the query times out.
         """
         effective_limit = limit or self.query_settings.default_limit
 
-        # Add LIMIT if not present in the query
-        exec_sql = sql.rstrip(";")
-        if "LIMIT" not in sql.upper():
-            exec_sql = f"{exec_sql} LIMIT {effective_limit}"
+        exec_sql = apply_row_limit(sql, effective_limit, statement)
 
         logger.debug(f"Executing query: {exec_sql[:200]}...")
 
-        async with self._pool.acquire() as conn:
+        read_pool = self._replicas if self._replicas is not None else self._pool
+        # Read-only queries are safe to retry once the router has dropped the lost replica
+        retries = 1 if self._replicas is not None else 0
+        while True:
             try:
-                # Set statement timeout
-                await conn.execute(
-                    f"SET statement_timeout = {self.query_settings.statement_timeout}"
-                )
-
-                start_time = time.perf_counter()
-                rows = await conn.fetch(exec_sql)
-                end_time = time.perf_counter()
-
-                execution_time_ms = (end_time - start_time) * 1000
-
-                if not rows:
-                    return QueryResultData(
-                        columns=[],
-                        rows=[],
-                        row_count=0,
-                        execution_time_ms=execution_time_ms,
-                    )
-
-                # Extract column names from the first row
-                columns = list(rows[0].keys())
-
-                # Convert rows to list of lists
-                result_rows = [list(row.values()) for row in rows]
-
-                logger.info(
-                    f"Query returned {len(result_rows)} rows in {execution_time_ms:.2f}ms"
-                )
-
-                return QueryResultData(
-                    columns=columns,
-                    rows=result_rows,
-                    row_count=len(result_rows),
-                    execution_time_ms=execution_time_ms,
-                )
-
+                async with read_pool.acquire() as conn:
+                    return await self._fetch_result(conn, exec_sql, statement)
+            except QueryTooExpensiveError as e:
+                logger.warning(f"Query rejected before execution: {e.reason}")
+                raise
+            except CONNECTION_ERRORS as e:
+                if retries > 0:
+                    retries -= 1
+                    logger.warning(f"Connection lost during query, retrying: {e}")
+                    continue
+                logger.error(f"SQL execution failed: {e}")
+                raise SQLExecutionError(message=f"Connection error: {e}", sql=sql)
             except asyncpg.QueryCanceledError:
                 raise SQLTimeoutError(
                     timeout_ms=self.query_settings.statement_timeout,
@@ -148,6 +708,7 @@ class DatabaseService:
                 raise SQLExecutionError(
                     message=str(e),
                     sql=sql,
+                    statement_error=not isinstance(e, _SERVER_STATE_ERRORS),
                 )
             except Exception as e:
                 logger.exception("Unexpected error during query execution")
@@ -155,3 +716,92 @@ class DatabaseService:
                     message=f"Unexpected error: {e}",
                     sql=sql,
                 )
+
+    async def _fetch_result(
+        self,
+        conn: asyncpg.Connection,
+        exec_sql: str,
+        statement: exp.Expression | None,
+    ) -> QueryResultData:
+        """Check the cost of a limited statement and fetch its result.
+
+        Runs in a read-only transaction with ``SET LOCAL statement_timeout``,
+        so the timeout ends with the transaction and does not apply to
+        schema work on the same pool.
+
+        Args:
+            conn: Connection to run the query on.
+            exec_sql: The statement with its row limit applied.
+            statement: Parsed form of the original statement, if available.
+
+        Returns:
+            The query result.
+        """
+        buffer: ResultBuffer | ColumnarBuffer
+        if self.query_settings.result_format == "columnar":
+            buffer = ColumnarBuffer(self.query_settings.max_result_bytes)
+        else:
+            buffer = ResultBuffer(self.query_settings.max_result_bytes)
+
+        async with conn.transaction(readonly=True):
+            await conn.execute(
+                f"SET LOCAL statement_timeout = {self.query_settings.statement_timeout}"
+            )
+            await self._cost_guard.check(conn, exec_sql, statement)
+
+            start_time = time.perf_counter()
+            if self.query_settings.stream_results:
+                columns = await self._fetch_streaming(conn, exec_sql, buffer)
+            else:
+                rows = await conn.fetch(exec_sql)
+                # Extract column names from the first row
+                columns = list(rows[0].keys()) if rows else []
+                buffer.extend(rows)
+                del rows
+            end_time = time.perf_counter()
+
+        execution_time_ms = (end_time - start_time) * 1000
+
+        if buffer.truncated:
+            logger.warning(
+                f"Query result truncated to {buffer.row_count} rows "
+                f"({buffer.size} bytes) by the result size budget"
+            )
+        logger.info(f"Query returned {buffer.row_count} rows in {execution_time_ms:.2f}ms")
+
+        return buffer.to_result(columns, execution_time_ms)
+
+    async def _fetch_streaming(
+        self,
+        conn: asyncpg.Connection,
+        sql: str,
+        buffer: ResultBuffer | ColumnarBuffer,
+    ) -> list[str]:
+        """Fetch rows in batches through a server-side cursor.
+
+        Only one batch of records is held at a time; fetching stops as soon
+        as the result buffer runs out of budget. Must be called inside a
+        transaction, which server-side cursors need.
+
+        Args:
+            conn: Active database connection.
+            sql: SQL statement to run.
+            buffer: Buffer collecting the converted rows.
+
+        Returns:
+            Column names of the result.
+        """
+        batch_size = self.query_settings.stream_batch_size
+        columns: list[str] = []
+        cursor = await conn.cursor(sql)
+        while True:
+            batch = await cursor.fetch(batch_size)
+            if batch and not columns:
+                columns = list(batch[0].keys())
+            if not buffer.extend(batch) or len(batch) < batch_size:
+                break
+        if not columns:
+            # No rows to take the names from; describe the statement instead
+            prepared = await conn.prepare(sql)
+            columns = [attribute.name for attribute in prepared.get_attributes()]
+        return columns
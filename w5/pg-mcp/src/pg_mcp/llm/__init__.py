@@ -1,17 +1,26 @@
 """LLM components for pg-mcp."""
 
+from pg_mcp.llm.limiter import TokenBucket
 from pg_mcp.llm.prompts import (
     RESULT_VALIDATION_SYSTEM_PROMPT,
     RESULT_VALIDATION_USER_TEMPLATE,
+    SQL_BATCH_GENERATION_SYSTEM_PROMPT,
+    SQL_BATCH_GENERATION_USER_TEMPLATE,
     SQL_GENERATION_SYSTEM_PROMPT,
     SQL_GENERATION_USER_TEMPLATE,
 )
 from pg_mcp.llm.service import LLMService
+from pg_mcp.llm.sql_extractor import SQLStreamExtractor, extract_sql
 
 __all__ = [
     "SQL_GENERATION_SYSTEM_PROMPT",
     "SQL_GENERATION_USER_TEMPLATE",
+    "SQL_BATCH_GENERATION_SYSTEM_PROMPT",
+    "SQL_BATCH_GENERATION_USER_TEMPLATE",
     "RESULT_VALIDATION_SYSTEM_PROMPT",
     "RESULT_VALIDATION_USER_TEMPLATE",
     "LLMService",
+    "TokenBucket",
+    "SQLStreamExtractor",
+    "extract_sql",
 ]
@@ -0,0 +1,51 @@
+"""Rate limiting and retry backoff for LLM API calls."""
+
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """Token bucket rate limiter for a single event loop.
+
+    Tokens are added continuously at ``rate`` per second up to ``capacity``;
+    each call takes one token and waits for it when the bucket is empty.
+    Waiters are served in arrival order.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum number of tokens, i.e. the allowed burst.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Take one token, waiting until one is available."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Get a jittered exponential backoff delay ("full jitter").
+
+    Args:
+        attempt: Zero-based number of the retry.
+        base: Delay of the first retry in seconds, before jitter.
+        cap: Maximum delay in seconds, before jitter.
+
+    Returns:
+        Seconds to wait, uniformly drawn between 0 and the capped delay.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -27,6 +27,12 @@ SQL_GENERATION_USER_TEMPLATE = """## 数据库 Schema
 
 请生成相应的 SQL 查询语句。"""
 
+SQL_REPAIR_USER_TEMPLATE = """上面的 SQL 执行失败：
+
+{error}
+
+请基于数据库 Schema 修正该 SQL，按原有输出要求只返回修正后的 SQL 语句。"""
+
 
 RESULT_VALIDATION_SYSTEM_PROMPT = """你是一个数据分析专家，负责验证 SQL 查询结果是否符合用户的原始意图。
 
@@ -60,3 +66,30 @@ RESULT_VALIDATION_USER_TEMPLATE = """## 用户原始查询
 {sample_rows}
 
 请验证结果是否符合用户意图。"""
+
+
+SQL_BATCH_GENERATION_SYSTEM_PROMPT = """你是一个 PostgreSQL 专家，根据用户的多个自然语言问题分别生成 SQL 查询语句。
+
+规则：
+1. 每个问题生成一条独立的 SELECT 查询语句
+2. 基于提供的数据库 Schema 信息
+3. 不要添加 LIMIT 子句，系统会自动处理
+4. 使用标准 PostgreSQL 语法
+5. 如果用户意图不明确，尝试做出合理推断
+6. 使用表和列的注释信息来理解业务含义
+7. 考虑外键关系来正确进行 JOIN 操作
+
+输出要求：
+- 只返回一个 JSON 字符串数组，按问题编号顺序每个问题对应一条 SQL
+- 数组长度必须与问题数量相同
+- 不要添加任何解释或注释"""
+
+SQL_BATCH_GENERATION_USER_TEMPLATE = """## 数据库 Schema
+
+{schema}
+
+## 用户问题
+
+{queries}
+
+请按顺序为每个问题生成相应的 SQL 查询语句，以 JSON 数组返回。"""
@@ -1,18 +1,31 @@
 """LLM service for SQL generation and result validation."""
 
+import asyncio
+import hashlib
 import json
 import logging
 import re
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
 
+import openai
 from openai import AsyncOpenAI
 
 from pg_mcp.config import LLMSettings
+from pg_mcp.llm.limiter import TokenBucket, backoff_delay
 from pg_mcp.llm.prompts import (
     RESULT_VALIDATION_SYSTEM_PROMPT,
     RESULT_VALIDATION_USER_TEMPLATE,
+    SQL_BATCH_GENERATION_SYSTEM_PROMPT,
+    SQL_BATCH_GENERATION_USER_TEMPLATE,
     SQL_GENERATION_SYSTEM_PROMPT,
     SQL_GENERATION_USER_TEMPLATE,
+    SQL_REPAIR_USER_TEMPLATE,
 )
+from pg_mcp.llm.sql_extractor import SQLStreamExtractor, extract_sql
+from pg_mcp.metrics import Metrics
 from pg_mcp.models import (
     DatabaseSchema,
     LLMError,
@@ -24,27 +37,56 @@ from pg_mcp.models import (
 logger = logging.getLogger(__name__)
 
 
+# Status codes worth retrying: rate limited, or a transient server error
+_RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
 class LLMService:
     """Service for LLM-powered SQL generation and validation.
 
+    The service is shared by all databases, so API calls go through a
+    concurrency limit and an optional token bucket, and transient failures
+    are retried with jittered exponential backoff. Identical SQL generation
+    requests that are in flight at the same time share one API call.
+
     Args:
         settings: LLM configuration settings.
+        metrics: Optional metrics registry for API call counts, latency and
+            token usage.
     """
 
-    def __init__(self, settings: LLMSettings) -> None:
+    def __init__(self, settings: LLMSettings, metrics: Metrics | None = None) -> None:
         self.settings = settings
+        self.metrics = metrics
         self._client = AsyncOpenAI(
             api_key=settings.api_key.get_secret_value(),
             base_url=settings.base_url,
             timeout=settings.timeout,
+            # Retries are handled by _create_completion
+            max_retries=0,
+        )
+        self._semaphore = asyncio.Semaphore(settings.max_concurrency)
+        self._rate_limiter = (
+            TokenBucket(settings.rate_limit, settings.rate_burst) if settings.rate_limit else None
         )
+        self._inflight: dict[bytes, asyncio.Task[str]] = {}
 
-    async def generate_sql(self, query: str, schema: DatabaseSchema) -> str:
+    async def generate_sql(
+        self,
+        query: str,
+        schema: DatabaseSchema,
+        schema_context: str | None = None,
+    ) -> str:
         """Generate SQL from a natural language query.
 
+        Concurrent calls with the same question and schema context share a
+        single API request.
+
         Args:
             query: The natural language query from the user.
             schema: The database schema for context.
+            schema_context: Pre-rendered schema context; rendered from
+                ``schema`` when not given.
 
         Returns:
             The generated SQL statement.
@@ -53,30 +95,125 @@ class LLMService:
             SQLGenerationError: If SQL generation fails.
             LLMError: If the LLM API call fails.
         """
-        schema_context = schema.to_llm_context()
+        if schema_context is None:
+            schema_context = schema.to_llm_context()
         user_message = SQL_GENERATION_USER_TEMPLATE.format(
             schema=schema_context,
             query=query,
         )
 
-        logger.debug(f"Generating SQL for query: {query}")
+        # The prompt holds the question and the schema, so equal prompts get equal answers
+        key = hashlib.sha256(user_message.encode("utf-8")).digest()
+        task = self._inflight.get(key)
+        if task is None:
+            logger.debug(f"Generating SQL for query: {query}")
+            task = asyncio.create_task(self._generate_sql(user_message))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.debug(f"Joining in-flight SQL generation for query: {query}")
+
+        # A cancelled caller must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def repair_sql(
+        self,
+        query: str,
+        schema: DatabaseSchema,
+        failures: Sequence[tuple[str, str]],
+        schema_context: str | None = None,
+    ) -> str:
+        """Ask the LLM to correct SQL that failed validation or execution.
+
+        The original generation prompt is replayed, followed by each failed
+        statement as the model's answer and its error as the next user turn,
+        so the model sees every earlier attempt.
 
-        try:
-            response = await self._client.chat.completions.create(
-                model=self.settings.model,
-                temperature=self.settings.temperature,
-                max_tokens=self.settings.max_tokens,
-                messages=[
-                    {"role": "system", "content": SQL_GENERATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_message},
-                ],
+        Args:
+            query: The natural language query from the user.
+            schema: The database schema for context.
+            failures: Failed statements and their error messages, oldest first.
+            schema_context: Pre-rendered schema context; rendered from
+                ``schema`` when not given.
+
+        Returns:
+            The corrected SQL statement.
+
+        Raises:
+            SQLGenerationError: If no SQL can be extracted from the response.
+            LLMError: If the LLM API call fails.
+        """
+        if schema_context is None:
+            schema_context = schema.to_llm_context()
+        messages = [
+            {"role": "system", "content": SQL_GENERATION_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": SQL_GENERATION_USER_TEMPLATE.format(
+                    schema=schema_context, query=query
+                ),
+            },
+        ]
+        for sql, error in failures:
+            messages.append({"role": "assistant", "content": sql})
+            messages.append(
+                {"role": "user", "content": SQL_REPAIR_USER_TEMPLATE.format(error=error)}
             )
 
-            content = response.choices[0].message.content
-            if not content:
-                raise SQLGenerationError("LLM 返回了空响应")
+        logger.debug(f"Repairing SQL for query: {query} (attempt {len(failures)})")
+        return await self._request_sql("repair_sql", messages)
+
+    async def _generate_sql(self, user_message: str) -> str:
+        """Request SQL from the LLM for a rendered prompt.
+
+        Args:
+            user_message: Rendered SQL generation prompt.
+
+        Returns:
+            The generated SQL statement.
+
+        Raises:
+            SQLGenerationError: If SQL generation fails.
+            LLMError: If the LLM API call fails.
+        """
+        return await self._request_sql(
+            "generate_sql",
+            [
+                {"role": "system", "content": SQL_GENERATION_SYSTEM_PROMPT},
+                {"role": "user", "content": user_message},
+            ],
+        )
+
+    async def _request_sql(self, operation: str, messages: list[dict[str, str]]) -> str:
+        """Request a single SQL statement from the LLM.
+
+        Args:
+            operation: Name of the calling operation, for metrics.
+            messages: Chat messages of the request.
+
+        Returns:
+            The SQL statement of the response.
+
+        Raises:
+            SQLGenerationError: If no SQL can be extracted from the response.
+            LLMError: If the LLM API call fails.
+        """
+        try:
+            if self.settings.stream_sql:
+                sql = await self._stream_sql(messages, operation)
+            else:
+                response = await self._create_completion(
+                    operation,
+                    max_tokens=self.settings.max_tokens,
+                    messages=messages,
+                )
+
+                content = response.choices[0].message.content
+                if not content:
+                    raise SQLGenerationError("LLM 返回了空响应")
+
+                sql = self._clean_sql(content)
 
-            sql = self._clean_sql(content)
             if not sql:
                 raise SQLGenerationError("无法从 LLM 响应中提取有效的 SQL")
 
@@ -89,6 +226,103 @@ class LLMService:
             logger.exception("LLM API call failed during SQL generation")
             raise LLMError(f"LLM API 调用失败: {e}")
 
+    async def generate_sql_batch(
+        self,
+        queries: list[str],
+        schema: DatabaseSchema,
+        schema_context: str | None = None,
+    ) -> list[str]:
+        """Generate SQL for several questions in a single API request.
+
+        The schema context is sent once for all questions, and the model
+        answers with a JSON array holding one statement per question.
+
+        Args:
+            queries: The natural language queries, in order.
+            schema: The database schema for context.
+            schema_context: Pre-rendered schema context; rendered from
+                ``schema`` when not given.
+
+        Returns:
+            The generated SQL statements, in the order of ``queries``.
+
+        Raises:
+            SQLGenerationError: If the response does not hold one statement
+                per question.
+            LLMError: If the LLM API call fails.
+        """
+        if schema_context is None:
+            schema_context = schema.to_llm_context()
+        user_message = SQL_BATCH_GENERATION_USER_TEMPLATE.format(
+            schema=schema_context,
+            queries="\n".join(f"{i}. {query}" for i, query in enumerate(queries, 1)),
+        )
+
+        logger.debug(f"Generating SQL for {len(queries)} queries in one request")
+        try:
+            response = await self._create_completion(
+                "generate_sql_batch",
+                max_tokens=min(
+                    self.settings.max_tokens * len(queries), self.settings.batch_max_tokens
+                ),
+                messages=[
+                    {"role": "system", "content": SQL_BATCH_GENERATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_message},
+                ],
+            )
+        except Exception as e:
+            logger.exception("LLM API call failed during batch SQL generation")
+            raise LLMError(f"LLM API 调用失败: {e}")
+
+        content = response.choices[0].message.content
+        if not content:
+            raise SQLGenerationError("LLM 返回了空响应")
+
+        statements = self._parse_sql_batch(content)
+        if len(statements) != len(queries):
+            raise SQLGenerationError(
+                f"LLM 返回了 {len(statements)} 条 SQL，预期 {len(queries)} 条"
+            )
+        logger.info(f"Generated {len(statements)} SQL statements in one request")
+        return statements
+
+    async def _stream_sql(
+        self, messages: list[dict[str, str]], operation: str = "generate_sql"
+    ) -> str:
+        """Stream the completion and stop reading once the SQL is complete.
+
+        Any explanation the model adds after the statement is never
+        downloaded, so validation can start as soon as the statement ends.
+
+        Args:
+            messages: Chat messages of the SQL generation request.
+            operation: Name of the calling operation, for metrics.
+
+        Returns:
+            The extracted SQL statement.
+
+        Raises:
+            SQLGenerationError: If the response is empty.
+        """
+        extractor = SQLStreamExtractor()
+        received = False
+        async with self._stream_completion(
+            operation, max_tokens=self.settings.max_tokens, messages=messages
+        ) as stream:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                received = True
+                sql = extractor.feed(delta)
+                if sql is not None:
+                    logger.debug("SQL statement complete, closing the completion stream")
+                    return sql
+
+        if not received:
+            raise SQLGenerationError("LLM 返回了空响应")
+        return extractor.finish()
+
     async def validate_result(
         self,
         query: str,
@@ -119,9 +353,8 @@ class LLMService:
         logger.debug(f"Validating result for query: {query}")
 
         try:
-            response = await self._client.chat.completions.create(
-                model=self.settings.model,
-                temperature=self.settings.temperature,
+            response = await self._create_completion(
+                "validate_result",
                 max_tokens=512,
                 messages=[
                     {"role": "system", "content": RESULT_VALIDATION_SYSTEM_PROMPT},
@@ -145,10 +378,144 @@ class LLMService:
                 message=f"验证过程出错，默认通过: {e}",
             )
 
+    async def _create_completion(self, operation: str, **kwargs: Any) -> Any:
+        """Call the chat completions API within the concurrency and rate limits.
+
+        Rate limit, timeout, connection and server errors are retried up to
+        ``max_retries`` times with jittered exponential backoff; the
+        concurrency slot is released while waiting.
+
+        Args:
+            operation: Name of the calling operation, for metrics.
+            **kwargs: Arguments for ``chat.completions.create`` besides the
+                model and temperature.
+
+        Returns:
+            The chat completion response.
+        """
+        start = time.perf_counter()
+        try:
+            response = await self._create_completion_with_retries(operation, **kwargs)
+        except Exception:
+            self._record_request(operation, "error", start)
+            raise
+
+        self._record_request(operation, "success", start, response)
+        return response
+
+    @asynccontextmanager
+    async def _stream_completion(self, operation: str, **kwargs: Any) -> AsyncIterator[Any]:
+        """Open a streamed chat completion within the concurrency and rate limits.
+
+        The concurrency slot is held, and the request timed, until the
+        stream is closed on leaving the context, so that
+        ``max_concurrency`` also bounds streams being read.
+
+        Args:
+            operation: Name of the calling operation, for metrics.
+            **kwargs: Arguments for ``chat.completions.create`` besides the
+                model, temperature and ``stream``.
+
+        Yields:
+            The completion stream.
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            stream = await self._create_completion_with_retries(
+                operation, keep_slot=True, stream=True, **kwargs
+            )
+            try:
+                yield stream
+                outcome = "success"
+            finally:
+                try:
+                    await stream.close()
+                finally:
+                    self._semaphore.release()
+        finally:
+            self._record_request(operation, outcome, start)
+
+    def _record_request(
+        self, operation: str, outcome: str, start: float, response: Any = None
+    ) -> None:
+        """Record the outcome, latency and token usage of an API call.
+
+        Args:
+            operation: Name of the calling operation.
+            outcome: "success" or "error".
+            start: ``time.perf_counter()`` when the call started.
+            response: The chat completion response, for token usage.
+        """
+        if self.metrics is None:
+            return
+        self.metrics.llm_requests.inc(operation=operation, outcome=outcome)
+        self.metrics.llm_seconds.observe(time.perf_counter() - start, operation=operation)
+        # Streamed responses carry no usage unless the stream is read to the end
+        usage = getattr(response, "usage", None)
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int):
+                self.metrics.llm_tokens.inc(tokens, operation=operation, kind=kind)
+
+    async def _create_completion_with_retries(
+        self, operation: str, keep_slot: bool = False, **kwargs: Any
+    ) -> Any:
+        """Call the chat completions API, retrying transient failures.
+
+        Args:
+            operation: Name of the calling operation, for metrics.
+            keep_slot: Return with the concurrency slot still held; the
+                caller must release ``self._semaphore`` when done with the
+                response.
+            **kwargs: Arguments for ``chat.completions.create`` besides the
+                model and temperature.
+
+        Returns:
+            The chat completion response.
+        """
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+            await self._semaphore.acquire()
+            try:
+                response = await self._client.chat.completions.create(
+                    model=self.settings.model,
+                    temperature=self.settings.temperature,
+                    **kwargs,
+                )
+            except (openai.APIConnectionError, openai.APIStatusError) as e:
+                self._semaphore.release()
+                retryable = isinstance(e, openai.APIConnectionError) or (
+                    e.status_code in _RETRYABLE_STATUS_CODES
+                )
+                if not retryable or attempt >= self.settings.max_retries:
+                    raise
+                if self.metrics is not None:
+                    self.metrics.llm_retries.inc(operation=operation)
+                delay = backoff_delay(
+                    attempt, self.settings.retry_base_delay, self.settings.retry_max_delay
+                )
+                attempt += 1
+                logger.warning(
+                    f"LLM API call failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.settings.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._semaphore.release()
+                raise
+            if not keep_slot:
+                self._semaphore.release()
+            return response
+
     def _clean_sql(self, content: str) -> str:
         """Clean LLM response to extract pure SQL.
 
-        Removes markdown code blocks and extra whitespace.
+        Removes markdown code blocks, explanations around the statement and
+        extra whitespace, the same way as in streaming mode.
 
         Args:
             content: Raw LLM response content.
@@ -156,23 +523,32 @@ class LLMService:
         Returns:
             Cleaned SQL statement.
         """
-        sql = content.strip()
+        return extract_sql(content)
 
-        # Remove markdown code blocks
-        sql = re.sub(r"```sql\s*", "", sql)
-        sql = re.sub(r"```\s*", "", sql)
+    def _parse_sql_batch(self, content: str) -> list[str]:
+        """Parse the JSON array of a batch SQL generation response.
 
-        # Remove leading/trailing whitespace and newlines
-        sql = sql.strip()
+        Args:
+            content: LLM response content.
+
+        Returns:
+            The cleaned SQL statements.
 
-        # Remove any leading explanation text before SELECT
-        if "SELECT" in sql.upper():
-            # Find the first SELECT and take everything from there
-            match = re.search(r"(SELECT\s+.+)", sql, re.IGNORECASE | re.DOTALL)
-            if match:
-                sql = match.group(1)
+        Raises:
+            SQLGenerationError: If the response holds no array of strings.
+        """
+        start = content.find("[")
+        end = content.rfind("]")
+        try:
+            if start == -1 or end < start:
+                raise ValueError("no JSON array")
+            data = json.loads(content[start : end + 1])
+            if not isinstance(data, list) or not all(isinstance(item, str) for item in data):
+                raise ValueError("not an array of strings")
+        except ValueError as e:
+            raise SQLGenerationError("无法解析 LLM 返回的批量 SQL", str(e))
 
-        return sql.strip()
+        return [self._clean_sql(item) for item in data]
 
     def _parse_validation_response(self, content: str) -> ValidationResult:
         """Parse LLM validation response into ValidationResult.
@@ -218,11 +594,11 @@ class LLMService:
         Returns:
             Formatted string representation of sample rows.
         """
-        if not result.rows:
+        if not result.row_count:
             return "（无数据）"
 
         lines: list[str] = []
-        for i, row in enumerate(result.rows[:max_rows]):
+        for i, row in enumerate(result.head(max_rows)):
             # Format each cell, handling None and long values
             formatted = []
             for val in row:
@@ -0,0 +1,143 @@
+"""Extraction of the SQL statement from (streamed) LLM responses."""
+
+import re
+
+_FENCE = "```"
+
+# Start of the statement: a CTE header or SELECT at the start of a line or
+# after a colon, so that prose such as "I will select..." is skipped
+_START_PATTERN = re.compile(
+    r"""
+    (?:^|(?<=[\n:\uff1a]))[ \t]*
+    (?P<sql>
+        with\s+(?:recursive\s+)?(?:"[^"]+"|\w+)(?:\s*\([^)]*\))?
+            \s+as\s*(?:(?:not\s+)?materialized\s+)?\(
+      | select(?=[\s(*])
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Tokens that matter for finding the end of the statement
+_SQL_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<complete>
+        '(?:[^']|'')*'                              # string literal
+      | "(?:[^"]|"")*"                              # quoted identifier
+      | (?P<tag>\$(?:[A-Za-z_]\w*)?\$).*?(?P=tag)   # dollar-quoted string
+      | --[^\n]*\n                                  # line comment
+      | /\*.*?\*/                                   # block comment
+    )
+    | (?P<open>['"]|\$(?:[A-Za-z_]\w*)?\$|--|/\*)   # not terminated yet
+    | (?P<end>;|```)
+    # A blank line followed by prose (CJK text, markdown or an explanation)
+    | \n[ \t]*\n(?=[ \t]*(?:[\u4e00-\u9fff\#*]|(?:explanation|note)\b))
+    """,
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+
+
+class SQLStreamExtractor:
+    """Recognises a complete SQL statement in an incrementally received response.
+
+    The statement starts inside a code fence or at the first ``SELECT`` or
+    CTE header, and is complete at a top-level semicolon, a closing code
+    fence or a blank line followed by prose. Semicolons and fences inside
+    string literals, quoted identifiers and comments are ignored.
+
+    Feed response chunks as they arrive; once :meth:`feed` returns the
+    statement, the rest of the response is not needed.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._start: int | None = None
+        # Scanning resumes here; everything before it is known to be inside the statement
+        self._pos = 0
+        self.sql: str | None = None
+
+    def feed(self, text: str) -> str | None:
+        """Add a chunk of the response.
+
+        Args:
+            text: Next chunk of response text.
+
+        Returns:
+            The complete SQL statement once it has been recognised, else None.
+        """
+        if self.sql is not None:
+            return self.sql
+
+        self._buffer += text
+        if self._start is None:
+            self._start = self._find_start()
+            if self._start is None:
+                return None
+            self._pos = self._start
+
+        for match in _SQL_TOKEN_PATTERN.finditer(self._buffer, self._pos):
+            if match.group("complete") is not None:
+                # A quote at the very end may still turn out to be an escaped quote
+                if match.end() == len(self._buffer):
+                    return None
+                self._pos = match.end()
+            elif match.group("open") is not None:
+                self._pos = match.start()
+                return None
+            else:
+                self.sql = self._buffer[self._start : match.start()].strip()
+                return self.sql
+        return None
+
+    def finish(self) -> str:
+        """Get the statement after the whole response has been received.
+
+        Returns:
+            The extracted SQL statement, or the cleaned response text if no
+            statement start was found.
+        """
+        if self.sql is not None:
+            return self.sql
+
+        if self._start is None:
+            text = self._buffer
+            fence = text.find(_FENCE)
+            if fence != -1:
+                # Drop the opening fence and its language tag
+                newline = text.find("\n", fence)
+                text = text[newline + 1 :] if newline != -1 else text[fence + len(_FENCE) :]
+            return text.replace(_FENCE, "").strip()
+
+        sql = self._buffer[self._start :]
+        fence = sql.find(_FENCE)
+        if fence != -1:
+            sql = sql[:fence]
+        return sql.strip().rstrip(";").strip()
+
+    def _find_start(self) -> int | None:
+        """Locate the start of the statement in the buffer.
+
+        Returns:
+            Offset of the statement, or None if more text is needed.
+        """
+        fence = self._buffer.find(_FENCE)
+        match = _START_PATTERN.search(self._buffer)
+        if fence != -1 and (match is None or fence < match.start()):
+            # The statement begins on the line after the opening fence
+            newline = self._buffer.find("\n", fence)
+            return newline + 1 if newline != -1 else None
+        return match.start("sql") if match else None
+
+
+def extract_sql(content: str) -> str:
+    """Extract the SQL statement from a complete LLM response.
+
+    Args:
+        content: Raw LLM response content.
+
+    Returns:
+        The SQL statement (see :class:`SQLStreamExtractor`).
+    """
+    extractor = SQLStreamExtractor()
+    extractor.feed(content)
+    return extractor.finish()
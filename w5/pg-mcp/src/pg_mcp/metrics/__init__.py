@@ -0,0 +1,12 @@
+"""Metrics instrumentation for pg-mcp."""
+
+from pg_mcp.metrics.instruments import Metrics
+from pg_mcp.metrics.registry import Counter, Gauge, Histogram, MetricsRegistry
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Metrics",
+    "MetricsRegistry",
+]
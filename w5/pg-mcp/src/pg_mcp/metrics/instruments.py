@@ -0,0 +1,92 @@
+"""Metrics recorded by the pg-mcp server."""
+
+from pg_mcp.metrics.registry import MetricsRegistry
+
+
+class Metrics(MetricsRegistry):
+    """Registry holding the instruments of a pg-mcp server.
+
+    Query pipeline stages are ``admission`` (waiting for an admission
+    slot), ``schema`` (schema selection and context
+    rendering), ``generation`` (LLM SQL generation), ``repair`` (LLM
+    correction of failed SQL), ``validation`` (SQL safety check),
+    ``execution`` (database query), ``result_validation`` (inline LLM result
+    check) and ``total``.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.queries = self.counter(
+            "pg_mcp_queries_total",
+            "Natural language queries answered, by outcome (success or error code)",
+            ("database", "outcome"),
+        )
+        self.stage_seconds = self.histogram(
+            "pg_mcp_query_stage_seconds",
+            "Time spent in each stage of the query pipeline",
+            ("database", "stage"),
+        )
+        self.cache_lookups = self.counter(
+            "pg_mcp_cache_lookups_total",
+            "Query cache lookups by level (sql or result) and result (hit or miss)",
+            ("database", "level", "result"),
+        )
+        self.sql_rejections = self.counter(
+            "pg_mcp_sql_rejections_total",
+            "Generated SQL statements rejected by the safety validator",
+            ("database",),
+        )
+        self.sql_repairs = self.counter(
+            "pg_mcp_sql_repairs_total",
+            "SQL repair attempts by attempt number and outcome (fixed, failed, timeout or error)",
+            ("database", "attempt", "outcome"),
+        )
+        self.llm_requests = self.counter(
+            "pg_mcp_llm_requests_total",
+            "LLM API calls by operation and outcome (success or error)",
+            ("operation", "outcome"),
+        )
+        self.llm_seconds = self.histogram(
+            "pg_mcp_llm_request_seconds",
+            "LLM API call latency including retries (until the stream is closed when streaming)",
+            ("operation",),
+        )
+        self.llm_retries = self.counter(
+            "pg_mcp_llm_retries_total",
+            "LLM API calls retried after a transient failure",
+            ("operation",),
+        )
+        self.llm_tokens = self.counter(
+            "pg_mcp_llm_tokens_total",
+            "LLM tokens reported by the API, by kind (prompt or completion)",
+            ("operation", "kind"),
+        )
+        self.pool_connections = self.gauge(
+            "pg_mcp_pool_connections",
+            "Open pooled connections by state (idle or busy)",
+            ("database", "endpoint", "state"),
+        )
+        self.pool_max_size = self.gauge(
+            "pg_mcp_pool_max_size",
+            "Maximum size of the connection pool",
+            ("database", "endpoint"),
+        )
+        self.pool_waiters = self.gauge(
+            "pg_mcp_pool_waiters",
+            "Callers waiting for a pooled connection",
+            ("database", "endpoint"),
+        )
+        self.replica_healthy = self.gauge(
+            "pg_mcp_replica_healthy",
+            "Whether a read replica is in rotation (1) or not (0)",
+            ("database", "endpoint"),
+        )
+        self.admission_queries = self.gauge(
+            "pg_mcp_admission_queries",
+            "Queries holding an admission slot (running) or waiting for one (waiting)",
+            ("database", "state"),
+        )
+        self.validation_queue_pending = self.gauge(
+            "pg_mcp_validation_queue_pending",
+            "Background result validations waiting for a worker",
+        )
@@ -0,0 +1,281 @@
+"""Minimal Prometheus-style metrics registry."""
+
+import logging
+import math
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Collector = Callable[[], None]
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the text exposition format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Sequence[tuple[str, str]]) -> str:
+    """Format label pairs, escaping backslashes, quotes and newlines."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="'
+        + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        + '"'
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Base class of a named metric with a fixed set of label names.
+
+    Args:
+        name: Metric name.
+        documentation: Help text.
+        labelnames: Names of the labels every sample must be given.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        """Get the label values of a sample in label name order.
+
+        Raises:
+            ValueError: If the labels do not match the label names.
+        """
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[tuple[str, list[tuple[str, str]], float]]:
+        """Yield (sample name, labels, value) for every recorded series."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        """Render the metric in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter.
+
+        Raises:
+            ValueError: If ``amount`` is negative.
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Get the current value of a series (0 if never increased)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[tuple[str, list[tuple[str, str]], float]]:
+        for key, value in sorted(self._values.items()):
+            yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    """Value per label set that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge."""
+        self._values[self._key(labels)] = float(value)
+
+    def value(self, **labels: str) -> float:
+        """Get the current value of a series (0 if never set)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def clear(self) -> None:
+        """Drop all series, e.g. before a collector sets the current ones."""
+        self._values.clear()
+
+    def samples(self) -> Iterator[tuple[str, list[tuple[str, str]], float]]:
+        for key, value in sorted(self._values.items()):
+            yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets per label set.
+
+    Args:
+        name: Metric name.
+        documentation: Help text.
+        labelnames: Names of the labels every observation must be given.
+        buckets: Upper bounds of the buckets, in increasing order.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: non-cumulative bucket counts (last one is +Inf), sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation."""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Get the number of observations of a series."""
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def sum(self, **labels: str) -> float:
+        """Get the sum of the observations of a series."""
+        series = self._series.get(self._key(labels))
+        return series[1][0] if series else 0.0
+
+    def samples(self) -> Iterator[tuple[str, list[tuple[str, str]], float]]:
+        for key, (counts, total) in sorted(self._series.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", [*labels, ("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together.
+
+    Collectors are called before every render to refresh gauges that mirror
+    state held elsewhere, such as connection pool sizes.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: dict[str, Collector] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Metric | None:
+        """Look up a registered metric by name."""
+        return self._metrics.get(name)
+
+    def set_collector(self, key: str, collector: Collector | None) -> None:
+        """Register, replace or (with None) remove a collector.
+
+        Args:
+            key: Identifies the collector.
+            collector: Called without arguments before every render.
+        """
+        if collector is None:
+            self._collectors.pop(key, None)
+        else:
+            self._collectors[key] = collector
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4).
+
+        Returns:
+            The exposition text.
+        """
+        for key, collector in list(self._collectors.items()):
+            try:
+                collector()
+            except Exception:
+                logger.exception(f"Metrics collector {key} failed")
+
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: M) -> M:
+        """Add a metric to the registry.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
@@ -1,22 +1,31 @@
 """Data models for pg-mcp."""
 
+from pg_mcp.models.columnar import decode_column, decode_rows, encode_columns
 from pg_mcp.models.errors import (
     ErrorCode,
     LLMError,
     QueryError,
+    QueryTooExpensiveError,
     SQLExecutionError,
     SQLGenerationError,
     SQLTimeoutError,
     SQLUnsafeError,
+    ServerOverloadedError,
 )
 from pg_mcp.models.query import (
+    BatchQueryMetadata,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    QueryMetadata,
     QueryRequest,
     QueryResponse,
     QueryResultData,
     ValidationResult,
+    ValidationStatus,
 )
 from pg_mcp.models.schema import (
     ColumnInfo,
+    ColumnStats,
     ConstraintInfo,
     DatabaseSchema,
     EnumTypeInfo,
@@ -27,6 +36,10 @@ from pg_mcp.models.schema import (
 )
 
 __all__ = [
+    # Columnar result encoding
+    "encode_columns",
+    "decode_column",
+    "decode_rows",
     # Errors
     "ErrorCode",
     "QueryError",
@@ -34,14 +47,22 @@ __all__ = [
     "SQLUnsafeError",
     "SQLExecutionError",
     "SQLTimeoutError",
+    "QueryTooExpensiveError",
+    "ServerOverloadedError",
     "LLMError",
     # Query models
+    "BatchQueryMetadata",
+    "BatchQueryRequest",
+    "BatchQueryResponse",
+    "QueryMetadata",
     "QueryRequest",
     "QueryResponse",
     "QueryResultData",
     "ValidationResult",
+    "ValidationStatus",
     # Schema models
     "ColumnInfo",
+    "ColumnStats",
     "IndexInfo",
     "ConstraintInfo",
     "TableInfo",
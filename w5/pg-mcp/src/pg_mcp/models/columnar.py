@@ -0,0 +1,212 @@
+"""Columnar encoding of query result rows.
+
+Each result column becomes a JSON object with its name, a type tag inferred
+from its values and one of these encodings:
+
+- ``plain``: ``values`` holds the values as they are (non-JSON types as
+  strings, like the row format).
+- ``dict``: repeated strings; ``dictionary`` holds the distinct strings and
+  ``values`` their indexes (null for NULL).
+- ``range``: integers with a constant step, described by ``start`` and
+  ``step`` alone.
+- ``delta``: non-decreasing integers; ``values`` holds the first value and
+  then the difference to the previous one.
+- ``scaled``: decimals stored as integers; a value is ``values[i] / 10**scale``.
+"""
+
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+# Largest decimal scale stored as integers; finer decimals stay strings
+MAX_DECIMAL_SCALE = 18
+
+# Checked in order: bool is an int and datetime is a date
+_TYPE_TAGS: tuple[tuple[type, str], ...] = (
+    (bool, "bool"),
+    (int, "int"),
+    (float, "float"),
+    (Decimal, "numeric"),
+    (str, "text"),
+    (datetime, "timestamp"),
+    (date, "date"),
+    (time, "time"),
+    (timedelta, "interval"),
+    (UUID, "uuid"),
+    (bytes, "bytea"),
+    (list, "array"),
+)
+
+
+def _type_tag(values: Sequence[Any]) -> str:
+    """Infer the type tag of a column from its first non-NULL value."""
+    for value in values:
+        if value is not None:
+            for python_type, tag in _TYPE_TAGS:
+                if isinstance(value, python_type):
+                    return tag
+            return "text"
+    return "null"
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert a value the way the row format's JSON encoder does."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _encode_ints(values: Sequence[int | None]) -> dict[str, Any]:
+    """Encode an integer column as a range, deltas or plain values."""
+    if len(values) < 2 or None in values:
+        return {"encoding": "plain", "values": list(values)}
+
+    deltas = [b - a for a, b in zip(values, values[1:])]
+    step = deltas[0]
+    if all(delta == step for delta in deltas):
+        return {"encoding": "range", "start": values[0], "step": step}
+    if all(delta >= 0 for delta in deltas):
+        return {"encoding": "delta", "values": [values[0], *deltas]}
+    return {"encoding": "plain", "values": list(values)}
+
+
+def _encode_decimals(values: Sequence[Decimal | None]) -> dict[str, Any]:
+    """Encode a decimal column as scaled integers, or strings if not all finite."""
+    # The string form is the cheapest way to get at the digits and exponent
+    texts = [None if v is None else str(v) for v in values]
+    scales: list[int] = []
+    for text in texts:
+        if text is None:
+            continue
+        # NaN, infinities and exponent notation stay strings
+        if not text[-1].isdigit() or "E" in text:
+            return {"encoding": "plain", "values": texts}
+        point = text.find(".")
+        scales.append(len(text) - point - 1 if point != -1 else 0)
+    scale = max(scales, default=0)
+    if scale > MAX_DECIMAL_SCALE:
+        return {"encoding": "plain", "values": texts}
+
+    digits = [int(text.replace(".", "")) for text in texts if text is not None]
+    if any(s != scale for s in scales):
+        digits = [d * 10 ** (scale - s) for d, s in zip(digits, scales)]
+    if len(digits) < len(texts):
+        filled = iter(digits)
+        return {
+            "encoding": "scaled",
+            "scale": scale,
+            "values": [None if text is None else next(filled) for text in texts],
+        }
+    return {"encoding": "scaled", "scale": scale, "values": digits}
+
+
+def _encode_strings(values: Sequence[Any]) -> dict[str, Any] | None:
+    """Dictionary-encode a string column when its values repeat.
+
+    Returns:
+        The encoding, or None if the column holds values other than strings.
+    """
+    # Worth it once every string appears at least twice on average
+    max_distinct = len(values) // 2
+    codes: dict[str, int] = {}
+    indexes: list[int | None] = []
+    for i, value in enumerate(values):
+        if value is None:
+            indexes.append(None)
+            continue
+        if type(value) is not str:
+            return None
+        code = codes.setdefault(value, len(codes))
+        if len(codes) > max_distinct:
+            # Too many distinct strings; only the type of the rest matters now
+            if all(v is None or type(v) is str for v in values[i + 1 :]):
+                return {"encoding": "plain", "values": list(values)}
+            return None
+        indexes.append(code)
+    return {"encoding": "dict", "dictionary": list(codes), "values": indexes}
+
+
+def encode_columns(names: Sequence[str], rows: Sequence[Sequence[Any]]) -> list[dict[str, Any]]:
+    """Encode result rows column by column.
+
+    Args:
+        names: Column names.
+        rows: Result rows, values in column order.
+
+    Returns:
+        One JSON-ready object per column (see the module docstring).
+    """
+    if rows:
+        columns: list[Sequence[Any]] = list(zip(*rows))
+    else:
+        columns = [() for _ in names]
+
+    encoded: list[dict[str, Any]] = []
+    for name, values in zip(names, columns):
+        tag = _type_tag(values)
+        if tag == "int":
+            encoding = _encode_ints(values)
+        elif tag == "numeric":
+            encoding = _encode_decimals(values)
+        elif tag == "text":
+            encoding = _encode_strings(values) or {
+                "encoding": "plain",
+                "values": [_jsonable(v) for v in values],
+            }
+        elif tag in ("bool", "float", "array", "null"):
+            encoding = {"encoding": "plain", "values": list(values)}
+        else:
+            # A single PostgreSQL type per column: all values convert the same way
+            encoding = {
+                "encoding": "plain",
+                "values": [None if v is None else str(v) for v in values],
+            }
+        encoded.append({"name": name, "type": tag, **encoding})
+    return encoded
+
+
+def decode_column(column: dict[str, Any], row_count: int) -> list[Any]:
+    """Decode the values of one encoded column.
+
+    Args:
+        column: Column object produced by :func:`encode_columns`.
+        row_count: Number of rows of the result.
+
+    Returns:
+        The column values; scaled decimals are returned as ``Decimal``.
+    """
+    encoding = column["encoding"]
+    if encoding == "range":
+        start, step = column["start"], column["step"]
+        return [start + i * step for i in range(row_count)]
+    if encoding == "delta":
+        values: list[Any] = []
+        current = 0
+        for delta in column["values"]:
+            current += delta
+            values.append(current)
+        return values
+    if encoding == "scaled":
+        scale = column["scale"]
+        return [None if v is None else Decimal(v).scaleb(-scale) for v in column["values"]]
+    if encoding == "dict":
+        dictionary = column["dictionary"]
+        return [None if i is None else dictionary[i] for i in column["values"]]
+    return list(column["values"])
+
+
+def decode_rows(columns: Sequence[dict[str, Any]], row_count: int) -> list[list[Any]]:
+    """Turn encoded columns back into rows.
+
+    Args:
+        columns: Column objects produced by :func:`encode_columns`.
+        row_count: Number of rows of the result.
+
+    Returns:
+        The result rows.
+    """
+    if not columns:
+        return [[] for _ in range(row_count)]
+    return [list(row) for row in zip(*(decode_column(c, row_count) for c in columns))]
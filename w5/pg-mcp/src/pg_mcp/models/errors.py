@@ -11,10 +11,13 @@ class ErrorCode(str, Enum):
     SQL_UNSAFE = "SQL_UNSAFE"
     SQL_EXECUTION_FAILED = "SQL_EXECUTION_FAILED"
     SQL_TIMEOUT = "SQL_TIMEOUT"
+    QUERY_TOO_EXPENSIVE = "QUERY_TOO_EXPENSIVE"
+    SERVER_OVERLOADED = "SERVER_OVERLOADED"
     RESULT_VALIDATION_FAILED = "RESULT_VALIDATION_FAILED"
     DATABASE_CONNECTION_FAILED = "DATABASE_CONNECTION_FAILED"
     SCHEMA_NOT_FOUND = "SCHEMA_NOT_FOUND"
     LLM_API_ERROR = "LLM_API_ERROR"
+    BATCH_TOO_LARGE = "BATCH_TOO_LARGE"
     INTERNAL_ERROR = "INTERNAL_ERROR"
 
 
@@ -70,11 +73,17 @@ class SQLExecutionError(QueryError):
     Args:
         message: Database error message.
         sql: The SQL statement that failed (optional).
+        statement_error: Whether the server rejected the statement itself
+            (syntax, unknown column, bad cast, ...), as opposed to a lost
+            connection, an exhausted server or a client-side failure.
     """
 
-    def __init__(self, message: str, sql: str | None = None) -> None:
+    def __init__(
+        self, message: str, sql: str | None = None, statement_error: bool = False
+    ) -> None:
         super().__init__(ErrorCode.SQL_EXECUTION_FAILED, message, sql)
         self.sql = sql
+        self.statement_error = statement_error
 
 
 class SQLTimeoutError(QueryError):
@@ -92,6 +101,35 @@ class SQLTimeoutError(QueryError):
         self.sql = sql
 
 
+class QueryTooExpensiveError(QueryError):
+    """Error raised when the planner estimates a query to be too expensive.
+
+    Args:
+        reason: Which estimate exceeded which limit.
+        sql: The rejected SQL statement (optional).
+    """
+
+    def __init__(self, reason: str, sql: str | None = None) -> None:
+        message = f"查询代价过高，已拒绝执行（{reason}）"
+        super().__init__(ErrorCode.QUERY_TOO_EXPENSIVE, message, sql)
+        self.reason = reason
+        self.sql = sql
+
+
+class ServerOverloadedError(QueryError):
+    """Error raised when a query is shed because the server is overloaded.
+
+    Args:
+        retry_after: Suggested seconds to wait before retrying.
+        reason: Why the query was not admitted (optional).
+    """
+
+    def __init__(self, retry_after: float, reason: str | None = None) -> None:
+        message = f"服务器繁忙，请在 {retry_after:g} 秒后重试"
+        super().__init__(ErrorCode.SERVER_OVERLOADED, message, reason)
+        self.retry_after = retry_after
+
+
 class LLMError(QueryError):
     """Error raised when LLM API call fails.
 
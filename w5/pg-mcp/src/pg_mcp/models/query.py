@@ -1,10 +1,12 @@
 """Query request/response models for pg-mcp."""
 
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, Field
 
+from pg_mcp.models.columnar import decode_rows
+
 
 class QueryRequest(BaseModel):
     """Request model for natural language query."""
@@ -14,15 +16,59 @@ class QueryRequest(BaseModel):
         max_length=4096,
         description="Natural language query description",
     )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip cached SQL and results and run the full pipeline",
+    )
+
+
+class BatchQueryRequest(BaseModel):
+    """Request model for several natural language queries on one database."""
+
+    queries: list[Annotated[str, Field(min_length=1, max_length=4096)]] = Field(
+        min_length=1,
+        description="Natural language query descriptions",
+    )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip cached SQL and results and run the full pipeline",
+    )
 
 
 class QueryResultData(BaseModel):
-    """Query execution result data."""
+    """Query execution result data.
+
+    In the columnar format ``rows`` is empty and the values are in
+    ``column_data`` (see :mod:`pg_mcp.models.columnar`).
+    """
 
     columns: list[str] = Field(description="Column names")
     rows: list[list[Any]] = Field(description="Query result rows")
     row_count: int = Field(ge=0, description="Number of rows returned")
     execution_time_ms: float = Field(ge=0, description="Query execution time in milliseconds")
+    truncated: bool = Field(
+        default=False,
+        description="Whether rows were dropped to stay within the result size budget",
+    )
+    format: Literal["rows", "columnar"] = Field(
+        default="rows", description="Whether the values are in rows or column_data"
+    )
+    column_data: list[dict[str, Any]] | None = Field(
+        default=None, description="Encoded column arrays of the columnar format"
+    )
+
+    def head(self, n: int) -> list[list[Any]]:
+        """Get the first rows of the result in either format.
+
+        Args:
+            n: Maximum number of rows.
+
+        Returns:
+            Up to ``n`` rows.
+        """
+        if self.column_data is None:
+            return self.rows[:n]
+        return decode_rows(self.column_data, self.row_count)[:n]
 
 
 class ValidationResult(BaseModel):
@@ -32,6 +78,49 @@ class ValidationResult(BaseModel):
     message: str = Field(description="Validation message or explanation")
 
 
+class ValidationStatus(BaseModel):
+    """State of an LLM result validation running in the background."""
+
+    validation_id: str = Field(description="ID returned with the query response")
+    status: Literal["pending", "completed", "failed"] = Field(
+        description="Whether the validation is queued, finished or could not run"
+    )
+    validation: ValidationResult | None = Field(
+        default=None, description="Validation result once completed"
+    )
+    error: str | None = Field(default=None, description="Error message if the validation failed")
+
+
+class QueryMetadata(BaseModel):
+    """Diagnostics about how a query was answered.
+
+    Schema fields are only set when SQL was generated for this request.
+    """
+
+    schema_tables_total: int | None = Field(
+        default=None, ge=0, description="Tables and views in the database schema"
+    )
+    schema_tables_used: int | None = Field(
+        default=None, ge=0, description="Tables and views sent to the LLM"
+    )
+    schema_tokens_full: int | None = Field(
+        default=None, ge=0, description="Estimated tokens of the full schema context"
+    )
+    schema_tokens_used: int | None = Field(
+        default=None, ge=0, description="Estimated tokens of the schema context sent"
+    )
+    schema_tokens_saved: int | None = Field(
+        default=None, ge=0, description="Estimated tokens saved by schema pruning"
+    )
+    repair_attempts: int = Field(
+        default=0, ge=0, description="Times failed SQL was sent back to the LLM for correction"
+    )
+    sql_cache_hit: bool = Field(default=False, description="Whether the SQL came from the cache")
+    result_cache_hit: bool = Field(
+        default=False, description="Whether the result came from the cache"
+    )
+
+
 class QueryResponse(BaseModel):
     """Response model for query execution."""
 
@@ -39,6 +128,47 @@ class QueryResponse(BaseModel):
     sql: str | None = Field(default=None, description="Generated SQL statement")
     result: QueryResultData | None = Field(default=None, description="Query result data")
     validation: ValidationResult | None = Field(default=None, description="LLM validation result")
+    validation_id: str | None = Field(
+        default=None,
+        description="ID of the LLM validation running in the background, if deferred",
+    )
     error: str | None = Field(default=None, description="Error message if query failed")
     error_code: str | None = Field(default=None, description="Error code if query failed")
+    retry_after: float | None = Field(
+        default=None,
+        description="Seconds to wait before retrying, when the query was shed under load",
+    )
+    metadata: QueryMetadata | None = Field(default=None, description="Query diagnostics")
+    generated_at: datetime = Field(default_factory=datetime.now, description="Response generation timestamp")
+
+
+class BatchQueryMetadata(BaseModel):
+    """Aggregate timings and counters of a batch query."""
+
+    total_time_ms: float = Field(ge=0, description="Wall-clock time of the whole batch")
+    sql_generation_time_ms: float | None = Field(
+        default=None,
+        ge=0,
+        description="Time of the combined SQL generation request, if one was made",
+    )
+    execution_time_ms: float = Field(
+        ge=0, description="Sum of the database execution times of the queries"
+    )
+    succeeded: int = Field(ge=0, description="Queries answered successfully")
+    failed: int = Field(ge=0, description="Queries that failed")
+    cache_hits: int = Field(ge=0, description="Queries whose SQL came from the cache")
+
+
+class BatchQueryResponse(BaseModel):
+    """Response model for batch query execution."""
+
+    success: bool = Field(
+        description="Whether the batch was run; see the results for each query"
+    )
+    results: list[QueryResponse] = Field(
+        default_factory=list, description="Responses in the order of the queries"
+    )
+    error: str | None = Field(default=None, description="Error message if the batch was rejected")
+    error_code: str | None = Field(default=None, description="Error code if the batch was rejected")
+    metadata: BatchQueryMetadata | None = Field(default=None, description="Batch diagnostics")
     generated_at: datetime = Field(default_factory=datetime.now, description="Response generation timestamp")
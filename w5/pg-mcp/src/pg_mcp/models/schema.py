@@ -3,6 +3,50 @@
 from pydantic import BaseModel, Field
 
 
+def _quote(value: str) -> str:
+    """Quote a value as a SQL string literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _percent(fraction: float) -> str:
+    """Format a fraction as a whole percentage, without rounding small ones to 0%."""
+    return f"{fraction:.0%}" if fraction >= 0.005 else "<1%"
+
+
+class ColumnStats(BaseModel):
+    """Summary of a column's values from the planner statistics (pg_stats)."""
+
+    null_fraction: float = Field(default=0.0, ge=0, le=1, description="Fraction of NULL values")
+    distinct_count: int | None = Field(
+        default=None, description="Estimated number of distinct non-NULL values"
+    )
+    most_common_values: list[str] = Field(
+        default_factory=list, description="Most common values, most frequent first"
+    )
+    most_common_frequencies: list[float] = Field(
+        default_factory=list, description="Fraction of rows holding each most common value"
+    )
+
+    def summary(self) -> str:
+        """Render the statistics compactly for the LLM context.
+
+        Returns:
+            E.g. ``'paid' 62%, 'open' 30% (~3 distinct, 5% NULL)``.
+        """
+        values = ", ".join(
+            f"{_quote(value)} {_percent(frequency)}"
+            for value, frequency in zip(self.most_common_values, self.most_common_frequencies)
+        )
+        notes: list[str] = []
+        if self.distinct_count is not None:
+            notes.append(f"~{self.distinct_count:,} distinct")
+        if self.null_fraction > 0:
+            notes.append(f"{_percent(self.null_fraction)} NULL")
+        if not notes:
+            return values
+        return f"{values} ({', '.join(notes)})" if values else ", ".join(notes)
+
+
 class ColumnInfo(BaseModel):
     """Information about a table column."""
 
@@ -15,6 +59,9 @@ class ColumnInfo(BaseModel):
     comment: str | None = Field(default=None, description="Column comment")
     foreign_table: str | None = Field(default=None, description="Referenced table for foreign key")
     foreign_column: str | None = Field(default=None, description="Referenced column for foreign key")
+    stats: ColumnStats | None = Field(
+        default=None, description="Value statistics of low-cardinality text columns, if profiled"
+    )
 
 
 class IndexInfo(BaseModel):
@@ -52,6 +99,41 @@ class TableInfo(BaseModel):
         """Get fully qualified table name."""
         return f"{self.schema_name}.{self.name}"
 
+    def to_llm_context(self) -> str:
+        """Render this table as a section of the LLM schema context.
+
+        Returns:
+            Markdown section with the table header and column table.
+        """
+        lines: list[str] = [f"### {self.full_name}"]
+        if self.comment:
+            lines.append(f"Comment: {self.comment}")
+        if self.estimated_row_count is not None:
+            lines.append(f"Estimated rows: ~{self.estimated_row_count:,}")
+        lines.append("")
+        lines.append("| Column | Type | Nullable | Key | Default | Comment |")
+        lines.append("|--------|------|----------|-----|---------|---------|")
+        for col in self.columns:
+            key = ""
+            if col.is_primary_key:
+                key = "PK"
+            elif col.is_foreign_key:
+                key = f"FK -> {col.foreign_table}.{col.foreign_column}"
+            nullable = "YES" if col.is_nullable else "NO"
+            default = col.default_value or ""
+            comment = col.comment or ""
+            lines.append(
+                f"| {col.name} | {col.data_type} | {nullable} | {key} | {default} | {comment} |"
+            )
+        profiled = [col for col in self.columns if col.stats is not None]
+        if profiled:
+            lines.append("")
+            lines.append("Common values:")
+            for col in profiled:
+                lines.append(f"- {col.name}: {col.stats.summary()}")
+        lines.append("")
+        return "\n".join(lines)
+
 
 class ViewInfo(BaseModel):
     """Information about a database view."""
@@ -67,6 +149,20 @@ class ViewInfo(BaseModel):
         """Get fully qualified view name."""
         return f"{self.schema_name}.{self.name}"
 
+    def to_llm_context(self) -> str:
+        """Render this view as a section of the LLM schema context.
+
+        Returns:
+            Markdown section with the view header and its columns.
+        """
+        lines: list[str] = [f"### {self.full_name}"]
+        if self.comment:
+            lines.append(f"Comment: {self.comment}")
+        lines.append("")
+        lines.append("Columns: " + ", ".join(f"{c.name} ({c.data_type})" for c in self.columns))
+        lines.append("")
+        return "\n".join(lines)
+
 
 class EnumTypeInfo(BaseModel):
     """Information about a PostgreSQL enum type."""
@@ -110,39 +206,14 @@ class DatabaseSchema(BaseModel):
             lines.append("## Tables")
             lines.append("")
             for table in self.tables:
-                lines.append(f"### {table.full_name}")
-                if table.comment:
-                    lines.append(f"Comment: {table.comment}")
-                if table.estimated_row_count is not None:
-                    lines.append(f"Estimated rows: ~{table.estimated_row_count:,}")
-                lines.append("")
-                lines.append("| Column | Type | Nullable | Key | Default | Comment |")
-                lines.append("|--------|------|----------|-----|---------|---------|")
-                for col in table.columns:
-                    key = ""
-                    if col.is_primary_key:
-                        key = "PK"
-                    elif col.is_foreign_key:
-                        key = f"FK -> {col.foreign_table}.{col.foreign_column}"
-                    nullable = "YES" if col.is_nullable else "NO"
-                    default = col.default_value or ""
-                    comment = col.comment or ""
-                    lines.append(
-                        f"| {col.name} | {col.data_type} | {nullable} | {key} | {default} | {comment} |"
-                    )
-                lines.append("")
+                lines.append(table.to_llm_context())
 
         # Views
         if self.views:
             lines.append("## Views")
             lines.append("")
             for view in self.views:
-                lines.append(f"### {view.full_name}")
-                if view.comment:
-                    lines.append(f"Comment: {view.comment}")
-                lines.append("")
-                lines.append("Columns: " + ", ".join(f"{c.name} ({c.data_type})" for c in view.columns))
-                lines.append("")
+                lines.append(view.to_llm_context())
 
         # Enum types
         if self.enum_types:
@@ -165,6 +236,30 @@ class DatabaseSchema(BaseModel):
 
         return "\n".join(lines)
 
+    def subset(self, names: set[str]) -> "DatabaseSchema":
+        """Build a schema containing only the given tables and views.
+
+        Foreign key relations are kept when both ends are in the subset;
+        enum types are always kept since they are small and referenced by type.
+
+        Args:
+            names: Schema-qualified names of the tables and views to keep.
+
+        Returns:
+            A new DatabaseSchema with the selected relations.
+        """
+        return DatabaseSchema(
+            database_name=self.database_name,
+            tables=[t for t in self.tables if t.full_name in names],
+            views=[v for v in self.views if v.full_name in names],
+            enum_types=self.enum_types,
+            foreign_key_relations=[
+                fk
+                for fk in self.foreign_key_relations
+                if fk.from_table in names and fk.to_table in names
+            ],
+        )
+
     def get_table_names(self) -> set[str]:
         """Get all table names (including schema-qualified names).
 
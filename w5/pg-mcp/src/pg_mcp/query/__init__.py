@@ -1,5 +1,15 @@
 """Query orchestration for pg-mcp."""
 
+from pg_mcp.query.admission import AdmissionController, AdmissionSlot
+from pg_mcp.query.schema_retriever import SchemaRetriever, SchemaSelection
 from pg_mcp.query.service import QueryService
+from pg_mcp.query.validation_queue import ValidationQueue
 
-__all__ = ["QueryService"]
+__all__ = [
+    "AdmissionController",
+    "AdmissionSlot",
+    "QueryService",
+    "SchemaRetriever",
+    "SchemaSelection",
+    "ValidationQueue",
+]
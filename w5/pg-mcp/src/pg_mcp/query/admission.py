@@ -0,0 +1,230 @@
+"""Admission control and fair scheduling of queries across databases."""
+
+import asyncio
+import bisect
+import itertools
+import logging
+import math
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from pg_mcp.config import AdmissionSettings
+from pg_mcp.models import ServerOverloadedError
+
+logger = logging.getLogger(__name__)
+
+# Identity shared by clients that cannot be told apart
+DEFAULT_CLIENT = "anonymous"
+
+# Weight of the latest query in the moving average of processing times
+_SERVICE_TIME_SMOOTHING = 0.2
+
+
+@dataclass(order=True)
+class _Waiter:
+    """A query waiting for admission, ordered by virtual finish time."""
+
+    finish: float
+    sequence: int
+    start: float = field(compare=False)
+    database: str = field(compare=False)
+    client: str = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+
+
+@dataclass(frozen=True)
+class AdmissionSlot:
+    """Permission to process one query, returned to :meth:`AdmissionController.release`.
+
+    Attributes:
+        database: Database alias of the query.
+        client: Identity of the client that sent the query.
+        admitted_at: Monotonic time of admission.
+    """
+
+    database: str
+    client: str
+    admitted_at: float
+
+
+class AdmissionController:
+    """Limits the queries processed at once and shares capacity fairly.
+
+    A query is admitted right away while fewer than ``max_concurrency``
+    queries are being processed and its database and client are below their
+    quotas. Otherwise it waits in a queue ordered by weighted fair queueing
+    across databases: the queries of a database get virtual finish times
+    ``1 / weight`` apart, starting no earlier than the virtual time of the
+    last admitted query. A database that floods the server therefore only
+    delays the others by its share, an idle database that starts sending
+    queries goes to the front, and under sustained load databases are
+    admitted in proportion to their weights. A query whose client is at its
+    quota does not hold up queries of other clients behind it.
+
+    Queries are shed with :class:`ServerOverloadedError` when the queue is
+    full or after waiting ``queue_timeout`` seconds; the error suggests a
+    retry delay from the queue length and the average processing time.
+
+    Not thread-safe; intended for use from a single event loop.
+
+    Args:
+        settings: Admission control settings; ``max_concurrency`` must be
+            positive.
+        weights: Weight of each database alias (1 for databases not listed).
+    """
+
+    def __init__(
+        self, settings: AdmissionSettings, weights: Mapping[str, float] | None = None
+    ) -> None:
+        self.settings = settings
+        self.weights = dict(weights or {})
+        self._running: Counter[str] = Counter()
+        self._running_by_client: Counter[str] = Counter()
+        self._waiters: list[_Waiter] = []
+        self._virtual_time = 0.0
+        self._last_finish: dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._service_time: float | None = None
+
+    @property
+    def running(self) -> dict[str, int]:
+        """Queries being processed, by database."""
+        return dict(self._running)
+
+    @property
+    def waiting(self) -> dict[str, int]:
+        """Queries waiting for admission, by database."""
+        return dict(Counter(waiter.database for waiter in self._waiters))
+
+    @asynccontextmanager
+    async def admit(self, database: str, client: str = DEFAULT_CLIENT) -> AsyncIterator[None]:
+        """Hold an admission slot while the enclosed block runs.
+
+        Args:
+            database: Database alias of the query.
+            client: Identity of the client that sent the query.
+
+        Raises:
+            ServerOverloadedError: If the query is shed.
+        """
+        slot = await self.acquire(database, client)
+        try:
+            yield
+        finally:
+            self.release(slot)
+
+    async def acquire(self, database: str, client: str = DEFAULT_CLIENT) -> AdmissionSlot:
+        """Wait until a query may be processed.
+
+        Args:
+            database: Database alias of the query.
+            client: Identity of the client that sent the query.
+
+        Returns:
+            The slot to release once the query is done.
+
+        Raises:
+            ServerOverloadedError: If the queue is full or the wait times out.
+        """
+        start = max(self._virtual_time, self._last_finish.get(database, 0.0))
+        waiter = _Waiter(
+            finish=start + 1 / self.weights.get(database, 1.0),
+            sequence=next(self._sequence),
+            start=start,
+            database=database,
+            client=client,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        bisect.insort(self._waiters, waiter)
+        self._dispatch()
+
+        if not waiter.future.done():
+            if len(self._waiters) > self.settings.max_queue_size:
+                self._waiters.remove(waiter)
+                raise self._overloaded(database, client, "admission queue is full")
+            self._last_finish[database] = waiter.finish
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(waiter.future), timeout=self.settings.queue_timeout
+                )
+            except asyncio.TimeoutError:
+                # Admitted just as the timeout fired: keep the slot
+                if not waiter.future.done():
+                    self._waiters.remove(waiter)
+                    raise self._overloaded(
+                        database, client, f"waited {self.settings.queue_timeout:g}s for admission"
+                    )
+            except asyncio.CancelledError:
+                if waiter.future.done():
+                    self._finish(database, client)
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        else:
+            self._last_finish[database] = waiter.finish
+
+        return AdmissionSlot(database, client, time.monotonic())
+
+    def release(self, slot: AdmissionSlot) -> None:
+        """Give back the slot of a finished query and admit waiting ones.
+
+        Args:
+            slot: The slot returned by :meth:`acquire`.
+        """
+        elapsed = time.monotonic() - slot.admitted_at
+        if self._service_time is None:
+            self._service_time = elapsed
+        else:
+            self._service_time += _SERVICE_TIME_SMOOTHING * (elapsed - self._service_time)
+        self._finish(slot.database, slot.client)
+
+    def _can_run(self, database: str, client: str) -> bool:
+        """Check whether a query fits the global, database and client limits."""
+        settings = self.settings
+        if sum(self._running.values()) >= settings.max_concurrency:
+            return False
+        if settings.database_max_concurrency and (
+            self._running[database] >= settings.database_max_concurrency
+        ):
+            return False
+        return not settings.client_max_concurrency or (
+            self._running_by_client[client] < settings.client_max_concurrency
+        )
+
+    def _dispatch(self) -> None:
+        """Admit waiting queries in virtual finish time order while they fit."""
+        i = 0
+        while i < len(self._waiters):
+            waiter = self._waiters[i]
+            if not self._can_run(waiter.database, waiter.client):
+                i += 1
+                continue
+            del self._waiters[i]
+            self._running[waiter.database] += 1
+            self._running_by_client[waiter.client] += 1
+            self._virtual_time = max(self._virtual_time, waiter.start)
+            waiter.future.set_result(None)
+
+    def _finish(self, database: str, client: str) -> None:
+        """Free the slot of a query and admit waiting ones."""
+        # Drop empty entries so counters do not grow with every client seen
+        for counter, key in ((self._running, database), (self._running_by_client, client)):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+        self._dispatch()
+
+    def _overloaded(self, database: str, client: str, reason: str) -> ServerOverloadedError:
+        """Build the error for a shed query with a suggested retry delay."""
+        # Rounds of max_concurrency queries ahead of a retry, in whole seconds
+        service_time = self._service_time if self._service_time is not None else 1.0
+        rounds = (len(self._waiters) + 1) / self.settings.max_concurrency
+        retry_after = float(max(1, math.ceil(rounds * service_time)))
+        logger.warning(
+            f"Shedding query for database {database} from client {client}: {reason}, "
+            f"retry after {retry_after:g}s"
+        )
+        return ServerOverloadedError(retry_after, reason)
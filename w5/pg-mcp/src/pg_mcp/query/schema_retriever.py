@@ -0,0 +1,253 @@
+"""Relevance-based schema pruning for SQL generation."""
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from pg_mcp.models import DatabaseSchema, TableInfo, ViewInfo
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Relation names weigh more than column names and comments
+NAME_WEIGHT = 3
+
+# Score multiplier for relations whose whole name appears in the question
+FULL_NAME_BOOST = 2.0
+
+# Relations scoring below this fraction of the best match are not selected
+MIN_RELATIVE_SCORE = 0.2
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+_CAMEL_PATTERN = re.compile(r"([a-z0-9])([A-Z])")
+_CJK_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lexical terms for schema matching.
+
+    ASCII identifiers are split on ``snake_case`` and ``camelCase`` boundaries
+    and naively singularised; runs of CJK characters become overlapping
+    bigrams so that "用户数量" matches a "用户表" comment.
+
+    Args:
+        text: Question, identifier or comment text.
+
+    Returns:
+        List of terms (with repetitions).
+    """
+    terms: list[str] = []
+    for word in _WORD_PATTERN.findall(_CAMEL_PATTERN.sub(r"\1 \2", text).lower()):
+        if _CJK_PATTERN.match(word):
+            if len(word) == 1:
+                terms.append(word)
+            else:
+                terms.extend(word[i : i + 2] for i in range(len(word) - 1))
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            terms.append(word[:-1])
+        else:
+            terms.append(word)
+    return terms
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM token count of a text.
+
+    Uses roughly one token per CJK character and four characters per token
+    for everything else, which is close enough for budgeting.
+
+    Args:
+        text: Text to estimate.
+
+    Returns:
+        Estimated number of tokens.
+    """
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@dataclass(frozen=True)
+class SchemaSelection:
+    """Result of pruning a schema for a question.
+
+    Attributes:
+        schema: The schema to send to the LLM.
+        names: Schema-qualified names of the selected tables and views, or
+            None when the full schema is used.
+        tables_total: Number of tables and views in the full schema.
+        tokens_full: Estimated tokens of the full schema context.
+    """
+
+    schema: DatabaseSchema
+    names: frozenset[str] | None
+    tables_total: int
+    tokens_full: int
+
+    @property
+    def pruned(self) -> bool:
+        """Whether the schema was reduced."""
+        return self.names is not None
+
+    @property
+    def tables_used(self) -> int:
+        """Number of tables and views in the selected schema."""
+        return len(self.schema.tables) + len(self.schema.views)
+
+
+class SchemaRetriever:
+    """Ranks the tables of a schema against a question with BM25.
+
+    Each table and view is indexed as a document made of its name (weighted),
+    comment, column names and column comments; relations whose whole name
+    occurs in the question are boosted. Selected tables are expanded
+    along foreign key relations so that join partners reach the LLM too.
+
+    The index is built once per schema; build a new retriever when the
+    schema changes.
+
+    Args:
+        schema: Database schema to index.
+        full_context: Already rendered LLM context of ``schema``, if available.
+    """
+
+    def __init__(self, schema: DatabaseSchema, full_context: str | None = None) -> None:
+        self.schema = schema
+        relations: list[TableInfo | ViewInfo] = [*schema.tables, *schema.views]
+        self._names = [r.full_name for r in relations]
+        self._name_terms = [frozenset(tokenize(r.name)) for r in relations]
+        self._costs = {r.full_name: estimate_tokens(r.to_llm_context()) for r in relations}
+        if full_context is None:
+            full_context = schema.to_llm_context()
+        self.tokens_full = estimate_tokens(full_context)
+
+        self._neighbors: dict[str, list[str]] = {name: [] for name in self._names}
+        for fk in schema.foreign_key_relations:
+            if fk.from_table in self._neighbors and fk.to_table in self._neighbors:
+                self._neighbors[fk.from_table].append(fk.to_table)
+                self._neighbors[fk.to_table].append(fk.from_table)
+
+        self._term_freqs: list[Counter[str]] = []
+        document_freqs: Counter[str] = Counter()
+        for relation in relations:
+            terms = Counter(self._document_terms(relation))
+            self._term_freqs.append(terms)
+            document_freqs.update(terms.keys())
+
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        count = len(relations)
+        self._idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_freqs.items()
+        }
+
+    @staticmethod
+    def _document_terms(relation: TableInfo | ViewInfo) -> list[str]:
+        """Collect the indexed terms of a table or view."""
+        terms = tokenize(relation.name) * NAME_WEIGHT
+        if relation.comment:
+            terms.extend(tokenize(relation.comment))
+        for column in relation.columns:
+            terms.extend(tokenize(column.name))
+            if column.comment:
+                terms.extend(tokenize(column.comment))
+        return terms
+
+    def rank(self, question: str) -> list[tuple[str, float]]:
+        """Score all tables and views against a question.
+
+        Args:
+            question: Natural language question.
+
+        Returns:
+            (full_name, score) pairs with a positive score, best first.
+        """
+        query_terms = set(tokenize(question)) & self._idf.keys()
+        if not query_terms:
+            return []
+
+        scores: list[tuple[str, float]] = []
+        for name, name_terms, tf, length in zip(
+            self._names, self._name_terms, self._term_freqs, self._lengths
+        ):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._avg_length)
+            for term in query_terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (BM25_K1 + 1) / (freq + norm)
+            if name_terms and name_terms <= query_terms:
+                score *= FULL_NAME_BOOST
+            if score > 0:
+                scores.append((name, score))
+
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
+
+    def select(self, question: str, token_budget: int) -> SchemaSelection:
+        """Select the relevant part of the schema within a token budget.
+
+        Relations are taken in rank order, each followed by its foreign key
+        neighbours, until the budget is spent. If nothing matches the
+        question, the full schema is returned unchanged.
+
+        Args:
+            question: Natural language question.
+            token_budget: Maximum estimated tokens for the selected tables.
+
+        Returns:
+            The selection with token accounting.
+        """
+        ranked = self.rank(question)
+        if not ranked:
+            logger.debug("No schema relation matches the question, using full schema")
+            return self.full_selection()
+
+        cutoff = ranked[0][1] * MIN_RELATIVE_SCORE
+        selected: dict[str, None] = {}
+        spent = 0
+
+        def add(name: str) -> bool:
+            nonlocal spent
+            if name in selected:
+                return True
+            cost = self._costs[name]
+            if spent + cost > token_budget and selected:
+                return False
+            selected[name] = None
+            spent += cost
+            return True
+
+        for name, score in ranked:
+            if score < cutoff or not add(name):
+                break
+            for neighbor in self._neighbors[name]:
+                add(neighbor)
+
+        if len(selected) == len(self._names):
+            return self.full_selection()
+
+        return SchemaSelection(
+            schema=self.schema.subset(set(selected)),
+            names=frozenset(selected),
+            tables_total=len(self._names),
+            tokens_full=self.tokens_full,
+        )
+
+    def full_selection(self) -> SchemaSelection:
+        """Build a selection that keeps the whole schema.
+
+        Returns:
+            The unpruned selection.
+        """
+        return SchemaSelection(
+            schema=self.schema,
+            names=None,
+            tables_total=len(self._names),
+            tokens_full=self.tokens_full,
+        )
@@ -1,38 +1,83 @@
 """Query orchestration service for pg-mcp."""
 
+import asyncio
 import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
+from sqlglot import exp
+
+from pg_mcp.cache import QueryCache
 from pg_mcp.config import QuerySettings
 from pg_mcp.database import DatabaseService
 from pg_mcp.llm import LLMService
+from pg_mcp.metrics import Metrics
 from pg_mcp.models import (
+    BatchQueryMetadata,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    DatabaseSchema,
     ErrorCode,
     QueryError,
+    QueryMetadata,
     QueryRequest,
     QueryResponse,
+    SQLExecutionError,
     SQLUnsafeError,
+    ServerOverloadedError,
+    ValidationResult,
 )
-from pg_mcp.validator import SQLValidator
+from pg_mcp.query.admission import DEFAULT_CLIENT, AdmissionController
+from pg_mcp.query.schema_retriever import SchemaRetriever, SchemaSelection, estimate_tokens
+from pg_mcp.query.validation_queue import ValidationQueue
+from pg_mcp.validator import SQLValidator, ValidationExecutor
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class _GeneratedSQL:
+    """SQL generated for a question by a combined batch request."""
+
+    sql: str
+    # Schema statistics of the context shared by the batch
+    metadata: QueryMetadata
+
+
 class QueryService:
     """Orchestrates the natural language to SQL query workflow.
 
-    This service coordinates:
-    1. Fetching database schema
+    This service coordinates (skipping steps served from the query cache):
+    1. Fetching database schema and selecting the tables relevant to the question
     2. Generating SQL from natural language
     3. Validating SQL safety
     4. Executing the query
-    5. Optionally validating results with LLM
+    5. Optionally validating results with LLM, inline or in the background
+
+    Generated SQL that is rejected by the validator or fails in the database
+    can be sent back to the LLM with its error, up to ``repair_attempts``
+    times and within ``repair_timeout`` seconds of the start of generation.
 
     Args:
         llm_service: LLM service for SQL generation and validation.
         database_service: Database service for schema and query execution.
         validator: SQL safety validator.
         query_settings: Query execution settings.
+        query_cache: Optional cache for generated SQL and query results,
+            usually shared by all databases.
+        validation_executor: Optional executor that validates SQL off the
+            event loop; without it SQL is validated inline.
+        validation_queue: Optional queue for LLM result validation; when
+            given, results are returned right away with a validation ID and
+            validated in the background.
+        metrics: Optional metrics registry for per-stage latency, outcomes
+            and cache lookups.
+        admission: Optional admission controller, usually shared by all
+            databases; every query waits for a slot before it is processed
+            and fails with ``SERVER_OVERLOADED`` when it is shed.
     """
 
     def __init__(
@@ -41,47 +86,274 @@ class QueryService:
         database_service: DatabaseService,
         validator: SQLValidator,
         query_settings: QuerySettings,
+        query_cache: QueryCache | None = None,
+        validation_executor: ValidationExecutor | None = None,
+        validation_queue: ValidationQueue | None = None,
+        metrics: Metrics | None = None,
+        admission: AdmissionController | None = None,
     ) -> None:
         self.llm_service = llm_service
         self.database_service = database_service
         self.validator = validator
         self.query_settings = query_settings
+        self.query_cache = query_cache
+        self.validation_executor = validation_executor
+        self.validation_queue = validation_queue
+        self.metrics = metrics
+        self.admission = admission
+        self._retriever: SchemaRetriever | None = None
 
-    async def execute(self, request: QueryRequest) -> QueryResponse:
+    async def execute(
+        self, request: QueryRequest, client: str = DEFAULT_CLIENT
+    ) -> QueryResponse:
         """Execute a natural language query.
 
         Args:
             request: The query request containing the natural language query.
+            client: Identity of the client, for per-client admission quotas.
 
         Returns:
             QueryResponse containing the results or error information.
         """
-        logger.info(f"Processing query: {request.query[:100]}...")
+        return await self._execute(request, client=client)
 
-        try:
-            # 1. Get Schema
-            schema = self.database_service.schema
+    async def execute_batch(
+        self, request: BatchQueryRequest, client: str = DEFAULT_CLIENT
+    ) -> BatchQueryResponse:
+        """Execute several natural language queries on the database.
 
-            # 2. Generate SQL using LLM
-            sql = await self.llm_service.generate_sql(request.query, schema)
+        The queries run concurrently, within the limits of the shared LLM
+        service and the connection pool. With the ``combined`` batch SQL mode,
+        the SQL of all questions missing from the cache is generated by one
+        LLM request over a shared schema context; if that request fails, each
+        question falls back to its own request. The combined request holds an
+        admission slot of its own while it runs, and each query is then
+        admitted on its own, so a batch counts towards the client's quota
+        like separate calls.
 
-            # 3. Validate SQL safety
-            self.validator.validate(sql)
+        Args:
+            request: The batch request containing the natural language queries.
+            client: Identity of the client, for per-client admission quotas.
 
-            # 4. Execute SQL
-            result = await self.database_service.execute_query(
-                sql,
-                limit=self.query_settings.default_limit,
+        Returns:
+            BatchQueryResponse with one response per query, in order.
+        """
+        start = time.perf_counter()
+        max_queries = self.query_settings.batch_max_queries
+        if len(request.queries) > max_queries:
+            return BatchQueryResponse(
+                success=False,
+                error=f"批量查询最多支持 {max_queries} 个问题，收到 {len(request.queries)} 个",
+                error_code=ErrorCode.BATCH_TOO_LARGE.value,
+                generated_at=datetime.now(timezone.utc),
+            )
+
+        requests = [
+            QueryRequest(query=query, bypass_cache=request.bypass_cache)
+            for query in request.queries
+        ]
+        logger.info(f"Processing batch of {len(requests)} queries")
+
+        generated: list[_GeneratedSQL | None] = [None] * len(requests)
+        generation_ms = None
+        if self.query_settings.batch_sql_mode == "combined" and len(requests) > 1:
+            generation_start = time.perf_counter()
+            generated = await self._generate_sql_combined(requests, client)
+            generation_ms = (time.perf_counter() - generation_start) * 1000
+
+        responses = await asyncio.gather(
+            *(
+                self._execute(req, sql, client=client)
+                for req, sql in zip(requests, generated)
             )
+        )
+
+        succeeded = sum(response.success for response in responses)
+        metadata = BatchQueryMetadata(
+            total_time_ms=(time.perf_counter() - start) * 1000,
+            sql_generation_time_ms=generation_ms,
+            execution_time_ms=sum(
+                response.result.execution_time_ms
+                for response in responses
+                if response.result is not None and not response.metadata.result_cache_hit
+            ),
+            succeeded=succeeded,
+            failed=len(responses) - succeeded,
+            cache_hits=sum(
+                response.metadata is not None and response.metadata.sql_cache_hit
+                for response in responses
+            ),
+        )
+        logger.info(
+            f"Batch completed: {succeeded}/{len(responses)} succeeded "
+            f"in {metadata.total_time_ms:.0f}ms"
+        )
+        return BatchQueryResponse(
+            success=True,
+            results=responses,
+            metadata=metadata,
+            generated_at=datetime.now(timezone.utc),
+        )
+
+    async def _execute(
+        self,
+        request: QueryRequest,
+        generated: _GeneratedSQL | None = None,
+        client: str = DEFAULT_CLIENT,
+    ) -> QueryResponse:
+        """Execute a natural language query and record its outcome.
+
+        Args:
+            request: The query request containing the natural language query.
+            generated: SQL already generated for the question by a batch
+                request; it is still validated before execution.
+            client: Identity of the client, for per-client admission quotas.
+
+        Returns:
+            QueryResponse containing the results or error information.
+        """
+        with self._timed("total"):
+            response = await self._admit_and_run(request, generated, client)
+        if self.metrics is not None:
+            outcome = "success" if response.success else (response.error_code or "").lower()
+            self.metrics.queries.inc(database=self.database_service.config.name, outcome=outcome)
+        return response
+
+    async def _admit_and_run(
+        self, request: QueryRequest, generated: _GeneratedSQL | None, client: str
+    ) -> QueryResponse:
+        """Run the query pipeline once the admission controller lets the query in.
+
+        Args:
+            request: The query request containing the natural language query.
+            generated: SQL already generated for the question by a batch request.
+            client: Identity of the client.
+
+        Returns:
+            QueryResponse containing the results or error information.
+        """
+        if self.admission is None:
+            return await self._run(request, generated)
+
+        try:
+            with self._timed("admission"):
+                slot = await self.admission.acquire(self.database_service.config.name, client)
+        except ServerOverloadedError as e:
+            return self._build_error_response(e)
+        try:
+            return await self._run(request, generated)
+        finally:
+            self.admission.release(slot)
+
+    async def _run(
+        self, request: QueryRequest, generated: _GeneratedSQL | None = None
+    ) -> QueryResponse:
+        """Run the query pipeline.
+
+        Args:
+            request: The query request containing the natural language query.
+            generated: SQL already generated for the question by a batch
+                request; it is still validated before execution.
+
+        Returns:
+            QueryResponse containing the results or error information.
+        """
+        logger.info(f"Processing query: {request.query[:100]}...")
+
+        try:
+            database = self.database_service.config.name
+            schema_version = self.database_service.schema_version
+            use_cache = self.query_cache is not None and not request.bypass_cache
+            metadata = QueryMetadata()
+
+            # 1-2. Generate SQL, unless it is cached for this schema version
+            sql = None
+            statement = None
+            schema_context = None
+            if use_cache:
+                sql = self.query_cache.get_sql(database, schema_version, request.query)
+                self._count_lookup("sql", sql is not None)
+            started = time.perf_counter()
+            if sql is not None:
+                metadata.sql_cache_hit = True
+                logger.info(f"SQL cache hit: {sql[:200]}")
+            elif generated is not None:
+                metadata = generated.metadata.model_copy()
+                sql = generated.sql
+            else:
+                sql, schema_context = await self._generate_sql(request.query, metadata)
+
+            # 3-4. Validate and execute SQL, sending failures back to the LLM for repair
+            failures: list[tuple[str, str]] = []
+            while True:
+                try:
+                    if not metadata.sql_cache_hit:
+                        statement = await self._validate_sql(sql)
+                    cached = None
+                    if use_cache:
+                        cached = self.query_cache.get_result(database, schema_version, sql)
+                        self._count_lookup("result", cached is not None)
+                    if cached is None:
+                        with self._timed("execution"):
+                            result = await self.database_service.execute_query(
+                                sql,
+                                limit=self.query_settings.default_limit,
+                                statement=statement,
+                            )
+                    break
+                except (SQLUnsafeError, SQLExecutionError) as e:
+                    if isinstance(e, SQLUnsafeError) and self.metrics is not None:
+                        self.metrics.sql_rejections.inc(database=database)
+                    # Cached SQL already succeeded once, and connection or server
+                    # failures are not the statement's fault: neither is the LLM's to fix
+                    if metadata.sql_cache_hit or (
+                        isinstance(e, SQLExecutionError) and not e.statement_error
+                    ):
+                        raise
+                    if failures:
+                        self._count_repair(len(failures), "failed")
+                    failures.append((sql, e.message))
+                    repaired = await self._repair_sql(
+                        request.query, failures, schema_context, started
+                    )
+                    if repaired is None:
+                        raise
+                    sql = repaired
+                    metadata.repair_attempts = len(failures)
+            if failures:
+                self._count_repair(len(failures), "fixed")
+                logger.info(f"SQL repaired after {len(failures)} attempt(s)")
 
             # 5. Optionally validate results with LLM
-            validation = None
-            if self.query_settings.enable_validation:
-                validation = await self.llm_service.validate_result(
-                    request.query,
-                    sql,
-                    result,
-                )
+            validation_id = None
+            if cached is not None:
+                metadata.result_cache_hit = True
+                result, validation = cached.result, cached.validation
+            else:
+                validation = None
+                if self.query_settings.enable_validation and self.validation_queue is not None:
+
+                    def forget_if_failed(background: ValidationResult) -> None:
+                        # The answer was cached optimistically; drop it if it did not pass
+                        if not background.passed and self.query_cache is not None:
+                            self.query_cache.discard(database, schema_version, request.query, sql)
+
+                    validation_id = self.validation_queue.submit(
+                        request.query, sql, result, on_complete=forget_if_failed
+                    )
+                elif self.query_settings.enable_validation:
+                    with self._timed("result_validation"):
+                        validation = await self.llm_service.validate_result(
+                            request.query,
+                            sql,
+                            result,
+                        )
+
+            # Only answers that passed validation are worth repeating
+            if self.query_cache is not None and (validation is None or validation.passed):
+                self.query_cache.set_sql(database, schema_version, request.query, sql)
+                if cached is None:
+                    self.query_cache.set_result(database, schema_version, sql, result, validation)
 
             # 6. Build success response
             logger.info(f"Query completed successfully: {result.row_count} rows")
@@ -90,6 +362,8 @@ class QueryService:
                 sql=sql,
                 result=result,
                 validation=validation,
+                validation_id=validation_id,
+                metadata=metadata,
                 generated_at=datetime.now(timezone.utc),
             )
 
@@ -110,6 +384,262 @@ class QueryService:
                 generated_at=datetime.now(timezone.utc),
             )
 
+    async def _generate_sql(self, question: str, metadata: QueryMetadata) -> tuple[str, str]:
+        """Generate SQL for a question.
+
+        Args:
+            question: Natural language question.
+            metadata: Response metadata to fill with schema pruning statistics.
+
+        Returns:
+            The generated SQL statement and the schema context it was
+            generated from.
+
+        Raises:
+            SQLGenerationError: If SQL generation fails.
+        """
+        # 1. Get Schema, pruned to the tables relevant to the question
+        with self._timed("schema"):
+            selection, schema_context = self._schema_context(question, metadata)
+
+        # 2. Generate SQL using LLM
+        with self._timed("generation"):
+            sql = await self.llm_service.generate_sql(question, selection.schema, schema_context)
+        return sql, schema_context
+
+    async def _repair_sql(
+        self,
+        question: str,
+        failures: list[tuple[str, str]],
+        schema_context: str | None,
+        started: float,
+    ) -> str | None:
+        """Ask the LLM to correct the last failed statement, within the repair limits.
+
+        Args:
+            question: Natural language question.
+            failures: Failed statements and their error messages, oldest first.
+            schema_context: Schema context the SQL was generated from; selected
+                again when the SQL came from a combined batch request.
+            started: ``time.perf_counter()`` when SQL generation started.
+
+        Returns:
+            The corrected SQL, or None if no further repair is possible, in
+            which case the last error stands.
+        """
+        attempt = len(failures)
+        if attempt > self.query_settings.repair_attempts:
+            return None
+        remaining = self.query_settings.repair_timeout - (time.perf_counter() - started)
+        if remaining <= 0:
+            logger.warning(f"No time left to repair SQL (attempt {attempt})")
+            self._count_repair(attempt, "timeout")
+            return None
+
+        if schema_context is None:
+            _, schema_context = self._schema_context(question, QueryMetadata())
+        logger.info(
+            f"Repairing SQL (attempt {attempt}/{self.query_settings.repair_attempts}): "
+            f"{failures[-1][1][:200]}"
+        )
+        try:
+            with self._timed("repair"):
+                sql = await asyncio.wait_for(
+                    self.llm_service.repair_sql(
+                        question, self.database_service.schema, list(failures), schema_context
+                    ),
+                    timeout=remaining,
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"SQL repair timed out (attempt {attempt})")
+            self._count_repair(attempt, "timeout")
+            return None
+        except QueryError as e:
+            logger.warning(f"SQL repair failed (attempt {attempt}): {e}")
+            self._count_repair(attempt, "error")
+            return None
+
+        # Running a statement that already failed again cannot succeed
+        if any(sql == failed for failed, _ in failures):
+            logger.warning(f"SQL repair repeated a failed statement (attempt {attempt})")
+            self._count_repair(attempt, "failed")
+            return None
+        return sql
+
+    async def _generate_sql_combined(
+        self, requests: list[QueryRequest], client: str = DEFAULT_CLIENT
+    ) -> list[_GeneratedSQL | None]:
+        """Generate the SQL of a batch in one LLM request.
+
+        Questions with cached SQL are left out. The schema context is
+        selected for all remaining questions together. With admission
+        control, the request waits for a slot like a single query; if it is
+        shed, each question goes through admission on its own.
+
+        Args:
+            requests: The query requests of the batch.
+            client: Identity of the client, for per-client admission quotas.
+
+        Returns:
+            Generated SQL per request, None for requests that generate their
+            own SQL (cached, or the combined request failed).
+        """
+        generated: list[_GeneratedSQL | None] = [None] * len(requests)
+        pending = [
+            i
+            for i, request in enumerate(requests)
+            if self.query_cache is None
+            or request.bypass_cache
+            or self.query_cache.get_sql(
+                self.database_service.config.name,
+                self.database_service.schema_version,
+                request.query,
+            )
+            is None
+        ]
+        if len(pending) < 2:
+            return generated
+
+        questions = [requests[i].query for i in pending]
+        metadata = QueryMetadata()
+        with self._timed("schema"):
+            selection, schema_context = self._schema_context("\n".join(questions), metadata)
+        slot = None
+        try:
+            if self.admission is not None:
+                with self._timed("admission"):
+                    slot = await self.admission.acquire(self.database_service.config.name, client)
+            with self._timed("generation"):
+                statements = await self.llm_service.generate_sql_batch(
+                    questions, selection.schema, schema_context
+                )
+        except QueryError as e:
+            logger.warning(f"Combined SQL generation failed, generating per question: {e}")
+            return generated
+        finally:
+            if slot is not None:
+                self.admission.release(slot)
+
+        for i, sql in zip(pending, statements):
+            generated[i] = _GeneratedSQL(sql, metadata)
+        return generated
+
+    def _schema_context(
+        self, question: str, metadata: QueryMetadata
+    ) -> tuple[SchemaSelection, str]:
+        """Select and render the schema context for a question.
+
+        Args:
+            question: Natural language question.
+            metadata: Response metadata to fill with schema pruning statistics.
+
+        Returns:
+            The schema selection and its rendered LLM context.
+        """
+        selection = self._select_schema(question, self.database_service.schema)
+
+        schema_context = self.database_service.get_llm_context(selection.names)
+        tokens_used = estimate_tokens(schema_context) if selection.pruned else selection.tokens_full
+        metadata.schema_tables_total = selection.tables_total
+        metadata.schema_tables_used = selection.tables_used
+        metadata.schema_tokens_full = selection.tokens_full
+        metadata.schema_tokens_used = tokens_used
+        metadata.schema_tokens_saved = max(selection.tokens_full - tokens_used, 0)
+        return selection, schema_context
+
+    async def _validate_sql(self, sql: str) -> exp.Expression:
+        """Check that a statement is safe to execute.
+
+        Args:
+            sql: The SQL statement.
+
+        Returns:
+            The parsed statement.
+
+        Raises:
+            SQLUnsafeError: If the SQL is not allowed.
+        """
+        with self._timed("validation"):
+            if self.validation_executor is not None:
+                validated = await self.validation_executor.validate(self.validator, sql)
+            else:
+                validated = self.validator.validate_statement(sql)
+        return validated.expression
+
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        """Record the duration of a pipeline stage, if metrics are enabled.
+
+        Args:
+            stage: Name of the stage.
+        """
+        if self.metrics is None:
+            yield
+            return
+        with self.metrics.stage_seconds.time(
+            database=self.database_service.config.name, stage=stage
+        ):
+            yield
+
+    def _count_lookup(self, level: str, hit: bool) -> None:
+        """Count a query cache lookup, if metrics are enabled.
+
+        Args:
+            level: Cache level, "sql" or "result".
+            hit: Whether the lookup found an entry.
+        """
+        if self.metrics is not None:
+            self.metrics.cache_lookups.inc(
+                database=self.database_service.config.name,
+                level=level,
+                result="hit" if hit else "miss",
+            )
+
+    def _count_repair(self, attempt: int, outcome: str) -> None:
+        """Count the outcome of a SQL repair attempt, if metrics are enabled.
+
+        Args:
+            attempt: One-based number of the repair attempt.
+            outcome: "fixed", "failed", "timeout" or "error".
+        """
+        if self.metrics is not None:
+            self.metrics.sql_repairs.inc(
+                database=self.database_service.config.name,
+                attempt=str(attempt),
+                outcome=outcome,
+            )
+
+    def _select_schema(self, question: str, schema: DatabaseSchema) -> SchemaSelection:
+        """Select the part of the schema to send to the LLM.
+
+        Small schemas, or a zero token budget, are passed through whole.
+
+        Args:
+            question: Natural language question.
+            schema: Current database schema.
+
+        Returns:
+            The schema selection with token accounting.
+        """
+        # Schemas are replaced, never mutated, on refresh: rebuild the index on change
+        if self._retriever is None or self._retriever.schema is not schema:
+            self._retriever = SchemaRetriever(
+                schema, full_context=self.database_service.get_llm_context()
+            )
+        retriever = self._retriever
+
+        relation_count = len(schema.tables) + len(schema.views)
+        budget = self.query_settings.schema_token_budget
+        if budget == 0 or relation_count < self.query_settings.schema_pruning_min_tables:
+            return retriever.full_selection()
+
+        selection = retriever.select(question, budget)
+        if selection.pruned:
+            logger.info(
+                f"Schema pruned to {selection.tables_used}/{selection.tables_total} relations"
+            )
+        return selection
+
     def _build_error_response(self, error: QueryError) -> QueryResponse:
         """Build an error response from a QueryError.
 
@@ -123,5 +653,6 @@ class QueryService:
             success=False,
             error=error.message,
             error_code=error.code.value,
+            retry_after=error.retry_after if isinstance(error, ServerOverloadedError) else None,
             generated_at=datetime.now(timezone.utc),
         )
@@ -0,0 +1,157 @@
+"""Background LLM validation of query results."""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from pg_mcp.cache import LRUCache
+from pg_mcp.config import QuerySettings
+from pg_mcp.llm import LLMService
+from pg_mcp.models import QueryResultData, ValidationResult, ValidationStatus
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of validation states kept for retrieval, besides their TTL
+MAX_RETAINED_VALIDATIONS = 10_000
+
+ValidationCallback = Callable[[ValidationResult], None]
+
+
+@dataclass(frozen=True)
+class _ValidationJob:
+    """A queued result validation."""
+
+    validation_id: str
+    question: str
+    sql: str
+    result: QueryResultData
+    on_complete: ValidationCallback | None
+
+
+class ValidationQueue:
+    """Validates query results with the LLM off the request path.
+
+    Jobs wait in a bounded queue and are processed by a fixed number of
+    workers, so background validation never uses more than
+    ``validation_workers`` LLM API slots and SQL generation keeps the rest.
+    When the queue is full, new results are returned without validation.
+    States are kept for ``validation_result_ttl`` seconds.
+
+    Workers are started on the first submission and stopped by :meth:`close`.
+
+    Args:
+        llm_service: LLM service used for validation.
+        settings: Query settings with the validation queue limits.
+    """
+
+    def __init__(self, llm_service: LLMService, settings: QuerySettings) -> None:
+        self.llm_service = llm_service
+        self.settings = settings
+        self._queue: asyncio.Queue[_ValidationJob] = asyncio.Queue(
+            maxsize=settings.validation_queue_size
+        )
+        self._states: LRUCache[str, ValidationStatus] = LRUCache(
+            MAX_RETAINED_VALIDATIONS, ttl=settings.validation_result_ttl
+        )
+        self._workers: list[asyncio.Task[None]] = []
+
+    def submit(
+        self,
+        question: str,
+        sql: str,
+        result: QueryResultData,
+        on_complete: ValidationCallback | None = None,
+    ) -> str | None:
+        """Queue a result for validation.
+
+        Args:
+            question: The original natural language query.
+            sql: The executed SQL statement.
+            result: The query result to validate.
+            on_complete: Called with the validation result once it is known.
+
+        Returns:
+            The validation ID, or None if the queue is full.
+        """
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.settings.validation_workers)
+            ]
+
+        validation_id = uuid.uuid4().hex
+        try:
+            self._queue.put_nowait(
+                _ValidationJob(validation_id, question, sql, result, on_complete)
+            )
+        except asyncio.QueueFull:
+            logger.warning("Validation queue is full, returning result without validation")
+            return None
+
+        self._states.set(
+            validation_id, ValidationStatus(validation_id=validation_id, status="pending")
+        )
+        return validation_id
+
+    def get(self, validation_id: str) -> ValidationStatus | None:
+        """Look up the state of a background validation.
+
+        Args:
+            validation_id: ID returned by :meth:`submit`.
+
+        Returns:
+            The validation state, or None if unknown or expired.
+        """
+        return self._states.get(validation_id)
+
+    @property
+    def pending(self) -> int:
+        """Number of validations waiting for a worker."""
+        return self._queue.qsize()
+
+    async def join(self) -> None:
+        """Wait until all queued validations have finished."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Stop the workers; queued validations are dropped."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self) -> None:
+        """Process queued validations until cancelled."""
+        while True:
+            job = await self._queue.get()
+            try:
+                validation = await self.llm_service.validate_result(
+                    job.question, job.sql, job.result
+                )
+            except Exception as e:
+                logger.exception("Background result validation failed")
+                self._states.set(
+                    job.validation_id,
+                    ValidationStatus(
+                        validation_id=job.validation_id,
+                        status="failed",
+                        error=f"验证失败: {e}",
+                    ),
+                )
+            else:
+                self._states.set(
+                    job.validation_id,
+                    ValidationStatus(
+                        validation_id=job.validation_id,
+                        status="completed",
+                        validation=validation,
+                    ),
+                )
+                if job.on_complete is not None:
+                    try:
+                        job.on_complete(validation)
+                    except Exception:
+                        logger.exception("Validation completion callback failed")
+            finally:
+                self._queue.task_done()
@@ -1,19 +1,26 @@
 """FastMCP server for pg-mcp."""
 
+import asyncio
 import json
 import logging
+import time
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 from typing import Any
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
 
+from pg_mcp.cache import QueryCache
 from pg_mcp.config import ConfigLoader, Settings
 from pg_mcp.database import DatabaseService
 from pg_mcp.llm import LLMService
-from pg_mcp.models import QueryRequest
-from pg_mcp.query import QueryService
-from pg_mcp.validator import SQLValidator
+from pg_mcp.metrics import Metrics
+from pg_mcp.models import BatchQueryRequest, QueryRequest
+from pg_mcp.query import AdmissionController, QueryService, ValidationQueue
+from pg_mcp.query.admission import DEFAULT_CLIENT
+from pg_mcp.validator import SQLValidator, ValidationExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +29,14 @@ logger = logging.getLogger(__name__)
 _query_services: dict[str, QueryService] = {}
 _database_services: dict[str, DatabaseService] = {}
 _database_names: list[str] = []
+_init_timeout: float = 30.0
+_validation_queue: ValidationQueue | None = None
+_admission: AdmissionController | None = None
+# Process-wide, so counters survive server restarts within the process
+_metrics = Metrics()
+
+# Content type of the Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 @asynccontextmanager
@@ -33,7 +48,8 @@ async def lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
     Yields:
         Empty context dict.
     """
-    global _query_services, _database_services, _database_names
+    global _query_services, _database_services, _database_names, _init_timeout
+    global _validation_queue, _admission
 
     logger.info("Starting pg-mcp server...")
 
@@ -55,41 +71,63 @@ async def lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
     if not databases:
         raise RuntimeError("No database configurations found")
 
-    # Shared LLM service for all databases
-    llm_service = LLMService(settings.llm)
-
-    # Initialize all databases
-    for db_config in databases:
-        logger.info(f"Initializing database: {db_config.name}")
-
-        try:
-            # Initialize database service
-            db_service = DatabaseService(db_config, settings.query)
-            await db_service.initialize()
-            _database_services[db_config.name] = db_service
-
-            # Create validator with known tables
-            table_names = db_service.get_table_names()
-            validator = SQLValidator(known_tables=table_names)
-
-            # Create query service
-            query_service = QueryService(
-                llm_service=llm_service,
-                database_service=db_service,
-                validator=validator,
-                query_settings=settings.query,
+    # Shared LLM service and query cache for all databases
+    llm_service = LLMService(settings.llm, metrics=_metrics)
+    query_cache = QueryCache(settings.cache) if settings.cache.enabled else None
+    validation_executor = ValidationExecutor(settings.validator)
+
+    # Background result validation, limited so it leaves LLM capacity for SQL generation
+    if settings.query.enable_validation and settings.query.validation_mode == "async":
+        _validation_queue = ValidationQueue(llm_service, settings.query)
+        if settings.query.validation_workers >= settings.llm.max_concurrency:
+            logger.warning(
+                "QUERY_VALIDATION_WORKERS is not below LLM_MAX_CONCURRENCY; background "
+                "validation can delay SQL generation"
             )
-            _query_services[db_config.name] = query_service
-            _database_names.append(db_config.name)
-            logger.info(f"Database {db_config.name} initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize database {db_config.name}: {e}")
-            # Continue with other databases
 
-    if not _database_names:
-        raise RuntimeError("No databases could be initialized")
+    # One admission queue for all databases, so they share the LLM fairly
+    if settings.admission.max_concurrency > 0:
+        _admission = AdmissionController(
+            settings.admission, {db_config.name: db_config.weight for db_config in databases}
+        )
 
-    logger.info(f"pg-mcp server initialized with {len(_database_names)} database(s): {_database_names}")
+    # Register every configured database; failed ones are retried on first use
+    for db_config in databases:
+        db_service = DatabaseService(db_config, settings.query, settings.schema_cache)
+        _database_services[db_config.name] = db_service
+
+        # Validator known tables follow the schema cache once it is loaded
+        validator = SQLValidator()
+        db_service.add_schema_listener(
+            lambda schema, validator=validator: validator.update_known_tables(
+                schema.get_table_names()
+            )
+        )
+
+        _query_services[db_config.name] = QueryService(
+            llm_service=llm_service,
+            database_service=db_service,
+            validator=validator,
+            query_settings=settings.query,
+            query_cache=query_cache,
+            validation_executor=validation_executor,
+            validation_queue=_validation_queue,
+            metrics=_metrics,
+            admission=_admission,
+        )
+        _database_names.append(db_config.name)
+
+    _init_timeout = settings.init_timeout
+    await _initialize_databases(_database_services, settings.init_timeout)
+
+    ready = [name for name in _database_names if _database_services[name].is_ready]
+    if not ready:
+        logger.error("No databases could be initialized, will retry on first query")
+
+    logger.info(
+        f"pg-mcp server initialized with {len(ready)}/{len(_database_names)} "
+        f"database(s) ready: {ready}"
+    )
 
     try:
         yield {}
@@ -99,12 +137,124 @@ async def lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
         for name, db_service in _database_services.items():
             logger.info(f"Closing database: {name}")
             await db_service.close()
+        validation_executor.close()
+        if _validation_queue is not None:
+            await _validation_queue.close()
+            _validation_queue = None
+        _admission = None
         _query_services.clear()
         _database_services.clear()
         _database_names.clear()
         logger.info("pg-mcp server shutdown complete")
 
 
+async def _initialize_database(name: str, db_service: DatabaseService, timeout: float) -> None:
+    """Initialize one database, logging instead of raising on failure.
+
+    Args:
+        name: Database alias.
+        db_service: Database service to initialize.
+        timeout: Maximum seconds to wait.
+    """
+    logger.info(f"Initializing database: {name}")
+    try:
+        await db_service.ensure_initialized(timeout)
+        logger.info(f"Database {name} initialized successfully")
+    except asyncio.TimeoutError:
+        logger.error(
+            f"Database {name} did not initialize within {timeout}s, will retry on first use"
+        )
+    except Exception as e:
+        logger.error(f"Failed to initialize database {name}: {e}, will retry on first use")
+
+
+async def _initialize_databases(services: dict[str, DatabaseService], timeout: float) -> None:
+    """Initialize all databases concurrently and log a startup report.
+
+    Args:
+        services: Database services keyed by alias.
+        timeout: Per-database initialization timeout in seconds.
+    """
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_initialize_database(name, service, timeout) for name, service in services.items())
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+
+    lines = [f"Database startup report ({total_ms:.0f}ms total):"]
+    for name, service in services.items():
+        if service.is_ready:
+            timings = service.init_timings
+            lines.append(
+                f"  {name}: ready (pool {timings.get('pool_ms', 0):.0f}ms, "
+                f"schema {timings.get('schema_ms', 0):.0f}ms)"
+            )
+        else:
+            error = service.init_error or "not initialized"
+            if isinstance(error, asyncio.TimeoutError):
+                error = f"timed out after {timeout}s"
+            lines.append(f"  {name}: unavailable ({error})")
+    logger.info("\n".join(lines))
+
+
+async def _ensure_database_ready(db_name: str) -> str | None:
+    """Lazily (re)initialize a database that failed at startup.
+
+    Args:
+        db_name: Database alias.
+
+    Returns:
+        None if the database is ready, otherwise an error message.
+    """
+    db_service = _database_services.get(db_name)
+    if db_service is None or db_service.is_ready:
+        return None
+
+    logger.info(f"Retrying initialization of database {db_name}")
+    try:
+        await db_service.ensure_initialized(_init_timeout)
+    except asyncio.TimeoutError:
+        return f"数据库 '{db_name}' 暂不可用: 初始化超时 ({_init_timeout}s)"
+    except Exception as e:
+        return f"数据库 '{db_name}' 暂不可用: {e}"
+    logger.info(f"Database {db_name} initialized on retry")
+    return None
+
+
+def _collect_metrics() -> None:
+    """Refresh the gauges that mirror connection pool and queue state."""
+    for gauge in (
+        _metrics.pool_connections,
+        _metrics.pool_max_size,
+        _metrics.pool_waiters,
+        _metrics.replica_healthy,
+        _metrics.admission_queries,
+    ):
+        gauge.clear()
+
+    for name, db_service in _database_services.items():
+        for endpoint, stats in db_service.pool_stats().items():
+            _metrics.pool_connections.set(stats.idle, database=name, endpoint=endpoint, state="idle")
+            _metrics.pool_connections.set(
+                stats.size - stats.idle, database=name, endpoint=endpoint, state="busy"
+            )
+            _metrics.pool_max_size.set(stats.max_size, database=name, endpoint=endpoint)
+            _metrics.pool_waiters.set(stats.waiters, database=name, endpoint=endpoint)
+        for endpoint, healthy in db_service.replica_health().items():
+            _metrics.replica_healthy.set(int(healthy), database=name, endpoint=endpoint)
+
+    if _admission is not None:
+        for state, counts in (("running", _admission.running), ("waiting", _admission.waiting)):
+            for name, count in counts.items():
+                _metrics.admission_queries.set(count, database=name, state=state)
+
+    pending = _validation_queue.pending if _validation_queue is not None else 0
+    _metrics.validation_queue_pending.set(pending)
+
+
+_metrics.set_collector("server", _collect_metrics)
+
+
 def _get_database_name(database: str | None) -> str | None:
     """Get valid database name or return None if invalid.
 
@@ -126,6 +276,47 @@ def _get_database_name(database: str | None) -> str | None:
     return None
 
 
+def _client_identity(ctx: Context) -> str:
+    """Identify the client of a tool call for per-client admission quotas.
+
+    Uses the session ID the server assigned to the HTTP session (the
+    ``mcp-session-id`` header, or the ``session_id`` of an SSE connection),
+    then the client name from the initialization handshake. The client ID
+    a client may put in the request metadata is only used as a label in
+    the logs, since a client could otherwise get around its quota by
+    sending a new ID with every call.
+
+    Args:
+        ctx: Context of the tool call.
+
+    Returns:
+        The client identity.
+    """
+    try:
+        request_context = ctx.request_context
+    except ValueError:
+        # Called outside of an MCP request
+        return DEFAULT_CLIENT
+
+    identity = DEFAULT_CLIENT
+    request = request_context.request
+    session_id = None
+    if request is not None:
+        session_id = request.headers.get("mcp-session-id") or request.query_params.get(
+            "session_id"
+        )
+    client_params = getattr(request_context.session, "client_params", None)
+    if session_id:
+        identity = f"session:{session_id}"
+    elif client_params is not None:
+        identity = client_params.clientInfo.name
+
+    client_id = getattr(request_context.meta, "client_id", None)
+    if client_id:
+        logger.debug(f"Tool call from client {identity} labelled {client_id}")
+    return identity
+
+
 def create_server() -> FastMCP:
     """Create and configure the FastMCP server.
 
@@ -139,7 +330,9 @@ def create_server() -> FastMCP:
     )
 
     @mcp.tool()
-    async def query(question: str, database: str = "") -> str:
+    async def query(
+        question: str, ctx: Context, database: str = "", bypass_cache: bool = False
+    ) -> str:
         """根据自然语言描述查询数据库。
 
         将自然语言查询转换为 SQL，执行查询并返回结果。
@@ -152,14 +345,17 @@ def create_server() -> FastMCP:
                 - ecommerce_db: 电商平台数据库
                 - erp_db: 企业ERP系统数据库
                 不指定则使用 blog_db。
+            bypass_cache: 是否跳过缓存，重新生成 SQL 并查询最新数据。默认 False。
 
         Returns:
             JSON 格式的查询结果，包含:
             - success: 是否成功
             - database: 查询的数据库
             - sql: 生成的 SQL 语句
-            - result: 查询结果数据
+            - result: 查询结果数据（truncated 为 true 表示结果超出大小限制已被截断）
+            - validation_id: 后台结果验证的 ID（异步验证模式），可通过 get_validation 查询
             - error: 错误信息（如果失败）
+            - retry_after: 服务器繁忙时（error_code 为 SERVER_OVERLOADED）建议的重试等待秒数
         """
         if not _query_services:
             return json.dumps({
@@ -175,15 +371,24 @@ def create_server() -> FastMCP:
                 "error": f"数据库 '{database}' 不存在。可用数据库: {available}"
             }, ensure_ascii=False)
 
+        init_error = await _ensure_database_ready(db_name)
+        if init_error is not None:
+            return json.dumps({
+                "success": False,
+                "database": db_name,
+                "error": init_error
+            }, ensure_ascii=False)
+
         try:
             query_service = _query_services[db_name]
-            request = QueryRequest(query=question)
-            response = await query_service.execute(request)
+            request = QueryRequest(query=question, bypass_cache=bypass_cache)
+            response = await query_service.execute(request, client=_client_identity(ctx))
 
             # Add database name to response
             result = response.model_dump()
             result["database"] = db_name
-            return json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            # Compact encoding: pretty-printing large results inflates them considerably
+            return json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str)
         except Exception as e:
             logger.exception("Query execution failed")
             return json.dumps({
@@ -192,6 +397,117 @@ def create_server() -> FastMCP:
                 "error": f"查询失败: {e}"
             }, ensure_ascii=False)
 
+    @mcp.tool()
+    async def batch_query(
+        questions: list[str], ctx: Context, database: str = "", bypass_cache: bool = False
+    ) -> str:
+        """在同一个数据库上一次执行多个自然语言查询。
+
+        多个相关问题（例如多个分组的统计）应使用本工具一次提交，而不是多次调用 query。
+        各问题并发生成 SQL 并行执行，每个问题的结果与 query 工具相同。
+
+        Args:
+            questions: 自然语言查询描述列表，例如 ["统计男性用户数量", "统计女性用户数量"]
+            database: 目标数据库名称，取值同 query 工具。不指定则使用 blog_db。
+            bypass_cache: 是否跳过缓存，重新生成 SQL 并查询最新数据。默认 False。
+
+        Returns:
+            JSON 格式的批量查询结果，包含:
+            - success: 批量查询是否执行（各问题是否成功见 results）
+            - database: 查询的数据库
+            - results: 按问题顺序排列的查询结果，格式同 query 工具
+            - metadata: 总耗时、SQL 生成耗时、执行耗时及成功/失败数量
+            - error: 错误信息（如果失败）
+        """
+        if not _query_services:
+            return json.dumps({
+                "success": False,
+                "error": "服务未初始化，请检查数据库连接"
+            }, ensure_ascii=False)
+
+        db_name = _get_database_name(database if database else None)
+        if db_name is None:
+            available = ", ".join(_database_names)
+            return json.dumps({
+                "success": False,
+                "error": f"数据库 '{database}' 不存在。可用数据库: {available}"
+            }, ensure_ascii=False)
+
+        init_error = await _ensure_database_ready(db_name)
+        if init_error is not None:
+            return json.dumps({
+                "success": False,
+                "database": db_name,
+                "error": init_error
+            }, ensure_ascii=False)
+
+        try:
+            query_service = _query_services[db_name]
+            request = BatchQueryRequest(queries=questions, bypass_cache=bypass_cache)
+            response = await query_service.execute_batch(request, client=_client_identity(ctx))
+
+            result = response.model_dump()
+            result["database"] = db_name
+            return json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str)
+        except Exception as e:
+            logger.exception("Batch query execution failed")
+            return json.dumps({
+                "success": False,
+                "database": db_name,
+                "error": f"批量查询失败: {e}"
+            }, ensure_ascii=False)
+
+    @mcp.resource(
+        "metrics://prometheus",
+        name="metrics",
+        description="服务器运行指标（Prometheus 文本格式）",
+        mime_type="text/plain",
+    )
+    def metrics_resource() -> str:
+        """服务器运行指标：查询各阶段耗时、缓存命中、LLM 调用与 token 用量、连接池状态。"""
+        return _metrics.render()
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> Response:
+        """Serve the metrics to Prometheus in HTTP mode."""
+        return PlainTextResponse(_metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+    @mcp.tool()
+    async def get_validation(validation_id: str) -> str:
+        """获取后台结果验证的状态。
+
+        异步验证模式下，query 工具会立即返回查询结果和 validation_id，
+        LLM 对结果的验证在后台进行，可通过本工具查询验证结论。
+
+        Args:
+            validation_id: query 工具返回的 validation_id
+
+        Returns:
+            JSON 格式的验证状态，包含:
+            - success: 是否找到验证记录
+            - status: pending（等待中）、completed（已完成）或 failed（失败）
+            - validation: 验证结果（完成后）
+            - error: 错误信息（如果失败）
+        """
+        if _validation_queue is None:
+            return json.dumps({
+                "success": False,
+                "error": "未启用异步结果验证"
+            }, ensure_ascii=False)
+
+        status = _validation_queue.get(validation_id)
+        if status is None:
+            return json.dumps({
+                "success": False,
+                "error": f"验证记录 '{validation_id}' 不存在或已过期"
+            }, ensure_ascii=False)
+
+        return json.dumps(
+            {"success": True, **status.model_dump()},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
     return mcp
 
 
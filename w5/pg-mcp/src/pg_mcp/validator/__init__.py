@@ -1,5 +1,6 @@
 """SQL validation components for pg-mcp."""
 
-from pg_mcp.validator.sql_validator import SQLValidator
+from pg_mcp.validator.executor import ValidationExecutor
+from pg_mcp.validator.sql_validator import SQLValidator, ValidatedStatement
 
-__all__ = ["SQLValidator"]
+__all__ = ["SQLValidator", "ValidatedStatement", "ValidationExecutor"]
@@ -0,0 +1,139 @@
+"""Off-loop SQL validation with a verdict cache."""
+
+import asyncio
+import functools
+import hashlib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from pg_mcp.cache import CacheStats, LRUCache
+from pg_mcp.config import ValidatorSettings
+from pg_mcp.models import SQLUnsafeError
+from pg_mcp.validator.sql_validator import SQLValidator, ValidatedStatement
+
+logger = logging.getLogger(__name__)
+
+# Validators used inside worker processes, one per validator class
+_worker_validators: dict[type[SQLValidator], SQLValidator] = {}
+
+
+def _validate_in_worker(validator_cls: type[SQLValidator], sql: str) -> ValidatedStatement:
+    """Parse and check a statement in a worker process.
+
+    Args:
+        validator_cls: Validator class whose rules to apply.
+        sql: The SQL statement to validate.
+
+    Returns:
+        The validated statement, without the table check.
+    """
+    validator = _worker_validators.get(validator_cls)
+    if validator is None:
+        validator = _worker_validators[validator_cls] = validator_cls()
+    return validator.validate_statement(sql, check_tables=False)
+
+
+class ValidationExecutor:
+    """Runs SQL safety validation off the event loop.
+
+    Parsing and the safety rules run in a thread or process pool, bounded by
+    ``parse_timeout``. Their verdicts only depend on the SQL and are cached
+    by SQL hash, while the table check runs on every call against the current
+    known tables of the validator, so one executor can serve all databases.
+
+    A statement that runs into the timeout is rejected, but its worker cannot
+    be interrupted and finishes in the background. In ``inline`` mode
+    validation runs on the event loop and the timeout does not apply.
+
+    Args:
+        settings: Validator configuration settings.
+    """
+
+    def __init__(self, settings: ValidatorSettings) -> None:
+        self.settings = settings
+        self._executor: Executor | None = None
+        if settings.executor == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.workers,
+                thread_name_prefix="pg-mcp-validator",
+            )
+        elif settings.executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=settings.workers)
+        # Validated statement, or the rejection message
+        self._verdicts: LRUCache[tuple[type[SQLValidator], bytes], ValidatedStatement | str] = (
+            LRUCache(settings.cache_size)
+        )
+
+    async def validate(self, validator: SQLValidator, sql: str) -> ValidatedStatement:
+        """Validate a SQL statement without blocking the event loop.
+
+        Args:
+            validator: Validator holding the rules and known tables to apply.
+            sql: The SQL statement to validate.
+
+        Returns:
+            The validated statement.
+
+        Raises:
+            SQLUnsafeError: If the SQL is unsafe, invalid, references unknown
+                tables or takes longer than ``parse_timeout`` to check.
+        """
+        key = (type(validator), hashlib.sha256(sql.encode("utf-8")).digest())
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = await self._run(validator, sql)
+            self._verdicts.set(key, verdict)
+
+        if isinstance(verdict, str):
+            raise SQLUnsafeError(verdict, sql)
+        validator.check_table_references(verdict)
+        return verdict
+
+    async def _run(self, validator: SQLValidator, sql: str) -> ValidatedStatement | str:
+        """Parse and check a statement in the configured executor.
+
+        Args:
+            validator: Validator whose rules to apply.
+            sql: The SQL statement to validate.
+
+        Returns:
+            The validated statement, or the message it was rejected with.
+
+        Raises:
+            SQLUnsafeError: If the check takes longer than ``parse_timeout``.
+        """
+        try:
+            if self._executor is None:
+                return validator.validate_statement(sql, check_tables=False)
+
+            loop = asyncio.get_running_loop()
+            if isinstance(self._executor, ProcessPoolExecutor):
+                future = loop.run_in_executor(
+                    self._executor, _validate_in_worker, type(validator), sql
+                )
+            else:
+                future = loop.run_in_executor(
+                    self._executor,
+                    functools.partial(validator.validate_statement, sql, check_tables=False),
+                )
+            return await asyncio.wait_for(future, self.settings.parse_timeout)
+        except SQLUnsafeError as e:
+            return e.message
+        except asyncio.TimeoutError:
+            # Not cached: the timeout may be caused by a busy pool rather than the SQL
+            logger.warning(f"SQL validation timed out after {self.settings.parse_timeout}s")
+            raise SQLUnsafeError(f"SQL 解析超时（超过 {self.settings.parse_timeout} 秒）", sql)
+
+    def stats(self) -> CacheStats:
+        """Get hit/miss counters of the verdict cache.
+
+        Returns:
+            Verdict cache counters.
+        """
+        return self._verdicts.stats()
+
+    def close(self) -> None:
+        """Shut down the worker pool without waiting for running checks."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,6 +1,8 @@
 """SQL safety validation using SQLGlot."""
 
 import logging
+from dataclasses import dataclass
+from enum import IntFlag
 
 import sqlglot
 from sqlglot import exp
@@ -11,11 +13,41 @@ from pg_mcp.models import SQLUnsafeError
 logger = logging.getLogger(__name__)
 
 
+class _Rule(IntFlag):
+    """Validation rules that apply to an AST node type."""
+
+    DANGEROUS_EXPRESSION = 1
+    DANGEROUS_FUNCTION = 2
+    ANONYMOUS_FUNCTION = 4
+    TABLE = 8
+    CTE = 16
+
+
+@dataclass(frozen=True)
+class ValidatedStatement:
+    """A SQL statement that passed validation.
+
+    Attributes:
+        sql: The validated SQL text.
+        expression: The parsed statement. It is shared, so copy it before
+            making changes.
+        tables: Referenced tables in order of appearance, as written in the
+            SQL (schema-qualified where the SQL qualifies them), excluding
+            CTE names.
+    """
+
+    sql: str
+    expression: exp.Expression
+    tables: tuple[str, ...]
+
+
 class SQLValidator:
     """Validates SQL statements for safety.
 
     Uses SQLGlot to parse SQL and check for dangerous operations.
-    Only SELECT statements are allowed.
+    Only SELECT statements are allowed. The rules that apply to each AST
+    node type are worked out once and cached, so validation is a single
+    walk over the statement.
 
     Args:
         known_tables: Optional set of known table names for validation.
@@ -67,6 +99,19 @@ class SQLValidator:
 
     def __init__(self, known_tables: set[str] | None = None) -> None:
         self.known_tables = known_tables or set()
+        self._compiled_rules: dict[type[exp.Expression], _Rule] = {}
+
+    def update_known_tables(self, table_names: set[str]) -> None:
+        """Replace the known table names in place.
+
+        The existing set object is kept, so anything sharing it sees the
+        update, and validations running concurrently never observe an empty set.
+
+        Args:
+            table_names: The new set of known table names.
+        """
+        self.known_tables.difference_update(self.known_tables - table_names)
+        self.known_tables.update(table_names)
 
     def validate(self, sql: str) -> str:
         """Validate a SQL statement for safety.
@@ -77,6 +122,26 @@ class SQLValidator:
         Returns:
             The validated SQL statement (unchanged if valid).
 
+        Raises:
+            SQLUnsafeError: If the SQL is unsafe or invalid.
+        """
+        self.validate_statement(sql)
+        return sql
+
+    def validate_statement(self, sql: str, check_tables: bool = True) -> ValidatedStatement:
+        """Validate a SQL statement for safety and return its parsed form.
+
+        The returned statement can be handed to query execution so the SQL
+        is not parsed a second time.
+
+        Args:
+            sql: The SQL statement to validate.
+            check_tables: Whether to check table references against the
+                known tables. Without it the verdict only depends on the SQL.
+
+        Returns:
+            The validated statement.
+
         Raises:
             SQLUnsafeError: If the SQL is unsafe or invalid.
         """
@@ -100,23 +165,102 @@ class SQLValidator:
         if statement is None:
             raise SQLUnsafeError("无法解析 SQL 语句", sql)
 
+        validated = self.validate_expression(statement, sql, check_tables)
+        logger.debug(f"SQL validation passed: {sql[:100]}...")
+        return validated
+
+    def validate_expression(
+        self,
+        statement: exp.Expression,
+        sql: str,
+        check_tables: bool = True,
+    ) -> ValidatedStatement:
+        """Validate an already parsed statement.
+
+        All rules are applied in a single walk over the AST, which stops at
+        the first dangerous node. Table references are checked once the walk
+        is complete. A reference is only taken to be a CTE when the CTE is
+        visible in the scope of the reference, so a CTE cannot hide a table
+        of the same name elsewhere in the statement.
+
+        Args:
+            statement: The parsed SQL statement.
+            sql: Original SQL string for error reporting.
+            check_tables: Whether to check table references against the
+                known tables.
+
+        Returns:
+            The validated statement.
+
+        Raises:
+            SQLUnsafeError: If the statement is unsafe.
+        """
         # Check statement type
         if not isinstance(statement, self.ALLOWED_STATEMENT_TYPES):
             stmt_type = type(statement).__name__
             raise SQLUnsafeError(f"只允许 SELECT 查询语句，收到: {stmt_type}", sql)
 
-        # Check for dangerous expressions in the AST
-        self._check_dangerous_expressions(statement, sql)
+        table_nodes: list[exp.Table] = []
+        cte_names: set[str] = set()
+        compiled = self._compiled_rules
 
-        # Check for dangerous function calls
-        self._check_dangerous_functions(statement, sql)
+        for node in statement.walk():
+            node_type = type(node)
+            rules = compiled.get(node_type)
+            if rules is None:
+                rules = compiled[node_type] = self._compile_rules(node_type)
+            if not rules:
+                continue
 
-        # Optionally check table references
-        if self.known_tables:
-            self._check_table_references(statement, sql)
+            if rules & _Rule.DANGEROUS_EXPRESSION:
+                raise SQLUnsafeError(f"包含不允许的操作: {node_type.__name__}", sql)
 
-        logger.debug(f"SQL validation passed: {sql[:100]}...")
-        return sql
+            if rules & _Rule.DANGEROUS_FUNCTION:
+                raise SQLUnsafeError(f"包含不允许的函数: {node_type.sql_names()[0].lower()}", sql)
+
+            if rules & _Rule.ANONYMOUS_FUNCTION:
+                # Function calls by name that sqlglot does not know
+                func_name = node.this.lower() if isinstance(node.this, str) else ""
+                if func_name in self.DANGEROUS_FUNCTIONS:
+                    raise SQLUnsafeError(f"包含不允许的函数: {func_name}", sql)
+
+            if rules & _Rule.TABLE:
+                table_nodes.append(node)
+
+            if rules & _Rule.CTE:
+                cte_names.add(node.alias_or_name)
+
+        tables: dict[str, None] = {}
+        for node in table_nodes:
+            if node.db:
+                tables.setdefault(f"{node.db}.{node.name}")
+            elif node.name not in cte_names or not self._is_cte_reference(node):
+                tables.setdefault(node.name)
+        referenced = tuple(tables)
+        validated = ValidatedStatement(sql=sql, expression=statement, tables=referenced)
+
+        if check_tables:
+            self.check_table_references(validated)
+        return validated
+
+    def check_table_references(self, validated: ValidatedStatement) -> None:
+        """Check that the tables of a validated statement are known.
+
+        Does nothing while no known tables are set.
+
+        Args:
+            validated: A statement that passed the safety rules.
+
+        Raises:
+            SQLUnsafeError: If unknown tables are referenced.
+        """
+        if not self.known_tables:
+            return
+        for full_name in validated.tables:
+            # Check both with and without schema prefix
+            table_name = full_name.rpartition(".")[2]
+            if table_name not in self.known_tables and full_name not in self.known_tables:
+                raise SQLUnsafeError(f"引用未知的表: {full_name}", validated.sql)
 
     def is_select_only(self, sql: str) -> bool:
         """Check if SQL is a single SELECT statement.
@@ -133,72 +277,67 @@ class SQLValidator:
         except SQLUnsafeError:
             return False
 
-    def _check_dangerous_expressions(self, statement: exp.Expression, sql: str) -> None:
-        """Check for dangerous expression types in the AST.
-
-        Args:
-            statement: The parsed SQL statement.
-            sql: Original SQL string for error reporting.
-
-        Raises:
-            SQLUnsafeError: If dangerous expressions are found.
-        """
-        for node in statement.walk():
-            if isinstance(node, self.DANGEROUS_EXPRESSION_TYPES):
-                node_type = type(node).__name__
-                raise SQLUnsafeError(
-                    f"包含不允许的操作: {node_type}",
-                    sql,
-                )
+    def _compile_rules(self, node_type: type[exp.Expression]) -> _Rule:
+        """Work out which rules apply to an AST node type.
 
-    def _check_dangerous_functions(self, statement: exp.Expression, sql: str) -> None:
-        """Check for dangerous function calls in the AST.
+        The result only depends on the type, so it is computed once per type
+        and cached for the lifetime of the validator.
 
         Args:
-            statement: The parsed SQL statement.
-            sql: Original SQL string for error reporting.
+            node_type: Expression class of an AST node.
 
-        Raises:
-            SQLUnsafeError: If dangerous functions are found.
+        Returns:
+            The rules to apply to nodes of this type.
         """
-        for node in statement.walk():
-            if isinstance(node, exp.Func):
-                func_name = node.name.lower() if node.name else ""
-                if func_name in self.DANGEROUS_FUNCTIONS:
-                    raise SQLUnsafeError(
-                        f"包含不允许的函数: {func_name}",
-                        sql,
-                    )
-
-            # Also check for Anonymous functions (function calls by name)
-            if isinstance(node, exp.Anonymous):
-                func_name = node.this.lower() if isinstance(node.this, str) else ""
-                if func_name in self.DANGEROUS_FUNCTIONS:
-                    raise SQLUnsafeError(
-                        f"包含不允许的函数: {func_name}",
-                        sql,
-                    )
-
-    def _check_table_references(self, statement: exp.Expression, sql: str) -> None:
-        """Check that all table references exist in known tables.
+        rules = _Rule(0)
+        if issubclass(node_type, self.DANGEROUS_EXPRESSION_TYPES):
+            rules |= _Rule.DANGEROUS_EXPRESSION
+        if issubclass(node_type, exp.Anonymous):
+            rules |= _Rule.ANONYMOUS_FUNCTION
+        elif issubclass(node_type, exp.Func) and any(
+            name.lower() in self.DANGEROUS_FUNCTIONS for name in node_type.sql_names()
+        ):
+            rules |= _Rule.DANGEROUS_FUNCTION
+        if issubclass(node_type, exp.Table):
+            rules |= _Rule.TABLE
+        if issubclass(node_type, exp.CTE):
+            rules |= _Rule.CTE
+        return rules
+
+    @staticmethod
+    def _is_cte_reference(table: exp.Table) -> bool:
+        """Check whether an unqualified table reference names a CTE in scope.
+
+        Walks up from the reference and looks at each WITH clause it is
+        nested in. In the body of a CTE only the CTEs defined before it are
+        visible, plus the CTE itself when the WITH clause is RECURSIVE.
 
         Args:
-            statement: The parsed SQL statement.
-            sql: Original SQL string for error reporting.
+            table: An unqualified table reference.
 
-        Raises:
-            SQLUnsafeError: If unknown tables are referenced.
+        Returns:
+            True if the reference resolves to a CTE.
         """
-        for node in statement.walk():
-            if isinstance(node, exp.Table):
-                table_name = node.name
-                schema_name = node.db
-
-                # Check both with and without schema prefix
-                full_name = f"{schema_name}.{table_name}" if schema_name else table_name
-
-                if table_name not in self.known_tables and full_name not in self.known_tables:
-                    raise SQLUnsafeError(
-                        f"引用未知的表: {full_name or table_name}",
-                        sql,
-                    )
+        name = table.name
+        child, node = table, table.parent
+        while node is not None:
+            if isinstance(node, exp.With):
+                # child is one of the CTEs of this WITH clause
+                for cte in node.expressions:
+                    if cte is child:
+                        break
+                    if cte.alias_or_name == name:
+                        return True
+                if node.args.get("recursive") and child.alias_or_name == name:
+                    return True
+                # Skip the query that owns the WITH clause, whose CTEs are done
+                child = node.parent
+                node = child.parent if child is not None else None
+                continue
+            with_ = node.args.get("with_") or node.args.get("with")
+            if isinstance(with_, exp.With) and any(
+                cte.alias_or_name == name for cte in with_.expressions
+            ):
+                return True
+            child, node = node, node.parent
+        return False
@@ -0,0 +1,6 @@
+"""Performance benchmarks for pg-mcp.
+
+Benchmarks measure latency, throughput and CPU cost of the query pipeline.
+Benchmarks that need PostgreSQL are skipped when the test database
+(TEST_DB_* environment variables) is not reachable.
+"""
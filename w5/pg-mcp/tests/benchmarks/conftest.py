@@ -0,0 +1,34 @@
+"""Shared fixtures for pg-mcp benchmarks."""
+
+from collections.abc import AsyncIterator
+
+import asyncpg
+import pytest
+
+from pg_mcp.config import DatabaseConfig
+
+
+@pytest.fixture
+async def benchmark_pool(test_db_config: DatabaseConfig) -> AsyncIterator[asyncpg.Pool]:
+    """Connection pool to the benchmark database.
+
+    Skips the benchmark when the database is not reachable.
+    """
+    try:
+        pool = await asyncpg.create_pool(
+            host=test_db_config.host,
+            port=test_db_config.port,
+            database=test_db_config.database,
+            user=test_db_config.user,
+            password=test_db_config.password.get_secret_value(),
+            min_size=1,
+            max_size=8,
+            timeout=5,
+        )
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Benchmark database not available: {e}")
+
+    try:
+        yield pool
+    finally:
+        await pool.close()
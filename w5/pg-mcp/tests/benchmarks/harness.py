@@ -0,0 +1,273 @@
+"""Load-test harness: a fake LLM endpoint, in-process servers and seed data.
+
+The fake endpoint speaks the OpenAI chat completions protocol (plain and
+streamed) and answers deterministically after a fixed latency: SQL
+generation requests get the SQL registered for the question, result
+validation requests always pass. Together with a PostgreSQL schema seeded
+from the test schema factories, it lets the full ``query`` pipeline run
+without an LLM provider.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import socket
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+import asyncpg
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from pg_mcp.llm.prompts import RESULT_VALIDATION_SYSTEM_PROMPT
+from pg_mcp.metrics import Histogram
+from pg_mcp.models import DatabaseSchema
+
+# The question follows this heading in the SQL generation prompt
+_QUESTION_PATTERN = re.compile(r"## 用户查询\s*\n\s*(?P<question>.+?)\s*\n\s*\n", re.DOTALL)
+
+# Answer for questions without a registered statement
+FALLBACK_SQL = "SELECT 1"
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count reported as usage by the fake endpoint."""
+    return max(1, len(text) // 4)
+
+
+def create_fake_llm_app(answers: dict[str, str], latency: float) -> Starlette:
+    """Create an OpenAI-compatible chat completions endpoint.
+
+    Args:
+        answers: SQL statement to return per natural language question.
+        latency: Seconds to wait before answering each request.
+
+    Returns:
+        ASGI application serving ``POST /chat/completions``.
+    """
+    completion_ids = itertools.count(1)
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        messages = body["messages"]
+        system = messages[0]["content"]
+        prompt = messages[-1]["content"]
+
+        if system == RESULT_VALIDATION_SYSTEM_PROMPT:
+            content = json.dumps({"passed": True, "message": "结果符合预期"}, ensure_ascii=False)
+        else:
+            match = _QUESTION_PATTERN.search(prompt)
+            question = match.group("question") if match else ""
+            content = answers.get(question, FALLBACK_SQL)
+
+        await asyncio.sleep(latency)
+
+        completion_id = f"chatcmpl-{next(completion_ids)}"
+        created = int(time.time())
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_chunks(completion_id, created, body["model"], content),
+                media_type="text/event-stream",
+            )
+
+        prompt_tokens = sum(_estimate_tokens(m["content"]) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    return Starlette(routes=[Route("/chat/completions", chat_completions, methods=["POST"])])
+
+
+async def _stream_chunks(
+    completion_id: str, created: int, model: str, content: str
+) -> AsyncIterator[str]:
+    """Yield a completion as server-sent events, one chunk per line of content."""
+    lines = content.splitlines(keepends=True) or [""]
+    for i, line in enumerate([*lines, None]):
+        choice: dict[str, Any] = {
+            "index": 0,
+            "delta": {"content": line} if line is not None else {},
+            "finish_reason": None if line is not None else "stop",
+        }
+        if i == 0:
+            choice["delta"]["role"] = "assistant"
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [choice],
+        }
+        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@asynccontextmanager
+async def serve_app(app: Any) -> AsyncIterator[str]:
+    """Serve an ASGI application on a free local port in the running event loop.
+
+    Args:
+        app: The ASGI application.
+
+    Yields:
+        Base URL of the server.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="on"))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    try:
+        while not server.started:
+            if task.done():
+                task.result()
+            await asyncio.sleep(0.01)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+        sock.close()
+
+
+class StageRecorder:
+    """Stand-in for the stage latency histogram that keeps every observation.
+
+    Records the duration of each stage and, while :mod:`tracemalloc` is
+    tracing, the memory still allocated when the stage ends. Stages of
+    concurrent queries overlap, so allocations are attributed exactly only
+    at a concurrency of 1. Everything else is delegated to the histogram.
+
+    Args:
+        histogram: The wrapped ``pg_mcp_query_stage_seconds`` histogram.
+    """
+
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+        self.seconds: dict[str, list[float]] = defaultdict(list)
+        self.allocated: dict[str, list[int]] = defaultdict(list)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Time a stage like :meth:`Histogram.time` and keep the observation."""
+        stage = labels["stage"]
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+        try:
+            with self._histogram.time(**labels):
+                yield
+        finally:
+            self.seconds[stage].append(time.perf_counter() - start)
+            if tracing:
+                self.allocated[stage].append(tracemalloc.get_traced_memory()[0] - before)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._histogram, name)
+
+
+def _column_values(column_name: str, data_type: str, fk_rows: int | None) -> str:
+    """SQL expression of deterministic values for row ``g`` of a generated table."""
+    if fk_rows is not None:
+        return f"(g % {fk_rows}) + 1"
+    if column_name == "status":
+        return "(ARRAY['pending', 'processing', 'completed', 'cancelled'])[g % 4 + 1]"
+    if data_type in ("integer", "bigint", "smallint"):
+        return "g"
+    if data_type == "numeric":
+        return "round((g * 7919 % 100000) / 100.0, 2)"
+    if data_type.startswith("timestamp"):
+        return "timestamp '2024-01-01' + g * interval '1 minute'"
+    return f"'{column_name}_' || g"
+
+
+async def seed_database(
+    conn: asyncpg.Connection, schema: DatabaseSchema, schema_name: str, rows: int
+) -> None:
+    """Create the tables, views and enums of a schema model with generated rows.
+
+    Objects are created in ``schema_name`` regardless of their schema in the
+    model. Each table gets ``rows`` rows; foreign key columns reference
+    existing rows of their target table. A view selects its columns from the
+    first table that has all of them.
+
+    Args:
+        conn: Connection to the benchmark database.
+        schema: Schema model, e.g. from ``SchemaFactory``.
+        schema_name: PostgreSQL schema to (re)create.
+        rows: Rows per table.
+    """
+    await conn.execute(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {schema_name}")
+
+    async with conn.transaction():
+        for enum in schema.enum_types:
+            labels = ", ".join(f"'{value}'" for value in enum.values)
+            await conn.execute(f"CREATE TYPE {schema_name}.{enum.name} AS ENUM ({labels})")
+
+        # Tables are listed parents first in the factories
+        for table in schema.tables:
+            definitions = []
+            for column in table.columns:
+                definition = f"{column.name} {column.data_type}"
+                if column.is_primary_key:
+                    definition += " PRIMARY KEY"
+                elif column.foreign_table:
+                    target = column.foreign_table.split(".")[-1]
+                    definition += f" REFERENCES {schema_name}.{target}({column.foreign_column})"
+                definitions.append(definition)
+            await conn.execute(
+                f"CREATE TABLE {schema_name}.{table.name} ({', '.join(definitions)})"
+            )
+
+            names = ", ".join(column.name for column in table.columns)
+            values = ", ".join(
+                _column_values(
+                    column.name,
+                    column.data_type,
+                    rows if column.foreign_table and not column.is_primary_key else None,
+                )
+                for column in table.columns
+            )
+            await conn.execute(
+                f"INSERT INTO {schema_name}.{table.name} ({names}) "
+                f"SELECT {values} FROM generate_series(1, {rows}) AS g"
+            )
+
+        for view in schema.views:
+            wanted = {column.name for column in view.columns}
+            source = next(
+                table for table in schema.tables
+                if wanted <= {column.name for column in table.columns}
+            )
+            names = ", ".join(column.name for column in view.columns)
+            await conn.execute(
+                f"CREATE VIEW {schema_name}.{view.name} AS "
+                f"SELECT {names} FROM {schema_name}.{source.name}"
+            )
+
+        for table in schema.tables:
+            await conn.execute(f"ANALYZE {schema_name}.{table.name}")
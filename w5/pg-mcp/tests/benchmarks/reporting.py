@@ -0,0 +1,29 @@
+"""Timing and reporting helpers for pg-mcp benchmarks."""
+
+import math
+import time
+from collections.abc import Callable, Sequence
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    """Run a callable several times and return the best wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Get the ``q``-th percentile (0-100) of a sample by the nearest-rank method."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def report(title: str, rows: dict[str, float], unit: str = "ms") -> None:
+    """Print a small benchmark report (visible with ``pytest -s``)."""
+    print(f"\n== {title} ==")
+    for name, value in rows.items():
+        print(f"  {name:<40} {value:>12.2f} {unit}")
@@ -0,0 +1,188 @@
+"""Benchmark: end-to-end load on the ``query`` tool over streamable HTTP.
+
+Seeds the complex test schema (users, orders, order_items; 10,000 rows
+per table by default, override with BENCH_LOAD_ROWS) into a dedicated
+PostgreSQL schema, serves the HTTP app from ``create_http_app`` and a fake
+LLM endpoint answering after BENCH_LLM_LATENCY_MS milliseconds, then sends
+BENCH_LOAD_REQUESTS queries from BENCH_LOAD_CONCURRENCY concurrent callers
+through one MCP client session.
+
+Reports p50/p95/p99 latency and throughput of the tool calls, p50/p95/p99
+latency and mean retained allocations of each pipeline stage, and peak
+memory. Allocations are traced with tracemalloc, which slows the server
+down; set BENCH_LOAD_TRACEMALLOC=0 for latencies without it. Other server
+settings can be overridden with their usual environment variables; the
+query cache is disabled unless CACHE_ENABLED is set.
+"""
+
+import asyncio
+import json
+import os
+import resource
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import asyncpg
+import pytest
+import yaml
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from pg_mcp import server
+from pg_mcp.config import DatabaseConfig
+from pg_mcp.metrics import Metrics
+
+from tests.benchmarks.harness import StageRecorder, create_fake_llm_app, seed_database, serve_app
+from tests.benchmarks.reporting import percentile, report
+from tests.fixtures.sample_data import SchemaFactory
+
+LOAD_SCHEMA = "pg_mcp_load"
+ROWS = int(os.environ.get("BENCH_LOAD_ROWS", "10000"))
+REQUESTS = int(os.environ.get("BENCH_LOAD_REQUESTS", "200"))
+CONCURRENCY = int(os.environ.get("BENCH_LOAD_CONCURRENCY", "16"))
+LLM_LATENCY = float(os.environ.get("BENCH_LLM_LATENCY_MS", "50")) / 1000
+TRACE_MEMORY = os.environ.get("BENCH_LOAD_TRACEMALLOC", "1") != "0"
+
+# Questions sent round-robin, with the SQL the fake LLM answers for them
+ANSWERS = {
+    "统计用户总数": f"SELECT COUNT(*) AS user_count FROM {LOAD_SCHEMA}.users",
+    "每种状态的订单数量和总金额": (
+        f"SELECT status, COUNT(*) AS orders, SUM(total) AS amount "
+        f"FROM {LOAD_SCHEMA}.orders GROUP BY status ORDER BY status"
+    ),
+    "消费金额最高的 10 个用户": (
+        f"SELECT u.name, SUM(o.total) AS spent FROM {LOAD_SCHEMA}.users u "
+        f"JOIN {LOAD_SCHEMA}.orders o ON o.user_id = u.id "
+        f"GROUP BY u.name ORDER BY spent DESC LIMIT 10"
+    ),
+    "每个订单的商品总件数": (
+        f"SELECT order_id, SUM(quantity) AS items FROM {LOAD_SCHEMA}.order_items "
+        f"GROUP BY order_id ORDER BY order_id"
+    ),
+    "列出最新的订单": (
+        f"SELECT id, user_id, total, status FROM {LOAD_SCHEMA}.orders ORDER BY id DESC"
+    ),
+}
+
+
+@pytest.fixture
+async def load_database(benchmark_pool: asyncpg.Pool) -> AsyncIterator[None]:
+    """Seed the benchmark schema and drop it afterwards."""
+    async with benchmark_pool.acquire() as conn:
+        await seed_database(conn, SchemaFactory.create_complex_schema(), LOAD_SCHEMA, ROWS)
+    try:
+        yield
+    finally:
+        async with benchmark_pool.acquire() as conn:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {LOAD_SCHEMA} CASCADE")
+
+
+def _write_config(path: Path, db_config: DatabaseConfig) -> Path:
+    """Write a database configuration file for the benchmark database."""
+    config = {
+        "databases": [{
+            "name": "load_db",
+            "host": db_config.host,
+            "port": db_config.port,
+            "database": db_config.database,
+            "user": db_config.user,
+            "password": db_config.password.get_secret_value(),
+            "min_pool_size": min(CONCURRENCY, 10),
+            "max_pool_size": CONCURRENCY,
+        }]
+    }
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+async def _call(session: ClientSession, question: str) -> float:
+    """Call the query tool once and return its latency in seconds."""
+    start = time.perf_counter()
+    result = await session.call_tool("query", {"question": question, "database": "load_db"})
+    elapsed = time.perf_counter() - start
+
+    payload = json.loads(result.content[0].text)
+    assert payload["success"], payload
+    return elapsed
+
+
+def _latency_rows(prefix: str, seconds: list[float]) -> dict[str, float]:
+    """Report rows with the p50/p95/p99 of a latency sample in milliseconds."""
+    return {f"{prefix} p{q}": percentile(seconds, q) * 1000 for q in (50, 95, 99)}
+
+
+@pytest.mark.slow
+@pytest.mark.db
+@pytest.mark.asyncio
+async def test_query_load(
+    load_database: None,
+    test_db_config: DatabaseConfig,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Measure latency, throughput and memory of the query tool under load."""
+    metrics = Metrics()
+    stages = StageRecorder(metrics.stage_seconds)
+    metrics.stage_seconds = stages
+    monkeypatch.setattr(server, "_metrics", metrics)
+
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    try:
+        async with serve_app(create_fake_llm_app(ANSWERS, LLM_LATENCY)) as llm_url:
+            config_path = _write_config(tmp_path / "config.yaml", test_db_config)
+            monkeypatch.setenv("PG_MCP_CONFIG_PATH", str(config_path))
+            monkeypatch.setenv("LLM_BASE_URL", llm_url)
+            monkeypatch.setenv("LLM_API_KEY", "benchmark")
+
+            async with serve_app(server.create_http_app()) as url:
+                async with streamablehttp_client(f"{url}/mcp") as (read, write, _):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+
+                        # Warm up connections and caches outside the measurement
+                        for question in ANSWERS:
+                            await _call(session, question)
+                        stages.seconds.clear()
+                        stages.allocated.clear()
+                        if TRACE_MEMORY:
+                            tracemalloc.reset_peak()
+
+                        questions = list(ANSWERS)
+                        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+                        async def caller(i: int) -> float:
+                            async with semaphore:
+                                return await _call(session, questions[i % len(questions)])
+
+                        start = time.perf_counter()
+                        latencies = await asyncio.gather(*(caller(i) for i in range(REQUESTS)))
+                        wall = time.perf_counter() - start
+
+        traced_peak = tracemalloc.get_traced_memory()[1] if TRACE_MEMORY else 0
+    finally:
+        tracemalloc.stop()
+
+    title = f"{REQUESTS} queries, concurrency {CONCURRENCY}, LLM latency {LLM_LATENCY * 1000:.0f}ms"
+    report(f"{title}: tool calls", _latency_rows("latency", latencies))
+    report(f"{title}: throughput", {"queries per second": REQUESTS / wall}, unit="q/s")
+
+    stage_rows: dict[str, float] = {}
+    for stage, seconds in stages.seconds.items():
+        stage_rows.update(_latency_rows(stage, seconds))
+    report(f"{title}: stages", stage_rows)
+
+    memory_rows = {
+        f"{stage} retained": sum(allocated) / len(allocated) / 1024
+        for stage, allocated in stages.allocated.items()
+    }
+    if TRACE_MEMORY:
+        memory_rows["traced peak"] = traced_peak / 1024
+    # ru_maxrss is reported in KiB on Linux
+    memory_rows["process max RSS"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report(f"{title}: memory", memory_rows, unit="KiB")
+
+    assert len(latencies) == REQUESTS
+    assert len(stages.seconds["total"]) == REQUESTS
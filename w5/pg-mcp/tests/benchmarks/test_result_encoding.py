@@ -0,0 +1,85 @@
+"""Benchmark: CPU time and size of the row and columnar result formats.
+
+Builds BENCH_ENCODING_ROWS (1,000 by default) order-like records with
+integer keys, repeated statuses, decimals, timestamps and distinct strings,
+then measures the whole path of a query result from the fetched records to
+the JSON text of the tool response, in both formats.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+import pytest
+
+from pg_mcp.database.service import ColumnarBuffer, ResultBuffer
+from pg_mcp.models import QueryResponse
+
+from tests.benchmarks.reporting import measure, report
+
+ROW_COUNT = int(os.environ.get("BENCH_ENCODING_ROWS", "1000"))
+COLUMNS = ["id", "user_id", "status", "total", "created_at", "email"]
+STATUSES = ["pending", "processing", "completed", "cancelled"]
+
+
+def _build_records() -> list[dict[str, Any]]:
+    """Build records shaped like asyncpg results of an orders query."""
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": i + 1,
+            "user_id": i * 7919 % 500,
+            "status": STATUSES[i % len(STATUSES)],
+            "total": Decimal(i * 7919 % 100000).scaleb(-2),
+            "created_at": start + timedelta(minutes=i),
+            "email": f"user{i}@example.com",
+        }
+        for i in range(ROW_COUNT)
+    ]
+
+
+def _tool_response(buffer: ResultBuffer | ColumnarBuffer, records: list[dict[str, Any]]) -> str:
+    """Run records through a result buffer and encode the tool response as the server does."""
+    buffer.extend(records)
+    response = QueryResponse(
+        success=True, sql="SELECT 1", result=buffer.to_result(COLUMNS, execution_time_ms=1.0)
+    )
+    return json.dumps(
+        response.model_dump(), ensure_ascii=False, separators=(",", ":"), default=str
+    )
+
+
+@pytest.mark.slow
+def test_result_encoding() -> None:
+    """Compare CPU time and response size of the row and columnar formats."""
+    records = _build_records()
+    budget = 100_000_000
+
+    timings = {
+        "rows": measure(lambda: _tool_response(ResultBuffer(budget), records), repeat=10),
+        "columnar": measure(lambda: _tool_response(ColumnarBuffer(budget), records), repeat=10),
+        "rows, no byte budget": measure(
+            lambda: _tool_response(ResultBuffer(0), records), repeat=10
+        ),
+        "columnar, no byte budget": measure(
+            lambda: _tool_response(ColumnarBuffer(0), records), repeat=10
+        ),
+    }
+    sizes = {
+        "rows": len(_tool_response(ResultBuffer(budget), records).encode("utf-8")) / 1024,
+        "columnar": len(_tool_response(ColumnarBuffer(budget), records).encode("utf-8")) / 1024,
+    }
+    report(f"Records to tool response ({ROW_COUNT} rows)", timings)
+    report(f"Tool response size ({ROW_COUNT} rows)", sizes, unit="KiB")
+
+    columnar = ColumnarBuffer(budget)
+    columnar.extend(records)
+    result = columnar.to_result(COLUMNS, execution_time_ms=1.0)
+    # Timestamps come back as strings; everything else decodes to the fetched values
+    assert [row[:4] for row in result.head(ROW_COUNT)] == [
+        list(record.values())[:4] for record in records
+    ]
+    assert sizes["columnar"] < sizes["rows"]
+    assert timings["columnar"] < timings["rows"]
@@ -0,0 +1,98 @@
+"""Benchmark: per-request cost of rendering the LLM schema context.
+
+Builds an in-memory schema with 1,000 tables (override with
+BENCH_CONTEXT_TABLES) and compares rendering the context on every request
+with the memoized context served by SchemaCache, for both the full schema
+and a pruned subset.
+"""
+
+import os
+
+import pytest
+
+from pg_mcp.database import SchemaCache
+from pg_mcp.models import ColumnInfo, DatabaseSchema, ForeignKeyRelation, TableInfo
+
+from tests.benchmarks.reporting import measure, report
+
+TABLE_COUNT = int(os.environ.get("BENCH_CONTEXT_TABLES", "1000"))
+REQUESTS = 100
+
+
+def _build_schema() -> DatabaseSchema:
+    """Build a schema of TABLE_COUNT commented tables chained by foreign keys."""
+    tables = [
+        TableInfo(
+            name=f"t_{i}",
+            comment=f"benchmark table {i}",
+            estimated_row_count=i * 100,
+            columns=[
+                ColumnInfo(name="id", data_type="integer", is_nullable=False, is_primary_key=True),
+                ColumnInfo(name="name", data_type="character varying", comment=f"name of row {i}"),
+                ColumnInfo(name="status", data_type="text"),
+                ColumnInfo(name="amount", data_type="numeric"),
+                ColumnInfo(
+                    name="created_at",
+                    data_type="timestamp with time zone",
+                    default_value="now()",
+                ),
+                ColumnInfo(
+                    name="parent_id",
+                    data_type="integer",
+                    is_foreign_key=True,
+                    foreign_table=f"public.t_{max(i - 1, 0)}",
+                    foreign_column="id",
+                ),
+            ],
+        )
+        for i in range(TABLE_COUNT)
+    ]
+    relations = [
+        ForeignKeyRelation(
+            from_table=f"public.t_{i}",
+            from_columns=["parent_id"],
+            to_table=f"public.t_{i - 1}",
+            to_columns=["id"],
+            constraint_name=f"t_{i}_parent_id_fkey",
+        )
+        for i in range(1, TABLE_COUNT)
+    ]
+    return DatabaseSchema(database_name="bench", tables=tables, foreign_key_relations=relations)
+
+
+@pytest.mark.slow
+def test_schema_context_memoization() -> None:
+    """Compare rendering per request with the memoized schema context."""
+    schema = _build_schema()
+    cache = SchemaCache("bench")
+    cache.restore(schema)
+    subset = frozenset(f"public.t_{i}" for i in range(10))
+
+    def render_full() -> None:
+        for _ in range(REQUESTS):
+            schema.to_llm_context()
+
+    def cached_full() -> None:
+        for _ in range(REQUESTS):
+            cache.get_llm_context()
+
+    def render_subset() -> None:
+        for _ in range(REQUESTS):
+            schema.subset(set(subset)).to_llm_context()
+
+    def cached_subset() -> None:
+        for _ in range(REQUESTS):
+            cache.get_llm_context(subset)
+
+    # Per-request CPU time in microseconds
+    timings = {
+        "full schema, rendered": measure(render_full, repeat=3) * 1000 / REQUESTS,
+        "full schema, memoized": measure(cached_full, repeat=3) * 1000 / REQUESTS,
+        "10-table subset, rendered": measure(render_subset, repeat=3) * 1000 / REQUESTS,
+        "10-table subset, memoized": measure(cached_subset, repeat=3) * 1000 / REQUESTS,
+    }
+    report(f"Schema context per request ({TABLE_COUNT} tables)", timings, unit="us")
+
+    assert cache.get_llm_context() == schema.to_llm_context()
+    assert timings["full schema, memoized"] < timings["full schema, rendered"]
+    assert timings["10-table subset, memoized"] < timings["10-table subset, rendered"]
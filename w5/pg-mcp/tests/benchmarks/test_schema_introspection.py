@@ -0,0 +1,91 @@
+"""Benchmark: information_schema vs pg_catalog schema introspection.
+
+Generates a schema with many tables (5,000 by default, override with
+BENCH_SCHEMA_TABLES) in a dedicated PostgreSQL schema, then refreshes the
+schema cache with both introspection backends and compares their timings.
+"""
+
+import os
+import time
+
+import asyncpg
+import pytest
+
+from pg_mcp.database import SchemaCache
+
+from tests.benchmarks.reporting import report
+
+BENCH_SCHEMA = "pg_mcp_bench"
+TABLE_COUNT = int(os.environ.get("BENCH_SCHEMA_TABLES", "5000"))
+# Tables created/dropped per transaction, kept well below max_locks_per_transaction
+BATCH_SIZE = 250
+
+
+async def _create_tables(conn: asyncpg.Connection) -> None:
+    """Create TABLE_COUNT commented tables chained by foreign keys."""
+    await conn.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {BENCH_SCHEMA}")
+
+    for start in range(0, TABLE_COUNT, BATCH_SIZE):
+        statements: list[str] = []
+        for i in range(start, min(start + BATCH_SIZE, TABLE_COUNT)):
+            fk = f", parent_id integer REFERENCES {BENCH_SCHEMA}.t_{i - 1}(id)" if i > 0 else ""
+            statements.append(
+                f"CREATE TABLE {BENCH_SCHEMA}.t_{i} ("
+                f"id serial PRIMARY KEY, name varchar(100) NOT NULL, "
+                f"status text, amount numeric(12, 2), created_at timestamptz DEFAULT now()"
+                f"{fk});"
+                f"COMMENT ON TABLE {BENCH_SCHEMA}.t_{i} IS 'benchmark table {i}';"
+                f"COMMENT ON COLUMN {BENCH_SCHEMA}.t_{i}.name IS 'name of row {i}';"
+            )
+        async with conn.transaction():
+            await conn.execute("\n".join(statements))
+
+
+async def _drop_tables(conn: asyncpg.Connection) -> None:
+    """Drop the generated tables in batches, newest first."""
+    for end in range(TABLE_COUNT, 0, -BATCH_SIZE):
+        names = ", ".join(
+            f"{BENCH_SCHEMA}.t_{i}" for i in range(max(0, end - BATCH_SIZE), end)
+        )
+        async with conn.transaction():
+            await conn.execute(f"DROP TABLE IF EXISTS {names} CASCADE")
+    await conn.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+
+
+@pytest.mark.slow
+@pytest.mark.db
+@pytest.mark.asyncio
+async def test_introspection_backends(benchmark_pool: asyncpg.Pool) -> None:
+    """Compare both introspection backends on a large generated schema."""
+    async with benchmark_pool.acquire() as conn:
+        await _create_tables(conn)
+        try:
+            timings: dict[str, float] = {}
+            schemas = {}
+            for backend in ("information_schema", "pg_catalog"):
+                cache = SchemaCache("bench", introspection=backend)
+                start = time.perf_counter()
+                schemas[backend] = await cache.refresh(conn)
+                timings[backend] = (time.perf_counter() - start) * 1000
+        finally:
+            await _drop_tables(conn)
+
+    report(f"Schema refresh with {TABLE_COUNT} tables", timings)
+
+    def bench_tables(backend: str) -> dict[str, set[str]]:
+        return {
+            t.name: {c.name for c in t.columns}
+            for t in schemas[backend].tables
+            if t.schema_name == BENCH_SCHEMA
+        }
+
+    assert len(bench_tables("pg_catalog")) == TABLE_COUNT
+    assert bench_tables("pg_catalog") == bench_tables("information_schema")
+
+    fks = {
+        fk.constraint_name
+        for fk in schemas["pg_catalog"].foreign_key_relations
+        if fk.from_table.startswith(f"{BENCH_SCHEMA}.")
+    }
+    assert len(fks) == TABLE_COUNT - 1
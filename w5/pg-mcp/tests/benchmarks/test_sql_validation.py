@@ -0,0 +1,108 @@
+"""Benchmark: CPU cost of SQL safety validation on generated queries.
+
+Builds a corpus of LLM-style queries with several CTEs, joins, aggregates
+and function calls (size set by BENCH_VALIDATION_QUERIES and
+BENCH_VALIDATION_CTES) and compares the single-pass rule visitor of
+SQLValidator with the previous approach of one AST walk per rule.
+"""
+
+import os
+
+import pytest
+import sqlglot
+from sqlglot import exp
+
+from pg_mcp.validator import SQLValidator
+
+from tests.benchmarks.reporting import measure, report
+
+QUERY_COUNT = int(os.environ.get("BENCH_VALIDATION_QUERIES", "30"))
+CTE_COUNT = int(os.environ.get("BENCH_VALIDATION_CTES", "8"))
+TABLES = [f"public.t_{i}" for i in range(50)]
+
+
+def _build_query(seed: int) -> str:
+    """Build a query with CTE_COUNT CTEs, each joining and aggregating two tables."""
+    ctes = []
+    for i in range(CTE_COUNT):
+        left = TABLES[(seed + i) % len(TABLES)]
+        right = TABLES[(seed + i * 7 + 3) % len(TABLES)]
+        ctes.append(
+            f"c{i} AS ("
+            f"SELECT a.id, lower(a.name) AS name, date_trunc('day', a.created_at) AS day, "
+            f"COALESCE(SUM(b.amount), 0) AS total, COUNT(DISTINCT b.status) AS statuses "
+            f"FROM {left} AS a LEFT JOIN {right} AS b ON b.parent_id = a.id "
+            f"WHERE a.created_at >= NOW() - INTERVAL '{seed % 30 + 1} days' "
+            f"AND (a.status IN ('new', 'open') OR b.amount > {seed}) "
+            f"GROUP BY a.id, a.name, a.created_at "
+            f"HAVING COUNT(*) > {i})"
+        )
+    joins = " ".join(f"JOIN c{i} ON c{i}.id = c0.id" for i in range(1, CTE_COUNT))
+    return (
+        f"WITH {', '.join(ctes)} "
+        f"SELECT c0.name, c0.day, CASE WHEN c0.total > 100 THEN 'high' ELSE 'low' END AS band, "
+        f"ROUND(c0.total / NULLIF(c0.statuses, 0), 2) AS avg_total "
+        f"FROM c0 {joins} ORDER BY c0.total DESC LIMIT 50"
+    )
+
+
+def _validate_three_walks(validator: SQLValidator, statement: exp.Expression) -> list[str]:
+    """Reference implementation: one full AST walk per rule, as before.
+
+    Returns the unknown table references instead of raising, since the old
+    table rule also rejected references to CTEs.
+    """
+    for node in statement.walk():
+        if isinstance(node, validator.DANGEROUS_EXPRESSION_TYPES):
+            raise AssertionError(type(node).__name__)
+    for node in statement.walk():
+        if isinstance(node, exp.Func):
+            if (node.name.lower() if node.name else "") in validator.DANGEROUS_FUNCTIONS:
+                raise AssertionError(node.name)
+        if isinstance(node, exp.Anonymous):
+            if isinstance(node.this, str) and node.this.lower() in validator.DANGEROUS_FUNCTIONS:
+                raise AssertionError(node.this)
+    unknown = []
+    for node in statement.walk():
+        if isinstance(node, exp.Table):
+            full_name = f"{node.db}.{node.name}" if node.db else node.name
+            if node.name not in validator.known_tables and full_name not in validator.known_tables:
+                unknown.append(full_name)
+    return unknown
+
+
+@pytest.mark.slow
+def test_sql_validation_single_pass() -> None:
+    """Compare per-query validation cost of three walks with the single pass."""
+    corpus = [_build_query(seed) for seed in range(QUERY_COUNT)]
+    parsed = [sqlglot.parse_one(sql, dialect="postgres") for sql in corpus]
+    validator = SQLValidator(known_tables=set(TABLES))
+
+    def parse_only() -> None:
+        for sql in corpus:
+            sqlglot.parse(sql, dialect="postgres")
+
+    def three_walks() -> None:
+        for statement in parsed:
+            _validate_three_walks(validator, statement)
+
+    def single_pass() -> None:
+        for sql, statement in zip(corpus, parsed):
+            validator.validate_expression(statement, sql)
+
+    # Per-query CPU time in microseconds
+    timings = {
+        # Parsing dominates and is unchanged, so a single run is enough
+        "parse": measure(parse_only, repeat=1) * 1000 / QUERY_COUNT,
+        "rules, three walks": measure(three_walks, repeat=3) * 1000 / QUERY_COUNT,
+        "rules, single pass": measure(single_pass, repeat=3) * 1000 / QUERY_COUNT,
+    }
+    report(
+        f"SQL validation per query ({QUERY_COUNT} queries, {CTE_COUNT} CTEs each)",
+        timings,
+        unit="us",
+    )
+
+    validated = validator.validate_statement(corpus[0])
+    assert "c0" not in validated.tables
+    assert timings["rules, single pass"] < timings["rules, three walks"]
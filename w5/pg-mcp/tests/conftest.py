@@ -27,6 +27,8 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(pytest.mark.integration)
         elif "/e2e/" in str(item.fspath):
             item.add_marker(pytest.mark.e2e)
+        elif "/benchmarks/" in str(item.fspath):
+            item.add_marker(pytest.mark.benchmark)
 
 
 @pytest.fixture
@@ -168,6 +170,7 @@ def mock_database_service(
     """Create a mock database service."""
     service = MagicMock()
     service.schema = sample_schema
+    service.get_llm_context = MagicMock(return_value=sample_schema.to_llm_context())
     service.get_table_names = MagicMock(return_value={"users", "orders", "public.users", "public.orders"})
     service.execute_query = AsyncMock(return_value=sample_query_result)
     return service
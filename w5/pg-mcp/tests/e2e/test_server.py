@@ -358,3 +358,203 @@ class TestServerWithMockedServices:
         # The exact number of tools depends on implementation
         assert server is not None
         assert "PostgreSQL" in server.name
+
+
+class TestLifespanInitialization:
+    """Tests for concurrent database initialization in the lifespan."""
+
+    @pytest.fixture
+    def config_path(self, tmp_path, monkeypatch) -> str:
+        """Write a config with one healthy, one failing and one hanging database."""
+        path = tmp_path / "config.yaml"
+        databases = "\n".join(
+            f"  - name: {name}\n    database: {name}\n    user: u\n    password: p"
+            for name in ("slow_db", "broken_db", "hung_db")
+        )
+        path.write_text(f"databases:\n{databases}\n", encoding="utf-8")
+        monkeypatch.setenv("PG_MCP_CONFIG_PATH", str(path))
+        monkeypatch.setenv("PG_MCP_INIT_TIMEOUT", "0.3")
+        monkeypatch.setenv("LLM_API_KEY", "test-key")
+        return str(path)
+
+    @staticmethod
+    def fake_initialize(sample_schema: DatabaseSchema, failing: set[str]):
+        """Build a DatabaseService.initialize replacement keyed on the database name."""
+        import asyncio
+
+        async def initialize(self) -> None:
+            name = self.config.name
+            if name in failing:
+                raise OSError(f"could not connect to {name}")
+            await asyncio.sleep(5 if name == "hung_db" else 0.2)
+            self._pool._pool = AsyncMock()
+            self._schema_cache.restore(sample_schema)
+            self.init_timings.update(pool_ms=1.0, schema_ms=2.0)
+            self._initialized = True
+
+        return initialize
+
+    @pytest.mark.asyncio
+    async def test_databases_initialize_concurrently(
+        self, config_path: str, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test slow and hanging databases do not hold each other up."""
+        import time
+        import pg_mcp.server as server_module
+        from pg_mcp.database import DatabaseService
+
+        initialize = self.fake_initialize(sample_schema, failing={"broken_db"})
+        with patch.object(DatabaseService, "initialize", initialize):
+            start = time.perf_counter()
+            async with server_module.lifespan(MagicMock()):
+                elapsed = time.perf_counter() - start
+                services = server_module._database_services
+
+                assert elapsed < 1.0
+                assert server_module._database_names == ["slow_db", "broken_db", "hung_db"]
+                assert services["slow_db"].is_ready
+                assert not services["broken_db"].is_ready
+                assert isinstance(services["broken_db"].init_error, OSError)
+                assert not services["hung_db"].is_ready
+
+                validator = server_module._query_services["slow_db"].validator
+                assert validator.known_tables == sample_schema.get_table_names()
+
+        assert server_module._database_names == []
+
+    @pytest.mark.asyncio
+    async def test_failed_database_retried_on_first_use(
+        self, config_path: str, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a database that failed at startup is initialized lazily."""
+        import pg_mcp.server as server_module
+        from pg_mcp.database import DatabaseService
+
+        failing = {"broken_db"}
+        initialize = self.fake_initialize(sample_schema, failing=failing)
+        with patch.object(DatabaseService, "initialize", initialize):
+            async with server_module.lifespan(MagicMock()):
+                error = await server_module._ensure_database_ready("broken_db")
+                assert error is not None
+                assert "broken_db" in error
+
+                failing.clear()
+                assert await server_module._ensure_database_ready("broken_db") is None
+                assert server_module._database_services["broken_db"].is_ready
+
+
+class TestMetricsExposure:
+    """Tests for the /metrics route and the metrics resource."""
+
+    @pytest.fixture
+    def database_services(self, monkeypatch) -> dict[str, MagicMock]:
+        """Register a mocked database service with a primary and a replica pool."""
+        from pg_mcp import server as server_module
+        from pg_mcp.database import PoolStats
+
+        db_service = MagicMock()
+        db_service.pool_stats.return_value = {
+            "primary": PoolStats(size=5, idle=2, max_size=10, waiters=0),
+            "replica:5432": PoolStats(size=3, idle=0, max_size=10, waiters=4),
+        }
+        db_service.replica_health.return_value = {"replica:5432": True}
+        services = {"blog_db": db_service}
+        monkeypatch.setattr(server_module, "_database_services", services)
+        return services
+
+    def test_http_metrics_route(self, database_services: dict[str, MagicMock]) -> None:
+        """Test the HTTP app serves the exposition format with current pool state."""
+        from starlette.testclient import TestClient
+
+        from pg_mcp.server import create_server
+
+        client = TestClient(create_server().streamable_http_app())
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert "# TYPE pg_mcp_query_stage_seconds histogram" in text
+        assert 'pg_mcp_pool_connections{database="blog_db",endpoint="primary",state="busy"} 3' in text
+        assert 'pg_mcp_pool_waiters{database="blog_db",endpoint="replica:5432"} 4' in text
+        assert 'pg_mcp_replica_healthy{database="blog_db",endpoint="replica:5432"} 1' in text
+
+    @pytest.mark.asyncio
+    async def test_metrics_resource(self, database_services: dict[str, MagicMock]) -> None:
+        """Test the metrics are readable as an MCP resource in any transport."""
+        from pg_mcp.server import create_server
+
+        contents = await create_server().read_resource("metrics://prometheus")
+
+        text = list(contents)[0].content
+        assert 'pg_mcp_pool_max_size{database="blog_db",endpoint="primary"} 10' in text
+
+
+class TestClientIdentity:
+    """Tests for identifying the client of a tool call for admission quotas."""
+
+    @staticmethod
+    def _context(meta=None, request=None, client_name: str | None = None):
+        """Build a tool call context with the given request metadata and session."""
+        from mcp.server.fastmcp import Context
+        from mcp.shared.context import RequestContext
+        from mcp.types import Implementation, InitializeRequestParams
+
+        session = MagicMock()
+        session.client_params = None
+        if client_name is not None:
+            session.client_params = InitializeRequestParams(
+                protocolVersion="2025-06-18",
+                capabilities={},
+                clientInfo=Implementation(name=client_name, version="1.0"),
+            )
+        request_context = RequestContext(
+            request_id=1, meta=meta, session=session, lifespan_context={}, request=request
+        )
+        return Context(request_context=request_context)
+
+    def test_client_id_does_not_set_identity(self) -> None:
+        """Test a client ID sent in the request metadata cannot pick the quota key."""
+        from mcp.types import RequestParams
+
+        from pg_mcp.server import _client_identity
+
+        request = MagicMock()
+        request.headers = {"mcp-session-id": "abc"}
+        meta = RequestParams.Meta(client_id="reporting-job")
+
+        assert _client_identity(self._context(meta, request, "claude")) == "session:abc"
+        assert _client_identity(self._context(meta, client_name="claude")) == "claude"
+
+    def test_http_session(self) -> None:
+        """Test HTTP clients are told apart by session."""
+        from pg_mcp.server import _client_identity
+
+        request = MagicMock()
+        request.headers = {"mcp-session-id": "abc"}
+
+        assert _client_identity(self._context(request=request, client_name="claude")) == (
+            "session:abc"
+        )
+
+    def test_sse_session(self) -> None:
+        """Test SSE clients are told apart by the session of their connection."""
+        from pg_mcp.server import _client_identity
+
+        request = MagicMock()
+        request.headers = {}
+        request.query_params = {"session_id": "xyz"}
+
+        assert _client_identity(self._context(request=request, client_name="claude")) == (
+            "session:xyz"
+        )
+
+    def test_client_name_and_default(self) -> None:
+        """Test stdio clients fall back to their name, then to the shared identity."""
+        from pg_mcp.query.admission import DEFAULT_CLIENT
+        from pg_mcp.server import _client_identity
+        from mcp.server.fastmcp import Context
+
+        assert _client_identity(self._context(client_name="claude")) == "claude"
+        assert _client_identity(self._context()) == DEFAULT_CLIENT
+        assert _client_identity(Context()) == DEFAULT_CLIENT
@@ -1,17 +1,42 @@
 """Tests for database service."""
 
-import pytest
-from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
+import asyncio
+import json
+from contextlib import asynccontextmanager
 
-from pg_mcp.config import DatabaseConfig, QuerySettings
-from pg_mcp.database import ConnectionPool, DatabaseService, SchemaCache
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call, patch, PropertyMock
+
+from pg_mcp.config import DatabaseConfig, QuerySettings, ReplicaConfig, SchemaSettings
+from pg_mcp.database import (
+    ColumnProfiler,
+    ConnectionPool,
+    DatabaseService,
+    ReplicaRouter,
+    SchemaCache,
+    SchemaWatcher,
+)
+from pg_mcp.database.schema_cache import (
+    INFORMATION_SCHEMA_QUERIES,
+    PG_CATALOG_QUERIES,
+    CatalogSignatures,
+)
+from pg_mcp.database.column_profiler import COLUMN_STATS_QUERY, build_column_stats
+from pg_mcp.database.schema_snapshot import SchemaSnapshotStore
+from pg_mcp.database.service import apply_row_limit, normalize_sql
+from pg_mcp.validator import SQLValidator
 from pg_mcp.models import (
     DatabaseSchema,
     QueryResultData,
+    QueryTooExpensiveError,
     SQLExecutionError,
     SQLTimeoutError,
     TableInfo,
     ColumnInfo,
+    ColumnStats,
+    ForeignKeyRelation,
+    ViewInfo,
 )
 
 
@@ -64,6 +89,41 @@ class TestConnectionPool:
             # Should only create pool once
             mock_create.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_pool_initialize_connection_settings(self, db_config: DatabaseConfig) -> None:
+        """Test the statement cache is set per connection and no timeout is sent at startup."""
+        with patch("pg_mcp.database.connection.asyncpg.create_pool", new_callable=AsyncMock) as mock_create:
+            pool = ConnectionPool(db_config)
+            await pool.initialize()
+
+            kwargs = mock_create.call_args.kwargs
+            assert kwargs["statement_cache_size"] == db_config.statement_cache_size
+            assert "server_settings" not in kwargs
+
+    @pytest.mark.asyncio
+    async def test_pool_initialize_pool_options(self, db_config: DatabaseConfig) -> None:
+        """Test pool options come from the database configuration."""
+        db_config = db_config.model_copy(
+            update={"command_timeout": 15.0, "max_inactive_connection_lifetime": 30.0}
+        )
+        with patch("pg_mcp.database.connection.asyncpg.create_pool", new_callable=AsyncMock) as mock_create:
+            await ConnectionPool(db_config).initialize()
+
+            kwargs = mock_create.call_args.kwargs
+            assert kwargs["command_timeout"] == 15.0
+            assert kwargs["max_inactive_connection_lifetime"] == 30.0
+
+    @pytest.mark.asyncio
+    async def test_pool_initialize_replica(self, db_config: DatabaseConfig) -> None:
+        """Test a replica pool connects to the replica with the primary's credentials."""
+        with patch("pg_mcp.database.connection.asyncpg.create_pool", new_callable=AsyncMock) as mock_create:
+            pool = ConnectionPool(db_config, replica=ReplicaConfig(host="replica", port=6432))
+            await pool.initialize()
+
+            kwargs = mock_create.call_args.kwargs
+            assert (kwargs["host"], kwargs["port"]) == ("replica", 6432)
+            assert kwargs["user"] == "testuser"
+
     @pytest.mark.asyncio
     async def test_pool_acquire(self, db_config: DatabaseConfig) -> None:
         """Test ConnectionPool.acquire()."""
@@ -80,6 +140,41 @@ class TestConnectionPool:
             async with pool.acquire() as conn:
                 assert conn == mock_conn
 
+    @pytest.mark.asyncio
+    async def test_pool_stats(self, db_config: DatabaseConfig) -> None:
+        """Test pool counters include callers waiting for a connection."""
+        with patch("pg_mcp.database.connection.asyncpg.create_pool", new_callable=AsyncMock) as mock_create:
+            released = asyncio.Event()
+
+            @asynccontextmanager
+            async def acquire():
+                await released.wait()
+                yield MagicMock()
+
+            mock_pool = MagicMock()
+            mock_pool.acquire = acquire
+            mock_pool.get_size.return_value = 4
+            mock_pool.get_idle_size.return_value = 0
+            mock_pool.get_max_size.return_value = 4
+            mock_create.return_value = mock_pool
+
+            pool = ConnectionPool(db_config)
+            assert pool.stats().size == 0
+            await pool.initialize()
+
+            async def query() -> None:
+                async with pool.acquire():
+                    pass
+
+            task = asyncio.create_task(query())
+            await asyncio.sleep(0)
+            stats = pool.stats()
+            released.set()
+            await task
+
+            assert (stats.size, stats.idle, stats.max_size, stats.waiters) == (4, 0, 4, 1)
+            assert pool.stats().waiters == 0
+
     @pytest.mark.asyncio
     async def test_pool_close(self, db_config: DatabaseConfig) -> None:
         """Test ConnectionPool.close()."""
@@ -103,6 +198,169 @@ class TestConnectionPool:
         assert pool.is_initialized is False
 
 
+def _query_conn() -> AsyncMock:
+    """Create a mock connection for running queries in a transaction."""
+    conn = AsyncMock()
+    conn.transaction = MagicMock()
+    return conn
+
+
+class FakePool:
+    """Stand-in for a ConnectionPool that hands out mock connections."""
+
+    def __init__(self, host: str, config: DatabaseConfig) -> None:
+        self.host = host
+        self.port = 5432
+        self.config = config
+        self.initialize = AsyncMock()
+        self.close = AsyncMock()
+        self.error: Exception | None = None
+        self.acquired = 0
+        self.released_with: list[BaseException | None] = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self.error is not None:
+            raise self.error
+        self.acquired += 1
+        conn = MagicMock()
+        conn.host = self.host
+        conn.fetchval = AsyncMock(return_value=1)
+        conn.is_closed.return_value = False
+        try:
+            yield conn
+        except BaseException as e:
+            self.released_with.append(e)
+            raise
+        self.released_with.append(None)
+
+
+class TestReplicaRouter:
+    """Tests for ReplicaRouter."""
+
+    @pytest.fixture
+    def db_config(self) -> DatabaseConfig:
+        """Create database configuration."""
+        return DatabaseConfig(name="test_db", database="testdb", user="u", password="p")
+
+    @pytest.fixture
+    def primary(self, db_config: DatabaseConfig) -> FakePool:
+        """Create the primary pool."""
+        return FakePool("primary", db_config)
+
+    @pytest.fixture
+    def replicas(self, db_config: DatabaseConfig) -> list[FakePool]:
+        """Create two replica pools."""
+        return [FakePool("replica-1", db_config), FakePool("replica-2", db_config)]
+
+    @pytest.fixture
+    async def router(self, primary: FakePool, replicas: list[FakePool]):
+        """Create an initialized router and close it afterwards."""
+        router = ReplicaRouter(primary, replicas, check_interval=60)
+        await router.initialize()
+        yield router
+        await router.close()
+
+    @pytest.mark.asyncio
+    async def test_least_outstanding_replica(self, router: ReplicaRouter) -> None:
+        """Test a busy replica is skipped in favour of an idle one."""
+        async with router.acquire() as first:
+            async with router.acquire() as second:
+                assert {first.host, second.host} == {"replica-1", "replica-2"}
+
+    @pytest.mark.asyncio
+    async def test_idle_replicas_take_turns(self, router: ReplicaRouter) -> None:
+        """Test sequential queries alternate between equally idle replicas."""
+        hosts = []
+        for _ in range(4):
+            async with router.acquire() as conn:
+                hosts.append(conn.host)
+
+        assert hosts.count("replica-1") == hosts.count("replica-2") == 2
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_fails_over(
+        self, router: ReplicaRouter, replicas: list[FakePool]
+    ) -> None:
+        """Test an unreachable replica is skipped and taken out of rotation."""
+        replicas[0].error = OSError("connection refused")
+
+        for _ in range(3):
+            async with router.acquire() as conn:
+                assert conn.host == "replica-2"
+
+        assert router.healthy_count == 1
+
+    @pytest.mark.asyncio
+    async def test_primary_fallback_and_recovery(
+        self, router: ReplicaRouter, replicas: list[FakePool]
+    ) -> None:
+        """Test the primary serves reads until a health check restores a replica."""
+        for pool in replicas:
+            pool.error = OSError("connection refused")
+
+        async with router.acquire() as conn:
+            assert conn.host == "primary"
+        assert router.healthy_count == 0
+
+        replicas[1].error = None
+        await router.check()
+
+        assert router.healthy_count == 1
+        async with router.acquire() as conn:
+            assert conn.host == "replica-2"
+
+    @pytest.mark.asyncio
+    async def test_lost_connection_marks_unhealthy(self, router: ReplicaRouter) -> None:
+        """Test a connection lost during a query takes its replica out of rotation."""
+        async with router.acquire() as conn:
+            conn.is_closed.return_value = True
+
+        assert router.healthy_count == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_error_reaches_pool(
+        self, router: ReplicaRouter, replicas: list[FakePool]
+    ) -> None:
+        """Test a connection error during a query is passed to the pool and to the caller."""
+        error = asyncpg.ConnectionDoesNotExistError("connection was closed")
+
+        with pytest.raises(asyncpg.ConnectionDoesNotExistError):
+            async with router.acquire() as conn:
+                host = conn.host
+                raise error
+
+        pool = next(pool for pool in replicas if pool.host == host)
+        assert pool.released_with[-1] is error
+        assert router.healthy_count == 1
+
+    @pytest.mark.asyncio
+    async def test_query_timeout_keeps_replica(self, router: ReplicaRouter) -> None:
+        """Test a query that hits command_timeout does not take its replica out."""
+        with pytest.raises(asyncio.TimeoutError):
+            async with router.acquire():
+                raise asyncio.TimeoutError()
+
+        assert router.healthy_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unreachable_at_startup(
+        self, primary: FakePool, replicas: list[FakePool]
+    ) -> None:
+        """Test an unreachable replica does not fail initialization."""
+        replicas[0].initialize.side_effect = OSError("connection refused")
+        router = ReplicaRouter(primary, replicas, check_interval=60)
+
+        try:
+            await router.initialize()
+            assert router.healthy_count == 1
+        finally:
+            await router.close()
+
+        for pool in replicas:
+            pool.close.assert_awaited_once()
+
+
 class TestSchemaCache:
     """Tests for SchemaCache."""
 
@@ -116,6 +374,131 @@ class TestSchemaCache:
         assert schema_cache.database_name == "testdb"
         assert schema_cache._schema is None
 
+    def test_schema_cache_default_introspection(self, schema_cache: SchemaCache) -> None:
+        """Test SchemaCache uses information_schema queries by default."""
+        assert schema_cache.introspection == "information_schema"
+        assert schema_cache.queries is INFORMATION_SCHEMA_QUERIES
+
+    def test_schema_cache_pg_catalog_introspection(self) -> None:
+        """Test SchemaCache can be switched to the pg_catalog backend."""
+        cache = SchemaCache("testdb", introspection="pg_catalog")
+
+        assert cache.queries is PG_CATALOG_QUERIES
+        assert set(cache.queries) == set(INFORMATION_SCHEMA_QUERIES)
+        for name in ("tables", "columns", "primary_keys", "foreign_keys", "views"):
+            assert "information_schema." not in cache.queries[name]
+            assert "::regclass," not in cache.queries[name]
+
+    def test_pg_catalog_queries_filter_visibility(self) -> None:
+        """Test every pg_catalog relation query hides invisible, toast and temp relations."""
+        for name in ("tables", "columns", "primary_keys", "views"):
+            query = PG_CATALOG_QUERIES[name]
+            assert "has_table_privilege(c.oid" in query, name
+            assert "n.nspname !~ '^pg_(toast|temp_)'" in query, name
+
+        foreign_keys = PG_CATALOG_QUERIES["foreign_keys"]
+        for namespace, relation in (("fn", "fc"), ("tn", "tc")):
+            assert f"pg_has_role({relation}.relowner, 'USAGE')" in foreign_keys
+            assert f"{namespace}.nspname !~ '^pg_(toast|temp_)'" in foreign_keys
+
+    def test_schema_cache_unknown_introspection(self) -> None:
+        """Test SchemaCache rejects unknown introspection backends."""
+        with pytest.raises(ValueError, match="introspection"):
+            SchemaCache("testdb", introspection="mysql")
+
+    def test_llm_context_memoized_per_version(self, schema_cache: SchemaCache) -> None:
+        """Test the rendered context is reused until the schema changes."""
+        schema = DatabaseSchema(
+            database_name="testdb",
+            tables=[TableInfo(name="users"), TableInfo(name="orders")],
+        )
+        schema_cache.restore(schema)
+        version = schema_cache.version
+
+        with patch.object(
+            DatabaseSchema, "to_llm_context", autospec=True, return_value="ctx"
+        ) as mock_render:
+            assert schema_cache.get_llm_context() == "ctx"
+            assert schema_cache.get_llm_context() == "ctx"
+            subset = frozenset({"public.users"})
+            schema_cache.get_llm_context(subset)
+            schema_cache.get_llm_context(subset)
+            assert mock_render.call_count == 2
+
+            schema_cache.restore(schema)
+            schema_cache.get_llm_context()
+            schema_cache.get_llm_context(subset)
+            assert mock_render.call_count == 4
+
+        assert schema_cache.version == version + 1
+
+    def test_llm_context_subset(self, schema_cache: SchemaCache) -> None:
+        """Test subset contexts only contain the requested relations."""
+        schema_cache.restore(
+            DatabaseSchema(
+                database_name="testdb",
+                tables=[TableInfo(name="users"), TableInfo(name="orders")],
+            )
+        )
+
+        context = schema_cache.get_llm_context(frozenset({"public.orders"}))
+
+        assert "public.orders" in context
+        assert "public.users" not in context
+        assert "public.users" in schema_cache.get_llm_context()
+
+    def test_llm_context_requires_schema(self, schema_cache: SchemaCache) -> None:
+        """Test rendering before the schema is loaded fails clearly."""
+        with pytest.raises(RuntimeError, match="not loaded"):
+            schema_cache.get_llm_context()
+
+    @pytest.mark.asyncio
+    async def test_refresh_schema_pg_catalog(self) -> None:
+        """Test refresh runs the pg_catalog queries and builds the same model."""
+        cache = SchemaCache("testdb", introspection="pg_catalog")
+        rows_by_query = {query: [] for query in PG_CATALOG_QUERIES.values()}
+        rows_by_query[PG_CATALOG_QUERIES["tables"]] = [
+            {
+                "table_schema": "public",
+                "table_name": "orders",
+                "table_comment": "Orders",
+                "estimated_row_count": 10,
+            },
+        ]
+        rows_by_query[PG_CATALOG_QUERIES["foreign_keys"]] = [
+            {
+                "from_schema": "public",
+                "from_table": "orders",
+                "from_column": "user_id",
+                "to_schema": "public",
+                "to_table": "users",
+                "to_column": "id",
+                "constraint_name": "orders_user_id_fkey",
+            },
+        ]
+        rows_by_query[PG_CATALOG_QUERIES["columns"]] = [
+            {
+                "table_schema": "public",
+                "table_name": "orders",
+                "column_name": "user_id",
+                "data_type": "integer",
+                "is_nullable": False,
+                "column_default": None,
+                "column_comment": None,
+            },
+        ]
+
+        mock_conn = AsyncMock()
+        mock_conn.fetch.side_effect = lambda query: rows_by_query[query]
+
+        result = await cache.refresh(mock_conn)
+
+        column = result.tables[0].columns[0]
+        assert column.is_foreign_key is True
+        assert column.foreign_table == "public.users"
+        assert result.foreign_key_relations[0].constraint_name == "orders_user_id_fkey"
+        assert mock_conn.fetch.call_count == len(PG_CATALOG_QUERIES)
+
     def test_schema_property_before_refresh(self, schema_cache: SchemaCache) -> None:
         """Test accessing schema before refresh returns None."""
         assert schema_cache.schema is None
@@ -184,6 +567,63 @@ class TestSchemaCache:
         assert len(result.tables) == 1
         assert result.tables[0].name == "users"
 
+    @pytest.mark.asyncio
+    async def test_refresh_parallel(self, schema_cache: SchemaCache) -> None:
+        """Test parallel refresh spreads catalog queries over pooled connections."""
+        queries = schema_cache.queries
+        rows_by_query = {query: [] for query in queries.values()}
+        rows_by_query[queries["tables"]] = [
+            {
+                "table_schema": "public",
+                "table_name": "users",
+                "table_comment": None,
+                "estimated_row_count": 0,
+            },
+        ]
+        rows_by_query[queries["columns"]] = [
+            {
+                "table_schema": "public",
+                "table_name": "users",
+                "column_name": "id",
+                "data_type": "integer",
+                "is_nullable": False,
+                "column_default": None,
+                "column_comment": None,
+            },
+        ]
+
+        in_flight = 0
+        max_in_flight = 0
+        acquired = 0
+
+        async def fetch(query: str) -> list:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return rows_by_query[query]
+
+        @asynccontextmanager
+        async def acquire():
+            nonlocal acquired
+            acquired += 1
+            conn = MagicMock()
+            conn.fetch = fetch
+            yield conn
+
+        pool = MagicMock()
+        pool.acquire = acquire
+
+        result = await schema_cache.refresh_parallel(pool, concurrency=3)
+
+        assert acquired == len(queries)
+        assert max_in_flight == 3
+        assert [t.name for t in result.tables] == ["users"]
+        assert result.tables[0].columns[0].name == "id"
+        assert result.tables[0].estimated_row_count is None
+        assert schema_cache.schema is result
+
     def test_get_table_names_with_schema(self) -> None:
         """Test get_table_names with loaded schema."""
         cache = SchemaCache("testdb")
@@ -215,187 +655,1183 @@ class TestSchemaCache:
         assert "public.orders" in names
 
 
-class TestDatabaseService:
-    """Tests for DatabaseService."""
-
-    @pytest.fixture
-    def db_config(self) -> DatabaseConfig:
-        """Create database configuration."""
-        return DatabaseConfig(
-            name="test_db",
-            host="localhost",
-            port=5432,
-            database="testdb",
-            user="testuser",
-            password="testpass",
-        )
-
-    @pytest.fixture
-    def query_settings(self) -> QuerySettings:
-        """Create query settings."""
-        return QuerySettings(
-            default_limit=100,
-            statement_timeout=30000,
-            enable_validation=True,
-        )
+class TestIncrementalSchemaRefresh:
+    """Tests for incremental schema refresh and DDL change detection."""
 
     @pytest.fixture
-    def sample_schema(self) -> DatabaseSchema:
-        """Create sample schema."""
+    def cached_schema(self) -> DatabaseSchema:
+        """Schema with two related tables and a view."""
         return DatabaseSchema(
             database_name="testdb",
             tables=[
                 TableInfo(
                     schema_name="public",
-                    name="users",
+                    name="orders",
                     columns=[
-                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
-                        ColumnInfo(name="name", data_type="varchar"),
+                        ColumnInfo(
+                            name="user_id",
+                            data_type="integer",
+                            is_foreign_key=True,
+                            foreign_table="public.users",
+                            foreign_column="id",
+                        ),
                     ],
                 ),
+                TableInfo(
+                    schema_name="public",
+                    name="users",
+                    columns=[ColumnInfo(name="id", data_type="integer", is_primary_key=True)],
+                ),
+            ],
+            views=[ViewInfo(schema_name="public", name="active_users")],
+            foreign_key_relations=[
+                ForeignKeyRelation(
+                    from_table="public.orders",
+                    from_columns=["user_id"],
+                    to_table="public.users",
+                    to_columns=["id"],
+                    constraint_name="orders_user_id_fkey",
+                ),
             ],
         )
 
-    def test_service_init(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings
-    ) -> None:
-        """Test DatabaseService initialization."""
-        service = DatabaseService(db_config, query_settings)
-        assert service.config == db_config
-        assert service.query_settings == query_settings
-
-    def test_schema_property_before_init(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings
-    ) -> None:
-        """Test accessing schema before initialization raises error."""
-        service = DatabaseService(db_config, query_settings)
+    def test_changed_tables(self) -> None:
+        """Test CatalogSignatures reports added, dropped and altered relations."""
+        before = CatalogSignatures(tables={"public.a": "1", "public.b": "1", "public.c": "1"})
+        after = CatalogSignatures(tables={"public.a": "1", "public.b": "2", "public.d": "1"})
 
-        with pytest.raises(RuntimeError) as exc:
-            _ = service.schema
-        assert "initialize" in str(exc.value).lower()
+        assert after.changed_tables(before) == {"public.b", "public.c", "public.d"}
+        assert after.fingerprint != before.fingerprint
+        assert before.fingerprint == CatalogSignatures(tables=dict(before.tables)).fingerprint
 
     @pytest.mark.asyncio
-    async def test_service_initialize(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
-    ) -> None:
-        """Test DatabaseService.initialize()."""
-        service = DatabaseService(db_config, query_settings)
-
-        with patch.object(service._pool, "initialize", new_callable=AsyncMock) as mock_pool_init:
-            with patch.object(service, "refresh_schema", new_callable=AsyncMock) as mock_refresh:
-                mock_refresh.return_value = sample_schema
+    async def test_fetch_signatures(self) -> None:
+        """Test fetching catalog signatures."""
+        cache = SchemaCache("testdb")
+        mock_conn = AsyncMock()
+        mock_conn.fetch.return_value = [
+            {"table_schema": "public", "table_name": "users", "signature": "abc"},
+        ]
+        mock_conn.fetchval.return_value = "enums"
 
-                await service.initialize()
+        signatures = await cache.fetch_signatures(mock_conn)
 
-                mock_pool_init.assert_called_once()
-                mock_refresh.assert_called_once()
+        assert signatures.tables == {"public.users": "abc"}
+        assert signatures.enums == "enums"
 
     @pytest.mark.asyncio
-    async def test_service_close(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings
+    async def test_refresh_tables_patches_changed_relations(
+        self, cached_schema: DatabaseSchema
     ) -> None:
-        """Test DatabaseService.close()."""
-        service = DatabaseService(db_config, query_settings)
+        """Test refresh_tables replaces changed tables and keeps the rest."""
+        cache = SchemaCache("testdb")
+        cache._schema = cached_schema
+        listener = MagicMock()
+        cache.add_listener(listener)
+
+        def fetch(query: str, *args):
+            if "table_comment" in query:
+                # users was altered, orders is re-fetched because it references users
+                return [
+                    {"table_schema": "public", "table_name": "orders",
+                     "table_comment": None, "estimated_row_count": 0},
+                    {"table_schema": "public", "table_name": "users",
+                     "table_comment": "Users", "estimated_row_count": 0},
+                ]
+            if "column_comment" in query:
+                return [
+                    {"table_schema": "public", "table_name": "users", "column_name": "email",
+                     "ordinal_position": 2, "data_type": "text", "is_nullable": True,
+                     "column_default": None, "column_comment": None},
+                ]
+            return []
 
-        with patch.object(service._pool, "close", new_callable=AsyncMock) as mock_close:
-            await service.close()
-            mock_close.assert_called_once()
+        mock_conn = AsyncMock()
+        mock_conn.fetch.side_effect = fetch
+
+        result = await cache.refresh_tables(mock_conn, {"public.users"})
+
+        scoped_names = {tuple(call.args[1]) for call in mock_conn.fetch.call_args_list}
+        assert scoped_names == {("public.orders", "public.users")}
+        assert all("ANY($1::text[])" in call.args[0] for call in mock_conn.fetch.call_args_list)
+        assert [t.name for t in result.tables] == ["orders", "users"]
+        assert result.tables[1].comment == "Users"
+        assert [c.name for c in result.tables[1].columns] == ["email"]
+        # The view was not touched; the orders FK is gone because it was not re-fetched
+        assert [v.name for v in result.views] == ["active_users"]
+        assert result.foreign_key_relations == []
+        assert cache.schema is result
+        assert cached_schema.tables[1].comment is None
+        listener.assert_called_once_with(result)
 
     @pytest.mark.asyncio
-    async def test_execute_query_success(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    async def test_refresh_tables_removes_dropped_relations(
+        self, cached_schema: DatabaseSchema
     ) -> None:
-        """Test successful query execution."""
-        service = DatabaseService(db_config, query_settings)
-        service._schema_cache._schema = sample_schema
-
+        """Test refresh_tables drops relations that no longer exist."""
+        cache = SchemaCache("testdb")
+        cache._schema = cached_schema
         mock_conn = AsyncMock()
-        mock_conn.fetch.return_value = [
-            {"id": 1, "name": "Alice"},
-            {"id": 2, "name": "Bob"},
-        ]
-        mock_conn.execute = AsyncMock()
-
-        with patch.object(service._pool, "acquire") as mock_acquire:
-            mock_acquire.return_value.__aenter__.return_value = mock_conn
-            mock_acquire.return_value.__aexit__.return_value = None
-            service._pool._pool = MagicMock()  # Mark as initialized
+        mock_conn.fetch.return_value = []
 
-            result = await service.execute_query("SELECT * FROM users")
+        result = await cache.refresh_tables(mock_conn, {"public.active_users"})
 
-            assert result.row_count == 2
-            assert result.columns == ["id", "name"]
-            assert result.execution_time_ms > 0
+        assert result.views == []
+        assert len(result.tables) == 2
+        assert result.foreign_key_relations == cached_schema.foreign_key_relations
 
     @pytest.mark.asyncio
-    async def test_execute_query_auto_limit(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
-    ) -> None:
-        """Test that LIMIT is automatically added."""
-        service = DatabaseService(db_config, query_settings)
-        service._schema_cache._schema = sample_schema
-
+    async def test_refresh_tables_without_cache_does_full_refresh(self) -> None:
+        """Test refresh_tables falls back to a full refresh when nothing is cached."""
+        cache = SchemaCache("testdb")
         mock_conn = AsyncMock()
         mock_conn.fetch.return_value = []
-        mock_conn.execute = AsyncMock()
 
-        with patch.object(service._pool, "acquire") as mock_acquire:
-            mock_acquire.return_value.__aenter__.return_value = mock_conn
-            mock_acquire.return_value.__aexit__.return_value = None
-            service._pool._pool = MagicMock()
+        await cache.refresh_tables(mock_conn, {"public.users"})
 
-            await service.execute_query("SELECT * FROM users")
+        assert mock_conn.fetch.call_count == len(cache.queries)
+        assert all(len(call.args) == 1 for call in mock_conn.fetch.call_args_list)
 
-            # Check that LIMIT was added
-            called_sql = mock_conn.fetch.call_args[0][0]
-            assert "LIMIT" in called_sql
+    @pytest.fixture
+    def watcher_parts(self) -> tuple[MagicMock, MagicMock, AsyncMock]:
+        """Mock pool, schema cache and connection for a SchemaWatcher."""
+        mock_conn = AsyncMock()
 
-    @pytest.mark.asyncio
-    async def test_execute_query_preserves_existing_limit(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
-    ) -> None:
-        """Test that existing LIMIT is preserved."""
-        service = DatabaseService(db_config, query_settings)
-        service._schema_cache._schema = sample_schema
+        @asynccontextmanager
+        async def acquire():
+            yield mock_conn
 
-        mock_conn = AsyncMock()
-        mock_conn.fetch.return_value = []
-        mock_conn.execute = AsyncMock()
+        pool = MagicMock()
+        pool.acquire = acquire
+        cache = MagicMock()
+        cache.database_name = "testdb"
+        cache.refresh_tables = AsyncMock()
+        return pool, cache, mock_conn
 
-        with patch.object(service._pool, "acquire") as mock_acquire:
-            mock_acquire.return_value.__aenter__.return_value = mock_conn
-            mock_acquire.return_value.__aexit__.return_value = None
-            service._pool._pool = MagicMock()
+    @pytest.mark.asyncio
+    async def test_watcher_refreshes_only_changed_tables(self, watcher_parts) -> None:
+        """Test a poll re-introspects only relations whose signature changed."""
+        pool, cache, mock_conn = watcher_parts
+        cache.fetch_signatures = AsyncMock(
+            side_effect=[
+                CatalogSignatures(tables={"public.users": "1", "public.orders": "1"}, enums="e"),
+                CatalogSignatures(tables={"public.users": "2", "public.orders": "1"}, enums="e"),
+                CatalogSignatures(tables={"public.users": "2", "public.orders": "1"}, enums="e"),
+            ]
+        )
+        watcher = SchemaWatcher(pool, cache, interval=10)
 
-            await service.execute_query("SELECT * FROM users LIMIT 10")
+        await watcher.capture_baseline(mock_conn)
+        assert await watcher.check() == {"public.users"}
+        cache.refresh_tables.assert_called_once_with(mock_conn, {"public.users"}, False)
 
-            # Check that original LIMIT is preserved
-            called_sql = mock_conn.fetch.call_args[0][0]
-            assert "LIMIT 10" in called_sql
-            assert called_sql.count("LIMIT") == 1
+        assert await watcher.check() == set()
+        cache.refresh_tables.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_execute_query_empty_result(
-        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
-    ) -> None:
-        """Test query with empty result."""
-        service = DatabaseService(db_config, query_settings)
-        service._schema_cache._schema = sample_schema
+    async def test_watcher_detects_enum_changes(self, watcher_parts) -> None:
+        """Test an enum change triggers an enum refresh."""
+        pool, cache, mock_conn = watcher_parts
+        cache.fetch_signatures = AsyncMock(
+            side_effect=[
+                CatalogSignatures(tables={"public.users": "1"}, enums="e1"),
+                CatalogSignatures(tables={"public.users": "1"}, enums="e2"),
+            ]
+        )
+        watcher = SchemaWatcher(pool, cache, interval=10)
 
-        mock_conn = AsyncMock()
-        mock_conn.fetch.return_value = []
-        mock_conn.execute = AsyncMock()
+        await watcher.capture_baseline(mock_conn)
+        await watcher.check()
 
-        with patch.object(service._pool, "acquire") as mock_acquire:
-            mock_acquire.return_value.__aenter__.return_value = mock_conn
-            mock_acquire.return_value.__aexit__.return_value = None
-            service._pool._pool = MagicMock()
+        cache.refresh_tables.assert_called_once_with(mock_conn, set(), True)
 
-            result = await service.execute_query("SELECT * FROM users WHERE id = 999")
+    @pytest.mark.asyncio
+    async def test_watcher_skips_signatures_when_ddl_log_unchanged(self, watcher_parts) -> None:
+        """Test the DDL log table gates the signature query."""
+        pool, cache, mock_conn = watcher_parts
+        cache.fetch_signatures = AsyncMock(return_value=CatalogSignatures())
+        mock_conn.fetchval.side_effect = [5, 5, 6]
+        watcher = SchemaWatcher(pool, cache, interval=10, ddl_log_table="public.ddl_log")
 
-            assert result.row_count == 0
-            assert result.columns == []
-            assert result.rows == []
+        await watcher.capture_baseline(mock_conn)
+        await watcher.check()
+        assert cache.fetch_signatures.call_count == 1
+
+        await watcher.check()
+        assert cache.fetch_signatures.call_count == 2
+        assert "public.ddl_log" in mock_conn.fetchval.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_watcher_falls_back_when_ddl_log_missing(self, watcher_parts) -> None:
+        """Test a missing DDL log table falls back to signature polling."""
+        import asyncpg
+
+        pool, cache, mock_conn = watcher_parts
+        cache.fetch_signatures = AsyncMock(return_value=CatalogSignatures())
+        mock_conn.fetchval.side_effect = asyncpg.UndefinedTableError("missing")
+        watcher = SchemaWatcher(pool, cache, interval=10, ddl_log_table="ddl_log")
+
+        await watcher.capture_baseline(mock_conn)
+
+        assert watcher.ddl_log_table is None
+        cache.fetch_signatures.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_watcher_start_stop(self, watcher_parts) -> None:
+        """Test the background task polls and stops cleanly."""
+        pool, cache, mock_conn = watcher_parts
+        cache.fetch_signatures = AsyncMock(return_value=CatalogSignatures())
+        watcher = SchemaWatcher(pool, cache, interval=0.01)
+
+        watcher.start()
+        assert watcher.is_running
+        await asyncio.sleep(0.05)
+        await watcher.stop()
+
+        assert not watcher.is_running
+        assert cache.fetch_signatures.call_count >= 1
+
+
+class TestSchemaSnapshotStore:
+    """Tests for SchemaSnapshotStore."""
+
+    @pytest.fixture
+    def schema(self) -> DatabaseSchema:
+        """Schema to snapshot."""
+        return DatabaseSchema(
+            database_name="testdb",
+            tables=[
+                TableInfo(
+                    name="users",
+                    columns=[ColumnInfo(name="id", data_type="integer", is_primary_key=True)],
+                    comment="用户表",
+                ),
+            ],
+        )
+
+    def test_save_and_load(self, tmp_path, schema: DatabaseSchema) -> None:
+        """Test a saved snapshot loads back with its fingerprint."""
+        store = SchemaSnapshotStore(tmp_path / "snapshots")
+
+        path = store.save("main", "localhost:5432/testdb", schema, "abc")
+        snapshot = store.load("main", "localhost:5432/testdb")
+
+        assert path.name == "main.schema.json.gz"
+        assert snapshot is not None
+        assert snapshot.schema == schema
+        assert snapshot.fingerprint == "abc"
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_load_missing(self, tmp_path) -> None:
+        """Test loading a missing snapshot returns None."""
+        assert SchemaSnapshotStore(tmp_path).load("main", "localhost:5432/testdb") is None
+
+    def test_load_other_target(self, tmp_path, schema: DatabaseSchema) -> None:
+        """Test a snapshot from a different database is ignored."""
+        store = SchemaSnapshotStore(tmp_path)
+        store.save("main", "localhost:5432/testdb", schema, "abc")
+
+        assert store.load("main", "otherhost:5432/testdb") is None
+
+    def test_load_other_format_version(self, tmp_path, schema: DatabaseSchema) -> None:
+        """Test a snapshot with an unknown format version is ignored."""
+        import gzip
+        import json
+
+        store = SchemaSnapshotStore(tmp_path)
+        path = store.save("main", "localhost:5432/testdb", schema, "abc")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        payload["format_version"] = 999
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+        assert store.load("main", "localhost:5432/testdb") is None
+
+    def test_load_corrupt(self, tmp_path) -> None:
+        """Test a corrupt snapshot is ignored."""
+        store = SchemaSnapshotStore(tmp_path)
+        store.path_for("main").write_bytes(b"not gzip")
+
+        assert store.load("main", "localhost:5432/testdb") is None
+
+    def test_path_for_sanitizes_name(self, tmp_path) -> None:
+        """Test database aliases cannot escape the snapshot directory."""
+        path = SchemaSnapshotStore(tmp_path).path_for("../etc/passwd")
+
+        assert path.parent == tmp_path
+
+
+class TestColumnProfiler:
+    """Tests for column value profiling from pg_stats."""
+
+    @pytest.fixture
+    def schema(self) -> DatabaseSchema:
+        """Schema with an orders table."""
+        return DatabaseSchema(
+            database_name="testdb",
+            tables=[
+                TableInfo(
+                    schema_name="public",
+                    name="orders",
+                    columns=[
+                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
+                        ColumnInfo(name="status", data_type="varchar"),
+                    ],
+                ),
+            ],
+        )
+
+    @staticmethod
+    def _stats_row(**overrides) -> dict:
+        """Build a row of the column statistics query."""
+        row = {
+            "table_schema": "public",
+            "table_name": "orders",
+            "column_name": "status",
+            "null_frac": 0.05,
+            "distinct_count": 3,
+            "most_common_values": ["paid", "open", "cancelled"],
+            "most_common_frequencies": [0.6, 0.3, 0.05],
+        }
+        row.update(overrides)
+        return row
+
+    def test_build_column_stats(self) -> None:
+        """Test pg_stats rows become compact per-column statistics."""
+        long_value = "x" * 100
+        stats = build_column_stats(
+            [
+                self._stats_row(),
+                self._stats_row(
+                    column_name="note",
+                    most_common_values=[long_value, "a", "b"],
+                    most_common_frequencies=[0.123456, 0.1, 0.1],
+                ),
+            ],
+            max_values=2,
+        )
+
+        assert stats["public.orders"]["status"] == ColumnStats(
+            null_fraction=0.05,
+            distinct_count=3,
+            most_common_values=["paid", "open"],
+            most_common_frequencies=[0.6, 0.3],
+        )
+        note = stats["public.orders"]["note"]
+        assert note.most_common_values[0] == "x" * 60 + "…"
+        assert note.most_common_frequencies == [0.1235, 0.1]
+
+    @pytest.mark.asyncio
+    async def test_profile_attaches_stats(self, schema: DatabaseSchema) -> None:
+        """Test a profile reads pg_stats once and shows the values in the LLM context."""
+        cache = SchemaCache("testdb")
+        cache.restore(schema)
+        mock_conn = AsyncMock()
+        mock_conn.fetch.return_value = [self._stats_row()]
+
+        @asynccontextmanager
+        async def acquire():
+            yield mock_conn
+
+        pool = MagicMock()
+        pool.acquire = acquire
+        profiler = ColumnProfiler(pool, cache, interval=60, max_distinct=20)
+
+        await profiler.profile()
+
+        mock_conn.fetch.assert_called_once_with(COLUMN_STATS_QUERY, 20)
+        assert "pg_stats" in COLUMN_STATS_QUERY
+        status = cache.schema.tables[0].columns[1]
+        assert status.stats.most_common_values == ["paid", "open", "cancelled"]
+        assert cache.schema.tables[0].columns[0].stats is None
+        assert (
+            "- status: 'paid' 60%, 'open' 30%, 'cancelled' 5% (~3 distinct, 5% NULL)"
+            in cache.get_llm_context()
+        )
+
+    @pytest.mark.asyncio
+    async def test_unchanged_profile_keeps_version(self, schema: DatabaseSchema) -> None:
+        """Test the schema version only changes when the statistics do."""
+        cache = SchemaCache("testdb")
+        cache.restore(schema)
+        stats = build_column_stats([self._stats_row()], max_values=10)
+
+        assert await cache.update_column_stats(stats) is True
+        version = cache.version
+        assert await cache.update_column_stats(build_column_stats([self._stats_row()], 10)) is False
+        assert cache.version == version
+
+        assert await cache.update_column_stats({}) is True
+        assert cache.schema.tables[0].columns[1].stats is None
+
+    @pytest.mark.asyncio
+    async def test_stats_survive_schema_refresh(self, schema: DatabaseSchema) -> None:
+        """Test the latest profile is attached to schemas loaded afterwards."""
+        cache = SchemaCache("testdb")
+        await cache.update_column_stats(build_column_stats([self._stats_row()], 10))
+
+        cache.restore(schema)
+
+        assert cache.schema.tables[0].columns[1].stats is not None
+        assert schema.tables[0].columns[1].stats is None
+
+    @pytest.mark.asyncio
+    async def test_failed_profile_keeps_running(self, schema: DatabaseSchema) -> None:
+        """Test the background task logs failures and stops cleanly."""
+        cache = SchemaCache("testdb")
+        profiler = ColumnProfiler(MagicMock(), cache, interval=60)
+
+        with patch.object(
+            profiler, "profile", new_callable=AsyncMock, side_effect=RuntimeError("boom")
+        ) as mock_profile:
+            profiler.start()
+            await asyncio.sleep(0)
+            assert profiler.is_running
+            await profiler.stop()
+
+        mock_profile.assert_called_once()
+        assert not profiler.is_running
+
+
+class TestNormalizeSql:
+    """Tests for normalize_sql."""
+
+    def test_collapses_whitespace(self) -> None:
+        """Test whitespace runs and trailing semicolons are removed."""
+        assert normalize_sql("  SELECT *\n\tFROM users ;\n") == "SELECT * FROM users"
+
+    def test_preserves_literals(self) -> None:
+        """Test whitespace inside literals and quoted identifiers is kept."""
+        sql = """SELECT "my  col" FROM t WHERE a = 'x  y' AND b = $$p  q$$"""
+
+        assert normalize_sql(sql) == sql
+
+    def test_preserves_escape_strings(self) -> None:
+        """Test an escaped quote does not end an E-string, so its whitespace is kept."""
+        sql = "SELECT * FROM t WHERE a = E'it\\'s  here' AND b = e'x  \\\\' AND c = 'd  e'"
+
+        assert normalize_sql(sql) == sql
+        assert normalize_sql("SELECT  E'a\\'  b'  ,  1") == "SELECT E'a\\'  b' , 1"
+
+    def test_preserves_line_comments(self) -> None:
+        """Test line comments keep their newline so the next line is not commented out."""
+        assert normalize_sql("SELECT 1 -- one\n  , 2") == "SELECT 1 -- one\n , 2"
+
+
+class TestApplyRowLimit:
+    """Tests for apply_row_limit."""
+
+    def test_adds_missing_limit(self) -> None:
+        """Test a LIMIT is appended to an unbounded query."""
+        assert apply_row_limit("SELECT * FROM users", 100) == "SELECT * FROM users LIMIT 100"
+
+    def test_keeps_smaller_limit(self) -> None:
+        """Test a LIMIT within the cap is kept as written."""
+        sql = "SELECT * FROM users LIMIT 10 OFFSET 5"
+
+        assert apply_row_limit(sql, 100) == sql
+
+    def test_caps_larger_limit(self) -> None:
+        """Test a LIMIT above the cap is lowered."""
+        assert apply_row_limit("SELECT * FROM users LIMIT 5000", 100) == (
+            "SELECT * FROM users LIMIT 100"
+        )
+
+    def test_caps_fetch_first(self) -> None:
+        """Test FETCH FIRST counts as a limit."""
+        assert apply_row_limit("SELECT * FROM users FETCH FIRST 5 ROWS ONLY", 100).endswith(
+            "FETCH FIRST 5 ROWS ONLY"
+        )
+        assert apply_row_limit("SELECT * FROM users FETCH FIRST 500 ROWS ONLY", 100) == (
+            "SELECT * FROM users LIMIT 100"
+        )
+
+    def test_inner_limit_does_not_count(self) -> None:
+        """Test a LIMIT in a subquery or a column name does not bound the outer query."""
+        sql = "SELECT limit_date FROM (SELECT * FROM events LIMIT 3) AS e UNION ALL SELECT now()"
+
+        assert apply_row_limit(sql, 100).endswith(" LIMIT 100")
+        assert apply_row_limit("SELECT limit_date FROM events", 100).endswith(" LIMIT 100")
+
+    def test_wraps_non_literal_limit(self) -> None:
+        """Test LIMIT ALL is bounded by wrapping the query."""
+        assert apply_row_limit("SELECT * FROM users LIMIT ALL", 100) == (
+            "SELECT * FROM (SELECT * FROM users LIMIT ALL) AS _pg_mcp_limited LIMIT 100"
+        )
+
+    def test_trailing_comment(self) -> None:
+        """Test the LIMIT is not swallowed by a trailing line comment."""
+        result = apply_row_limit("SELECT * FROM users -- all users", 100)
+
+        assert result.endswith(" LIMIT 100")
+        assert "--" not in result
+
+    def test_uses_given_statement(self) -> None:
+        """Test a parsed statement is used instead of parsing the SQL again."""
+        statement = SQLValidator().validate_statement("SELECT * FROM users").expression
+
+        with patch("pg_mcp.database.service.sqlglot.parse_one") as mock_parse:
+            result = apply_row_limit("SELECT * FROM users", 100, statement)
+
+        mock_parse.assert_not_called()
+        assert result == "SELECT * FROM users LIMIT 100"
+        assert statement.args.get("limit") is None
+
+
+class TestDatabaseService:
+    """Tests for DatabaseService."""
+
+    @pytest.fixture
+    def db_config(self) -> DatabaseConfig:
+        """Create database configuration."""
+        return DatabaseConfig(
+            name="test_db",
+            host="localhost",
+            port=5432,
+            database="testdb",
+            user="testuser",
+            password="testpass",
+        )
+
+    @pytest.fixture
+    def query_settings(self) -> QuerySettings:
+        """Create query settings."""
+        return QuerySettings(
+            default_limit=100,
+            statement_timeout=30000,
+            enable_validation=True,
+        )
+
+    @pytest.fixture
+    def sample_schema(self) -> DatabaseSchema:
+        """Create sample schema."""
+        return DatabaseSchema(
+            database_name="testdb",
+            tables=[
+                TableInfo(
+                    schema_name="public",
+                    name="users",
+                    columns=[
+                        ColumnInfo(name="id", data_type="integer", is_primary_key=True),
+                        ColumnInfo(name="name", data_type="varchar"),
+                    ],
+                ),
+            ],
+        )
+
+    def test_service_init(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings
+    ) -> None:
+        """Test DatabaseService initialization."""
+        service = DatabaseService(db_config, query_settings)
+        assert service.config == db_config
+        assert service.query_settings == query_settings
+
+    def test_service_init_introspection_setting(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings
+    ) -> None:
+        """Test DatabaseService passes the introspection backend to the schema cache."""
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(introspection="pg_catalog")
+        )
+        assert service._schema_cache.queries is PG_CATALOG_QUERIES
+
+    def test_schema_property_before_init(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings
+    ) -> None:
+        """Test accessing schema before initialization raises error."""
+        service = DatabaseService(db_config, query_settings)
+
+        with pytest.raises(RuntimeError) as exc:
+            _ = service.schema
+        assert "initialize" in str(exc.value).lower()
+
+    @pytest.mark.asyncio
+    async def test_service_initialize(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test DatabaseService.initialize()."""
+        service = DatabaseService(db_config, query_settings)
+
+        with patch.object(service._pool, "initialize", new_callable=AsyncMock) as mock_pool_init:
+            with patch.object(service, "refresh_schema", new_callable=AsyncMock) as mock_refresh:
+                mock_refresh.return_value = sample_schema
+
+                await service.initialize()
+
+                mock_pool_init.assert_called_once()
+                mock_refresh.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_service_close(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings
+    ) -> None:
+        """Test DatabaseService.close()."""
+        service = DatabaseService(db_config, query_settings)
+
+        with patch.object(service._pool, "close", new_callable=AsyncMock) as mock_close:
+            await service.close()
+            mock_close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_execute_query_on_replica(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test queries are routed to the replicas when configured."""
+        db_config = db_config.model_copy(update={"replicas": [ReplicaConfig(host="replica")]})
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        replica_conn = _query_conn()
+        replica_conn.fetch.return_value = [{"id": 1}]
+        replica_conn.is_closed = MagicMock(return_value=False)
+
+        @asynccontextmanager
+        async def replica_acquire():
+            yield replica_conn
+
+        replica = service._replicas._replicas[0]
+        replica.healthy = True
+        with patch.object(replica.pool, "acquire", replica_acquire):
+            with patch.object(service._pool, "acquire") as primary_acquire:
+                result = await service.execute_query("SELECT id FROM users")
+
+        assert result.rows == [[1]]
+        replica_conn.fetch.assert_called_once()
+        primary_acquire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_query_retried_after_lost_replica(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a query whose replica connection is lost is retried on the primary."""
+        db_config = db_config.model_copy(update={"replicas": [ReplicaConfig(host="replica")]})
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        replica_conn = _query_conn()
+        replica_conn.fetch.side_effect = asyncpg.ConnectionDoesNotExistError("connection lost")
+        replica_conn.is_closed = MagicMock(return_value=True)
+        primary_conn = _query_conn()
+        primary_conn.fetch.return_value = [{"id": 1}]
+
+        @asynccontextmanager
+        async def replica_acquire():
+            yield replica_conn
+
+        @asynccontextmanager
+        async def primary_acquire():
+            yield primary_conn
+
+        replica = service._replicas._replicas[0]
+        replica.healthy = True
+        with patch.object(replica.pool, "acquire", replica_acquire), patch.object(
+            service._pool, "acquire", primary_acquire
+        ):
+            result = await service.execute_query("SELECT id FROM users")
+
+            assert result.rows == [[1]]
+            assert replica.healthy is False
+
+            # The retry is bounded: a second loss is reported to the caller
+            primary_conn.fetch.side_effect = asyncpg.ConnectionDoesNotExistError("lost again")
+            with pytest.raises(SQLExecutionError) as exc:
+                await service.execute_query("SELECT id FROM users")
+            assert exc.value.statement_error is False
+
+    @pytest.mark.asyncio
+    async def test_execute_query_timeout_not_retried(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a query that hits command_timeout on a replica is not run again."""
+        db_config = db_config.model_copy(update={"replicas": [ReplicaConfig(host="replica")]})
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        replica_conn = _query_conn()
+        replica_conn.fetch.side_effect = asyncio.TimeoutError()
+        replica_conn.is_closed = MagicMock(return_value=False)
+        primary_conn = _query_conn()
+
+        @asynccontextmanager
+        async def replica_acquire():
+            yield replica_conn
+
+        @asynccontextmanager
+        async def primary_acquire():
+            yield primary_conn
+
+        replica = service._replicas._replicas[0]
+        replica.healthy = True
+        with patch.object(replica.pool, "acquire", replica_acquire), patch.object(
+            service._pool, "acquire", primary_acquire
+        ):
+            with pytest.raises(SQLExecutionError):
+                await service.execute_query("SELECT id FROM users")
+
+        assert replica_conn.fetch.await_count == 1
+        primary_conn.fetch.assert_not_awaited()
+        assert replica.healthy is True
+
+    @pytest.mark.asyncio
+    async def test_execute_query_success(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test successful query execution."""
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = [
+            {"id": 1, "name": "Alice"},
+            {"id": 2, "name": "Bob"},
+        ]
+        mock_conn.execute = AsyncMock()
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+            service._pool._pool = MagicMock()  # Mark as initialized
+
+            result = await service.execute_query("SELECT * FROM users")
+
+            assert result.row_count == 2
+            assert result.columns == ["id", "name"]
+            assert result.execution_time_ms > 0
+
+    @pytest.mark.asyncio
+    async def test_execute_query_auto_limit(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test that LIMIT is automatically added."""
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = []
+        mock_conn.execute = AsyncMock()
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+            service._pool._pool = MagicMock()
+
+            await service.execute_query("SELECT * FROM users")
+
+            # Check that LIMIT was added
+            called_sql = mock_conn.fetch.call_args[0][0]
+            assert "LIMIT" in called_sql
+
+    @pytest.mark.asyncio
+    async def test_execute_query_preserves_existing_limit(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test that existing LIMIT is preserved."""
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = []
+        mock_conn.execute = AsyncMock()
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+            service._pool._pool = MagicMock()
+
+            await service.execute_query("SELECT * FROM users LIMIT 10")
+
+            # Check that original LIMIT is preserved
+            called_sql = mock_conn.fetch.call_args[0][0]
+            assert "LIMIT 10" in called_sql
+            assert called_sql.count("LIMIT") == 1
+
+    @pytest.mark.asyncio
+    async def test_execute_query_empty_result(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test query with empty result."""
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = []
+        mock_conn.execute = AsyncMock()
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+            service._pool._pool = MagicMock()
+
+            result = await service.execute_query("SELECT * FROM users WHERE id = 999")
+
+            assert result.row_count == 0
+            assert result.columns == []
+            assert result.rows == []
+
+    @pytest.mark.asyncio
+    async def test_execute_query_local_timeout(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test queries run with a transaction-local timeout and normalized text."""
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = []
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            await service.execute_query("SELECT *\n  FROM users\n WHERE name = 'a  b';")
+            await service.execute_query("SELECT * FROM users WHERE name = 'a  b'")
+
+        assert mock_conn.transaction.call_args_list == [call(readonly=True)] * 2
+        assert mock_conn.execute.call_args_list == [
+            call(f"SET LOCAL statement_timeout = {query_settings.statement_timeout}")
+        ] * 2
+        first, second = (call.args[0] for call in mock_conn.fetch.call_args_list)
+        assert first == second == "SELECT * FROM users WHERE name = 'a  b' LIMIT 100"
+
+    @pytest.mark.asyncio
+    async def test_execute_query_result_byte_budget(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test rows beyond the byte budget are dropped and reported."""
+        service = DatabaseService(db_config, QuerySettings(max_result_bytes=40))
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = [{"id": i, "name": "用户"} for i in range(10)]
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM users")
+
+        # Each row encodes to [i,"用户"] = 12 bytes plus a separator
+        assert result.rows == [[0, "用户"], [1, "用户"]]
+        assert result.row_count == 2
+        assert result.truncated is True
+
+    @pytest.mark.asyncio
+    async def test_execute_query_no_byte_budget_by_default(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test results are neither truncated nor size-encoded without a byte budget."""
+        service = DatabaseService(db_config, QuerySettings())
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = [{"id": i, "name": "用户" * 1000} for i in range(100)]
+
+        with patch.object(service._pool, "acquire") as mock_acquire, patch(
+            "pg_mcp.database.service._ROW_ENCODER"
+        ) as mock_encoder:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM users")
+
+        assert result.row_count == 100
+        assert result.truncated is False
+        mock_encoder.encode.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_query_streaming(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test streaming fetches cursor batches until the result is exhausted."""
+        service = DatabaseService(
+            db_config, QuerySettings(stream_results=True, stream_batch_size=2)
+        )
+        service._schema_cache._schema = sample_schema
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetch = AsyncMock(
+            side_effect=[
+                [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}],
+                [{"id": 3, "name": "Carol"}],
+            ]
+        )
+        mock_conn = _query_conn()
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM users")
+
+        mock_conn.transaction.assert_called_once_with(readonly=True)
+        mock_conn.cursor.assert_called_once_with("SELECT * FROM users LIMIT 100")
+        mock_conn.fetch.assert_not_called()
+        assert mock_cursor.fetch.call_count == 2
+        assert result.columns == ["id", "name"]
+        assert result.rows == [[1, "Alice"], [2, "Bob"], [3, "Carol"]]
+        assert result.truncated is False
+
+    @pytest.mark.asyncio
+    async def test_execute_query_streaming_empty_result(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test an empty streamed result still reports its columns."""
+        service = DatabaseService(db_config, QuerySettings(stream_results=True))
+        service._schema_cache._schema = sample_schema
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetch = AsyncMock(return_value=[])
+        attributes = [MagicMock(), MagicMock()]
+        attributes[0].name, attributes[1].name = "id", "name"
+        mock_prepared = MagicMock()
+        mock_prepared.get_attributes.return_value = attributes
+        mock_conn = _query_conn()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_conn.prepare.return_value = mock_prepared
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM users WHERE id = 999")
+
+        mock_conn.prepare.assert_awaited_once_with("SELECT * FROM users WHERE id = 999 LIMIT 100")
+        assert result.columns == ["id", "name"]
+        assert result.rows == []
+        assert result.row_count == 0
+
+    @pytest.mark.asyncio
+    async def test_execute_query_streaming_stops_at_budget(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test streaming stops fetching once the byte budget is spent."""
+        service = DatabaseService(
+            db_config,
+            QuerySettings(stream_results=True, stream_batch_size=2, max_result_bytes=20),
+        )
+        service._schema_cache._schema = sample_schema
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetch = AsyncMock(
+            return_value=[{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}]
+        )
+        mock_conn = _query_conn()
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM users")
+
+        mock_cursor.fetch.assert_called_once()
+        assert result.rows == [[1, "Alice"]]
+        assert result.truncated is True
+
+    @pytest.mark.asyncio
+    async def test_execute_query_columnar(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test the columnar format encodes the records column by column."""
+        service = DatabaseService(db_config, QuerySettings(result_format="columnar"))
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = [
+            {"id": i, "status": ("paid", "open")[i % 2]} for i in range(1, 5)
+        ]
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM orders")
+
+        assert result.format == "columnar"
+        assert result.rows == []
+        assert result.row_count == 4
+        assert result.column_data == [
+            {"name": "id", "type": "int", "encoding": "range", "start": 1, "step": 1},
+            {
+                "name": "status",
+                "type": "text",
+                "encoding": "dict",
+                "dictionary": ["open", "paid"],
+                "values": [0, 1, 0, 1],
+            },
+        ]
+        assert result.head(2) == [[1, "open"], [2, "paid"]]
+
+    @pytest.mark.asyncio
+    async def test_execute_query_columnar_byte_budget(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test the byte budget applies to the encoded columns."""
+        service = DatabaseService(
+            db_config, QuerySettings(result_format="columnar", max_result_bytes=80)
+        )
+        service._schema_cache._schema = sample_schema
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = [{"name": f"user{i}"} for i in range(20)]
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT name FROM users")
+
+        # The column object costs 61 bytes plus 8 per name ("userN",)
+        assert result.truncated is True
+        assert result.row_count == 2
+        assert result.head(20) == [["user0"], ["user1"]]
+        encoded = json.dumps(result.column_data, ensure_ascii=False, separators=(",", ":"))
+        assert len(encoded.encode()) <= 80
+
+    @pytest.mark.asyncio
+    async def test_execute_query_columnar_streaming(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test streamed batches are encoded into one set of columns."""
+        service = DatabaseService(
+            db_config,
+            QuerySettings(result_format="columnar", stream_results=True, stream_batch_size=2),
+        )
+        service._schema_cache._schema = sample_schema
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetch = AsyncMock(
+            side_effect=[
+                [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}],
+                [{"id": 3, "name": "Carol"}],
+            ]
+        )
+        mock_conn = _query_conn()
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            result = await service.execute_query("SELECT * FROM users")
+
+        assert result.row_count == 3
+        assert result.column_data[0] == {
+            "name": "id", "type": "int", "encoding": "range", "start": 1, "step": 1
+        }
+        assert result.head(3) == [[1, "Alice"], [2, "Bob"], [3, "Carol"]]
+
+    @staticmethod
+    def _explain(cost: float, rows: int) -> str:
+        """Build EXPLAIN (FORMAT JSON) output with the given estimates."""
+        return json.dumps([{"Plan": {"Node Type": "Seq Scan", "Total Cost": cost, "Plan Rows": rows}}])
+
+    @pytest.mark.asyncio
+    async def test_execute_query_cost_guard_disabled_by_default(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test queries are not planned when no cost or row limit is set."""
+        service = DatabaseService(db_config, query_settings)
+        service._schema_cache.restore(sample_schema)
+
+        mock_conn = _query_conn()
+        mock_conn.fetch.return_value = []
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            await service.execute_query("SELECT * FROM users")
+
+        mock_conn.fetchval.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_query_rejects_expensive_plan(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a query over the cost or row limit is rejected without running it."""
+        service = DatabaseService(
+            db_config, QuerySettings(max_estimated_cost=1000, max_estimated_rows=10000)
+        )
+        service._schema_cache.restore(sample_schema)
+
+        mock_conn = _query_conn()
+        mock_conn.fetchval.side_effect = [self._explain(5000, 10), self._explain(10, 50000)]
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            with pytest.raises(QueryTooExpensiveError) as cost_exc:
+                await service.execute_query("SELECT * FROM users")
+            with pytest.raises(QueryTooExpensiveError) as rows_exc:
+                await service.execute_query("SELECT * FROM users ORDER BY name")
+
+        assert "5,000" in cost_exc.value.reason
+        assert "50,000" in rows_exc.value.reason
+        assert mock_conn.fetchval.call_args_list[0].args[0] == (
+            "EXPLAIN (FORMAT JSON) SELECT * FROM users LIMIT 100"
+        )
+        mock_conn.fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_query_caches_plan_estimate(
+        self, db_config: DatabaseConfig, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a repeated query is planned once until the schema is refreshed."""
+        service = DatabaseService(db_config, QuerySettings(max_estimated_cost=1000))
+        service._schema_cache.restore(sample_schema)
+
+        mock_conn = _query_conn()
+        mock_conn.fetchval.return_value = self._explain(10, 1)
+        mock_conn.fetch.return_value = [{"id": 1}]
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            await service.execute_query("SELECT id FROM users")
+            await service.execute_query("SELECT id FROM users")
+            assert mock_conn.fetchval.call_count == 1
+
+            service._schema_cache.restore(sample_schema)
+            await service.execute_query("SELECT id FROM users")
+
+        assert mock_conn.fetchval.call_count == 2
+        assert mock_conn.fetch.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_execute_query_rejects_cross_join_from_row_counts(
+        self, db_config: DatabaseConfig
+    ) -> None:
+        """Test a cross join of large tables is rejected from the cached row counts alone."""
+        schema = DatabaseSchema(
+            database_name="testdb",
+            tables=[
+                TableInfo(schema_name="public", name="users", estimated_row_count=20000),
+                TableInfo(schema_name="public", name="orders", estimated_row_count=100000),
+            ],
+        )
+        service = DatabaseService(db_config, QuerySettings(max_estimated_rows=1_000_000))
+        service._schema_cache.restore(schema)
+        sql = "SELECT COUNT(*) FROM users CROSS JOIN orders"
+        statement = SQLValidator().validate_statement(sql).expression
+
+        mock_conn = _query_conn()
+
+        with patch.object(service._pool, "acquire") as mock_acquire:
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+
+            with pytest.raises(QueryTooExpensiveError) as exc:
+                await service.execute_query(sql, statement=statement)
+
+        assert "2,000,000,000" in exc.value.reason
+        mock_conn.fetchval.assert_not_called()
+        mock_conn.fetch.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_execute_query_timeout(
@@ -407,7 +1843,7 @@ class TestDatabaseService:
         service = DatabaseService(db_config, query_settings)
         service._schema_cache._schema = sample_schema
 
-        mock_conn = AsyncMock()
+        mock_conn = _query_conn()
         mock_conn.execute = AsyncMock()
         mock_conn.fetch.side_effect = asyncpg.QueryCanceledError("timeout")
 
@@ -429,7 +1865,7 @@ class TestDatabaseService:
         service = DatabaseService(db_config, query_settings)
         service._schema_cache._schema = sample_schema
 
-        mock_conn = AsyncMock()
+        mock_conn = _query_conn()
         mock_conn.execute = AsyncMock()
         mock_conn.fetch.side_effect = asyncpg.PostgresError("relation does not exist")
 
@@ -438,8 +1874,15 @@ class TestDatabaseService:
             mock_acquire.return_value.__aexit__.return_value = None
             service._pool._pool = MagicMock()
 
-            with pytest.raises(SQLExecutionError):
+            with pytest.raises(SQLExecutionError) as exc:
+                await service.execute_query("SELECT * FROM nonexistent")
+            assert exc.value.statement_error is True
+
+            # Errors about the connection rather than the statement
+            mock_conn.fetch.side_effect = asyncpg.ConnectionFailureError("connection lost")
+            with pytest.raises(SQLExecutionError) as exc:
                 await service.execute_query("SELECT * FROM nonexistent")
+            assert exc.value.statement_error is False
 
     @pytest.mark.asyncio
     async def test_execute_query_unexpected_error(
@@ -449,7 +1892,7 @@ class TestDatabaseService:
         service = DatabaseService(db_config, query_settings)
         service._schema_cache._schema = sample_schema
 
-        mock_conn = AsyncMock()
+        mock_conn = _query_conn()
         mock_conn.execute = AsyncMock()
         mock_conn.fetch.side_effect = RuntimeError("Unexpected error")
 
@@ -461,6 +1904,7 @@ class TestDatabaseService:
             with pytest.raises(SQLExecutionError) as exc:
                 await service.execute_query("SELECT * FROM users")
             assert "Unexpected" in str(exc.value)
+            assert exc.value.statement_error is False
 
     def test_get_table_names(
         self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
@@ -481,7 +1925,7 @@ class TestDatabaseService:
         """Test schema refresh."""
         service = DatabaseService(db_config, query_settings)
 
-        mock_conn = AsyncMock()
+        mock_conn = _query_conn()
 
         with patch.object(service._pool, "acquire") as mock_acquire:
             with patch.object(service._schema_cache, "refresh", new_callable=AsyncMock) as mock_refresh:
@@ -494,3 +1938,295 @@ class TestDatabaseService:
 
                 assert result == sample_schema
                 mock_refresh.assert_called_once_with(mock_conn)
+
+    @pytest.mark.asyncio
+    async def test_service_schema_watcher(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test the schema watcher captures a baseline and runs between initialize and close."""
+        service = DatabaseService(db_config, query_settings, SchemaSettings(watch_interval=60))
+        watcher = service._schema_watcher
+        assert watcher is not None
+
+        mock_conn = _query_conn()
+        with (
+            patch.object(service._pool, "initialize", new_callable=AsyncMock),
+            patch.object(service._pool, "close", new_callable=AsyncMock),
+            patch.object(service._pool, "acquire") as mock_acquire,
+            patch.object(service._schema_cache, "refresh", new_callable=AsyncMock) as mock_refresh,
+            patch.object(watcher, "capture_baseline", new_callable=AsyncMock) as mock_baseline,
+        ):
+            mock_acquire.return_value.__aenter__.return_value = mock_conn
+            mock_acquire.return_value.__aexit__.return_value = None
+            mock_refresh.return_value = sample_schema
+
+            await service.initialize()
+            assert watcher.is_running
+            mock_baseline.assert_called_once_with(mock_conn)
+
+            await service.close()
+            assert not watcher.is_running
+
+    @pytest.mark.asyncio
+    async def test_refresh_schema_saves_snapshot(
+        self,
+        tmp_path,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+        sample_schema: DatabaseSchema,
+    ) -> None:
+        """Test a refresh writes a snapshot with the pre-refresh fingerprint."""
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(snapshot_dir=str(tmp_path))
+        )
+        signatures = CatalogSignatures(tables={"public.users": "1"})
+
+        with (
+            patch.object(service._pool, "acquire") as mock_acquire,
+            patch.object(service._schema_cache, "refresh", new_callable=AsyncMock) as mock_refresh,
+            patch.object(
+                service._schema_cache, "fetch_signatures", new_callable=AsyncMock
+            ) as mock_signatures,
+        ):
+            mock_acquire.return_value.__aenter__.return_value = AsyncMock()
+            mock_acquire.return_value.__aexit__.return_value = None
+            mock_refresh.return_value = sample_schema
+            mock_signatures.return_value = signatures
+
+            await service.refresh_schema()
+
+        snapshot = service._snapshot_store.load(db_config.name, service.snapshot_target)
+        assert snapshot is not None
+        assert snapshot.schema == sample_schema
+        assert snapshot.fingerprint == signatures.fingerprint
+
+    @pytest.mark.asyncio
+    async def test_initialize_from_snapshot(
+        self,
+        tmp_path,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+        sample_schema: DatabaseSchema,
+    ) -> None:
+        """Test startup serves the snapshot and revalidates it in the background."""
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(snapshot_dir=str(tmp_path))
+        )
+        stale = CatalogSignatures(tables={"public.users": "1"})
+        current = CatalogSignatures(tables={"public.users": "2"})
+        service._snapshot_store.save(
+            db_config.name, service.snapshot_target, sample_schema, stale.fingerprint
+        )
+
+        with (
+            patch.object(service._pool, "initialize", new_callable=AsyncMock),
+            patch.object(service._pool, "close", new_callable=AsyncMock),
+            patch.object(service._pool, "acquire") as mock_acquire,
+            patch.object(service, "refresh_schema", new_callable=AsyncMock) as mock_refresh,
+            patch.object(
+                service._schema_cache, "fetch_signatures", new_callable=AsyncMock
+            ) as mock_signatures,
+        ):
+            mock_acquire.return_value.__aenter__.return_value = AsyncMock()
+            mock_acquire.return_value.__aexit__.return_value = None
+            mock_signatures.return_value = current
+
+            await service.initialize()
+
+            assert service.schema == sample_schema
+            mock_refresh.assert_not_called()
+
+            await service._revalidate_task
+            mock_refresh.assert_called_once()
+
+            await service.close()
+
+    @pytest.mark.asyncio
+    async def test_initialize_from_current_snapshot(
+        self,
+        tmp_path,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+        sample_schema: DatabaseSchema,
+    ) -> None:
+        """Test an up-to-date snapshot is not refreshed."""
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(snapshot_dir=str(tmp_path))
+        )
+        current = CatalogSignatures(tables={"public.users": "1"})
+        service._snapshot_store.save(
+            db_config.name, service.snapshot_target, sample_schema, current.fingerprint
+        )
+
+        with (
+            patch.object(service._pool, "initialize", new_callable=AsyncMock),
+            patch.object(service._pool, "acquire") as mock_acquire,
+            patch.object(service, "refresh_schema", new_callable=AsyncMock) as mock_refresh,
+            patch.object(
+                service._schema_cache, "fetch_signatures", new_callable=AsyncMock
+            ) as mock_signatures,
+        ):
+            mock_acquire.return_value.__aenter__.return_value = AsyncMock()
+            mock_acquire.return_value.__aexit__.return_value = None
+            mock_signatures.return_value = current
+
+            await service.initialize()
+            await service._revalidate_task
+
+            mock_refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_initialize_records_timings(
+        self,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+        sample_schema: DatabaseSchema,
+    ) -> None:
+        """Test initialization reports pool and schema load times."""
+        service = DatabaseService(db_config, query_settings)
+
+        async def refresh() -> DatabaseSchema:
+            return service._schema_cache.restore(sample_schema)
+
+        with (
+            patch.object(service._pool, "initialize", new_callable=AsyncMock),
+            patch.object(service, "refresh_schema", side_effect=refresh),
+        ):
+            await service.initialize()
+
+        assert set(service.init_timings) == {"pool_ms", "schema_ms"}
+        assert all(ms >= 0 for ms in service.init_timings.values())
+
+    @pytest.mark.asyncio
+    async def test_ensure_initialized_timeout_then_retry(
+        self,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+    ) -> None:
+        """Test a timed-out initialization is recorded and can be retried."""
+        service = DatabaseService(db_config, query_settings)
+
+        async def hang() -> None:
+            await asyncio.sleep(5)
+
+        with patch.object(service, "initialize", side_effect=hang):
+            with pytest.raises(asyncio.TimeoutError):
+                await service.ensure_initialized(timeout=0.05)
+
+        assert isinstance(service.init_error, asyncio.TimeoutError)
+        assert not service.is_ready
+
+        with patch.object(service, "initialize", new_callable=AsyncMock) as mock_init:
+            await service.ensure_initialized(timeout=1)
+
+        mock_init.assert_called_once()
+        assert service.init_error is None
+
+    @pytest.mark.asyncio
+    async def test_timeout_after_schema_load_retried(
+        self,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+        sample_schema: DatabaseSchema,
+    ) -> None:
+        """Test a timeout in a late step leaves the service not ready until a retry finishes."""
+        db_config = db_config.model_copy(update={"replicas": [ReplicaConfig(host="replica")]})
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(watch_interval=3600)
+        )
+
+        async def load_schema() -> None:
+            service._schema_cache.restore(sample_schema)
+
+        async def hang() -> None:
+            await asyncio.sleep(5)
+
+        with patch.object(service._pool, "initialize", new_callable=AsyncMock), patch.object(
+            service, "refresh_schema", side_effect=load_schema
+        ) as mock_refresh, patch.object(service._pool, "close", new_callable=AsyncMock):
+            service._pool._pool = MagicMock()
+            with patch.object(service._replicas, "initialize", side_effect=hang):
+                with pytest.raises(asyncio.TimeoutError):
+                    await service.ensure_initialized(timeout=0.05)
+
+            assert service._schema_cache.schema is not None
+            assert not service.is_ready
+            assert not service._schema_watcher.is_running
+
+            with patch.object(service._replicas, "initialize", new_callable=AsyncMock), patch.object(
+                service._schema_watcher, "_run", new_callable=AsyncMock
+            ):
+                await service.ensure_initialized(timeout=1)
+                assert service.is_ready
+                assert service._schema_watcher._task is not None
+                mock_refresh.assert_called_once()
+                await service.close()
+
+    @pytest.mark.asyncio
+    async def test_ensure_initialized_shares_attempt(
+        self,
+        db_config: DatabaseConfig,
+        query_settings: QuerySettings,
+    ) -> None:
+        """Test concurrent callers share one failed attempt."""
+        service = DatabaseService(db_config, query_settings)
+
+        async def fail() -> None:
+            await asyncio.sleep(0.05)
+            raise OSError("connection refused")
+
+        with patch.object(service, "initialize", side_effect=fail) as mock_init:
+            results = await asyncio.gather(
+                service.ensure_initialized(),
+                service.ensure_initialized(),
+                return_exceptions=True,
+            )
+
+        assert mock_init.call_count == 1
+        assert all(isinstance(result, OSError) for result in results)
+
+    def test_service_watcher_disabled_by_default(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings
+    ) -> None:
+        """Test no schema watcher or column profiler is created with default settings."""
+        service = DatabaseService(db_config, query_settings)
+        assert service._schema_watcher is None
+        assert service._column_profiler is None
+
+    @pytest.mark.asyncio
+    async def test_service_column_profiler(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test the column profiler starts after initialization and stops on close."""
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(profile_interval=3600)
+        )
+        service._schema_cache._schema = sample_schema
+
+        with patch.object(service._pool, "initialize", new_callable=AsyncMock), patch.object(
+            service._pool, "close", new_callable=AsyncMock
+        ), patch.object(service._column_profiler, "profile", new_callable=AsyncMock):
+            await service.initialize()
+            assert service._column_profiler.is_running
+            await service.close()
+
+        assert not service._column_profiler.is_running
+
+    @pytest.mark.asyncio
+    async def test_refresh_schema_parallel(
+        self, db_config: DatabaseConfig, query_settings: QuerySettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test schema refresh fans out when refresh_concurrency > 1."""
+        service = DatabaseService(
+            db_config, query_settings, SchemaSettings(refresh_concurrency=4)
+        )
+
+        with patch.object(
+            service._schema_cache, "refresh_parallel", new_callable=AsyncMock
+        ) as mock_refresh:
+            mock_refresh.return_value = sample_schema
+
+            result = await service.refresh_schema()
+
+            assert result == sample_schema
+            mock_refresh.assert_called_once_with(service._pool, 4)
@@ -1,10 +1,16 @@
 """Tests for LLM service."""
 
+import asyncio
+import json
+
+import httpx
+import openai
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from pg_mcp.config import LLMSettings
 from pg_mcp.llm import LLMService
+from pg_mcp.metrics import Metrics
 from pg_mcp.models import (
     DatabaseSchema,
     LLMError,
@@ -13,6 +19,7 @@ from pg_mcp.models import (
     TableInfo,
     ColumnInfo,
     ValidationResult,
+    encode_columns,
 )
 
 
@@ -82,6 +89,30 @@ class TestLLMService:
 
             assert result == "SELECT * FROM users"
 
+    @pytest.mark.asyncio
+    async def test_generate_sql_with_prerendered_context(
+        self, llm_settings: LLMSettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a pre-rendered schema context is used instead of re-rendering."""
+        with patch("pg_mcp.llm.service.AsyncOpenAI") as mock_openai:
+            mock_response = MagicMock()
+            mock_response.choices = [MagicMock()]
+            mock_response.choices[0].message.content = "SELECT * FROM users"
+
+            mock_client = MagicMock()
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+            mock_openai.return_value = mock_client
+
+            service = LLMService(llm_settings)
+            service._client = mock_client
+
+            with patch.object(DatabaseSchema, "to_llm_context") as mock_render:
+                await service.generate_sql("查询所有用户", sample_schema, "CACHED CONTEXT")
+
+            mock_render.assert_not_called()
+            messages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+            assert "CACHED CONTEXT" in messages[1]["content"]
+
     @pytest.mark.asyncio
     async def test_generate_sql_with_markdown(
         self, llm_settings: LLMSettings, sample_schema: DatabaseSchema
@@ -187,6 +218,39 @@ class TestLLMService:
                 await service.generate_sql("查询用户", sample_schema)
             assert "API" in str(exc.value)
 
+    @pytest.mark.asyncio
+    async def test_repair_sql(
+        self, llm_settings: LLMSettings, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test failed statements and their errors are replayed as conversation turns."""
+        with patch("pg_mcp.llm.service.AsyncOpenAI") as mock_openai:
+            mock_response = MagicMock()
+            mock_response.choices = [MagicMock()]
+            mock_response.choices[0].message.content = "SELECT name FROM users"
+
+            mock_client = MagicMock()
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+            mock_openai.return_value = mock_client
+
+            metrics = Metrics()
+            service = LLMService(llm_settings, metrics)
+            service._client = mock_client
+
+            result = await service.repair_sql(
+                "列出用户名",
+                sample_schema,
+                [("SELECT nme FROM users", 'column "nme" does not exist')],
+                "CACHED CONTEXT",
+            )
+
+            assert result == "SELECT name FROM users"
+            messages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+            assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+            assert "CACHED CONTEXT" in messages[1]["content"]
+            assert messages[2]["content"] == "SELECT nme FROM users"
+            assert 'column "nme" does not exist' in messages[3]["content"]
+            assert metrics.llm_requests.value(operation="repair_sql", outcome="success") == 1
+
     # ============ Result Validation Tests ============
 
     @pytest.mark.asyncio
@@ -456,3 +520,383 @@ class TestLLMServiceHelpers:
         formatted = service._format_sample_rows(result, max_rows=5)
         assert "还有" in formatted
         assert "5" in formatted
+
+    def test_format_sample_rows_columnar(self, service: LLMService) -> None:
+        """Test sample rows are decoded from the columnar format."""
+        result = QueryResultData(
+            columns=["id", "status"],
+            rows=[],
+            row_count=3,
+            execution_time_ms=5.0,
+            format="columnar",
+            column_data=encode_columns(["id", "status"], [[1, "paid"], [2, "paid"], [3, None]]),
+        )
+        formatted = service._format_sample_rows(result)
+        assert "1. 1, paid" in formatted
+        assert "3. 3, NULL" in formatted
+
+
+def _api_error(error_cls: type[openai.APIStatusError], status_code: int) -> openai.APIStatusError:
+    """Build an OpenAI API status error with a fake response."""
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    return error_cls(f"HTTP {status_code}", response=response, body=None)
+
+
+def _completion(content: str) -> MagicMock:
+    """Build a chat completion response."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+class TestLLMServiceLimits:
+    """Tests for LLMService request coalescing, limiting and retries."""
+
+    @pytest.fixture
+    def sample_schema(self) -> DatabaseSchema:
+        """Create a minimal schema."""
+        return DatabaseSchema(
+            database_name="testdb",
+            tables=[TableInfo(name="users", columns=[ColumnInfo(name="id", data_type="integer")])],
+        )
+
+    def make_service(self, create: AsyncMock, **settings) -> LLMService:
+        """Create an LLMService whose API client is mocked."""
+        service = LLMService(LLMSettings(api_key="test-api-key", **settings))
+        service._client = MagicMock()
+        service._client.chat.completions.create = create
+        return service
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_coalesced(self, sample_schema: DatabaseSchema) -> None:
+        """Test concurrent identical questions share one API call."""
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.05)
+            return _completion("SELECT * FROM users")
+
+        create = AsyncMock(side_effect=slow_create)
+        service = self.make_service(create)
+
+        results = await asyncio.gather(
+            service.generate_sql("all users", sample_schema),
+            service.generate_sql("all users", sample_schema),
+            service.generate_sql("user count", sample_schema),
+        )
+
+        assert results == ["SELECT * FROM users"] * 3
+        assert create.call_count == 2
+        assert service._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_coalesced_failure_reaches_all_callers(
+        self, sample_schema: DatabaseSchema
+    ) -> None:
+        """Test a failed shared request fails every waiting caller."""
+        create = AsyncMock(side_effect=Exception("boom"))
+        service = self.make_service(create)
+
+        results = await asyncio.gather(
+            service.generate_sql("all users", sample_schema),
+            service.generate_sql("all users", sample_schema),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, LLMError) for result in results)
+        assert create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit(self, sample_schema: DatabaseSchema) -> None:
+        """Test rate limit and server errors are retried with backoff."""
+        create = AsyncMock(
+            side_effect=[
+                _api_error(openai.RateLimitError, 429),
+                _api_error(openai.InternalServerError, 503),
+                _completion("SELECT 1"),
+            ]
+        )
+        service = self.make_service(create, max_retries=3)
+
+        with patch("pg_mcp.llm.service.backoff_delay", return_value=0) as mock_backoff:
+            sql = await service.generate_sql("one", sample_schema)
+
+        assert sql == "SELECT 1"
+        assert create.call_count == 3
+        assert [call.args[0] for call in mock_backoff.call_args_list] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_metrics(self, sample_schema: DatabaseSchema) -> None:
+        """Test API calls, retries, failures and token usage are recorded."""
+        response = _completion("SELECT 1")
+        response.usage = MagicMock(prompt_tokens=120, completion_tokens=8)
+        create = AsyncMock(
+            side_effect=[_api_error(openai.RateLimitError, 429), response, Exception("boom")]
+        )
+        metrics = Metrics()
+        service = self.make_service(create, max_retries=1)
+        service.metrics = metrics
+
+        with patch("pg_mcp.llm.service.backoff_delay", return_value=0):
+            await service.generate_sql("one", sample_schema)
+            with pytest.raises(LLMError):
+                await service.generate_sql("two", sample_schema)
+
+        op = {"operation": "generate_sql"}
+        assert metrics.llm_requests.value(outcome="success", **op) == 1
+        assert metrics.llm_requests.value(outcome="error", **op) == 1
+        assert metrics.llm_retries.value(**op) == 1
+        assert metrics.llm_tokens.value(kind="prompt", **op) == 120
+        assert metrics.llm_tokens.value(kind="completion", **op) == 8
+        assert metrics.llm_seconds.count(**op) == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted(self, sample_schema: DatabaseSchema) -> None:
+        """Test the error is raised once the retries are used up."""
+        create = AsyncMock(side_effect=_api_error(openai.RateLimitError, 429))
+        service = self.make_service(create, max_retries=2)
+
+        with patch("pg_mcp.llm.service.backoff_delay", return_value=0):
+            with pytest.raises(LLMError):
+                await service.generate_sql("one", sample_schema)
+
+        assert create.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self, sample_schema: DatabaseSchema) -> None:
+        """Test client errors such as a bad request fail immediately."""
+        create = AsyncMock(side_effect=_api_error(openai.BadRequestError, 400))
+        service = self.make_service(create, max_retries=3)
+
+        with pytest.raises(LLMError):
+            await service.generate_sql("one", sample_schema)
+
+        assert create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, sample_schema: DatabaseSchema) -> None:
+        """Test no more than max_concurrency API calls run at once."""
+        in_flight = 0
+        peak = 0
+
+        async def tracked_create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return _completion("SELECT 1")
+
+        service = self.make_service(AsyncMock(side_effect=tracked_create), max_concurrency=2)
+
+        await asyncio.gather(*(service.generate_sql(f"q{i}", sample_schema) for i in range(6)))
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_used(self, sample_schema: DatabaseSchema) -> None:
+        """Test every API call takes a token when rate limiting is enabled."""
+        service = self.make_service(
+            AsyncMock(return_value=_completion("SELECT 1")), rate_limit=100, rate_burst=1
+        )
+
+        with patch.object(
+            service._rate_limiter, "acquire", wraps=service._rate_limiter.acquire
+        ) as mock_acquire:
+            await service.generate_sql("a", sample_schema)
+            await service.generate_sql("b", sample_schema)
+
+        assert mock_acquire.call_count == 2
+
+    def test_client_retries_disabled(self) -> None:
+        """Test the OpenAI client does not retry on its own."""
+        service = LLMService(LLMSettings(api_key="test-api-key"))
+
+        assert service._client.max_retries == 0
+
+
+class FakeStream:
+    """Async iterator over chat completion chunks that records how far it was read."""
+
+    def __init__(self, pieces: list[str]) -> None:
+        self.pieces = pieces
+        self.read = 0
+        self.close = AsyncMock()
+
+    def __aiter__(self) -> "FakeStream":
+        return self
+
+    async def __anext__(self) -> MagicMock:
+        if self.read >= len(self.pieces):
+            raise StopAsyncIteration
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = self.pieces[self.read]
+        self.read += 1
+        return chunk
+
+
+class TestLLMServiceStreaming:
+    """Tests for streaming SQL generation."""
+
+    @pytest.fixture
+    def sample_schema(self) -> DatabaseSchema:
+        """Create a minimal schema."""
+        return DatabaseSchema(
+            database_name="testdb",
+            tables=[TableInfo(name="users", columns=[ColumnInfo(name="id", data_type="integer")])],
+        )
+
+    def make_service(self, stream: FakeStream) -> LLMService:
+        """Create a streaming LLMService whose API client returns the given stream."""
+        service = LLMService(LLMSettings(api_key="test-api-key", stream_sql=True))
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(return_value=stream)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_stops_reading_after_statement(self, sample_schema: DatabaseSchema) -> None:
+        """Test the stream is closed once the statement is complete."""
+        stream = FakeStream(
+            ["```sql\nSELECT id ", "FROM users\n```", "\nThis query ", "lists ", "all users."]
+        )
+        service = self.make_service(stream)
+
+        sql = await service.generate_sql("all users", sample_schema)
+
+        assert sql == "SELECT id FROM users"
+        assert stream.read == 2
+        stream.close.assert_awaited_once()
+        assert service._client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_statement_without_terminator(self, sample_schema: DatabaseSchema) -> None:
+        """Test a bare statement is taken from the whole stream."""
+        stream = FakeStream(["SELECT ", "count(*) ", "FROM users"])
+        service = self.make_service(stream)
+
+        sql = await service.generate_sql("user count", sample_schema)
+
+        assert sql == "SELECT count(*) FROM users"
+        stream.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_empty_stream(self, sample_schema: DatabaseSchema) -> None:
+        """Test an empty streamed response is an error."""
+        service = self.make_service(FakeStream([]))
+
+        with pytest.raises(SQLGenerationError, match="空响应"):
+            await service.generate_sql("anything", sample_schema)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_covers_reading(self, sample_schema: DatabaseSchema) -> None:
+        """Test a stream holds its concurrency slot, and is timed, until it is closed."""
+        reading = 0
+        peak = 0
+
+        class SlowStream(FakeStream):
+            async def __anext__(self) -> MagicMock:
+                nonlocal reading, peak
+                if self.read == 0:
+                    reading += 1
+                    peak = max(peak, reading)
+                await asyncio.sleep(0.01)
+                try:
+                    return await super().__anext__()
+                except StopAsyncIteration:
+                    reading -= 1
+                    raise
+
+        metrics = Metrics()
+        service = LLMService(
+            LLMSettings(api_key="test-api-key", stream_sql=True, max_concurrency=2), metrics
+        )
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(
+            side_effect=lambda **kwargs: SlowStream(["SELECT ", "1"])
+        )
+
+        await asyncio.gather(*(service.generate_sql(f"q{i}", sample_schema) for i in range(6)))
+
+        assert peak == 2
+        assert service._semaphore._value == 2
+        assert metrics.llm_requests.value(operation="generate_sql", outcome="success") == 6
+        # Each request covers reading its three chunks
+        assert metrics.llm_seconds.sum(operation="generate_sql") >= 6 * 0.03
+
+
+class TestLLMServiceBatch:
+    """Tests for multi-question SQL generation."""
+
+    @pytest.fixture
+    def sample_schema(self) -> DatabaseSchema:
+        """Create a minimal schema."""
+        return DatabaseSchema(
+            database_name="testdb",
+            tables=[TableInfo(name="users", columns=[ColumnInfo(name="id", data_type="integer")])],
+        )
+
+    def make_service(self, content: str, batch_max_tokens: int = 8192) -> LLMService:
+        """Create an LLMService whose API client answers with the given content."""
+        service = LLMService(
+            LLMSettings(
+                api_key="test-api-key", max_tokens=512, batch_max_tokens=batch_max_tokens
+            )
+        )
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(return_value=_completion(content))
+        return service
+
+    @pytest.mark.asyncio
+    async def test_one_request_for_all_questions(self, sample_schema: DatabaseSchema) -> None:
+        """Test all questions are numbered in a single prompt and answered in order."""
+        service = self.make_service(
+            '```json\n["SELECT count(*) FROM users;", "SELECT max(id) FROM users"]\n```'
+        )
+
+        statements = await service.generate_sql_batch(["用户数量", "最大 ID"], sample_schema)
+
+        assert statements == ["SELECT count(*) FROM users", "SELECT max(id) FROM users"]
+        kwargs = service._client.chat.completions.create.call_args.kwargs
+        prompt = kwargs["messages"][1]["content"]
+        assert "1. 用户数量" in prompt and "2. 最大 ID" in prompt
+        assert prompt.count("users") == 1
+        assert kwargs["max_tokens"] == 1024
+
+    @pytest.mark.asyncio
+    async def test_max_tokens_capped(self, sample_schema: DatabaseSchema) -> None:
+        """Test the output budget of a large batch stays within batch_max_tokens."""
+        questions = [f"问题 {i}" for i in range(20)]
+        service = self.make_service(
+            json.dumps(["SELECT 1"] * len(questions)), batch_max_tokens=4096
+        )
+
+        await service.generate_sql_batch(questions, sample_schema)
+
+        assert service._client.chat.completions.create.call_args.kwargs["max_tokens"] == 4096
+
+    @pytest.mark.asyncio
+    async def test_count_mismatch(self, sample_schema: DatabaseSchema) -> None:
+        """Test an answer with the wrong number of statements is rejected."""
+        service = self.make_service('["SELECT 1"]')
+
+        with pytest.raises(SQLGenerationError, match="预期 2 条"):
+            await service.generate_sql_batch(["a", "b"], sample_schema)
+
+    @pytest.mark.asyncio
+    async def test_not_a_json_array(self, sample_schema: DatabaseSchema) -> None:
+        """Test an answer without a JSON array of strings is rejected."""
+        service = self.make_service("SELECT 1; SELECT 2")
+
+        with pytest.raises(SQLGenerationError, match="批量 SQL"):
+            await service.generate_sql_batch(["a", "b"], sample_schema)
+
+    @pytest.mark.asyncio
+    async def test_api_error(self, sample_schema: DatabaseSchema) -> None:
+        """Test API failures are reported as LLMError."""
+        service = self.make_service("")
+        service._client.chat.completions.create = AsyncMock(side_effect=Exception("boom"))
+
+        with pytest.raises(LLMError):
+            await service.generate_sql_batch(["a", "b"], sample_schema)
@@ -1,19 +1,44 @@
 """Tests for query service."""
 
+import asyncio
+
 import pytest
+from sqlglot import exp
 from unittest.mock import AsyncMock, MagicMock
 
-from pg_mcp.config import QuerySettings
+from pg_mcp.cache import QueryCache
+from pg_mcp.config import AdmissionSettings, CacheSettings, QuerySettings, ValidatorSettings
+from pg_mcp.metrics import Metrics
 from pg_mcp.models import (
+    BatchQueryRequest,
+    ColumnInfo,
+    DatabaseSchema,
     ErrorCode,
     QueryRequest,
     QueryResultData,
+    SQLExecutionError,
     SQLGenerationError,
     SQLUnsafeError,
+    TableInfo,
     ValidationResult,
 )
-from pg_mcp.query import QueryService
-from pg_mcp.validator import SQLValidator
+from pg_mcp.query import AdmissionController, QueryService, ValidationQueue
+from pg_mcp.validator import SQLValidator, ValidationExecutor
+
+
+def mock_database(schema: DatabaseSchema, result: QueryResultData) -> MagicMock:
+    """Create a mock database service serving the given schema."""
+    db = MagicMock()
+    db.schema = schema
+    db.get_llm_context = MagicMock(
+        side_effect=lambda names=None: (
+            schema if names is None else schema.subset(set(names))
+        ).to_llm_context()
+    )
+    db.execute_query = AsyncMock(return_value=result)
+    db.config.name = "testdb"
+    db.schema_version = 1
+    return db
 
 
 class TestQueryService:
@@ -41,10 +66,7 @@ class TestQueryService:
     @pytest.fixture
     def mock_db(self, sample_schema, sample_query_result) -> MagicMock:
         """Create a mock database service."""
-        db = MagicMock()
-        db.schema = sample_schema
-        db.execute_query = AsyncMock(return_value=sample_query_result)
-        return db
+        return mock_database(sample_schema, sample_query_result)
 
     @pytest.fixture
     def validator(self) -> SQLValidator:
@@ -105,6 +127,55 @@ class TestQueryService:
         assert response.validation is None
         mock_llm.validate_result.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_execute_passes_parsed_statement(
+        self,
+        mock_llm: MagicMock,
+        mock_db: MagicMock,
+        validator: SQLValidator,
+        query_settings: QuerySettings,
+    ) -> None:
+        """Test the statement parsed by the validator is reused for execution."""
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=validator,
+            query_settings=query_settings,
+        )
+
+        await service.execute(QueryRequest(query="Find all users"))
+
+        statement = mock_db.execute_query.call_args.kwargs["statement"]
+        assert isinstance(statement, exp.Select)
+
+    @pytest.mark.asyncio
+    async def test_execute_with_validation_executor(
+        self,
+        mock_llm: MagicMock,
+        mock_db: MagicMock,
+        validator: SQLValidator,
+        query_settings: QuerySettings,
+    ) -> None:
+        """Test SQL is validated through the executor when one is configured."""
+        executor = ValidationExecutor(ValidatorSettings(executor="thread", workers=1))
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=validator,
+            query_settings=query_settings,
+            validation_executor=executor,
+        )
+
+        try:
+            first = await service.execute(QueryRequest(query="Find all users"))
+            second = await service.execute(QueryRequest(query="Find all users"))
+        finally:
+            executor.close()
+
+        assert first.success is True
+        assert second.success is True
+        assert executor.stats().hits == 1
+
     @pytest.mark.asyncio
     async def test_execute_sql_generation_error(
         self,
@@ -181,3 +252,794 @@ class TestQueryService:
         assert response.success is False
         assert response.error_code == ErrorCode.INTERNAL_ERROR.value
         assert "内部错误" in response.error
+
+
+class TestSchemaPruning:
+    """Tests for relevance-based schema pruning in QueryService."""
+
+    @pytest.fixture
+    def large_schema(self) -> DatabaseSchema:
+        """Schema large enough to be pruned."""
+        tables = [
+            TableInfo(
+                name="users",
+                comment="用户表",
+                columns=[ColumnInfo(name="id", data_type="integer", is_primary_key=True)],
+            ),
+        ]
+        tables.extend(
+            TableInfo(
+                name=f"metrics_{i}",
+                columns=[ColumnInfo(name="value", data_type="numeric")],
+            )
+            for i in range(40)
+        )
+        return DatabaseSchema(database_name="testdb", tables=tables)
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM service."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(return_value="SELECT count(*) FROM users")
+        return llm
+
+    @pytest.fixture
+    def mock_db(self, large_schema: DatabaseSchema, sample_query_result) -> MagicMock:
+        """Create a mock database service with a large schema."""
+        return mock_database(large_schema, sample_query_result)
+
+    @pytest.mark.asyncio
+    async def test_prunes_schema_and_reports_savings(
+        self, mock_llm: MagicMock, mock_db: MagicMock
+    ) -> None:
+        """Test only relevant tables reach the LLM and savings are reported."""
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False),
+        )
+
+        response = await service.execute(QueryRequest(query="统计用户数量"))
+
+        sent_schema = mock_llm.generate_sql.call_args.args[1]
+        assert [t.name for t in sent_schema.tables] == ["users"]
+        assert response.metadata is not None
+        assert response.metadata.schema_tables_total == 41
+        assert response.metadata.schema_tables_used == 1
+        assert response.metadata.schema_tokens_saved > 0
+        assert (
+            response.metadata.schema_tokens_used + response.metadata.schema_tokens_saved
+            == response.metadata.schema_tokens_full
+        )
+
+    @pytest.mark.asyncio
+    async def test_pruning_disabled(
+        self, mock_llm: MagicMock, mock_db: MagicMock, large_schema: DatabaseSchema
+    ) -> None:
+        """Test a zero token budget sends the full schema."""
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False, schema_token_budget=0),
+        )
+
+        response = await service.execute(QueryRequest(query="统计用户数量"))
+
+        assert mock_llm.generate_sql.call_args.args[1] is large_schema
+        assert response.metadata is not None
+        assert response.metadata.schema_tokens_saved == 0
+
+    @pytest.mark.asyncio
+    async def test_small_schema_not_pruned(
+        self, mock_llm: MagicMock, sample_schema: DatabaseSchema, sample_query_result
+    ) -> None:
+        """Test schemas below the pruning threshold are sent whole."""
+        db = mock_database(sample_schema, sample_query_result)
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False),
+        )
+
+        await service.execute(QueryRequest(query="统计用户数量"))
+
+        assert mock_llm.generate_sql.call_args.args[1] is sample_schema
+
+
+class TestQueryCaching:
+    """Tests for the query cache in QueryService."""
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM service."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(return_value="SELECT count(*) FROM users")
+        llm.validate_result = AsyncMock(
+            return_value=ValidationResult(passed=True, message="OK")
+        )
+        return llm
+
+    @pytest.fixture
+    def mock_db(self, sample_schema, sample_query_result) -> MagicMock:
+        """Create a mock database service."""
+        return mock_database(sample_schema, sample_query_result)
+
+    @pytest.fixture
+    def service(self, mock_llm: MagicMock, mock_db: MagicMock) -> QueryService:
+        """Create a QueryService with a query cache."""
+        return QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(),
+            query_cache=QueryCache(CacheSettings()),
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_served_from_cache(
+        self, service: QueryService, mock_llm: MagicMock, mock_db: MagicMock
+    ) -> None:
+        """Test a repeated question skips the LLM and the database."""
+        first = await service.execute(QueryRequest(query="查询用户数量"))
+        second = await service.execute(QueryRequest(query="查询用户数量？"))
+
+        assert first.metadata.sql_cache_hit is False
+        assert second.metadata.sql_cache_hit is True
+        assert second.metadata.result_cache_hit is True
+        assert second.result == first.result
+        assert second.validation == first.validation
+        mock_llm.generate_sql.assert_called_once()
+        mock_llm.validate_result.assert_called_once()
+        mock_db.execute_query.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_bypass_cache(
+        self, service: QueryService, mock_llm: MagicMock, mock_db: MagicMock
+    ) -> None:
+        """Test the bypass flag runs the full pipeline."""
+        await service.execute(QueryRequest(query="查询用户数量"))
+        response = await service.execute(QueryRequest(query="查询用户数量", bypass_cache=True))
+
+        assert response.metadata.sql_cache_hit is False
+        assert response.metadata.result_cache_hit is False
+        assert mock_llm.generate_sql.call_count == 2
+        assert mock_db.execute_query.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_schema_change_invalidates_sql(
+        self, service: QueryService, mock_llm: MagicMock, mock_db: MagicMock
+    ) -> None:
+        """Test SQL is regenerated after the schema version changes."""
+        await service.execute(QueryRequest(query="查询用户数量"))
+        mock_db.schema_version = 2
+        await service.execute(QueryRequest(query="查询用户数量"))
+
+        assert mock_llm.generate_sql.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_validation_not_cached(
+        self, service: QueryService, mock_llm: MagicMock
+    ) -> None:
+        """Test answers that failed LLM validation are not cached."""
+        mock_llm.validate_result = AsyncMock(
+            return_value=ValidationResult(passed=False, message="结果不符合")
+        )
+
+        await service.execute(QueryRequest(query="查询用户数量"))
+        await service.execute(QueryRequest(query="查询用户数量"))
+
+        assert mock_llm.generate_sql.call_count == 2
+
+
+class TestBackgroundValidation:
+    """Tests for LLM result validation through the ValidationQueue."""
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM service."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(return_value="SELECT count(*) FROM users")
+        llm.validate_result = AsyncMock(
+            return_value=ValidationResult(passed=True, message="OK")
+        )
+        return llm
+
+    @pytest.fixture
+    def mock_db(self, sample_schema, sample_query_result) -> MagicMock:
+        """Create a mock database service."""
+        return mock_database(sample_schema, sample_query_result)
+
+    @pytest.fixture
+    async def queue(self, mock_llm: MagicMock):
+        """Create a validation queue and stop its workers afterwards."""
+        queue = ValidationQueue(mock_llm, QuerySettings(validation_mode="async"))
+        yield queue
+        await queue.close()
+
+    @pytest.fixture
+    def service(
+        self, mock_llm: MagicMock, mock_db: MagicMock, queue: ValidationQueue
+    ) -> QueryService:
+        """Create a QueryService validating in the background."""
+        return QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(validation_mode="async"),
+            query_cache=QueryCache(CacheSettings()),
+            validation_queue=queue,
+        )
+
+    @pytest.mark.asyncio
+    async def test_result_returned_before_validation(
+        self, service: QueryService, queue: ValidationQueue, mock_llm: MagicMock
+    ) -> None:
+        """Test the response does not wait for validation and carries its ID."""
+        validated = asyncio.Event()
+
+        async def slow_validation(*args: object) -> ValidationResult:
+            await validated.wait()
+            return ValidationResult(passed=True, message="OK")
+
+        mock_llm.validate_result = AsyncMock(side_effect=slow_validation)
+
+        response = await service.execute(QueryRequest(query="查询用户数量"))
+
+        assert response.success is True
+        assert response.validation is None
+        assert response.validation_id is not None
+        assert queue.get(response.validation_id).status == "pending"
+
+        validated.set()
+        await queue.join()
+        status = queue.get(response.validation_id)
+        assert status.status == "completed"
+        assert status.validation.passed is True
+
+    @pytest.mark.asyncio
+    async def test_failed_validation_evicts_cache(
+        self, service: QueryService, queue: ValidationQueue, mock_llm: MagicMock
+    ) -> None:
+        """Test an answer is dropped from the cache once it fails validation."""
+        mock_llm.validate_result = AsyncMock(
+            return_value=ValidationResult(passed=False, message="结果不符合")
+        )
+
+        await service.execute(QueryRequest(query="查询用户数量"))
+        await queue.join()
+        response = await service.execute(QueryRequest(query="查询用户数量"))
+
+        assert response.metadata.sql_cache_hit is False
+        assert mock_llm.generate_sql.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_validation_error_recorded(
+        self, queue: ValidationQueue, mock_llm: MagicMock, sample_query_result
+    ) -> None:
+        """Test a failing LLM call is reported as a failed validation."""
+        mock_llm.validate_result = AsyncMock(side_effect=RuntimeError("API down"))
+
+        validation_id = queue.submit("查询用户数量", "SELECT 1", sample_query_result)
+        await queue.join()
+
+        status = queue.get(validation_id)
+        assert status.status == "failed"
+        assert "API down" in status.error
+
+    @pytest.mark.asyncio
+    async def test_full_queue_skips_validation(
+        self, mock_llm: MagicMock, sample_query_result
+    ) -> None:
+        """Test submissions beyond the queue size are not validated."""
+        mock_llm.validate_result = AsyncMock(side_effect=asyncio.Event().wait)
+        queue = ValidationQueue(
+            mock_llm, QuerySettings(validation_workers=1, validation_queue_size=1)
+        )
+
+        try:
+            first = queue.submit("q1", "SELECT 1", sample_query_result)
+            # Let the worker take the first job off the queue
+            await asyncio.sleep(0)
+            second = queue.submit("q2", "SELECT 2", sample_query_result)
+            third = queue.submit("q3", "SELECT 3", sample_query_result)
+        finally:
+            await queue.close()
+
+        assert first is not None
+        assert second is not None
+        assert third is None
+        assert queue.get("unknown") is None
+
+
+class TestBatchQuery:
+    """Tests for QueryService.execute_batch."""
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM service answering each question with its own SQL."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(
+            side_effect=lambda query, *args: f"SELECT count(*) FROM users -- {query}"
+        )
+        llm.generate_sql_batch = AsyncMock(
+            side_effect=lambda queries, *args: [
+                f"SELECT count(*) FROM users -- {query}" for query in queries
+            ]
+        )
+        llm.validate_result = AsyncMock(
+            return_value=ValidationResult(passed=True, message="OK")
+        )
+        return llm
+
+    @pytest.fixture
+    def mock_db(self, sample_schema, sample_query_result) -> MagicMock:
+        """Create a mock database service."""
+        return mock_database(sample_schema, sample_query_result)
+
+    def make_service(
+        self, mock_llm: MagicMock, mock_db: MagicMock, **settings
+    ) -> QueryService:
+        """Create a QueryService with a query cache and the given query settings."""
+        return QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False, **settings),
+            query_cache=QueryCache(CacheSettings()),
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_mode(self, mock_llm: MagicMock, mock_db: MagicMock) -> None:
+        """Test each question gets its own SQL and results keep the question order."""
+        service = self.make_service(mock_llm, mock_db)
+
+        response = await service.execute_batch(
+            BatchQueryRequest(queries=["男性用户", "女性用户", "全部用户"])
+        )
+
+        assert response.success is True
+        assert [r.sql.rsplit("-- ", 1)[1] for r in response.results] == [
+            "男性用户",
+            "女性用户",
+            "全部用户",
+        ]
+        assert mock_llm.generate_sql.call_count == 3
+        mock_llm.generate_sql_batch.assert_not_called()
+        assert mock_db.execute_query.call_count == 3
+        assert response.metadata.succeeded == 3
+        assert response.metadata.sql_generation_time_ms is None
+        assert response.metadata.execution_time_ms == 3 * 15.5
+
+    @pytest.mark.asyncio
+    async def test_combined_mode(self, mock_llm: MagicMock, mock_db: MagicMock) -> None:
+        """Test SQL of uncached questions is generated by one LLM request."""
+        service = self.make_service(mock_llm, mock_db, batch_sql_mode="combined")
+        await service.execute(QueryRequest(query="全部用户"))
+
+        response = await service.execute_batch(
+            BatchQueryRequest(queries=["男性用户", "女性用户", "全部用户"])
+        )
+
+        mock_llm.generate_sql_batch.assert_called_once()
+        assert mock_llm.generate_sql_batch.call_args.args[0] == ["男性用户", "女性用户"]
+        assert mock_llm.generate_sql.call_count == 1
+        assert response.results[1].sql.endswith("-- 女性用户")
+        assert response.results[1].metadata.schema_tables_total is not None
+        assert response.metadata.cache_hits == 1
+        assert response.metadata.sql_generation_time_ms is not None
+
+    @pytest.mark.asyncio
+    async def test_combined_mode_falls_back(
+        self, mock_llm: MagicMock, mock_db: MagicMock
+    ) -> None:
+        """Test a failed combined request falls back to one request per question."""
+        mock_llm.generate_sql_batch = AsyncMock(side_effect=SQLGenerationError("解析失败"))
+        service = self.make_service(mock_llm, mock_db, batch_sql_mode="combined")
+
+        response = await service.execute_batch(BatchQueryRequest(queries=["男性用户", "女性用户"]))
+
+        assert response.metadata.succeeded == 2
+        assert mock_llm.generate_sql.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_isolated(self, mock_llm: MagicMock, mock_db: MagicMock) -> None:
+        """Test an unsafe statement fails only its own question."""
+        mock_llm.generate_sql = AsyncMock(
+            side_effect=lambda query, *args: (
+                "DELETE FROM users" if query == "删除用户" else "SELECT count(*) FROM users"
+            )
+        )
+        service = self.make_service(mock_llm, mock_db)
+
+        response = await service.execute_batch(BatchQueryRequest(queries=["用户数量", "删除用户"]))
+
+        assert response.success is True
+        assert response.results[0].success is True
+        assert response.results[1].error_code == ErrorCode.SQL_UNSAFE.value
+        assert response.metadata.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_too_many_queries(self, mock_llm: MagicMock, mock_db: MagicMock) -> None:
+        """Test batches above batch_max_queries are rejected up front."""
+        service = self.make_service(mock_llm, mock_db, batch_max_queries=2)
+
+        response = await service.execute_batch(BatchQueryRequest(queries=["a", "b", "c"]))
+
+        assert response.success is False
+        assert response.error_code == ErrorCode.BATCH_TOO_LARGE.value
+        mock_llm.generate_sql.assert_not_called()
+
+
+class TestQueryMetrics:
+    """Tests for the metrics recorded by QueryService."""
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM service."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(return_value="SELECT count(*) FROM users")
+        llm.validate_result = AsyncMock(
+            return_value=ValidationResult(passed=True, message="OK")
+        )
+        return llm
+
+    @pytest.fixture
+    def metrics(self) -> Metrics:
+        """Create a metrics registry."""
+        return Metrics()
+
+    @pytest.fixture
+    def service(
+        self, mock_llm: MagicMock, metrics: Metrics, sample_schema, sample_query_result
+    ) -> QueryService:
+        """Create an instrumented QueryService with a query cache."""
+        return QueryService(
+            llm_service=mock_llm,
+            database_service=mock_database(sample_schema, sample_query_result),
+            validator=SQLValidator(),
+            query_settings=QuerySettings(),
+            query_cache=QueryCache(CacheSettings()),
+            metrics=metrics,
+        )
+
+    @pytest.mark.asyncio
+    async def test_stage_timings(self, service: QueryService, metrics: Metrics) -> None:
+        """Test every pipeline stage of a fresh query is timed."""
+        await service.execute(QueryRequest(query="查询用户数量"))
+
+        for stage in (
+            "schema",
+            "generation",
+            "validation",
+            "execution",
+            "result_validation",
+            "total",
+        ):
+            assert metrics.stage_seconds.count(database="testdb", stage=stage) == 1
+        assert metrics.queries.value(database="testdb", outcome="success") == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_lookups(self, service: QueryService, metrics: Metrics) -> None:
+        """Test cache lookups are counted per level."""
+        await service.execute(QueryRequest(query="查询用户数量"))
+        await service.execute(QueryRequest(query="查询用户数量"))
+
+        lookups = metrics.cache_lookups
+        assert lookups.value(database="testdb", level="sql", result="miss") == 1
+        assert lookups.value(database="testdb", level="sql", result="hit") == 1
+        assert lookups.value(database="testdb", level="result", result="hit") == 1
+        assert metrics.stage_seconds.count(database="testdb", stage="generation") == 1
+
+    @pytest.mark.asyncio
+    async def test_rejection_counted(
+        self, service: QueryService, metrics: Metrics, mock_llm: MagicMock
+    ) -> None:
+        """Test unsafe SQL counts as a rejection and an error outcome."""
+        mock_llm.generate_sql = AsyncMock(return_value="DROP TABLE users")
+
+        await service.execute(QueryRequest(query="删除用户表"))
+
+        assert metrics.sql_rejections.value(database="testdb") == 1
+        assert metrics.queries.value(database="testdb", outcome="sql_unsafe") == 1
+
+
+class TestAdmission:
+    """Tests for QueryService behind an admission controller."""
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM service."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(return_value="SELECT count(*) FROM users")
+        return llm
+
+    @pytest.fixture
+    def metrics(self) -> Metrics:
+        """Create a metrics registry."""
+        return Metrics()
+
+    def _service(
+        self,
+        mock_llm: MagicMock,
+        admission: AdmissionController,
+        metrics: Metrics,
+        sample_schema: DatabaseSchema,
+        sample_query_result: QueryResultData,
+    ) -> QueryService:
+        """Create a QueryService sharing the given admission controller."""
+        return QueryService(
+            llm_service=mock_llm,
+            database_service=mock_database(sample_schema, sample_query_result),
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False),
+            metrics=metrics,
+            admission=admission,
+        )
+
+    @pytest.mark.asyncio
+    async def test_admitted_query(
+        self, mock_llm: MagicMock, metrics: Metrics, sample_schema, sample_query_result
+    ) -> None:
+        """Test an admitted query runs, releases its slot and times the wait."""
+        admission = AdmissionController(AdmissionSettings(max_concurrency=1))
+        service = self._service(mock_llm, admission, metrics, sample_schema, sample_query_result)
+
+        response = await service.execute(QueryRequest(query="查询用户数量"), client="alice")
+
+        assert response.success is True
+        assert response.retry_after is None
+        assert admission.running == {}
+        assert metrics.stage_seconds.count(database="testdb", stage="admission") == 1
+
+    @pytest.mark.asyncio
+    async def test_shed_query_response(
+        self, mock_llm: MagicMock, metrics: Metrics, sample_schema, sample_query_result
+    ) -> None:
+        """Test a shed query fails with SERVER_OVERLOADED and a retry delay."""
+        admission = AdmissionController(
+            AdmissionSettings(max_concurrency=1, max_queue_size=0)
+        )
+        service = self._service(mock_llm, admission, metrics, sample_schema, sample_query_result)
+        await admission.acquire("testdb", "other")
+
+        response = await service.execute(QueryRequest(query="查询用户数量"), client="alice")
+
+        assert response.success is False
+        assert response.error_code == ErrorCode.SERVER_OVERLOADED.value
+        assert response.retry_after == 1
+        mock_llm.generate_sql.assert_not_called()
+        assert metrics.queries.value(database="testdb", outcome="server_overloaded") == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_queries_admitted_per_question(
+        self, mock_llm: MagicMock, metrics: Metrics, sample_schema, sample_query_result
+    ) -> None:
+        """Test the questions of a batch count towards the client quota one by one."""
+        admission = AdmissionController(
+            AdmissionSettings(max_concurrency=8, client_max_concurrency=1)
+        )
+        service = self._service(mock_llm, admission, metrics, sample_schema, sample_query_result)
+        running: list[dict[str, int]] = []
+
+        async def generate_sql(*args, **kwargs) -> str:
+            running.append(admission.running)
+            await asyncio.sleep(0)
+            return "SELECT count(*) FROM users"
+
+        mock_llm.generate_sql = AsyncMock(side_effect=generate_sql)
+
+        response = await service.execute_batch(
+            BatchQueryRequest(queries=["查询用户数量", "统计用户", "用户总数"]), client="alice"
+        )
+
+        assert response.metadata.succeeded == 3
+        assert running == [{"testdb": 1}] * 3
+
+    @pytest.mark.asyncio
+    async def test_combined_generation_admitted(
+        self, mock_llm: MagicMock, metrics: Metrics, sample_schema, sample_query_result
+    ) -> None:
+        """Test the combined LLM request of a batch holds an admission slot while it runs."""
+        admission = AdmissionController(AdmissionSettings(max_concurrency=4))
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=mock_database(sample_schema, sample_query_result),
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False, batch_sql_mode="combined"),
+            metrics=metrics,
+            admission=admission,
+        )
+        running: list[dict[str, int]] = []
+
+        async def generate_sql_batch(questions, *args) -> list[str]:
+            running.append(admission.running)
+            return ["SELECT count(*) FROM users"] * len(questions)
+
+        mock_llm.generate_sql_batch = AsyncMock(side_effect=generate_sql_batch)
+
+        response = await service.execute_batch(
+            BatchQueryRequest(queries=["查询用户数量", "统计用户"]), client="alice"
+        )
+
+        assert response.metadata.succeeded == 2
+        assert running == [{"testdb": 1}]
+        assert admission.running == {}
+        mock_llm.generate_sql.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_shed_combined_generation(
+        self, mock_llm: MagicMock, metrics: Metrics, sample_schema, sample_query_result
+    ) -> None:
+        """Test a shed combined request makes no LLM call and leaves each question to admission."""
+        admission = AdmissionController(AdmissionSettings(max_concurrency=1, max_queue_size=0))
+        service = QueryService(
+            llm_service=mock_llm,
+            database_service=mock_database(sample_schema, sample_query_result),
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False, batch_sql_mode="combined"),
+            metrics=metrics,
+            admission=admission,
+        )
+        mock_llm.generate_sql_batch = AsyncMock()
+        holder = await admission.acquire("testdb", "bob")
+
+        response = await service.execute_batch(
+            BatchQueryRequest(queries=["查询用户数量", "统计用户"]), client="alice"
+        )
+        admission.release(holder)
+
+        mock_llm.generate_sql_batch.assert_not_called()
+        mock_llm.generate_sql.assert_not_called()
+        assert all(
+            result.error_code == ErrorCode.SERVER_OVERLOADED.value for result in response.results
+        )
+
+
+class TestSQLRepair:
+    """Tests for sending failed SQL back to the LLM for correction."""
+
+    @pytest.fixture
+    def mock_llm(self) -> MagicMock:
+        """Create a mock LLM whose first statement references a missing column."""
+        llm = MagicMock()
+        llm.generate_sql = AsyncMock(return_value="SELECT nme FROM users")
+        llm.repair_sql = AsyncMock(return_value="SELECT name FROM users")
+        return llm
+
+    @pytest.fixture
+    def metrics(self) -> Metrics:
+        """Create a metrics registry."""
+        return Metrics()
+
+    @pytest.fixture
+    def mock_db(self, sample_schema, sample_query_result) -> MagicMock:
+        """Create a mock database that rejects the misspelled column."""
+        db = mock_database(sample_schema, sample_query_result)
+
+        async def execute_query(sql: str, **kwargs) -> QueryResultData:
+            if "nme" in sql:
+                raise SQLExecutionError('column "nme" does not exist', sql, statement_error=True)
+            return sample_query_result
+
+        db.execute_query = AsyncMock(side_effect=execute_query)
+        return db
+
+    def _service(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics, **settings
+    ) -> QueryService:
+        """Create a QueryService with SQL repair settings."""
+        return QueryService(
+            llm_service=mock_llm,
+            database_service=mock_db,
+            validator=SQLValidator(),
+            query_settings=QuerySettings(enable_validation=False, **settings),
+            query_cache=QueryCache(CacheSettings()),
+            metrics=metrics,
+        )
+
+    @pytest.mark.asyncio
+    async def test_execution_error_repaired(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics
+    ) -> None:
+        """Test a database error is sent back with the failed SQL and the schema context."""
+        service = self._service(mock_llm, mock_db, metrics, repair_attempts=1)
+
+        response = await service.execute(QueryRequest(query="列出用户名"))
+
+        assert response.success is True
+        assert response.sql == "SELECT name FROM users"
+        assert response.metadata.repair_attempts == 1
+        args = mock_llm.repair_sql.call_args.args
+        assert args[2] == [("SELECT nme FROM users", 'column "nme" does not exist')]
+        assert args[3] == mock_llm.generate_sql.call_args.args[2]
+        assert metrics.sql_repairs.value(database="testdb", attempt="1", outcome="fixed") == 1
+        assert metrics.stage_seconds.count(database="testdb", stage="repair") == 1
+        # The repaired statement is what gets cached for the question
+        assert service.query_cache.get_sql("testdb", 1, "列出用户名") == "SELECT name FROM users"
+
+    @pytest.mark.asyncio
+    async def test_unsafe_sql_repaired(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics
+    ) -> None:
+        """Test SQL rejected by the validator is repaired and validated again."""
+        mock_llm.generate_sql = AsyncMock(return_value="DELETE FROM users")
+        service = self._service(mock_llm, mock_db, metrics, repair_attempts=1)
+
+        response = await service.execute(QueryRequest(query="列出用户名"))
+
+        assert response.success is True
+        assert metrics.sql_rejections.value(database="testdb") == 1
+        assert mock_llm.repair_sql.call_args.args[2][0][0] == "DELETE FROM users"
+
+    @pytest.mark.asyncio
+    async def test_attempts_bounded(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics
+    ) -> None:
+        """Test the last error is returned once the repair attempts are used up."""
+        mock_llm.repair_sql = AsyncMock(
+            side_effect=["SELECT nme, id FROM users", "SELECT id, nme FROM users"]
+        )
+        service = self._service(mock_llm, mock_db, metrics, repair_attempts=2)
+
+        response = await service.execute(QueryRequest(query="列出用户名"))
+
+        assert response.success is False
+        assert response.error_code == ErrorCode.SQL_EXECUTION_FAILED.value
+        assert mock_llm.repair_sql.call_count == 2
+        # Each attempt sees every earlier failure
+        assert len(mock_llm.repair_sql.call_args.args[2]) == 2
+        for attempt in ("1", "2"):
+            assert metrics.sql_repairs.value(
+                database="testdb", attempt=attempt, outcome="failed"
+            ) == 1
+
+    @pytest.mark.asyncio
+    async def test_time_budget(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics
+    ) -> None:
+        """Test a repair that outlasts the time budget is abandoned."""
+
+        async def slow_repair(*args) -> str:
+            await asyncio.sleep(1)
+            return "SELECT name FROM users"
+
+        mock_llm.repair_sql = AsyncMock(side_effect=slow_repair)
+        service = self._service(
+            mock_llm, mock_db, metrics, repair_attempts=1, repair_timeout=0.05
+        )
+
+        response = await service.execute(QueryRequest(query="列出用户名"))
+
+        assert response.success is False
+        assert response.error_code == ErrorCode.SQL_EXECUTION_FAILED.value
+        assert metrics.sql_repairs.value(database="testdb", attempt="1", outcome="timeout") == 1
+
+    @pytest.mark.asyncio
+    async def test_infrastructure_errors_not_repaired(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics
+    ) -> None:
+        """Test failures that are not about the statement are returned without repair."""
+        mock_db.execute_query = AsyncMock(
+            side_effect=SQLExecutionError("Unexpected error: connection reset", "SELECT 1")
+        )
+        service = self._service(mock_llm, mock_db, metrics, repair_attempts=2)
+
+        response = await service.execute(QueryRequest(query="列出用户名"))
+
+        assert response.error_code == ErrorCode.SQL_EXECUTION_FAILED.value
+        mock_llm.repair_sql.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(
+        self, mock_llm: MagicMock, mock_db: MagicMock, metrics: Metrics
+    ) -> None:
+        """Test failures are returned right away unless repair is enabled."""
+        service = self._service(mock_llm, mock_db, metrics)
+
+        response = await service.execute(QueryRequest(query="列出用户名"))
+
+        assert response.success is False
+        mock_llm.repair_sql.assert_not_called()
@@ -0,0 +1,165 @@
+"""Tests for query admission control."""
+
+import asyncio
+
+import pytest
+
+from pg_mcp.config import AdmissionSettings
+from pg_mcp.models import ErrorCode, ServerOverloadedError
+from pg_mcp.query import AdmissionController
+
+
+async def _settle() -> None:
+    """Let waiting tasks run until they block again."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_max_concurrency(self) -> None:
+        """Test queries beyond max_concurrency wait for a slot to be released."""
+        controller = AdmissionController(AdmissionSettings(max_concurrency=2))
+        first = await controller.acquire("db")
+        await controller.acquire("db")
+
+        waiting = asyncio.create_task(controller.acquire("db"))
+        await _settle()
+        assert not waiting.done()
+        assert controller.running == {"db": 2}
+        assert controller.waiting == {"db": 1}
+
+        controller.release(first)
+        await _settle()
+        assert waiting.done()
+        assert controller.waiting == {}
+
+    @pytest.mark.asyncio
+    async def test_weighted_fair_order_across_databases(self) -> None:
+        """Test waiting databases are admitted in proportion to their weights."""
+        controller = AdmissionController(
+            AdmissionSettings(max_concurrency=1, client_max_concurrency=0),
+            weights={"heavy": 2.0},
+        )
+        holder = await controller.acquire("heavy")
+
+        order: list[str] = []
+
+        async def query(database: str) -> None:
+            async with controller.admit(database):
+                order.append(database)
+
+        # The heavy database floods the queue before the light one shows up
+        tasks = [asyncio.create_task(query("heavy")) for _ in range(6)]
+        await _settle()
+        tasks += [asyncio.create_task(query("light")) for _ in range(3)]
+        await _settle()
+
+        controller.release(holder)
+        await asyncio.gather(*tasks)
+
+        assert order[:6] == ["heavy", "light", "heavy", "heavy", "light", "heavy"]
+
+    @pytest.mark.asyncio
+    async def test_database_quota(self) -> None:
+        """Test a database at its quota does not block other databases."""
+        controller = AdmissionController(
+            AdmissionSettings(max_concurrency=4, database_max_concurrency=1)
+        )
+        await controller.acquire("busy")
+
+        blocked = asyncio.create_task(controller.acquire("busy"))
+        await _settle()
+        other = await asyncio.wait_for(controller.acquire("idle"), timeout=1)
+
+        assert other.database == "idle"
+        assert not blocked.done()
+        blocked.cancel()
+
+    @pytest.mark.asyncio
+    async def test_client_quota(self) -> None:
+        """Test a client at its quota waits while other clients are admitted."""
+        controller = AdmissionController(
+            AdmissionSettings(max_concurrency=4, client_max_concurrency=2)
+        )
+        first = await controller.acquire("db", "noisy")
+        await controller.acquire("db", "noisy")
+
+        noisy = asyncio.create_task(controller.acquire("db", "noisy"))
+        await _settle()
+        quiet = await asyncio.wait_for(controller.acquire("db", "quiet"), timeout=1)
+        assert quiet.client == "quiet"
+        assert not noisy.done()
+
+        controller.release(first)
+        await _settle()
+        assert noisy.done()
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_queue_full(self) -> None:
+        """Test a query is rejected with a retry delay when the queue is full."""
+        controller = AdmissionController(
+            AdmissionSettings(max_concurrency=1, max_queue_size=1)
+        )
+        await controller.acquire("db")
+        queued = asyncio.create_task(controller.acquire("db"))
+        await _settle()
+
+        with pytest.raises(ServerOverloadedError) as exc:
+            await controller.acquire("db")
+
+        assert exc.value.code == ErrorCode.SERVER_OVERLOADED
+        assert exc.value.retry_after >= 1
+        assert controller.waiting == {"db": 1}
+        queued.cancel()
+
+    @pytest.mark.asyncio
+    async def test_sheds_after_queue_timeout(self) -> None:
+        """Test a query waiting longer than queue_timeout is rejected and dequeued."""
+        controller = AdmissionController(
+            AdmissionSettings(max_concurrency=1, queue_timeout=0.05)
+        )
+        await controller.acquire("db")
+
+        with pytest.raises(ServerOverloadedError) as exc:
+            await controller.acquire("db")
+
+        assert "0.05s" in exc.value.details
+        assert controller.waiting == {}
+
+    @pytest.mark.asyncio
+    async def test_retry_after_from_service_time(self) -> None:
+        """Test the retry delay grows with the queue and the processing time."""
+        controller = AdmissionController(
+            AdmissionSettings(max_concurrency=1, max_queue_size=2)
+        )
+        # A processing time of about 2s per query
+        controller._service_time = 2.0
+        await controller.acquire("db")
+        tasks = [asyncio.create_task(controller.acquire("db")) for _ in range(2)]
+        await _settle()
+
+        with pytest.raises(ServerOverloadedError) as exc:
+            await controller.acquire("db")
+
+        # Two queued queries plus the retry itself, 2s each
+        assert exc.value.retry_after == 6
+        for task in tasks:
+            task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        """Test a cancelled query neither stays queued nor takes a slot."""
+        controller = AdmissionController(AdmissionSettings(max_concurrency=1))
+        holder = await controller.acquire("db")
+        waiting = asyncio.create_task(controller.acquire("db"))
+        await _settle()
+
+        waiting.cancel()
+        await _settle()
+        controller.release(holder)
+
+        assert controller.waiting == {}
+        assert controller.running == {}
@@ -0,0 +1,148 @@
+"""Tests for in-process caches."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pg_mcp.cache import LRUCache, QueryCache, normalize_question
+from pg_mcp.config import CacheSettings
+from pg_mcp.models import QueryResultData, ValidationResult
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+
+    def test_get_and_set(self) -> None:
+        """Test values round-trip and lookups are counted."""
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+
+        assert cache.get("a") is None
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test the least recently used entry is evicted first."""
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats().evictions == 1
+
+    def test_ttl_expiry(self) -> None:
+        """Test entries expire after the TTL."""
+        cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=10)
+        now = time.monotonic()
+
+        with patch("pg_mcp.cache.lru.time.monotonic", return_value=now):
+            cache.set("a", 1)
+        with patch("pg_mcp.cache.lru.time.monotonic", return_value=now + 5):
+            assert cache.get("a") == 1
+        with patch("pg_mcp.cache.lru.time.monotonic", return_value=now + 11):
+            assert cache.get("a") is None
+
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self) -> None:
+        """Test a zero maxsize stores nothing."""
+        cache: LRUCache[str, int] = LRUCache(maxsize=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_pop_and_clear(self) -> None:
+        """Test entries can be removed individually or all at once."""
+        cache: LRUCache[str, int] = LRUCache(maxsize=3)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestQueryCache:
+    """Tests for the two-level QueryCache."""
+
+    @pytest.fixture
+    def result(self) -> QueryResultData:
+        """Small query result."""
+        return QueryResultData(columns=["count"], rows=[[42]], row_count=1, execution_time_ms=5.0)
+
+    def test_normalize_question(self) -> None:
+        """Test trivially different phrasings normalize to the same key."""
+        assert normalize_question("  查询用户数量？ ") == normalize_question("查询用户数量")
+        assert normalize_question("Count  USERS!") == "Count USERS"
+        assert normalize_question("ＳＥＬＥＣＴ") == "SELECT"
+
+    def test_case_sensitive_literals(self) -> None:
+        """Test questions differing only in the case of a literal get separate entries."""
+        cache = QueryCache(CacheSettings())
+        cache.set_sql(
+            "main", 1, "orders with status 'Shipped'", "SELECT * FROM orders WHERE status = 'Shipped'"
+        )
+
+        assert normalize_question("orders with status 'shipped'") != normalize_question(
+            "orders with status 'Shipped'"
+        )
+        assert cache.get_sql("main", 1, "orders with status 'shipped'") is None
+
+    def test_sql_keyed_by_schema_version(self) -> None:
+        """Test cached SQL is invalidated by a schema version change."""
+        cache = QueryCache(CacheSettings())
+        cache.set_sql("main", 1, "查询用户数量", "SELECT count(*) FROM users")
+
+        assert cache.get_sql("main", 1, "查询用户数量。") == "SELECT count(*) FROM users"
+        assert cache.get_sql("main", 2, "查询用户数量") is None
+        assert cache.get_sql("other", 1, "查询用户数量") is None
+
+    def test_result_round_trip(self, result: QueryResultData) -> None:
+        """Test results are cached together with their validation."""
+        cache = QueryCache(CacheSettings())
+        validation = ValidationResult(passed=True, message="OK")
+
+        assert cache.set_result("main", 1, "SELECT 1", result, validation)
+        cached = cache.get_result("main", 1, "SELECT 1")
+
+        assert cached is not None
+        assert cached.result == result
+        assert cached.validation == validation
+        assert cache.stats()["result"].hits == 1
+
+    def test_discard(self, result: QueryResultData) -> None:
+        """Test discarding drops both the SQL and the result of a question."""
+        cache = QueryCache(CacheSettings())
+        cache.set_sql("main", 1, "查询用户数量", "SELECT 1")
+        cache.set_result("main", 1, "SELECT 1", result, None)
+
+        cache.discard("main", 1, "查询用户数量？", "SELECT 1")
+
+        assert cache.get_sql("main", 1, "查询用户数量") is None
+        assert cache.get_result("main", 1, "SELECT 1") is None
+
+    def test_result_row_budget(self, result: QueryResultData) -> None:
+        """Test results above the row budget are not cached."""
+        cache = QueryCache(CacheSettings(result_max_rows=0))
+
+        assert not cache.set_result("main", 1, "SELECT 1", result, None)
+        assert cache.get_result("main", 1, "SELECT 1") is None
+
+    def test_result_ttl_zero_disables_results(self, result: QueryResultData) -> None:
+        """Test a zero TTL disables the result level only."""
+        cache = QueryCache(CacheSettings(result_ttl=0))
+        cache.set_result("main", 1, "SELECT 1", result, None)
+        cache.set_sql("main", 1, "q", "SELECT 1")
+
+        assert cache.get_result("main", 1, "SELECT 1") is None
+        assert cache.get_sql("main", 1, "q") == "SELECT 1"
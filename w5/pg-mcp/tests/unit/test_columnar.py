@@ -0,0 +1,129 @@
+"""Tests for the columnar result encoding."""
+
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from pg_mcp.models import decode_rows, encode_columns
+
+
+class TestEncodeColumns:
+    """Tests for encode_columns."""
+
+    def test_integer_range(self) -> None:
+        """Test integers with a constant step are stored as start and step."""
+        (column,) = encode_columns(["id"], [[10], [8], [6]])
+
+        assert column == {"name": "id", "type": "int", "encoding": "range", "start": 10, "step": -2}
+
+    def test_integer_delta(self) -> None:
+        """Test non-decreasing integers are stored as differences."""
+        (column,) = encode_columns(["id"], [[3], [4], [4], [10]])
+
+        assert column["encoding"] == "delta"
+        assert column["values"] == [3, 1, 0, 6]
+
+    def test_integer_plain(self) -> None:
+        """Test unordered integers and integers with NULLs stay plain."""
+        unordered, with_null = (
+            encode_columns(["a"], [[3], [1], [2]])[0],
+            encode_columns(["a"], [[1], [None], [3]])[0],
+        )
+
+        assert unordered["encoding"] == "plain"
+        assert unordered["values"] == [3, 1, 2]
+        assert with_null["encoding"] == "plain"
+        assert with_null["values"] == [1, None, 3]
+
+    def test_bool_is_not_int(self) -> None:
+        """Test booleans keep their own type tag."""
+        (column,) = encode_columns(["flag"], [[True], [False]])
+
+        assert column == {"name": "flag", "type": "bool", "encoding": "plain", "values": [True, False]}
+
+    def test_decimal_scaled(self) -> None:
+        """Test decimals are stored as integers at the largest scale."""
+        (column,) = encode_columns(
+            ["total"], [[Decimal("12.5")], [None], [Decimal("-0.05")], [Decimal("3")]]
+        )
+
+        assert column == {
+            "name": "total",
+            "type": "numeric",
+            "encoding": "scaled",
+            "scale": 2,
+            "values": [1250, None, -5, 300],
+        }
+
+    def test_decimal_special_values_stay_strings(self) -> None:
+        """Test NaN and exponent notation fall back to strings."""
+        nan = encode_columns(["x"], [[Decimal("NaN")], [Decimal("1.5")]])[0]
+        exponent = encode_columns(["x"], [[Decimal("1E+3")]])[0]
+
+        assert nan["encoding"] == "plain"
+        assert nan["values"] == ["NaN", "1.5"]
+        assert exponent["values"] == ["1E+3"]
+
+    def test_repeated_strings_dictionary(self) -> None:
+        """Test repeated strings are dictionary encoded in order of appearance."""
+        (column,) = encode_columns(["s"], [["b"], ["a"], [None], ["b"], ["a"]])
+
+        assert column == {
+            "name": "s",
+            "type": "text",
+            "encoding": "dict",
+            "dictionary": ["b", "a"],
+            "values": [0, 1, None, 0, 1],
+        }
+
+    def test_distinct_strings_plain(self) -> None:
+        """Test mostly distinct strings are not dictionary encoded."""
+        (column,) = encode_columns(["s"], [["a"], ["b"], ["c"], ["a"]])
+
+        assert column["encoding"] == "plain"
+        assert column["values"] == ["a", "b", "c", "a"]
+
+    def test_other_types_as_strings(self) -> None:
+        """Test values without a JSON type are stored as strings with a type tag."""
+        uuid = UUID("12345678-1234-5678-1234-567812345678")
+        created, ids = encode_columns(
+            ["created_at", "uid"], [[datetime(2024, 1, 2, 3, 4, 5), uuid]]
+        )
+
+        assert created["type"] == "timestamp"
+        assert created["values"] == ["2024-01-02 03:04:05"]
+        assert ids["type"] == "uuid"
+        assert ids["values"] == [str(uuid)]
+
+    def test_null_and_empty_columns(self) -> None:
+        """Test all-NULL columns and empty results keep one object per column."""
+        assert encode_columns(["a"], [[None], [None]]) == [
+            {"name": "a", "type": "null", "encoding": "plain", "values": [None, None]}
+        ]
+        assert encode_columns(["a", "b"], []) == [
+            {"name": "a", "type": "null", "encoding": "plain", "values": []},
+            {"name": "b", "type": "null", "encoding": "plain", "values": []},
+        ]
+
+
+class TestDecodeRows:
+    """Tests for decode_rows."""
+
+    def test_round_trip(self) -> None:
+        """Test decoding restores the rows of every encoding."""
+        rows = [
+            [i, i * i, ("x", "y")[i % 2], Decimal(f"{i}.25"), i * 0.5, None]
+            for i in range(1, 7)
+        ]
+        names = ["id", "square", "label", "amount", "ratio", "missing"]
+
+        columns = encode_columns(names, rows)
+
+        assert [c["encoding"] for c in columns] == [
+            "range", "delta", "dict", "scaled", "plain", "plain"
+        ]
+        assert decode_rows(columns, len(rows)) == rows
+
+    def test_empty(self) -> None:
+        """Test decoding an empty result."""
+        assert decode_rows(encode_columns(["a"], []), 0) == []
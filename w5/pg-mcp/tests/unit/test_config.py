@@ -6,11 +6,15 @@ import tempfile
 from pathlib import Path
 
 from pg_mcp.config import (
+    AdmissionSettings,
+    CacheSettings,
     ConfigLoader,
     DatabaseConfig,
     LLMSettings,
     QuerySettings,
+    SchemaSettings,
     Settings,
+    ValidatorSettings,
 )
 
 
@@ -25,7 +29,12 @@ class TestLLMSettings:
         assert settings.temperature == 0.1
         assert settings.timeout == 30.0
         assert settings.max_tokens == 2048
+        assert settings.batch_max_tokens == 8192
         assert "dashscope" in settings.base_url
+        assert settings.stream_sql is False
+        assert settings.max_concurrency == 8
+        assert settings.rate_limit == 0
+        assert settings.max_retries == 3
 
     def test_api_key_secret(self) -> None:
         """Test that API key is stored as SecretStr."""
@@ -49,6 +58,21 @@ class TestQuerySettings:
         assert settings.default_limit == 100
         assert settings.statement_timeout == 30000
         assert settings.enable_validation is True
+        assert settings.schema_token_budget == 6000
+        assert settings.stream_results is False
+        assert settings.max_result_bytes == 0
+        assert settings.result_format == "rows"
+        assert settings.max_estimated_cost == 0
+        assert settings.max_estimated_rows == 0
+        assert settings.explain_cache_size == 1024
+        assert settings.repair_attempts == 0
+        assert settings.repair_timeout == 15.0
+        assert settings.schema_pruning_min_tables == 30
+        assert settings.validation_mode == "sync"
+        assert settings.validation_workers == 2
+        assert settings.validation_queue_size == 100
+        assert settings.batch_max_queries == 20
+        assert settings.batch_sql_mode == "concurrent"
 
     def test_validation_limit_bounds(self) -> None:
         """Test that default_limit has proper bounds."""
@@ -58,10 +82,111 @@ class TestQuerySettings:
         with pytest.raises(ValueError):
             QuerySettings(default_limit=20000)
 
+    def test_invalid_validation_mode(self) -> None:
+        """Test that validation_mode only accepts sync or async."""
+        with pytest.raises(ValueError):
+            QuerySettings(validation_mode="deferred")
+
+
+class TestSchemaSettings:
+    """Tests for SchemaSettings."""
+
+    def test_default_values(self) -> None:
+        """Test SchemaSettings default values."""
+        settings = SchemaSettings()
+
+        assert settings.refresh_concurrency == 1
+        assert settings.introspection == "information_schema"
+        assert settings.watch_interval == 0
+        assert settings.ddl_log_table is None
+        assert settings.snapshot_dir is None
+        assert settings.profile_interval == 0
+        assert settings.profile_max_distinct == 50
+        assert settings.profile_max_values == 10
+
+    def test_ddl_log_table_must_be_identifier(self) -> None:
+        """Test that ddl_log_table only accepts plain (schema-qualified) identifiers."""
+        assert SchemaSettings(ddl_log_table="audit.ddl_log").ddl_log_table == "audit.ddl_log"
+
+        with pytest.raises(ValueError):
+            SchemaSettings(ddl_log_table="ddl_log; DROP TABLE users")
+
+    def test_introspection_choices(self) -> None:
+        """Test that only known introspection backends are accepted."""
+        assert SchemaSettings(introspection="pg_catalog").introspection == "pg_catalog"
+
+        with pytest.raises(ValueError):
+            SchemaSettings(introspection="mysql")
+
+    def test_refresh_concurrency_bounds(self) -> None:
+        """Test that refresh_concurrency has proper bounds."""
+        with pytest.raises(ValueError):
+            SchemaSettings(refresh_concurrency=0)
+
+        with pytest.raises(ValueError):
+            SchemaSettings(refresh_concurrency=8)
+
+
+class TestCacheSettings:
+    """Tests for CacheSettings."""
+
+    def test_default_values(self) -> None:
+        """Test CacheSettings default values."""
+        settings = CacheSettings()
+
+        assert settings.enabled is False
+        assert settings.sql_cache_size == 1024
+        assert settings.result_cache_size == 256
+        assert settings.result_ttl == 60.0
+        assert settings.result_max_rows == 1000
+
+
+class TestValidatorSettings:
+    """Tests for ValidatorSettings."""
+
+    def test_default_values(self) -> None:
+        """Test ValidatorSettings default values."""
+        settings = ValidatorSettings()
+
+        assert settings.executor == "thread"
+        assert settings.workers == 2
+        assert settings.parse_timeout == 5.0
+        assert settings.cache_size == 1024
+
+    def test_invalid_executor(self) -> None:
+        """Test an unknown executor kind is rejected."""
+        with pytest.raises(ValueError):
+            ValidatorSettings(executor="fiber")
+
+
+class TestAdmissionSettings:
+    """Tests for AdmissionSettings."""
+
+    def test_default_values(self) -> None:
+        """Test AdmissionSettings default values."""
+        settings = AdmissionSettings()
+
+        assert settings.max_concurrency == 0
+        assert settings.database_max_concurrency == 0
+        assert settings.client_max_concurrency == 8
+        assert settings.max_queue_size == 256
+        assert settings.queue_timeout == 30.0
+
 
 class TestDatabaseConfig:
     """Tests for DatabaseConfig."""
 
+    def test_pool_defaults(self) -> None:
+        """Test pool option and replica defaults."""
+        config = DatabaseConfig(name="test", database="mydb", user="myuser", password="mypass")
+
+        assert config.command_timeout == 60.0
+        assert config.max_inactive_connection_lifetime == 300.0
+        assert config.statement_cache_size == 256
+        assert config.replicas == []
+        assert config.replica_check_interval == 10.0
+        assert config.weight == 1.0
+
     def test_dsn_generation(self) -> None:
         """Test DSN connection string generation."""
         config = DatabaseConfig(
@@ -142,6 +267,41 @@ databases:
             finally:
                 os.unlink(f.name)
 
+    def test_load_config_with_replicas(self) -> None:
+        """Test replica endpoints are loaded with environment variables expanded."""
+        os.environ["TEST_PG_REPLICA_HOST"] = "replica-1.internal"
+
+        config_content = """
+databases:
+  - name: test_db
+    database: testdb
+    user: testuser
+    password: testpass
+    command_timeout: 15
+    replicas:
+      - host: "${TEST_PG_REPLICA_HOST}"
+      - host: replica-2.internal
+        port: 6432
+"""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".yaml", delete=False
+        ) as f:
+            f.write(config_content)
+            f.flush()
+
+            try:
+                databases = ConfigLoader.load_databases(f.name)
+
+                replicas = databases[0].replicas
+                assert [(r.host, r.port) for r in replicas] == [
+                    ("replica-1.internal", 5432),
+                    ("replica-2.internal", 6432),
+                ]
+                assert databases[0].command_timeout == 15
+            finally:
+                os.unlink(f.name)
+                del os.environ["TEST_PG_REPLICA_HOST"]
+
     def test_load_config_with_env_var(self) -> None:
         """Test loading configuration with environment variable substitution."""
         os.environ["TEST_PG_PASSWORD"] = "env_password"
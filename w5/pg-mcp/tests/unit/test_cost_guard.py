@@ -0,0 +1,87 @@
+"""Tests for the query cost guard."""
+
+import json
+
+import sqlglot
+
+from pg_mcp.database.cost_guard import PlanEstimate, estimate_cross_join_rows, parse_plan
+
+ROW_COUNTS = {"public.users": 1000, "users": 1000, "public.orders": 5000, "orders": 5000}
+
+
+def _rows(sql: str) -> int | None:
+    """Estimate the cross join rows of a SQL statement."""
+    return estimate_cross_join_rows(sqlglot.parse_one(sql, dialect="postgres"), ROW_COUNTS)
+
+
+class TestParsePlan:
+    """Tests for parse_plan."""
+
+    def test_total_cost_and_largest_node(self) -> None:
+        """Test the top-level cost and the largest row estimate of any node are used."""
+        explain = [{
+            "Plan": {
+                "Node Type": "Sort",
+                "Total Cost": 1234.5,
+                "Plan Rows": 100,
+                "Plans": [{
+                    "Node Type": "Hash Join",
+                    "Total Cost": 1200.0,
+                    "Plan Rows": 5000,
+                    "Plans": [
+                        {"Node Type": "Seq Scan", "Total Cost": 80.0, "Plan Rows": 20000},
+                        {"Node Type": "Hash", "Total Cost": 30.0, "Plan Rows": 1000},
+                    ],
+                }],
+            }
+        }]
+
+        assert parse_plan(explain) == PlanEstimate(cost=1234.5, rows=20000)
+
+    def test_rows_below_limit_ignored(self) -> None:
+        """Test the full scan estimate under a Limit does not count."""
+        explain = [{
+            "Plan": {
+                "Node Type": "Limit",
+                "Total Cost": 0.02,
+                "Plan Rows": 100,
+                "Plans": [
+                    {"Node Type": "Seq Scan", "Total Cost": 180000.0, "Plan Rows": 10000000},
+                ],
+            }
+        }]
+
+        assert parse_plan(explain) == PlanEstimate(cost=0.02, rows=100)
+
+    def test_json_text(self) -> None:
+        """Test EXPLAIN output returned as JSON text is decoded."""
+        explain = json.dumps([{"Plan": {"Total Cost": 1.5, "Plan Rows": 3}}])
+
+        assert parse_plan(explain) == PlanEstimate(cost=1.5, rows=3)
+
+
+class TestEstimateCrossJoinRows:
+    """Tests for estimate_cross_join_rows."""
+
+    def test_comma_and_cross_joins(self) -> None:
+        """Test tables joined without a condition multiply their row counts."""
+        assert _rows("SELECT * FROM users, orders") == 5_000_000
+        assert _rows("SELECT * FROM public.users CROSS JOIN public.orders") == 5_000_000
+
+    def test_join_conditions(self) -> None:
+        """Test joins with ON, USING, NATURAL or a WHERE clause are not cross joins."""
+        assert _rows("SELECT * FROM users JOIN orders ON orders.user_id = users.id") is None
+        assert _rows("SELECT * FROM users JOIN orders USING (id)") is None
+        assert _rows("SELECT * FROM users NATURAL JOIN orders") is None
+        assert _rows("SELECT * FROM users, orders WHERE orders.user_id = users.id") is None
+
+    def test_unknown_sources_skipped(self) -> None:
+        """Test cross joins with subqueries or tables without row counts are skipped."""
+        assert _rows("SELECT * FROM users, (SELECT 1) AS s") is None
+        assert _rows("SELECT * FROM users, audit_log") is None
+
+    def test_subquery_cross_join(self) -> None:
+        """Test cross joins inside subqueries are found."""
+        sql = "SELECT COUNT(*) FROM (SELECT * FROM users, users AS u2) AS s"
+
+        assert _rows(sql) == 1_000_000
@@ -0,0 +1,52 @@
+"""Tests for LLM rate limiting helpers."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pg_mcp.llm import TokenBucket
+from pg_mcp.llm.limiter import backoff_delay
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    @pytest.mark.asyncio
+    async def test_burst_does_not_wait(self) -> None:
+        """Test up to capacity tokens are handed out immediately."""
+        bucket = TokenBucket(rate=1.0, capacity=3)
+
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+
+        assert time.monotonic() - start < 0.1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_refill(self) -> None:
+        """Test an empty bucket waits for the next token."""
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        await bucket.acquire()
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.04
+
+
+class TestBackoffDelay:
+    """Tests for backoff_delay."""
+
+    def test_exponential_with_cap(self) -> None:
+        """Test the upper bound doubles per attempt up to the cap."""
+        with patch("pg_mcp.llm.limiter.random.uniform", side_effect=lambda a, b: b):
+            delays = [backoff_delay(attempt, base=0.5, cap=3.0) for attempt in range(5)]
+
+        assert delays == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+    def test_jitter_within_bounds(self) -> None:
+        """Test jittered delays stay between zero and the bound."""
+        delays = [backoff_delay(2, base=1.0, cap=10.0) for _ in range(50)]
+
+        assert all(0 <= delay <= 4.0 for delay in delays)
@@ -0,0 +1,106 @@
+"""Tests for the metrics registry."""
+
+import pytest
+
+from pg_mcp.metrics import Metrics, MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry and its metric types."""
+
+    def test_counter_render(self) -> None:
+        """Test counters render one sample per label set."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("outcome",))
+        requests.inc(outcome="success")
+        requests.inc(2, outcome="success")
+        requests.inc(outcome="error")
+
+        text = registry.render()
+
+        assert "# HELP requests_total Requests\n# TYPE requests_total counter\n" in text
+        assert 'requests_total{outcome="success"} 3\n' in text
+        assert 'requests_total{outcome="error"} 1\n' in text
+        assert requests.value(outcome="success") == 3
+
+    def test_counter_rejects_decrease(self) -> None:
+        """Test counters cannot go down."""
+        counter = MetricsRegistry().counter("c_total", "C")
+
+        with pytest.raises(ValueError):
+            counter.inc(-1)
+
+    def test_labels_must_match(self) -> None:
+        """Test samples need exactly the declared labels."""
+        counter = MetricsRegistry().counter("c_total", "C", ("database",))
+
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            counter.inc(database="a", stage="b")
+
+    def test_label_escaping(self) -> None:
+        """Test quotes, backslashes and newlines in label values are escaped."""
+        registry = MetricsRegistry()
+        registry.gauge("g", "G", ("name",)).set(1.5, name='a"b\\c\nd')
+
+        assert 'g{name="a\\"b\\\\c\\nd"} 1.5' in registry.render()
+
+    def test_histogram_buckets(self) -> None:
+        """Test histograms render cumulative buckets, sum and count."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1\n' in text
+        assert 'latency_seconds_bucket{le="1"} 3\n' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4\n' in text
+        assert "latency_seconds_sum 4.25\n" in text
+        assert "latency_seconds_count 4\n" in text
+
+    def test_histogram_time(self) -> None:
+        """Test the timer observes once, also when the block raises."""
+        latency = MetricsRegistry().histogram("latency_seconds", "Latency", ("stage",))
+
+        with latency.time(stage="a"):
+            pass
+        with pytest.raises(RuntimeError):
+            with latency.time(stage="a"):
+                raise RuntimeError("boom")
+
+        assert latency.count(stage="a") == 2
+
+    def test_collectors(self) -> None:
+        """Test collectors refresh gauges before rendering and failures are contained."""
+        registry = MetricsRegistry()
+        size = registry.gauge("pool_size", "Pool size")
+        registry.set_collector("pool", lambda: size.set(7))
+        registry.set_collector("broken", lambda: 1 / 0)
+
+        assert "pool_size 7\n" in registry.render()
+
+        registry.set_collector("pool", None)
+        size.clear()
+        assert "pool_size 7" not in registry.render()
+
+    def test_duplicate_name(self) -> None:
+        """Test a metric name can only be registered once."""
+        registry = MetricsRegistry()
+        registry.counter("c_total", "C")
+
+        with pytest.raises(ValueError):
+            registry.gauge("c_total", "C")
+
+    def test_server_metrics_registered(self) -> None:
+        """Test the server registry declares the pipeline and pool metrics."""
+        metrics = Metrics()
+
+        for name in (
+            "pg_mcp_query_stage_seconds",
+            "pg_mcp_llm_tokens_total",
+            "pg_mcp_pool_waiters",
+        ):
+            assert metrics.get(name) is not None
@@ -4,7 +4,9 @@ import pytest
 from datetime import datetime
 
 from pg_mcp.models import (
+    BatchQueryRequest,
     ColumnInfo,
+    ColumnStats,
     DatabaseSchema,
     ErrorCode,
     QueryError,
@@ -72,6 +74,14 @@ class TestQueryModels:
         with pytest.raises(ValueError):
             QueryRequest(query="a" * 5000)
 
+    def test_batch_query_request_validation(self) -> None:
+        """Test a batch needs at least one query and validates each query."""
+        assert BatchQueryRequest(queries=["a", "b"]).queries == ["a", "b"]
+        with pytest.raises(ValueError):
+            BatchQueryRequest(queries=[])
+        with pytest.raises(ValueError):
+            BatchQueryRequest(queries=["a", ""])
+
     def test_query_result_data(self) -> None:
         """Test QueryResultData creation."""
         result = QueryResultData(
@@ -84,6 +94,22 @@ class TestQueryModels:
         assert result.row_count == 2
         assert result.execution_time_ms == 10.5
 
+    def test_query_result_data_head(self) -> None:
+        """Test head returns the first rows of either format."""
+        rows = QueryResultData(
+            columns=["id"], rows=[[1], [2], [3]], row_count=3, execution_time_ms=1.0
+        )
+        columnar = QueryResultData(
+            columns=["id"],
+            rows=[],
+            row_count=3,
+            execution_time_ms=1.0,
+            format="columnar",
+            column_data=[{"name": "id", "type": "int", "encoding": "range", "start": 1, "step": 1}],
+        )
+        assert rows.head(2) == [[1], [2]]
+        assert columnar.head(2) == [[1], [2]]
+
     def test_validation_result(self) -> None:
         """Test ValidationResult creation."""
         result = ValidationResult(passed=True, message="OK")
@@ -280,6 +306,45 @@ class TestSchemaModels:
         context = schema.to_llm_context()
         assert "1,000" in context or "~1,000" in context
 
+    def test_column_stats_summary(self) -> None:
+        """Test ColumnStats.summary() renders common values compactly."""
+        stats = ColumnStats(
+            null_fraction=0.0,
+            distinct_count=2,
+            most_common_values=["it's", "no"],
+            most_common_frequencies=[0.755, 0.245],
+        )
+        assert stats.summary() == "'it''s' 76%, 'no' 24% (~2 distinct)"
+
+    def test_database_schema_to_llm_context_with_column_stats(self) -> None:
+        """Test to_llm_context lists common values of profiled columns."""
+        schema = DatabaseSchema(
+            database_name="testdb",
+            tables=[
+                TableInfo(
+                    schema_name="public",
+                    name="orders",
+                    columns=[
+                        ColumnInfo(name="id", data_type="integer"),
+                        ColumnInfo(
+                            name="status",
+                            data_type="text",
+                            stats=ColumnStats(
+                                null_fraction=0.05,
+                                distinct_count=3,
+                                most_common_values=["paid", "open"],
+                                most_common_frequencies=[0.62, 0.3],
+                            ),
+                        ),
+                    ],
+                ),
+            ],
+        )
+        context = schema.to_llm_context()
+        assert "Common values:" in context
+        assert "- status: 'paid' 62%, 'open' 30% (~3 distinct, 5% NULL)" in context
+        assert "- id:" not in context
+
     def test_database_schema_to_llm_context_with_views(self) -> None:
         """Test to_llm_context includes views."""
         from pg_mcp.models import ViewInfo
@@ -343,6 +408,35 @@ class TestSchemaModels:
         assert "public.orders" in context
         assert "public.users" in context
 
+    def test_database_schema_subset(self) -> None:
+        """Test subset keeps only the selected relations and their relationships."""
+        from pg_mcp.models import EnumTypeInfo, ForeignKeyRelation
+        schema = DatabaseSchema(
+            database_name="testdb",
+            tables=[
+                TableInfo(schema_name="public", name="users", columns=[]),
+                TableInfo(schema_name="public", name="orders", columns=[]),
+                TableInfo(schema_name="public", name="logs", columns=[]),
+            ],
+            enum_types=[EnumTypeInfo(name="status", values=["active"])],
+            foreign_key_relations=[
+                ForeignKeyRelation(
+                    from_table="public.orders",
+                    from_columns=["user_id"],
+                    to_table="public.users",
+                    to_columns=["id"],
+                    constraint_name="fk_orders_users",
+                ),
+            ],
+        )
+
+        subset = schema.subset({"public.users", "public.logs"})
+
+        assert [t.name for t in subset.tables] == ["users", "logs"]
+        assert subset.foreign_key_relations == []
+        assert subset.enum_types == schema.enum_types
+        assert "public.orders" not in subset.to_llm_context()
+
     def test_database_schema_get_table_names(self) -> None:
         """Test DatabaseSchema.get_table_names() method."""
         schema = DatabaseSchema(
@@ -0,0 +1,134 @@
+"""Tests for relevance-based schema pruning."""
+
+import pytest
+
+from pg_mcp.models import ColumnInfo, DatabaseSchema, ForeignKeyRelation, TableInfo, ViewInfo
+from pg_mcp.query.schema_retriever import SchemaRetriever, estimate_tokens, tokenize
+
+
+@pytest.fixture
+def large_schema() -> DatabaseSchema:
+    """Schema with a few meaningful tables among many unrelated ones."""
+    tables = [
+        TableInfo(
+            name="users",
+            comment="用户表",
+            columns=[
+                ColumnInfo(name="id", data_type="integer", is_primary_key=True),
+                ColumnInfo(name="created_at", data_type="timestamp", comment="注册时间"),
+            ],
+        ),
+        TableInfo(
+            name="orders",
+            comment="订单表",
+            columns=[
+                ColumnInfo(name="id", data_type="integer", is_primary_key=True),
+                ColumnInfo(name="user_id", data_type="integer", is_foreign_key=True),
+                ColumnInfo(name="total_amount", data_type="numeric", comment="订单金额"),
+            ],
+        ),
+        TableInfo(
+            name="order_items",
+            columns=[
+                ColumnInfo(name="order_id", data_type="integer", is_foreign_key=True),
+                ColumnInfo(name="quantity", data_type="integer"),
+            ],
+        ),
+    ]
+    tables.extend(
+        TableInfo(
+            name=f"audit_log_{i}",
+            columns=[ColumnInfo(name=f"payload_{j}", data_type="jsonb") for j in range(10)],
+        )
+        for i in range(40)
+    )
+    return DatabaseSchema(
+        database_name="shop",
+        tables=tables,
+        views=[ViewInfo(name="daily_sales", comment="每日销售汇总")],
+        foreign_key_relations=[
+            ForeignKeyRelation(
+                from_table="public.orders",
+                from_columns=["user_id"],
+                to_table="public.users",
+                to_columns=["id"],
+                constraint_name="orders_user_id_fkey",
+            ),
+            ForeignKeyRelation(
+                from_table="public.order_items",
+                from_columns=["order_id"],
+                to_table="public.orders",
+                to_columns=["id"],
+                constraint_name="order_items_order_id_fkey",
+            ),
+        ],
+    )
+
+
+class TestTokenize:
+    """Tests for the schema term tokenizer."""
+
+    def test_identifiers(self) -> None:
+        """Test snake_case and camelCase identifiers are split and singularised."""
+        assert tokenize("order_items") == ["order", "item"]
+        assert tokenize("userAccounts") == ["user", "account"]
+        assert tokenize("status") == ["statu"]
+        assert tokenize("address") == ["address"]
+
+    def test_cjk_bigrams(self) -> None:
+        """Test CJK text becomes overlapping bigrams."""
+        assert tokenize("用户数量") == ["用户", "户数", "数量"]
+        assert tokenize("表") == ["表"]
+
+    def test_mixed_text(self) -> None:
+        """Test mixed language questions keep both kinds of terms."""
+        assert tokenize("查询 orders 金额") == ["查询", "order", "金额"]
+
+    def test_estimate_tokens(self) -> None:
+        """Test token estimates count CJK characters individually."""
+        assert estimate_tokens("abcdefgh") == 2
+        assert estimate_tokens("用户表") == 3
+        assert estimate_tokens("") == 0
+
+
+class TestSchemaRetriever:
+    """Tests for SchemaRetriever."""
+
+    def test_rank_by_name_and_comment(self, large_schema: DatabaseSchema) -> None:
+        """Test English names and Chinese comments both match."""
+        retriever = SchemaRetriever(large_schema)
+
+        assert retriever.rank("list all orders")[0][0] == "public.orders"
+        assert retriever.rank("查询最近一个月注册的用户数量")[0][0] == "public.users"
+        assert retriever.rank("每日销售")[0][0] == "public.daily_sales"
+
+    def test_rank_no_match(self, large_schema: DatabaseSchema) -> None:
+        """Test unrelated questions match nothing."""
+        assert SchemaRetriever(large_schema).rank("天气怎么样") == []
+
+    def test_select_expands_foreign_keys(self, large_schema: DatabaseSchema) -> None:
+        """Test selected tables bring their join partners along."""
+        selection = SchemaRetriever(large_schema).select("订单金额", token_budget=10000)
+
+        names = {t.full_name for t in selection.schema.tables}
+        assert selection.pruned is True
+        assert {"public.orders", "public.users", "public.order_items"} <= names
+        assert not any(name.startswith("public.audit_log") for name in names)
+        assert len(selection.schema.foreign_key_relations) == 2
+        assert selection.names == frozenset(names)
+        assert selection.tables_total == 44
+
+    def test_select_respects_budget(self, large_schema: DatabaseSchema) -> None:
+        """Test the budget limits expansion but always keeps the best match."""
+        selection = SchemaRetriever(large_schema).select("订单金额", token_budget=1)
+
+        assert [t.full_name for t in selection.schema.tables] == ["public.orders"]
+        assert selection.schema.foreign_key_relations == []
+
+    def test_select_without_match_keeps_full_schema(self, large_schema: DatabaseSchema) -> None:
+        """Test the full schema is used when nothing matches."""
+        selection = SchemaRetriever(large_schema).select("天气怎么样", token_budget=100)
+
+        assert selection.pruned is False
+        assert selection.schema is large_schema
+        assert selection.names is None
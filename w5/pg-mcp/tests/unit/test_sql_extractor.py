@@ -0,0 +1,88 @@
+"""Tests for SQL extraction from LLM responses."""
+
+import pytest
+
+from pg_mcp.llm import SQLStreamExtractor, extract_sql
+
+
+def feed_in_chunks(text: str, size: int) -> tuple[str | None, int]:
+    """Feed text in fixed-size chunks until the statement is complete.
+
+    Returns:
+        The statement (or None) and the number of characters fed.
+    """
+    extractor = SQLStreamExtractor()
+    for start in range(0, len(text), size):
+        sql = extractor.feed(text[start : start + size])
+        if sql is not None:
+            return sql, min(start + size, len(text))
+    return None, len(text)
+
+
+class TestExtractSql:
+    """Tests for extract_sql."""
+
+    @pytest.mark.parametrize(
+        ("content", "expected"),
+        [
+            ("SELECT * FROM users", "SELECT * FROM users"),
+            ("```sql\nSELECT * FROM users\n```", "SELECT * FROM users"),
+            ("这是SQL：SELECT 1", "SELECT 1"),
+            ("SELECT 1;\n\nThis query returns one.", "SELECT 1"),
+            ("SELECT 1\n\n解释：返回常量", "SELECT 1"),
+            ("I will select the rows:\n```sql\nSELECT id FROM t\n```\nDone.", "SELECT id FROM t"),
+            ("", ""),
+        ],
+    )
+    def test_extracts_statement(self, content: str, expected: str) -> None:
+        """Test the statement is extracted from common response shapes."""
+        assert extract_sql(content) == expected
+
+    def test_keeps_leading_cte(self) -> None:
+        """Test a WITH clause is not cut off at the first SELECT."""
+        sql = "WITH recent AS (SELECT * FROM orders) SELECT count(*) FROM recent"
+
+        assert extract_sql(f"Query:\n{sql}") == sql
+
+    def test_ignores_terminators_in_literals_and_comments(self) -> None:
+        """Test semicolons and fences inside literals and comments do not end the statement."""
+        sql = "SELECT ';' AS a, $$```$$ AS b -- ;\n, \"x;\" FROM t /* ; */ WHERE c = 'it''s'"
+
+        assert extract_sql(f"```sql\n{sql}\n```") == sql
+
+    def test_blank_line_inside_sql(self) -> None:
+        """Test a blank line followed by more SQL is part of the statement."""
+        assert extract_sql("SELECT id\n\nFROM users") == "SELECT id\n\nFROM users"
+
+
+class TestSQLStreamExtractor:
+    """Tests for SQLStreamExtractor."""
+
+    RESPONSE = (
+        "```sql\nSELECT name, 'it''s;' FROM users WHERE id = 1\n```\n"
+        "This query selects the name of the user with id 1 and a constant string."
+    )
+
+    @pytest.mark.parametrize("size", [1, 2, 5, 16])
+    def test_stops_at_closing_fence(self, size: int) -> None:
+        """Test the statement is recognised before the explanation is received."""
+        sql, consumed = feed_in_chunks(self.RESPONSE, size)
+        fence_end = self.RESPONSE.index("```\nThis") + 3
+
+        assert sql == "SELECT name, 'it''s;' FROM users WHERE id = 1"
+        # Reading stops with the chunk that holds the closing fence
+        assert consumed < fence_end + size
+
+    def test_waits_for_escaped_quote(self) -> None:
+        """Test a quote at the end of a chunk is not taken as the end of a literal."""
+        extractor = SQLStreamExtractor()
+
+        assert extractor.feed("SELECT 'a'") is None
+        assert extractor.feed("';' FROM t;") == "SELECT 'a'';' FROM t"
+
+    def test_finish_without_terminator(self) -> None:
+        """Test finish returns the statement when the response just ends."""
+        extractor = SQLStreamExtractor()
+        extractor.feed("SELECT 1 FROM t")
+
+        assert extractor.finish() == "SELECT 1 FROM t"
@@ -1,9 +1,14 @@
 """Tests for SQL validator."""
 
+import time
+from unittest.mock import patch
+
 import pytest
+from sqlglot import exp
 
+from pg_mcp.config import ValidatorSettings
 from pg_mcp.models import SQLUnsafeError
-from pg_mcp.validator import SQLValidator
+from pg_mcp.validator import SQLValidator, ValidationExecutor
 
 
 class TestSQLValidator:
@@ -39,6 +44,81 @@ class TestSQLValidator:
         result = validator.validate(sql)
         assert result == sql
 
+    def test_validate_statement_returns_ast(self, validator: SQLValidator) -> None:
+        """Test validate_statement returns the parsed SELECT for reuse."""
+        validated = validator.validate_statement("SELECT id FROM users LIMIT 10")
+
+        assert validated.sql == "SELECT id FROM users LIMIT 10"
+        assert isinstance(validated.expression, exp.Select)
+        assert validated.expression.args["limit"].expression.to_py() == 10
+
+    def test_validate_statement_collects_tables(self, validator: SQLValidator) -> None:
+        """Test referenced tables are reported, without CTE names."""
+        validated = validator.validate_statement(
+            "WITH recent AS (SELECT * FROM public.orders) "
+            "SELECT * FROM recent JOIN users ON users.id = recent.user_id"
+        )
+
+        assert set(validated.tables) == {"public.orders", "users"}
+
+    def test_cte_reference_with_known_tables(self, validator_with_tables: SQLValidator) -> None:
+        """Test a reference to a CTE is not rejected as an unknown table."""
+        sql = "WITH big AS (SELECT * FROM orders WHERE total > 100) SELECT * FROM big"
+
+        assert validator_with_tables.validate(sql) == sql
+
+    def test_cte_does_not_hide_table_in_outer_scope(
+        self, validator_with_tables: SQLValidator
+    ) -> None:
+        """Test a CTE only matches references within the query that defines it."""
+        sql = (
+            "SELECT usename, passwd FROM pg_shadow, "
+            "(WITH pg_shadow AS (SELECT 1) SELECT * FROM pg_shadow) x"
+        )
+
+        assert validator_with_tables.validate_statement(sql, check_tables=False).tables == (
+            "pg_shadow",
+        )
+        with pytest.raises(SQLUnsafeError, match="pg_shadow"):
+            validator_with_tables.validate(sql)
+
+    def test_cte_reference_in_subquery(self, validator_with_tables: SQLValidator) -> None:
+        """Test a CTE referenced from a nested subquery is not taken as a table."""
+        sql = (
+            "WITH big AS (SELECT * FROM orders WHERE total > 100) "
+            "SELECT * FROM users WHERE id IN (SELECT user_id FROM big)"
+        )
+
+        assert validator_with_tables.validate_statement(sql).tables == ("users", "orders")
+
+    def test_cte_not_visible_before_definition(self, validator: SQLValidator) -> None:
+        """Test a CTE body cannot refer to a later CTE of the same WITH clause."""
+        validated = validator.validate_statement(
+            "WITH b AS (SELECT * FROM a), a AS (SELECT 1 AS x) SELECT * FROM b"
+        )
+
+        assert validated.tables == ("a",)
+
+    def test_known_function_named_by_literal(self, validator: SQLValidator) -> None:
+        """Test a literal argument that looks like a dangerous function name passes."""
+        sql = "SELECT upper('pg_read_file') FROM users"
+
+        assert validator.validate(sql) == sql
+
+    def test_rules_compiled_once_per_type(self, validator: SQLValidator) -> None:
+        """Test rule lookups are cached per AST node type."""
+        validator.validate("SELECT id FROM users WHERE id = 1")
+        compiled = dict(validator._compiled_rules)
+        validator.validate("SELECT name FROM users WHERE id = 2")
+
+        assert validator._compiled_rules == compiled
+        assert exp.Select in compiled
+
+    def test_validate_statement_rejects_unsafe(self, validator: SQLValidator) -> None:
+        """Test validate_statement applies the same checks as validate."""
+        with pytest.raises(SQLUnsafeError):
+            validator.validate_statement("DELETE FROM users")
+
     def test_select_distinct(self, validator: SQLValidator) -> None:
         """Test SELECT DISTINCT passes validation."""
         sql = "SELECT DISTINCT name FROM users"
@@ -431,6 +511,18 @@ class TestSQLValidator:
             validator_with_tables.validate(sql)
         assert "未知" in str(exc.value)
 
+    def test_update_known_tables_in_place(self, validator_with_tables: SQLValidator) -> None:
+        """Test update_known_tables swaps table names without replacing the set."""
+        known = validator_with_tables.known_tables
+
+        validator_with_tables.update_known_tables({"users", "invoices"})
+
+        assert validator_with_tables.known_tables is known
+        assert known == {"users", "invoices"}
+        assert validator_with_tables.validate("SELECT * FROM invoices")
+        with pytest.raises(SQLUnsafeError):
+            validator_with_tables.validate("SELECT * FROM orders")
+
     # is_select_only helper
 
     def test_is_select_only_true(self, validator: SQLValidator) -> None:
@@ -444,3 +536,100 @@ class TestSQLValidator:
     def test_is_select_only_false_for_invalid(self, validator: SQLValidator) -> None:
         """Test is_select_only returns False for invalid SQL."""
         assert validator.is_select_only("NOT VALID SQL") is False
+
+
+class TestValidationExecutor:
+    """Tests for ValidationExecutor."""
+
+    @pytest.fixture
+    def executor(self):
+        """Create a thread pool executor and shut it down afterwards."""
+        executor = ValidationExecutor(ValidatorSettings(executor="thread", workers=1))
+        yield executor
+        executor.close()
+
+    @pytest.mark.asyncio
+    async def test_validates_in_worker(self, executor: ValidationExecutor) -> None:
+        """Test statements are parsed and checked in the pool."""
+        validated = await executor.validate(SQLValidator(), "SELECT id FROM users")
+
+        assert isinstance(validated.expression, exp.Select)
+        assert validated.tables == ("users",)
+
+    @pytest.mark.asyncio
+    async def test_verdicts_are_cached(self, executor: ValidationExecutor) -> None:
+        """Test repeated SQL is served from the verdict cache, rejections included."""
+        validator = SQLValidator()
+
+        with patch.object(
+            validator, "validate_statement", wraps=validator.validate_statement
+        ) as mock_validate:
+            first = await executor.validate(validator, "SELECT 1")
+            second = await executor.validate(validator, "SELECT 1")
+            for _ in range(2):
+                with pytest.raises(SQLUnsafeError, match="DELETE|Delete"):
+                    await executor.validate(validator, "DELETE FROM users")
+
+        assert first is second
+        assert mock_validate.call_count == 2
+        assert executor.stats().hits == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_verdict_checks_current_tables(
+        self, executor: ValidationExecutor
+    ) -> None:
+        """Test a cached verdict is checked against the current known tables."""
+        validator = SQLValidator(known_tables={"users"})
+        sql = "SELECT * FROM orders"
+
+        with pytest.raises(SQLUnsafeError, match="orders"):
+            await executor.validate(validator, sql)
+
+        validator.update_known_tables({"users", "orders"})
+        validated = await executor.validate(validator, sql)
+
+        assert validated.tables == ("orders",)
+        assert executor.stats().hits == 1
+
+    @pytest.mark.asyncio
+    async def test_parse_timeout(self) -> None:
+        """Test a slow statement is rejected and its verdict is not cached."""
+        executor = ValidationExecutor(
+            ValidatorSettings(executor="thread", workers=1, parse_timeout=0.05)
+        )
+        validator = SQLValidator()
+
+        def slow_validate(sql: str, check_tables: bool = True):
+            time.sleep(0.2)
+            return SQLValidator.validate_statement(validator, sql, check_tables)
+
+        try:
+            with patch.object(validator, "validate_statement", side_effect=slow_validate):
+                with pytest.raises(SQLUnsafeError, match="超时"):
+                    await executor.validate(validator, "SELECT 1")
+            assert len(executor._verdicts) == 0
+        finally:
+            executor.close()
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self) -> None:
+        """Test validation in a worker process returns a usable statement."""
+        executor = ValidationExecutor(ValidatorSettings(executor="process", workers=1))
+        try:
+            validated = await executor.validate(SQLValidator(), "SELECT name FROM users")
+            with pytest.raises(SQLUnsafeError, match="pg_read_file"):
+                await executor.validate(SQLValidator(), "SELECT pg_read_file('/etc/passwd')")
+        finally:
+            executor.close()
+
+        assert validated.expression.sql(dialect="postgres") == "SELECT name FROM users"
+
+    @pytest.mark.asyncio
+    async def test_inline(self) -> None:
+        """Test inline mode validates on the event loop without a pool."""
+        executor = ValidationExecutor(ValidatorSettings(executor="inline"))
+
+        validated = await executor.validate(SQLValidator(), "SELECT 1")
+
+        assert executor._executor is None
+        assert validated.sql == "SELECT 1"